@@ -8,6 +8,7 @@ from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
 from core.models import (Application, Deceased, Dispute, Applicant, Document, ApplicationProcessingStatus, )
+from core.serializers import ApplicantListSerializer, ApplicantPPSMixin
 from expense.serializers import ExpenseSerializer
 from user.serializers import UserSerializer
 from loan.serializers import LoanSerializer
@@ -60,7 +61,7 @@ class AgentDisputeSerializer(serializers.ModelSerializer):
         fields = ['details']
 
 
-class AgentApplicantSerializer(serializers.ModelSerializer):
+class AgentApplicantSerializer(ApplicantPPSMixin, serializers.ModelSerializer):
     # Override the pps_number field to accept plain text from the frontend
     pps_number = serializers.CharField(required=True, allow_blank=False)
 
@@ -112,16 +113,7 @@ class AgentApplicantSerializer(serializers.ModelSerializer):
             'updated_at'
         ]
         read_only_fields = ['id', 'full_name', 'full_address', 'created_at', 'updated_at']
-
-    def get_pps_number(self, obj):
-        """Return the decrypted PPS number for GET requests."""
-        return obj.decrypted_pps
-
-    def to_representation(self, instance):
-        """Decrypt PPS number when sending data to the frontend."""
-        ret = super().to_representation(instance)
-        ret['pps_number'] = instance.decrypted_pps
-        return ret
+        list_serializer_class = ApplicantListSerializer
 
     def validate(self, data):
         """Additional validation for required fields."""
@@ -155,6 +147,11 @@ class AgentApplicantSerializer(serializers.ModelSerializer):
         return instance
 
 
+class AgentMaskedApplicantSerializer(AgentApplicantSerializer):
+    """Applicant serializer for application lists, the PPS number is masked and never decrypted"""
+    mask_pps = True
+
+
 class ApplicationProcessingStatusSerializer(serializers.ModelSerializer):
     last_updated_by = serializers.StringRelatedField(read_only=True)
 
@@ -176,7 +173,7 @@ class AgentApplicationSerializer(serializers.ModelSerializer):
     assigned_to_email = serializers.SerializerMethodField()
     loan = LoanSerializer(read_only=True)
     last_updated_by_email = serializers.SerializerMethodField()
-    applicants = AgentApplicantSerializer(
+    applicants = AgentMaskedApplicantSerializer(
         many=True, required=True)
     currency_sign = serializers.SerializerMethodField()
 
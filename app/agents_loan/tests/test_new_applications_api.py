@@ -0,0 +1,98 @@
+"""
+Tests for the new applications feed
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Application, Team
+
+LIST_URL = reverse('agents_loan:new-applications-list')
+MARK_SEEN_BULK_URL = reverse('agents_loan:new-applications-mark-seen-bulk')
+
+
+class NewApplicationsApiTests(TestCase):
+
+    def setUp(self):
+        self.solicitor = get_user_model().objects.create_user(email='solicitor@example.com', password='pass',
+                                                              country='IE')
+        uk_solicitor = get_user_model().objects.create_user(email='uk@example.com', password='pass', country='UK')
+        self.new_applications = [Application.objects.create(user=self.solicitor, amount=1000, term=12)
+                                 for _ in range(3)]
+        seen = Application.objects.create(user=self.solicitor, amount=1000, term=12)
+        Application.objects.filter(pk=seen.pk).update(is_new=False)
+        Application.objects.create(user=uk_solicitor, amount=1000, term=12)
+
+        self.staff = get_user_model().objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        self.staff.teams.add(Team.objects.create(name='ie_team'))
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.staff)
+
+    def test_list_new_for_team_countries(self):
+        response = self.client.get(LIST_URL)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([row['id'] for row in response.data['new_application_ids']],
+                         [a.id for a in self.new_applications])
+        self.assertEqual(response.data['new_application_ids'][0]['user__country'], 'IE')
+        self.assertEqual(response.data['cursor'], self.new_applications[-1].id)
+
+    def test_list_since_cursor(self):
+        response = self.client.get(LIST_URL, {'since': self.new_applications[0].id})
+        self.assertEqual([row['id'] for row in response.data['new_application_ids']],
+                         [a.id for a in self.new_applications[1:]])
+
+        response = self.client.get(LIST_URL, {'since': response.data['cursor']})
+        self.assertEqual(response.data['new_application_ids'], [])
+        self.assertEqual(response.data['cursor'], self.new_applications[-1].id)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(LIST_URL, {'since': 'abc'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    @patch('agents_loan.views.broadcast_applications_seen')
+    def test_bulk_mark_seen_is_a_single_update(self, patched_broadcast):
+        ids = [a.id for a in self.new_applications[:2]]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(MARK_SEEN_BULK_URL, {'ids': ids}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(len([q for q in queries if q['sql'].startswith('UPDATE "core_application"')]), 1)
+        self.assertEqual(list(Application.objects.filter(is_new=True, country='IE').values_list('id', flat=True)),
+                         [self.new_applications[2].id])
+        patched_broadcast.assert_called_once_with(ids, self.staff)
+
+    def test_bulk_mark_seen_requires_ids(self):
+        response = self.client.post(MARK_SEEN_BULK_URL, {'ids': 'all'}, format='json')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_mark_seen_single(self):
+        application = self.new_applications[0]
+        url = reverse('agents_loan:new-applications-mark-seen', args=[application.id])
+
+        response = self.client.patch(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        application.refresh_from_db()
+        self.assertFalse(application.is_new)
+
+        self.assertEqual(self.client.patch(url).status_code, status.HTTP_200_OK)
+        response = self.client.patch(reverse('agents_loan:new-applications-mark-seen', args=[application.id + 100]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    @patch('core.signals.broadcast_new_application')
+    def test_new_application_is_pushed_after_commit(self, patched_broadcast):
+        with self.captureOnCommitCallbacks(execute=True):
+            application = Application.objects.create(user=self.solicitor, amount=1000, term=12)
+            patched_broadcast.assert_not_called()
+
+        patched_broadcast.assert_called_once_with(application)
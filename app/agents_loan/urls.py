@@ -8,7 +8,7 @@ from rest_framework.routers import DefaultRouter
 
 from agents_loan import views
 from agents_loan.views import DownloadFileView, NewApplicationViewSet, ApplicationProcessingStatusCreateView, \
-    NotifySolicitorDocumentUploadView
+    NotifySolicitorDocumentUploadView, AgentChunkedDocumentUploadViewSet
 
 router = DefaultRouter()
 
@@ -24,6 +24,20 @@ urlpatterns = [
     path('applications/agent_applications/document_file/<int:application_id>/',
          views.AgentDocumentUploadAndViewListForApplicationIdView.as_view(),
          name='agent_application-upload-document'),
+    # Chunked upload of large documents (init / append / complete)
+    path('applications/agent_applications/document_file/<int:application_id>/chunked/',
+         AgentChunkedDocumentUploadViewSet.as_view({'post': 'create'}),
+         name='agent_application-chunked-upload'),
+    path('applications/agent_applications/document_file/<int:application_id>/chunked/<uuid:upload_id>/',
+         AgentChunkedDocumentUploadViewSet.as_view({'get': 'retrieve', 'delete': 'destroy'}),
+         name='agent_application-chunked-upload-detail'),
+    path('applications/agent_applications/document_file/<int:application_id>/chunked/<uuid:upload_id>/'
+         'chunks/<int:index>/',
+         AgentChunkedDocumentUploadViewSet.as_view({'put': 'chunk'}),
+         name='agent_application-chunked-upload-chunk'),
+    path('applications/agent_applications/document_file/<int:application_id>/chunked/<uuid:upload_id>/complete/',
+         AgentChunkedDocumentUploadViewSet.as_view({'post': 'complete'}),
+         name='agent_application-chunked-upload-complete'),
     path('applications/agent_applications/document_patch/<int:document_id>/', views.AgentDocumentPatchView.as_view(),
          name='agents-document-patch-view'),
     path('applications/agent_applications/document_file/download/<str:filename>/', DownloadFileView.as_view(),
@@ -32,6 +46,9 @@ urlpatterns = [
     path('applications/agent_applications/new_applications/list/',
          NewApplicationViewSet.as_view({'get': 'list_new'}),
          name='new-applications-list'),
+    path('applications/agent_applications/new_applications/mark-seen/',
+         NewApplicationViewSet.as_view({'post': 'mark_seen_bulk'}),
+         name='new-applications-mark-seen-bulk'),
     path('applications/agent_applications/new_applications/<int:pk>/mark-seen/',
          NewApplicationViewSet.as_view({'patch': 'mark_seen'}),
          name='new-applications-mark-seen'),
@@ -1,15 +1,16 @@
 """
 Views for agents_application API
 """
+import logging
 import os
 import re
 
 from django.utils import timezone
 
 from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
-from django.db import transaction
 from django.db.models import Q
-from django.http import JsonResponse, Http404, HttpResponseForbidden, HttpResponse, HttpResponseNotFound
+from django.db import transaction
+from django.http import JsonResponse, Http404, HttpResponseForbidden, HttpResponseNotFound
 from django.shortcuts import get_object_or_404
 from drf_spectacular.types import OpenApiTypes
 
@@ -28,7 +29,7 @@ from app.utils import log_event
 from communications.utils import send_email_f
 from core import models
 from agents_loan.permissions import IsStaff
-from app.pagination import CustomPageNumberPagination
+from app.pagination import CustomPageNumberPagination, KeysetPaginationMixin
 
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
 
@@ -39,12 +40,23 @@ from core.models import Document, Application, ApplicationProcessingStatus
 from django.core.files.base import ContentFile
 
 from core.Validators.id_validators import ApplicantsValidator
+from core.applicant_search import search_applications
+from core.detail_cache import bump_application_versions, cached_detail_response
+from core.estate_totals import with_estate_value
+from core.maturity import maturity_date_expression
+from core.tab_counts import get_cached_counts
+from core.downloads import serve_field_file
+from core.utils import get_application_document_file_path
+from core.views import ChunkedUploadViewSet
+from notifications.utils import broadcast_applications_seen
 
 from django.conf import settings
 from django.core.files.storage import default_storage
 
 import shutil
-from datetime import datetime, date
+from datetime import datetime
+
+logger = logging.getLogger(__name__)
 
 
 @extend_schema_view(
@@ -91,6 +103,13 @@ from datetime import datetime, date
                 required=False,
                 type=OpenApiTypes.STR
             ),
+            OpenApiParameter(
+                name='sort_by',
+                description='Sort by the net value of the estate: `estate_value` (ascending) or `-estate_value` (descending).',
+                required=False,
+                type=OpenApiTypes.STR,
+                enum=['estate_value', '-estate_value']
+            ),
         ]
     ),
     retrieve=extend_schema(
@@ -137,6 +156,20 @@ from datetime import datetime, date
                              required=True, type=int)
         ]
     ),
+    counts=extend_schema(
+        summary='Count applications per status tab {-Works only for staff users-}',
+        description='Returns the number of applications for every status filter of the list (active, rejected, '
+                    'approved, paid_out, settled) and the total, for the countries of the user\'s teams. '
+                    'Counts are cached for a few seconds and refreshed whenever an application or loan changes.',
+        tags=['agent_application'],
+        parameters=[
+            OpenApiParameter(name='assigned',
+                             description='Count only applications assigned to the logged-in user (true) or '
+                                         'unassigned applications (false) - optional',
+                             required=False, type=str)
+        ],
+        responses=OpenApiTypes.OBJECT,
+    ),
     search_applications=extend_schema(
         summary='Search applications based on any field {-Works only for staff users-}',
         description='Search applications by passing any property from the model. Supports date range for date fields and foreign key filters. Excludes loans.',
@@ -181,7 +214,7 @@ from datetime import datetime, date
     )
 
 )
-class AgentApplicationViewSet(viewsets.ModelViewSet):
+class AgentApplicationViewSet(KeysetPaginationMixin, viewsets.ModelViewSet):
     """Viewset for applications"""
     serializer_class = serializers.AgentApplicationDetailSerializer
     queryset = models.Application.objects.all()
@@ -189,9 +222,8 @@ class AgentApplicationViewSet(viewsets.ModelViewSet):
     permission_classes = [IsAuthenticated, IsStaff]
     pagination_class = CustomPageNumberPagination
 
-    def get_queryset(self):
-        queryset = self.queryset
-
+    def get_country_filters(self):
+        """Countries of the user's teams, staff without a country team cannot list applications"""
         user = self.request.user
 
         # Get the user's teams and filter based on the country
@@ -204,8 +236,12 @@ class AgentApplicationViewSet(viewsets.ModelViewSet):
             # Check if no country filters were added
         if not country_filters:
             raise PermissionDenied("You must be assigned to at least one team to access this resource.")
+        return country_filters
 
-        queryset = queryset.filter(user__country__in=country_filters)
+    def get_queryset(self):
+        queryset = self.queryset
+
+        queryset = queryset.filter(country__in=self.get_country_filters())
 
         stat = self.request.query_params.get('status', None)
         assigned = self.request.query_params.get('assigned', None)
@@ -223,15 +259,7 @@ class AgentApplicationViewSet(viewsets.ModelViewSet):
 
                 # Filter by applicant search term
         if search_term:
-            queryset = queryset.filter(
-                Q(applicants__first_name__icontains=search_term) |
-                Q(applicants__last_name__icontains=search_term) |
-                Q(applicants__pps_number__icontains=search_term) |
-                Q(applicants__email__icontains=search_term) |
-                Q(applicants__phone_number__icontains=search_term) |
-                Q(applicants__city__icontains=search_term) |
-                Q(applicants__county__icontains=search_term)
-            ).distinct()
+            queryset = search_applications(queryset, search_term)
             return queryset
 
         if assigned is not None:
@@ -240,78 +268,20 @@ class AgentApplicationViewSet(viewsets.ModelViewSet):
             if assigned == "false":
                 queryset = queryset.filter(assigned_to=None)
 
-            # Filter based on status parameter
+            # Filter based on status parameter, a single scan of the (stage, country, id) index
         if stat is not None:
-            if stat == 'active':
-                # Applications that are not rejected or approved, or need committee approval and are pending approval
-                queryset = queryset.filter(
-                    Q(is_rejected=False, approved=False) |
-                    Q(
-                        approved=True,
-                        loan__isnull=False,
-                        loan__needs_committee_approval=True,
-                        loan__is_committee_approved__isnull=True
-                    )
-                ).distinct()
-
-            elif stat == 'rejected':
-                # Applications explicitly rejected or rejected in the loan approval process
-                queryset = queryset.filter(
-                    Q(is_rejected=True) |
-                    Q(
-                        is_rejected=False,
-                        approved=True,
-                        loan__isnull=False,
-                        loan__needs_committee_approval=True,
-                        loan__is_committee_approved=False
-                    )
-                ).distinct()
-
-
-            elif stat == 'approved':
-                # Define condition for "not truly paid out"
-                not_paid_out_condition = Q(loan__is_paid_out=False) | Q(loan__is_paid_out=True,
-                                                                        loan__paid_out_date__isnull=True)
-                # Approved applications with loans that are not paid out or settled
-                queryset = queryset.filter(
-                    approved=True,
-                    loan__isnull=False
-                ).filter(
-                    (Q(loan__needs_committee_approval=False) & not_paid_out_condition & Q(loan__is_settled=False)) |
-                    (Q(loan__needs_committee_approval=True) & Q(
-                        loan__is_committee_approved=True) & not_paid_out_condition & Q(loan__is_settled=False))
-                )
+            stages = models.Application.AGENT_STATUS_STAGES.get(stat)
+            if stages is not None:
+                queryset = queryset.filter(stage__in=stages)
 
+            if stat == 'paid_out':
+                # Soonest maturity first, computed by the database so the list can still be paginated
+                return queryset.annotate(loan_maturity=maturity_date_expression('loan__')).order_by(
+                    'loan_maturity', '-id')
 
-            elif stat == 'paid_out':
-                # Applications with loans paid out but not settled
-                # Must have paid_out_date (same rule as before)
-                queryset = queryset.filter(
-                    approved=True,
-                    loan__isnull=False,
-                    loan__paid_out_date__isnull=False  # ✅ Add this check
-                ).filter(
-                    (Q(loan__needs_committee_approval=False) & Q(loan__is_paid_out=True) & Q(loan__is_settled=False)) |
-                    (Q(loan__needs_committee_approval=True) & Q(loan__is_committee_approved=True) & Q(
-                        loan__is_paid_out=True) & Q(loan__is_settled=False))
-                )
-                # Sort using date.max for consistency (fixes date comparison issue)
-                queryset = sorted(
-                    queryset,
-                    key=lambda app: app.loan.maturity_date if app.loan and app.loan.maturity_date else date.max
-                )
-                return queryset
-
-            elif stat == 'settled':
-                # Applications with loans that are fully paid out and settled
-                queryset = queryset.filter(
-                    approved=True,
-                    loan__isnull=False
-                ).filter(
-                    (Q(loan__needs_committee_approval=False) & Q(loan__is_paid_out=True) & Q(loan__is_settled=True)) |
-                    (Q(loan__needs_committee_approval=True) & Q(loan__is_committee_approved=True) & Q(
-                        loan__is_paid_out=True) & Q(loan__is_settled=True))
-                )
+        sort_by = self.request.query_params.get('sort_by', None)
+        if sort_by in ('estate_value', '-estate_value'):
+            return with_estate_value(queryset).order_by(sort_by, '-id')
 
         return queryset.order_by('-id')
 
@@ -399,6 +369,25 @@ class AgentApplicationViewSet(viewsets.ModelViewSet):
 
         return Response(serializer.data, status=status.HTTP_200_OK)
 
+    @action(detail=False, methods=['get'])
+    def counts(self, request):
+        """Number of applications in every status tab, counted in a single query"""
+        country_filters = self.get_country_filters()
+        queryset = models.Application.objects.filter(country__in=country_filters)
+
+        assigned = request.query_params.get('assigned', None)
+        if assigned == "true":
+            queryset = queryset.filter(assigned_to=request.user)
+        elif assigned == "false":
+            queryset = queryset.filter(assigned_to=None)
+
+        assigned_user = request.user.id if assigned == "true" else ''
+        scope = f"agent_applications:{','.join(country_filters)}:{assigned}:{assigned_user}"
+        tab_filters = {
+            stat: Q(stage__in=stages) for stat, stages in models.Application.AGENT_STATUS_STAGES.items()
+        }
+        return Response(get_cached_counts(scope, queryset, tab_filters), status=status.HTTP_200_OK)
+
     @action(detail=False, methods=['get'])
     def all_application_ids(self, request):
         """Returns a list of all application IDs"""
@@ -415,6 +404,11 @@ class AgentApplicationViewSet(viewsets.ModelViewSet):
         application_ids = self.queryset.filter(user_id=user_id).values_list('id', flat=True)
         return Response(application_ids, status=status.HTTP_200_OK)
 
+    def retrieve(self, request, *args, **kwargs):
+        """Detail response cached per application version, with ETag / If-None-Match support"""
+        return cached_detail_response(request, self.get_object(), self.get_serializer_class(),
+                                      self.get_serializer_context())
+
     def get_serializer_class(self):
         """Return serializer class for the requested model."""
         if self.action == 'list':
@@ -567,6 +561,64 @@ class AgentDocumentUploadAndViewListForApplicationIdView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+
+@extend_schema_view(
+    create=extend_schema(
+        summary="Start a chunked document upload for a specific application {-Works only for staff users-}",
+        description="Opens an upload session for a large document. Send `filename`, `total_size` and the "
+                    "document fields, then upload each chunk and complete the upload.",
+        tags=["document_agent"],
+    ),
+    retrieve=extend_schema(
+        summary="Status of a chunked document upload {-Works only for staff users-}",
+        description="Returns the received and missing chunks, used to resume an interrupted upload.",
+        tags=["document_agent"],
+    ),
+    chunk=extend_schema(
+        summary="Upload one chunk of a document {-Works only for staff users-}",
+        description="Raw chunk bytes in the body, SHA-256 of the chunk in the `X-Chunk-Checksum` header.",
+        tags=["document_agent"],
+    ),
+    complete=extend_schema(
+        summary="Complete a chunked document upload {-Works only for staff users-}",
+        description="Commits the uploaded chunks and creates the document.",
+        tags=["document_agent"],
+    ),
+    destroy=extend_schema(
+        summary="Abort a chunked document upload {-Works only for staff users-}",
+        description="Aborts the upload and discards the received chunks.",
+        tags=["document_agent"],
+    ),
+)
+class AgentChunkedDocumentUploadViewSet(ChunkedUploadViewSet):
+    serializer_class = serializers.AgentDocumentSerializer
+    permission_classes = [IsAuthenticated, IsStaff]
+    upload_target = models.ChunkedUpload.TARGET_DOCUMENT
+
+    def get_application(self, application_id):
+        return get_object_or_404(models.Application, id=application_id)
+
+    def get_storage_name(self, filename):
+        return get_application_document_file_path(None, filename)
+
+    def save_record(self, serializer, application, upload, storage_name):
+        return serializer.save(
+            application=application,
+            uploaded_by=self.request.user,
+            document=storage_name,
+            original_name=serializer.validated_data.get('original_name') or os.path.splitext(upload.filename)[0],
+        )
+
+    def upload_completed(self, request, application, upload, instance):
+        request_body = dict(upload.metadata)
+        request_body['document'] = {
+            'filename': upload.filename,
+            'size': upload.total_size,
+            'chunks': upload.total_chunks,
+        }
+        log_event(request=request, request_body=request_body, application=application, response_status=201)
+
+
 class AgentDocumentDeleteView(APIView):
     serializer_class = serializers.AgentDocumentSerializer
     authentication_classes = (JWTAuthentication,)
@@ -610,12 +662,12 @@ class AgentDocumentDeleteView(APIView):
                     # Azure storage - use storage backend operations
                     self._move_file_azure(document, deleted_file_path)
 
-                print(f"Moved document file from {original_file_name} to {deleted_file_path}")
+                logger.debug("Moved document file from %s to %s", original_file_name, deleted_file_path)
             else:
-                print(f"Original file {original_file_name} does not exist")
+                logger.warning("Original file %s does not exist", original_file_name)
 
         except Exception as e:
-            print(f"Error moving document file {original_file_name}: {e}")
+            logger.error("Error moving document file %s: %s", original_file_name, e)
             # Continue with deletion even if move fails
 
     def _move_file_local(self, document, deleted_file_path):
@@ -700,7 +752,8 @@ class DownloadFileView(APIView):
 
     @extend_schema(
         summary="Download a document with the given filename",
-        description="Allows authenticated users to download a file if they have access permissions.",
+        description="Allows authenticated users to download a file if they have access permissions. "
+                    "Supports Range and If-None-Match requests.",
         tags=["document_agent"],
         responses={
             200: {
@@ -713,24 +766,22 @@ class DownloadFileView(APIView):
     )
     def get(self, request, filename):
         try:
-            document = Document.objects.get(document__endswith=filename)
-            application = document.application
-
-            # Check if the user is not staff and does not own the application
-            if not request.user.is_staff and application.user != request.user:
-                return HttpResponseForbidden("You do not have permission to access this file.")
+            # Exact match on the indexed storage key, uploads are always stored as uploads/application/<uuid><ext>
+            document = Document.objects.select_related('application').get(
+                document=f'uploads/application/{filename}'
+            )
+        except Document.DoesNotExist:
+            return HttpResponseNotFound("File not found.")
 
-            file_path = os.path.join(settings.MEDIA_ROOT, 'uploads', 'application', filename)
+        application = document.application
 
-            if os.path.exists(file_path):
-                with open(file_path, 'rb') as file:
-                    response = HttpResponse(file.read(), content_type='application/pdf')
-                    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-                    return response
-            else:
-                return HttpResponseNotFound("File not found.")
+        # Check if the user is not staff and does not own the application
+        if not request.user.is_staff and application.user != request.user:
+            return HttpResponseForbidden("You do not have permission to access this file.")
 
-        except Document.DoesNotExist:
+        try:
+            return serve_field_file(request, document.document, filename=filename)
+        except Http404:
             return HttpResponseNotFound("File not found.")
 
 
@@ -743,14 +794,33 @@ class NewApplicationViewSet(viewsets.ViewSet):
     authentication_classes = (JWTAuthentication,)
     permission_classes = [IsAuthenticated]
 
+    def get_team_countries(self):
+        country_teams = self.request.user.teams.all().filter(name__endswith='_team')
+        # Extract the part of the name before '_team'
+        return [team.name.rsplit('_team', 1)[0].upper() for team in country_teams]
+
+    def set_seen(self, application_ids):
+        """Clear is_new with a single UPDATE and push the change to the other agents, returns the updated count"""
+        updated = models.Application.objects.filter(id__in=application_ids, is_new=True).update(is_new=False)
+        if updated:
+            bump_application_versions(application__in=application_ids)
+            broadcast_applications_seen(application_ids, self.request.user)
+        return updated
+
     @extend_schema(
         summary="List IDs of new applications",
-        description="Returns a list of application IDs where `is_new=True`.",
+        description="Returns the applications where `is_new=True` for the user's country teams. New applications "
+                    "are pushed over the notifications websocket (`new_application` events), pass the returned "
+                    "`cursor` as `since` after a reconnect to only get the ones created in between.",
         tags=["agent_application"],
+        parameters=[
+            OpenApiParameter(name='since', description='Only applications with an ID greater than this cursor',
+                             required=False, type=OpenApiTypes.INT),
+        ],
         responses={
             200: {
                 "description": "A list of new application IDs.",
-                "examples": {"new_application_ids": [1, 2, 3]},
+                "examples": {"new_application_ids": [1, 2, 3], "cursor": 3},
             },
             403: {"description": "Forbidden - Authentication credentials not provided."},
         },
@@ -758,20 +828,28 @@ class NewApplicationViewSet(viewsets.ViewSet):
     @action(detail=False, methods=['get'], url_path='list')
     def list_new(self, request):
         """
-        List IDs of applications where `is_new=True`.
+        List IDs of applications where `is_new=True`, served from the partial index on unseen applications.
         """
-        country_teams = self.request.user.teams.all().filter(name__endswith='_team')
-        # Extract the part of the name before '_team'
-        filtered_team_names = [team.name.rsplit('_team', 1)[0].upper() for team in country_teams]
+        since = request.query_params.get('since', None)
 
         new_applications = models.Application.objects.filter(
-            is_new=True
-        ).values('id', 'assigned_to__email', "user__country")
+            is_new=True, country__in=self.get_team_countries()
+        )
+        if since:
+            try:
+                since = int(since)
+            except ValueError:
+                raise DRFValidationError({"since": "Invalid cursor. Must be an integer."})
+            new_applications = new_applications.filter(id__gt=since)
 
-        new_applications_for_agent_teams = new_applications.filter(user__country__in=filtered_team_names)
-        # print(new_applications_for_agent_teams)
+        rows = list(new_applications.order_by('id').values('id', 'assigned_to__email', 'country'))
+        for row in rows:
+            row['user__country'] = row.pop('country')
 
-        return Response({"new_application_ids": list(new_applications_for_agent_teams)}, status=status.HTTP_200_OK)
+        return Response({
+            "new_application_ids": rows,
+            "cursor": rows[-1]['id'] if rows else since or None,
+        }, status=status.HTTP_200_OK)
 
     @extend_schema(
         summary="Mark an application as seen",
@@ -790,13 +868,39 @@ class NewApplicationViewSet(viewsets.ViewSet):
         """
         Mark an application as not new (`is_new=False`) based on the provided ID.
         """
-        try:
-            application = models.Application.objects.get(pk=pk)
-            application.is_new = False
-            application.save()
-            return Response({"message": f"Application {pk} marked as seen."}, status=status.HTTP_200_OK)
-        except models.Application.DoesNotExist:
+        if not self.set_seen([pk]) and not models.Application.objects.filter(pk=pk).exists():
             return Response({"error": f"Application with ID {pk} does not exist."}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"message": f"Application {pk} marked as seen."}, status=status.HTTP_200_OK)
+
+    @extend_schema(
+        summary="Mark several applications as seen",
+        description="Sets the `is_new` field to `False` for all the given application IDs in a single update.",
+        tags=["agent_application"],
+        request={
+            "application/json": {
+                "type": "object",
+                "properties": {"ids": {"type": "array", "items": {"type": "integer"}}},
+                "required": ["ids"],
+            }
+        },
+        responses={
+            200: {
+                "description": "The applications have been marked as seen.",
+                "examples": {"updated": 2},
+            },
+            400: {"description": "`ids` is not a list of integers."},
+        },
+    )
+    @action(detail=False, methods=['post'], url_path='mark-seen')
+    def mark_seen_bulk(self, request):
+        """
+        Mark many applications as not new with a single `UPDATE ... WHERE id IN (...)`.
+        """
+        ids = request.data.get('ids')
+        if not isinstance(ids, list) or not all(isinstance(i, int) and not isinstance(i, bool) for i in ids):
+            raise DRFValidationError({"ids": "Must be a list of application IDs."})
+
+        return Response({"updated": self.set_seen(ids) if ids else 0}, status=status.HTTP_200_OK)
 
 
 class ApplicationProcessingStatusCreateView(APIView):
@@ -1,7 +1,153 @@
-from rest_framework.pagination import PageNumberPagination
+import base64
+import json
+from collections import OrderedDict
+from datetime import date, datetime
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
 
 
 class CustomPageNumberPagination(PageNumberPagination):
     page_size = 100
     page_size_query_param = 'page_size'
     max_page_size = 10000
+
+
+def approximate_count(queryset):
+    """Row estimate of the planner (pg statistics) for the queryset, without running it"""
+    plan = json.loads(queryset.explain(format='json'))
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination on the ordering of the queryset, e.g. ('-id',) or ('estate_value', '-id').
+
+    The cursor holds the sort key values of the last row, the next page is read with
+    WHERE (sort_key, id) > (last_sort_key, last_id) so deep pages cost the same as the first one and no
+    COUNT(*) is needed. The id is added as a tie breaker when the ordering does not end with it.
+
+    ?count=exact adds the exact count, ?count=approximate the planner's estimate.
+    """
+    page_size = 100
+    page_size_query_param = 'page_size'
+    max_page_size = 1000
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if isinstance(queryset, list):
+            raise ValidationError({'pagination': 'Cursor pagination is not available for this list.'})
+
+        self.request = request
+        self.ordering = self.get_ordering(queryset)
+        queryset = queryset.order_by(*self.ordering)
+
+        self.count = None
+        count = request.query_params.get(self.count_query_param)
+        if count == 'exact':
+            self.count = queryset.count()
+        elif count == 'approximate':
+            self.count = approximate_count(queryset)
+
+        cursor = request.query_params.get(self.cursor_query_param)
+        if cursor:
+            queryset = queryset.filter(self.after(self.decode_cursor(cursor)))
+
+        page_size = self.get_page_size(request)
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        self.page = rows[:page_size]
+        return self.page
+
+    def get_ordering(self, queryset):
+        ordering = list(queryset.query.order_by or queryset.model._meta.ordering) or ['-id']
+        if not all(isinstance(key, str) for key in ordering):
+            raise ValidationError({'pagination': 'Cursor pagination is not available for this ordering.'})
+        ordering = ['id' if key == 'pk' else '-id' if key == '-pk' else key for key in ordering]
+        if ordering[-1].lstrip('-') != 'id':
+            ordering.append('-id' if ordering[-1].startswith('-') else 'id')
+        return ordering
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except ValueError:
+            page_size = self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def after(self, values):
+        """Rows after the cursor: (a > x) OR (a = x AND b > y) ..., each key in its own direction"""
+        condition = Q()
+        for i, key in enumerate(self.ordering):
+            lookup = 'lt' if key.startswith('-') else 'gt'
+            row_condition = Q(**{f'{key.lstrip("-")}__{lookup}': values[i]})
+            for previous_key, previous_value in zip(self.ordering[:i], values[:i]):
+                row_condition &= Q(**{previous_key.lstrip('-'): previous_value})
+            condition |= row_condition
+        return condition
+
+    def encode_cursor(self, row):
+        values = []
+        for key in self.ordering:
+            value = row
+            for attribute in key.lstrip('-').split('__'):
+                value = getattr(value, attribute)
+            # Full precision, DjangoJSONEncoder would drop the microseconds of datetimes
+            values.append(value.isoformat() if isinstance(value, (date, datetime)) else value)
+        return base64.urlsafe_b64encode(json.dumps(values, cls=DjangoJSONEncoder).encode()).decode()
+
+    def decode_cursor(self, cursor):
+        try:
+            values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        except (ValueError, TypeError):
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor.'})
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor.'})
+        return values
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.page[-1]))
+
+    def get_paginated_response(self, data):
+        response = OrderedDict([('next', self.get_next_link())])
+        if self.count is not None:
+            response['count'] = self.count
+        response['results'] = data
+        return Response(response)
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'count': {'type': 'integer'},
+                'results': schema,
+            },
+        }
+
+
+class KeysetPaginationMixin:
+    """
+    Lets the frontend opt in to KeysetPagination per request with ?pagination=cursor (or by following a `next`
+    link carrying a cursor), other requests keep the view's pagination_class.
+    """
+
+    @property
+    def paginator(self):
+        if not hasattr(self, '_paginator'):
+            request = getattr(self, 'request', None)
+            params = request.query_params if request is not None else {}
+            if params.get('pagination') == 'cursor' or KeysetPagination.cursor_query_param in params:
+                self._paginator = KeysetPagination()
+            else:
+                self._paginator = self.pagination_class() if self.pagination_class else None
+        return self._paginator
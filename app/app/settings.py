@@ -45,6 +45,32 @@ DILISENSE_API_KEY = os.getenv('DILISENSE_API_KEY', '')
 # CCR Configuration
 CCR_PROVIDER_CODE = os.getenv('CCR_PROVIDER_CODE', 'TEST001')  # Your temporary code
 CCR_TEST_MODE = os.getenv('CCR_TEST_MODE', 'True').lower() == 'true'
+# Store a gzip copy next to each generated CCR submission file
+CCR_COMPRESS_SUBMISSIONS = os.getenv('CCR_COMPRESS_SUBMISSIONS', 'False').lower() == 'true'
+# Processes valuing the active contracts of a CCR run, 1 values them in the request/command process
+CCR_VALUATION_WORKERS = int(os.getenv('CCR_VALUATION_WORKERS', 1))
+
+# DOCX -> PDF conversion worker (Mortgage & Charge). Binary is autodetected (soffice/libreoffice) when empty
+DOCX_PDF_CONVERTER_BINARY = os.getenv('DOCX_PDF_CONVERTER_BINARY', '')
+DOCX_PDF_CONVERTER_WORKERS = int(os.getenv('DOCX_PDF_CONVERTER_WORKERS', 1))
+DOCX_PDF_CONVERTER_TIMEOUT = int(os.getenv('DOCX_PDF_CONVERTER_TIMEOUT', 60))
+# Threads generating documents of a bulk requirements pack download
+DOCUMENT_PACK_WORKERS = int(os.getenv('DOCUMENT_PACK_WORKERS', 4))
+# Chunked uploads: chunk size clients are asked to use and how long an unfinished upload can be resumed
+CHUNKED_UPLOAD_CHUNK_SIZE = int(os.getenv('CHUNKED_UPLOAD_CHUNK_SIZE', 4 * 1024 * 1024))
+CHUNKED_UPLOAD_EXPIRY_HOURS = int(os.getenv('CHUNKED_UPLOAD_EXPIRY_HOURS', 24))
+# File downloads: redirect to short-lived signed Azure URLs instead of streaming through the app
+DOWNLOAD_SAS_REDIRECT = os.getenv('DOWNLOAD_SAS_REDIRECT', 'False').lower() == 'true'
+DOWNLOAD_SAS_EXPIRY_SECONDS = int(os.getenv('DOWNLOAD_SAS_EXPIRY_SECONDS', 300))
+# Applicant search: maximum number of ranked applications returned by the search service
+APPLICANT_SEARCH_LIMIT = int(os.getenv('APPLICANT_SEARCH_LIMIT', 500))
+# Status tab counters: seconds the counts are cached, they are also dropped on every application/loan write
+TAB_COUNTS_CACHE_SECONDS = int(os.getenv('TAB_COUNTS_CACHE_SECONDS', 30))
+# Application detail responses: cached per application version, the TTL catches writes made without signals
+APPLICATION_DETAIL_CACHE_SECONDS = int(os.getenv('APPLICATION_DETAIL_CACHE_SECONDS', 300))
+# Committee members and checklist configuration: seconds a process keeps them, the bound on how long a change made
+# in another process (the cache is per process without a shared CACHES backend) can go unseen
+LOAN_SUMMARIES_CACHE_SECONDS = int(os.getenv('LOAN_SUMMARIES_CACHE_SECONDS', 60))
 
 # SECURITY WARNING: don't run with debug turned on in production!
 DEBUG = bool(int(os.getenv('DEBUG', 0)))
@@ -121,11 +147,21 @@ ADVANCEMENT_THRESHOLD_FOR_COMMITTEE_APPROVAL = float(os.getenv("ADVANCEMENT_THRE
 COMMITTEE_MEMBERS_COUNT_REQUIRED_FOR_APPROVAL = int(os.getenv("COMMITTEE_MEMBERS_COUNT_REQUIRED_FOR_APPROVAL", 1))
 if TESTING:
     COMMITTEE_MEMBERS_COUNT_REQUIRED_FOR_APPROVAL = 1
+# Committee decisions are notified by a background thread, batching up to COMMITTEE_NOTIFIER_BATCH_SIZE decisions.
+# Off in tests, decisions are then delivered when the vote commits.
+COMMITTEE_NOTIFIER_ASYNC = os.getenv("COMMITTEE_NOTIFIER_ASYNC", str(not TESTING)).lower() in ["true", "1", "yes"]
+COMMITTEE_NOTIFIER_BATCH_SIZE = int(os.getenv("COMMITTEE_NOTIFIER_BATCH_SIZE", 50))
 
 # Encryption key for PPS number
 PPS_ENCRYPTION_KEY = os.getenv("PPS_ENCRYPTION_KEY")
 if not PPS_ENCRYPTION_KEY:
     raise ValueError("PPS_ENCRYPTION_KEY must be set in the environment.")
+# Optional Fernet keys for rotation, comma separated and newest first. Values encrypted with any of them can be read,
+# new values use the first one. Defaults to PPS_ENCRYPTION_KEY alone.
+PPS_ENCRYPTION_KEYS = [key.strip() for key in os.getenv("PPS_ENCRYPTION_KEYS", "").split(",") if key.strip()]
+# HMAC keys for the PPS blind index, comma separated. The first key indexes new values, the others stay
+# searchable until rebuild_pps_blind_index has run after a rotation. Derived from PPS_ENCRYPTION_KEY if unset.
+PPS_BLIND_INDEX_KEYS = [key.strip() for key in os.getenv("PPS_BLIND_INDEX_KEYS", "").split(",") if key.strip()]
 
 # Application definition
 
@@ -136,6 +172,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'corsheaders',
     'rest_framework',
     'rest_framework_simplejwt.token_blacklist',
@@ -452,3 +489,37 @@ AUDITLOG_SERIALIZATION = 'json'  # This enables the serialized_data field
 # Optional: Configure what gets logged
 AUDITLOG_USE_TEXT_CHANGES_IF_JSON_IS_NOT_PRESENT = True  # Fallback for serialization
 AUDITLOG_ACTOR_FIELD = 'email'
+
+# Logging: LOG_LEVEL for everything, LOG_LEVEL_<SUBSYSTEM> (e.g. LOG_LEVEL_CCR_REPORTING=DEBUG) per app,
+# LOG_FORMAT=json for one JSON object per line. Per-record debug messages are sampled, 1 in LOG_SAMPLE_RATE is kept.
+# Records are written to stderr by a background thread, never to stdout from a request.
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'text').lower()
+LOG_SAMPLE_RATE = int(os.getenv('LOG_SAMPLE_RATE', 100))
+LOG_SUBSYSTEMS = ['agents_loan', 'ccr_reporting', 'communications', 'core', 'document_emails', 'document_requirements',
+                  'internal_files', 'loan', 'notifications', 'signed_documents', 'solicitors_loan', 'undertaking',
+                  'user']
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'filters': {
+        'sample': {'()': 'core.structured_logging.SampleFilter', 'rate': LOG_SAMPLE_RATE},
+    },
+    'formatters': {
+        'text': {'format': '%(asctime)s %(levelname)s %(name)s: %(message)s'},
+        'json': {'()': 'core.structured_logging.JSONFormatter'},
+    },
+    'handlers': {
+        'console': {
+            'class': 'core.structured_logging.BackgroundStreamHandler',
+            'formatter': 'json' if LOG_FORMAT == 'json' else 'text',
+            'filters': ['sample'],
+        },
+    },
+    'root': {'handlers': ['console'], 'level': LOG_LEVEL},
+    'loggers': {
+        subsystem: {'level': os.getenv(f'LOG_LEVEL_{subsystem.upper()}', LOG_LEVEL).upper()}
+        for subsystem in LOG_SUBSYSTEMS
+    },
+}
@@ -0,0 +1,110 @@
+import random
+import time
+from datetime import date, datetime, time as datetime_time, timedelta
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from ccr_reporting.models import CCRContractRecord
+from ccr_reporting.services.file_generator import CCRFileGenerator
+from ccr_reporting.services.snapshots import content_checksum
+from core.models import Applicant, Application, Loan, Transaction
+from loanbook.models import LoanBook
+
+
+class Command(BaseCommand):
+    """
+    Time the CCR run over synthetic active contracts with 1, 2, 4 and 8 valuation workers.
+
+    Every run generates the full submission (lines, CCR records, tracking rows, snapshots) in a savepoint that is
+    rolled back, and the synthetic contracts live in a transaction that is rolled back at the end, nothing is left
+    in the database. The file checksums of all runs must match.
+
+    Usage:
+    python manage.py benchmark_ccr_run [--contracts 2000] [--workers 1 2 4 8] [--repeat 2]
+    """
+    help = "Benchmark the CCR run time with different numbers of valuation workers."
+
+    REFERENCE_DATE = date(2025, 6, 30)
+
+    def add_arguments(self, parser):
+        parser.add_argument('--contracts', type=int, default=2000, help="Synthetic active contracts to create")
+        parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4, 8], help="Worker counts to time")
+        parser.add_argument('--repeat', type=int, default=2, help="Runs per worker count")
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            self.create_contracts(options['contracts'])
+
+            baseline = None
+            checksums = set()
+            for workers in options['workers']:
+                elapsed = []
+                for _ in range(options['repeat']):
+                    started = time.perf_counter()
+                    with transaction.atomic():
+                        file_content, total_records, _ = CCRFileGenerator().generate_monthly_submission(
+                            self.REFERENCE_DATE, workers=workers)
+                        transaction.set_rollback(True)
+                    elapsed.append(time.perf_counter() - started)
+                    checksums.add(content_checksum(file_content))
+
+                best = min(elapsed)
+                baseline = baseline or best
+                self.stdout.write(f"{workers} worker(s): {best:.2f}s for {total_records} records "
+                                  f"({baseline / best:.2f}x)")
+
+            if len(checksums) == 1:
+                self.stdout.write(self.style.SUCCESS("Identical files for every worker count"))
+            else:
+                self.stdout.write(self.style.ERROR("The files differ between worker counts"))
+
+            transaction.set_rollback(True)
+
+    def create_contracts(self, count):
+        """``count`` contracts paid out about two years before the reference date, reported since, with payments"""
+        started = time.perf_counter()
+        user = get_user_model().objects.create_user(email='benchmark-ccr-run@example.com')
+        applications = Application.objects.bulk_create(
+            [Application(user=user, amount=10000, term=36) for _ in range(count)], batch_size=5000
+        )
+        Applicant.objects.bulk_create([
+            Applicant(application=application, title='Mr', first_name='John', last_name=f'Smith{index}')
+            for index, application in enumerate(applications)
+        ], batch_size=5000)
+
+        loans = []
+        for application in applications:
+            paid_out_date = self.REFERENCE_DATE - timedelta(days=random.randint(400, 1000))
+            loans.append(Loan(application=application, amount_agreed=Decimal('10000.00'),
+                              fee_agreed=Decimal('1500.00'), term_agreed=36, approved_date=paid_out_date,
+                              is_paid_out=True, paid_out_date=paid_out_date))
+        loans = Loan.objects.bulk_create(loans, batch_size=5000)
+
+        loanbooks = LoanBook.objects.bulk_create([
+            LoanBook(loan=loan, initial_amount=loan.amount_agreed, estate_net_value=Decimal('100000.00'),
+                     initial_fee_percentage=Decimal('15.00'), daily_fee_after_year_percentage=Decimal('0.07'),
+                     exit_fee_percentage=Decimal('1.50'),
+                     created_at=timezone.make_aware(datetime.combine(loan.paid_out_date, datetime_time.min)))
+            for loan in loans
+        ], batch_size=5000)
+
+        CCRContractRecord.objects.bulk_create([
+            CCRContractRecord(loanbook=loanbook, ccr_contract_id=str(loanbook.pk),
+                              first_reported_date=date(2025, 3, 31), last_reported_date=date(2025, 5, 31))
+            for loanbook in loanbooks
+        ], batch_size=5000)
+
+        transactions = []
+        for loan in loans:
+            for _ in range(random.randint(0, 4)):
+                paid_on = loan.paid_out_date + timedelta(days=random.randint(30, 390))
+                transactions.append(Transaction(
+                    loan=loan, amount=Decimal(random.randint(100, 1000)), created_by=user,
+                    transaction_date=timezone.make_aware(datetime.combine(paid_on, datetime_time.min)),
+                ))
+        Transaction.objects.bulk_create(transactions, batch_size=5000)
+        self.stdout.write(f"Created {count} contracts in {time.perf_counter() - started:.1f}s")
@@ -0,0 +1,61 @@
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from ccr_reporting.services.file_generator import CCRFileGenerator
+
+
+class Command(BaseCommand):
+    """
+    Generate the monthly CCR submission outside of a request, the active contracts are valued by a process pool.
+
+    Without --date the month before the current one is reported. --dry-run builds the file in a transaction that
+    is rolled back, nothing is stored.
+
+    Usage:
+    python manage.py generate_ccr_submission [--date 2025-06-30] [--workers 4] [--test-mode] [--dry-run]
+    """
+    help = 'Generate the monthly CCR submission file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', help='Reference date (YYYY-MM-DD), last day of the previous month by default')
+        parser.add_argument('--workers', type=int, default=getattr(settings, 'CCR_VALUATION_WORKERS', 1),
+                            help='Processes valuing the active contracts')
+        parser.add_argument('--test-mode', action='store_true', help='Generate a test submission')
+        parser.add_argument('--dry-run', action='store_true', help='Build the file without storing anything')
+
+    def handle(self, *args, **options):
+        if options['date']:
+            try:
+                reference_date = datetime.strptime(options['date'], '%Y-%m-%d').date()
+            except ValueError:
+                raise CommandError('--date must be in YYYY-MM-DD format')
+        else:
+            reference_date = timezone.now().date().replace(day=1) - timedelta(days=1)
+        workers = max(1, options['workers'])
+
+        generator = CCRFileGenerator()
+        try:
+            if options['dry_run']:
+                with transaction.atomic():
+                    _, total_records, summary = generator.generate_monthly_submission(
+                        reference_date, force_test_mode=options['test_mode'], workers=workers)
+                    transaction.set_rollback(True)
+                stored = 'nothing stored'
+            else:
+                submission, summary = generator.write_monthly_submission(
+                    reference_date, force_test_mode=options['test_mode'], workers=workers)
+                total_records = summary['total_records']
+                stored = f'stored as {submission.file_path}'
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        prefix = '[dry run] ' if options['dry_run'] else ''
+        self.stdout.write(self.style.SUCCESS(
+            f"{prefix}CCR submission for {reference_date}: {total_records} records "
+            f"({summary['new_contracts']} new, {summary['active_contracts']} active, "
+            f"{summary['settled_contracts']} settled), {stored}"
+        ))
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.1 on 2026-10-18 22:21
+
+import django.core.serializers.json
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ccr_reporting', '0002_ccrsubmission_ccr_response_file_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ccrsubmission',
+            name='content_checksum',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.CreateModel(
+            name='CCRContractSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('submission_type', models.CharField(choices=[('NEW', 'New Contract'), ('UPDATE', 'Monthly Update'), ('SETTLEMENT', 'Final Settlement')], max_length=20)),
+                ('applicant_name', models.CharField(blank=True, max_length=511)),
+                ('personal_info', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('encrypted_ppsn', models.BinaryField(blank=True, null=True)),
+                ('credit_info', models.JSONField(blank=True, encoder=django.core.serializers.json.DjangoJSONEncoder, null=True)),
+                ('id_line_number', models.PositiveIntegerField(blank=True, null=True)),
+                ('ci_line_number', models.PositiveIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('contract_record', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='snapshots', to='ccr_reporting.ccrcontractrecord')),
+                ('submission', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='snapshots', to='ccr_reporting.ccrsubmission')),
+            ],
+            options={
+                'ordering': ['submission', 'id'],
+            },
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 22:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ccr_reporting', '0003_ccrsubmission_content_checksum_ccrcontractsnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='ccrsubmission',
+            name='compressed_file_path',
+            field=models.CharField(blank=True, help_text='gzip copy of the file, if any', max_length=500),
+        ),
+    ]
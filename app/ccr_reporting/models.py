@@ -1,4 +1,5 @@
 # ccr_reporting/models.py - Enhanced with status management and error tracking
+from django.core.serializers.json import DjangoJSONEncoder
 from django.db import models
 from django.utils import timezone
 from decimal import Decimal
@@ -19,6 +20,7 @@ class CCRSubmission(models.Model):
     reference_date = models.DateField(help_text="Month-end date being reported")
     generated_at = models.DateTimeField(auto_now_add=True)
     file_path = models.CharField(max_length=500)
+    compressed_file_path = models.CharField(max_length=500, blank=True, help_text="gzip copy of the file, if any")
     total_records = models.IntegerField(default=0)
     status = models.CharField(max_length=20, choices=SUBMISSION_STATUS, default='GENERATED')
 
@@ -39,6 +41,9 @@ class CCRSubmission(models.Model):
     has_modifications = models.BooleanField(default=False, help_text="File was modified after generation")
     modification_notes = models.TextField(blank=True, help_text="Notes about modifications made")
 
+    # SHA-256 of the generated file, a file rendered again from the snapshots must match it
+    content_checksum = models.CharField(max_length=64, blank=True)
+
     class Meta:
         unique_together = ['reference_date']
         ordering = ['-reference_date']
@@ -105,16 +110,44 @@ class CCRContractRecord(models.Model):
 
 class CCRContractSubmission(models.Model):
     """Track which contracts were included in which submissions"""
-    contract_record = models.ForeignKey(CCRContractRecord, on_delete=models.CASCADE)
-    submission = models.ForeignKey(CCRSubmission, on_delete=models.CASCADE)
-    submission_type = models.CharField(max_length=20, choices=[
+    SUBMISSION_TYPES = [
         ('NEW', 'New Contract'),
         ('UPDATE', 'Monthly Update'),
         ('SETTLEMENT', 'Final Settlement'),
-    ])
+    ]
+
+    contract_record = models.ForeignKey(CCRContractRecord, on_delete=models.CASCADE)
+    submission = models.ForeignKey(CCRSubmission, on_delete=models.CASCADE)
+    submission_type = models.CharField(max_length=20, choices=SUBMISSION_TYPES)
     created_at = models.DateTimeField(auto_now_add=True)
 
 
+class CCRContractSnapshot(models.Model):
+    """Data a contract's lines were rendered from, frozen when the submission was generated"""
+    submission = models.ForeignKey(CCRSubmission, on_delete=models.CASCADE, related_name='snapshots')
+    contract_record = models.ForeignKey(CCRContractRecord, on_delete=models.SET_NULL, null=True, blank=True,
+                                        related_name='snapshots')
+    submission_type = models.CharField(max_length=20, choices=CCRContractSubmission.SUBMISSION_TYPES)
+    applicant_name = models.CharField(max_length=511, blank=True)
+
+    # personal_info / credit_info of CCRDataCollector, the PPSN is kept encrypted outside the JSON
+    personal_info = models.JSONField(encoder=DjangoJSONEncoder, null=True, blank=True)
+    encrypted_ppsn = models.BinaryField(null=True, blank=True, editable=False)
+    credit_info = models.JSONField(encoder=DjangoJSONEncoder, null=True, blank=True)
+
+    # Position of the ID / CI line in the file, None when the contract has no such line
+    id_line_number = models.PositiveIntegerField(null=True, blank=True)
+    ci_line_number = models.PositiveIntegerField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['submission', 'id']
+
+    def __str__(self):
+        return f"{self.submission_type} snapshot in {self.submission}"
+
+
 class CCRErrorRecord(models.Model):
     """Track individual record errors and their resolution"""
     ERROR_TYPES = [
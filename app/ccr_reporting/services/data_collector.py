@@ -1,9 +1,17 @@
 # ccr_reporting/services/data_collector.py - Fixed for regeneration
+import logging
 from datetime import timedelta
 from decimal import Decimal
 from django.conf import settings
 import os
 
+from core.structured_logging import SAMPLED
+
+from .preview import CCRSubmissionPreview
+from .valuation import valuation_input, value_contracts
+
+logger = logging.getLogger(__name__)
+
 
 class CCRDataCollector:
     """Collect and format data for CCR submissions"""
@@ -12,51 +20,51 @@ class CCRDataCollector:
 
     def debug_ccr_records(self, reference_date):
         """Debug method to see what CCR records exist"""
-        print(f"=== DEBUG_CCR_RECORDS for {reference_date} ===")
+        logger.debug("=== DEBUG_CCR_RECORDS for %s ===", reference_date)
 
         from ..models import CCRContractRecord
 
         # Get all CCR records
         all_records = CCRContractRecord.objects.all()
-        print(f"Total CCR records in database: {all_records.count()}")
+        logger.debug("Total CCR records in database: %s", all_records.count())
 
         for record in all_records:
-            print(f"  Record ID: {record.id}")
-            print(f"    LoanBook: {record.loanbook.id}")
-            print(f"    Loan: {record.loanbook.loan.id}")
-            print(f"    First reported: {record.first_reported_date}")
-            print(f"    Last reported: {record.last_reported_date}")
-            print(f"    Is closed in CCR: {record.is_closed_in_ccr}")
-            print(f"    Loan is settled: {record.loanbook.loan.is_settled}")
-            print(f"    Closed date: {record.closed_date}")
-            print("    ---")
+            logger.debug("  Record ID: %s", record.id, extra=SAMPLED)
+            logger.debug("    LoanBook: %s", record.loanbook.id, extra=SAMPLED)
+            logger.debug("    Loan: %s", record.loanbook.loan.id, extra=SAMPLED)
+            logger.debug("    First reported: %s", record.first_reported_date, extra=SAMPLED)
+            logger.debug("    Last reported: %s", record.last_reported_date, extra=SAMPLED)
+            logger.debug("    Is closed in CCR: %s", record.is_closed_in_ccr, extra=SAMPLED)
+            logger.debug("    Loan is settled: %s", record.loanbook.loan.is_settled, extra=SAMPLED)
+            logger.debug("    Closed date: %s", record.closed_date, extra=SAMPLED)
+            logger.debug("    ---", extra=SAMPLED)
 
         # Now check what the filter should find
         start_of_current_month = reference_date.replace(day=1)
-        print(f"Start of current month: {start_of_current_month}")
+        logger.debug("Start of current month: %s", start_of_current_month)
 
         # Check each condition separately
-        print("=== CHECKING FILTER CONDITIONS ===")
+        logger.debug("=== CHECKING FILTER CONDITIONS ===")
 
         # Condition 1: Not closed in CCR
         not_closed = CCRContractRecord.objects.filter(is_closed_in_ccr=False)
-        print(f"Records not closed in CCR: {not_closed.count()}")
+        logger.debug("Records not closed in CCR: %s", not_closed.count())
         for record in not_closed:
-            print(f"  - {record.loanbook.loan.id} (first: {record.first_reported_date})")
+            logger.debug("  - %s (first: %s)", record.loanbook.loan.id, record.first_reported_date, extra=SAMPLED)
 
         # Condition 2: Loan not settled
         loan_not_settled = not_closed.filter(loanbook__loan__is_settled=False)
-        print(f"Records with loan not settled: {loan_not_settled.count()}")
+        logger.debug("Records with loan not settled: %s", loan_not_settled.count())
         for record in loan_not_settled:
-            print(f"  - {record.loanbook.loan.id} (first: {record.first_reported_date})")
+            logger.debug("  - %s (first: %s)", record.loanbook.loan.id, record.first_reported_date, extra=SAMPLED)
 
         # Condition 3: First reported before this month
         before_this_month = loan_not_settled.filter(first_reported_date__lt=start_of_current_month)
-        print(f"Records first reported before this month: {before_this_month.count()}")
+        logger.debug("Records first reported before this month: %s", before_this_month.count())
         for record in before_this_month:
-            print(f"  - {record.loanbook.loan.id} (first: {record.first_reported_date})")
+            logger.debug("  - %s (first: %s)", record.loanbook.loan.id, record.first_reported_date, extra=SAMPLED)
 
-        print(f"=== DEBUG_CCR_RECORDS COMPLETE ===")
+        logger.debug("=== DEBUG_CCR_RECORDS COMPLETE ===")
         return before_this_month
 
     def __init__(self):
@@ -64,19 +72,16 @@ class CCRDataCollector:
 
     def get_personal_info(self, applicant):
         """Extract personal information for CCR submission"""
-        print(f"=== GET_PERSONAL_INFO ===")
-        print(f"Processing applicant: {applicant}")
-
         # Check if it's a string or an object
         if isinstance(applicant, str):
-            print(f"ERROR: Received string instead of applicant object: '{applicant}'")
+            logger.error("Received string instead of applicant object: '%s'", applicant)
             raise ValueError(f"Expected applicant object, got string: {applicant}")
 
         # Check if it has required attributes
         required_attrs = ['id', 'first_name', 'last_name']
         for attr in required_attrs:
             if not hasattr(applicant, attr):
-                print(f"ERROR: Applicant missing required attribute: {attr}")
+                logger.error("Applicant missing required attribute: %s", attr)
                 raise ValueError(f"Applicant object missing required attribute: {attr}")
 
         personal_info = {
@@ -96,40 +101,44 @@ class CCRDataCollector:
             'phone': applicant.phone_number[:17] if applicant.phone_number else '',
         }
 
-        print(f"Personal info generated for: {personal_info['forename']} {personal_info['surname']}")
-        print(f"=== GET_PERSONAL_INFO COMPLETE ===")
+        logger.debug("Personal info generated for applicant %s", applicant.id, extra=SAMPLED)
         return personal_info
 
-    def get_credit_info(self, loanbook, reference_date):
-        """Extract credit information for CCR submission with settlement handling"""
-        print(f"=== GET_CREDIT_INFO ===")
+    def maturity_date(self, loanbook):
+        return loanbook.created_at.date() + timedelta(days=self.FIXED_LOAN_DAYS)
 
+    def value_contracts(self, loanbooks, reference_date, workers=1):
+        """
+        Outstanding balance on reference_date and amount due at maturity of the active ``loanbooks``, by loanbook
+        pk, computed by ``workers`` processes. None for a contract whose valuation failed.
+        """
+        inputs = [valuation_input(loanbook, (reference_date, self.maturity_date(loanbook))) for loanbook in loanbooks]
+        valuations = value_contracts(inputs, workers=workers)
+        return {loanbook.pk: valuation for loanbook, valuation in zip(loanbooks, valuations)}
+
+    def get_credit_info(self, loanbook, reference_date, valuation=None):
+        """Extract credit information for CCR submission with settlement handling
+
+        ``valuation`` is the (outstanding_balance, next_payment_amount) of an active contract computed up front by
+        value_contracts, without it both are calculated here.
+        """
         loan = loanbook.loan
-        print(f"Getting credit info for loan {loan.id}")
-        print(f"Loan is_settled: {loan.is_settled}")
 
         # Get applicant using the correct path
         try:
             applicant = loan.application.applicants.first()
-            print(f"Got applicant: {applicant}")
-            if applicant:
-                print(f"Applicant ID: {applicant.id}")
-            else:
-                print("No applicant found!")
+            if not applicant:
+                logger.warning("No applicant found for loan %s", loan.id)
         except Exception as e:
-            print(f"Error getting applicant: {e}")
+            logger.error("Error getting applicant: %s", e)
             applicant = None
 
         # Calculate dates using FIXED 1095 days approach
         start_date = loanbook.created_at.date()
-        maturity_date = start_date + timedelta(days=self.FIXED_LOAN_DAYS)
-
-        print(f"Start date: {start_date}")
-        print(f"Maturity date: {maturity_date}")
+        maturity_date = self.maturity_date(loanbook)
 
         # Determine contract phase and dates based on settlement status
         if loan.is_settled:
-            print(f"Loan is settled on: {loan.settled_date}")
             # Check if closed at maturity or in advance
             if loan.settled_date and loan.settled_date >= maturity_date:
                 contract_phase = 'Closed'  # Closed at maturity
@@ -149,14 +158,12 @@ class CCRDataCollector:
             contract_end_date = None
             next_payment_date = maturity_date  # Single bullet payment
             outstanding_payments_number = 1
-            # Calculate current outstanding balance
-            outstanding_balance = loanbook.calculate_total_due(reference_date)
-            next_payment_amount = loanbook.calculate_total_due(maturity_date)
-
-        print(f"Contract phase: {contract_phase}")
-        print(f"Credit status: {credit_status}")
-        print(f"Outstanding balance: {outstanding_balance}")
-        print(f"Contract end date: {contract_end_date}")
+            if valuation is not None:
+                outstanding_balance, next_payment_amount = valuation
+            else:
+                # Calculate current outstanding balance
+                outstanding_balance = loanbook.calculate_total_due(reference_date)
+                next_payment_amount = loanbook.calculate_total_due(maturity_date)
 
         credit_info = {
             'provider_code': self.provider_code,
@@ -196,12 +203,64 @@ class CCRDataCollector:
             'purpose_of_credit_type': 'Other purposes',
         }
 
-        print(
-            f"Credit info generated: contract_no={credit_info['provider_contract_no']}, phase={credit_info['contract_phase']}")
-        print(f"=== GET_CREDIT_INFO COMPLETE ===")
-
+        logger.debug("Credit info for loan %s: phase=%s, status=%s, outstanding=%s, end date=%s", loan.id,
+                     contract_phase, credit_status, outstanding_balance, contract_end_date, extra=SAMPLED)
         return credit_info
 
+    def new_loanbooks_queryset(self, reference_date, ignore_already_reported=False):
+        """LoanBooks of €500 or more created in the reference month, without a CCR record unless
+        ignore_already_reported"""
+        from loanbook.models import LoanBook
+
+        start_of_month = reference_date.replace(day=1)
+        new_loanbooks = LoanBook.objects.filter(
+            created_at__date__gte=start_of_month,
+            created_at__date__lte=reference_date,
+            initial_amount__gte=Decimal('500.00'),
+        )
+        if not ignore_already_reported:
+            new_loanbooks = new_loanbooks.exclude(ccr_record__isnull=False)
+        return new_loanbooks.select_related('loan__application', 'ccr_record').order_by('pk')
+
+    def active_loanbooks_queryset(self, reference_date, for_regeneration=False):
+        """LoanBooks reported before the reference month that need a monthly update"""
+        from loanbook.models import LoanBook
+
+        if for_regeneration:
+            # Records updated on this date that were active (not closed) at that time
+            active_loanbooks = LoanBook.objects.filter(
+                ccr_record__last_reported_date=reference_date,
+                ccr_record__first_reported_date__lt=reference_date,
+            ).exclude(
+                ccr_record__closed_date=reference_date
+            )
+        else:
+            active_loanbooks = LoanBook.objects.filter(
+                ccr_record__is_closed_in_ccr=False,
+                loan__is_settled=False,
+                ccr_record__first_reported_date__lt=reference_date.replace(day=1),
+            )
+        return active_loanbooks.select_related('loan__application', 'ccr_record').order_by('pk')
+
+    def settled_loanbooks_queryset(self, reference_date, for_regeneration=False):
+        """LoanBooks settled in the reference month that need their final report"""
+        from loanbook.models import LoanBook
+
+        if for_regeneration:
+            # Records closed on this date
+            settled_loanbooks = LoanBook.objects.filter(
+                ccr_record__closed_date=reference_date,
+                ccr_record__is_closed_in_ccr=True,
+            )
+        else:
+            settled_loanbooks = LoanBook.objects.filter(
+                ccr_record__is_closed_in_ccr=False,
+                loan__is_settled=True,
+                loan__settled_date__gte=reference_date.replace(day=1),
+                loan__settled_date__lte=reference_date,
+            )
+        return settled_loanbooks.select_related('loan__application', 'ccr_record').order_by('pk')
+
     def get_new_loanbooks(self, reference_date, ignore_already_reported=False):
         """Get LoanBooks created in the reference month that haven't been reported
 
@@ -210,92 +269,50 @@ class CCRDataCollector:
             ignore_already_reported: If True, include loanbooks that already have CCR records
                                    (useful for regeneration)
         """
-        print(f"=== GET_NEW_LOANBOOKS ===")
-        print(f"Reference date: {reference_date}")
-        print(f"Ignore already reported: {ignore_already_reported}")
-
-        from loanbook.models import LoanBook
-        from ..models import CCRContractRecord
-
-        # Get loanbooks created in reference month
-        start_of_month = reference_date.replace(day=1)
-        print(f"Start of month: {start_of_month}")
-
-        print("Step 1: Filtering by date range...")
-        date_filtered = LoanBook.objects.filter(
-            created_at__date__gte=start_of_month,
-            created_at__date__lte=reference_date
-        )
-        print(f"  Found {date_filtered.count()} loanbooks in date range")
+        logger.debug("=== GET_NEW_LOANBOOKS ===")
+        logger.debug("Reference date: %s", reference_date)
+        logger.debug("Ignore already reported: %s", ignore_already_reported)
 
-        print("Step 2: Filtering by amount >= €500...")
-        amount_filtered = date_filtered.filter(initial_amount__gte=Decimal('500.00'))
-        print(f"  Found {amount_filtered.count()} loanbooks with amount >= €500")
-
-        if ignore_already_reported:
-            print("Step 3: Including all loanbooks (ignoring already reported status)...")
-            new_loanbooks = amount_filtered
-            print(f"  Found {new_loanbooks.count()} loanbooks (including already reported)")
-        else:
-            print("Step 3: Excluding already reported...")
-            new_loanbooks = amount_filtered.exclude(ccr_record__isnull=False)
-            print(f"  Found {new_loanbooks.count()} new loanbooks (not yet reported)")
+        new_loanbooks = self.new_loanbooks_queryset(reference_date, ignore_already_reported)
 
         for lb in new_loanbooks:
             has_ccr_record = hasattr(lb, 'ccr_record') and lb.ccr_record is not None
-            print(
-                f"    - LoanBook {lb.id} (Loan #{lb.loan.id}), Amount: €{lb.initial_amount}, Created: {lb.created_at}, Has CCR Record: {has_ccr_record}")
+            logger.debug(
+                "    - LoanBook %s (Loan #%s), Amount: €%s, Created: %s, Has CCR Record: %s", lb.id, lb.loan.id,
+                lb.initial_amount, lb.created_at, has_ccr_record, extra=SAMPLED
+            )
 
-        print(f"=== GET_NEW_LOANBOOKS COMPLETE: {new_loanbooks.count()} found ===")
+        logger.debug("=== GET_NEW_LOANBOOKS COMPLETE: %s found ===", new_loanbooks.count())
         return new_loanbooks
 
     def get_active_loanbooks(self, reference_date, for_regeneration=False):
         """Get LoanBooks that need monthly updates (active, not settled)"""
-        print(f"=== GET_ACTIVE_LOANBOOKS ===")
-        print(f"Reference date: {reference_date}")
-        print(f"For regeneration: {for_regeneration}")
+        logger.debug("=== GET_ACTIVE_LOANBOOKS ===")
+        logger.debug("Reference date: %s", reference_date)
+        logger.debug("For regeneration: %s", for_regeneration)
 
-        from ..models import CCRContractRecord
+        # The dump reads every CCR record, only worth it when someone reads the debug output
+        if logger.isEnabledFor(logging.DEBUG):
+            self.debug_ccr_records(reference_date)
 
-        # Add debugging
-        self.debug_ccr_records(reference_date)
-
-        if for_regeneration:
-            # For regeneration: get all CCR records that were updated on this date
-            # and were active (not closed) at that time
-            active_records = CCRContractRecord.objects.filter(
-                last_reported_date=reference_date,
-                first_reported_date__lt=reference_date,  # Was reported before this month
-            ).exclude(
-                closed_date=reference_date  # Exclude ones that were closed on this date
-            )
-        else:
-            # Normal mode: get currently active loans that have been reported before
-            # Calculate start of current month to check if contract was reported before this month
-            start_of_current_month = reference_date.replace(day=1)
-            print(f"Looking for contracts first reported before: {start_of_current_month}")
-
-            active_records = CCRContractRecord.objects.filter(
-                is_closed_in_ccr=False,  # Not closed in CCR
-                loanbook__loan__is_settled=False,  # Loan is not settled
-                first_reported_date__lt=start_of_current_month  # Was first reported before this month
-            )
-
-            print(f"Query found {active_records.count()} active records")
-
-        active_loanbooks = [record.loanbook for record in active_records]
-        print(f"Found {len(active_loanbooks)} active loanbooks for monthly update")
+        active_loanbooks = list(self.active_loanbooks_queryset(reference_date, for_regeneration))
+        logger.debug("Found %s active loanbooks for monthly update", len(active_loanbooks))
 
         for lb in active_loanbooks:
             if hasattr(lb, 'ccr_record'):
                 first_reported = lb.ccr_record.first_reported_date
                 last_reported = lb.ccr_record.last_reported_date
-                print(
-                    f"  - LoanBook {lb.id} (Loan #{lb.loan.id}), Amount: €{lb.initial_amount}, First: {first_reported}, Last: {last_reported}")
+                logger.debug(
+                    "  - LoanBook %s (Loan #%s), Amount: €%s, First: %s, Last: %s", lb.id, lb.loan.id,
+                    lb.initial_amount, first_reported, last_reported, extra=SAMPLED
+                )
             else:
-                print(f"  - LoanBook {lb.id} (Loan #{lb.loan.id}), Amount: €{lb.initial_amount}, No CCR record")
+                logger.debug(
+                    "  - LoanBook %s (Loan #%s), Amount: €%s, No CCR record", lb.id, lb.loan.id, lb.initial_amount,
+                    extra=SAMPLED
+                )
 
-        print(f"=== GET_ACTIVE_LOANBOOKS COMPLETE: {len(active_loanbooks)} found ===")
+        logger.debug("=== GET_ACTIVE_LOANBOOKS COMPLETE: %s found ===", len(active_loanbooks))
         return active_loanbooks
 
     def get_settled_loanbooks(self, reference_date, for_regeneration=False):
@@ -306,119 +323,24 @@ class CCRDataCollector:
             for_regeneration: If True, get loanbooks that were settled at this date
                             (useful for regeneration)
         """
-        print(f"=== GET_SETTLED_LOANBOOKS ===")
-        print(f"Reference date: {reference_date}")
-        print(f"For regeneration: {for_regeneration}")
-
-        from loanbook.models import LoanBook
-        from ..models import CCRContractRecord
-
-        start_of_month = reference_date.replace(day=1)
-        print(f"Start of month: {start_of_month}")
-
-        if for_regeneration:
-            # For regeneration: get CCR records that were closed on this date
-            settled_records = CCRContractRecord.objects.filter(
-                closed_date=reference_date,
-                is_closed_in_ccr=True
-            )
-        else:
-            # Normal mode: get loans settled this month that need reporting
-            settled_records = CCRContractRecord.objects.filter(
-                is_closed_in_ccr=False,  # Not yet closed in CCR
-                loanbook__loan__is_settled=True,  # Loan is settled
-                loanbook__loan__settled_date__gte=start_of_month,  # Settled this month
-                loanbook__loan__settled_date__lte=reference_date
-            )
+        logger.debug("=== GET_SETTLED_LOANBOOKS ===")
+        logger.debug("Reference date: %s", reference_date)
+        logger.debug("For regeneration: %s", for_regeneration)
 
-        settled_loanbooks = [record.loanbook for record in settled_records]
-        print(f"Found {len(settled_loanbooks)} settled loanbooks for final reporting")
+        settled_loanbooks = list(self.settled_loanbooks_queryset(reference_date, for_regeneration))
+        logger.debug("Found %s settled loanbooks for final reporting", len(settled_loanbooks))
 
         for lb in settled_loanbooks:
             settled_date = getattr(lb.loan, 'settled_date', 'Unknown')
-            print(f"  - LoanBook {lb.id} (Loan #{lb.loan.id}), Settled: {settled_date}")
+            logger.debug("  - LoanBook %s (Loan #%s), Settled: %s", lb.id, lb.loan.id, settled_date, extra=SAMPLED)
 
-        print(f"=== GET_SETTLED_LOANBOOKS COMPLETE: {len(settled_loanbooks)} found ===")
+        logger.debug("=== GET_SETTLED_LOANBOOKS COMPLETE: %s found ===", len(settled_loanbooks))
         return settled_loanbooks
 
-    def get_submission_preview(self, reference_date):
-        """Get preview data for potential submission without generating file"""
-        print(f"=== GET_SUBMISSION_PREVIEW ===")
-        print(f"Reference date: {reference_date}")
-
-        # Get all the different types of loanbooks
-        new_loanbooks = self.get_new_loanbooks(reference_date)
-        active_loanbooks = self.get_active_loanbooks(reference_date)
-        settled_loanbooks = self.get_settled_loanbooks(reference_date)
-
-        # Count records that would be generated
-        header_count = 1 if (new_loanbooks or active_loanbooks or settled_loanbooks) else 0
-        footer_count = 1 if (new_loanbooks or active_loanbooks or settled_loanbooks) else 0
-
-        # ID records for new applicants
-        id_record_count = 0
-        if new_loanbooks:
-            # Check which applicants haven't been reported before
-            for loanbook in new_loanbooks:
-                try:
-                    applicant = loanbook.loan.application.applicants.first()
-                    if applicant and not getattr(applicant, 'ccr_reported', False):
-                        id_record_count += 1
-                except Exception:
-                    continue
-
-        # CI records for all contracts
-        ci_record_count = len(active_loanbooks) + len(settled_loanbooks)
-        # Note: new_loanbooks only get ID records, CI records come next month
-
-        total_records = header_count + id_record_count + ci_record_count + footer_count
-
-        preview_data = {
-            'reference_date': reference_date,
-            'total_records': total_records,
-            'new_contracts': {
-                'count': len(new_loanbooks),
-                'details': [
-                    {
-                        'loanbook_id': lb.id,
-                        'loan_id': lb.loan.id,
-                        'amount': float(lb.initial_amount),
-                        'created_at': lb.created_at,
-                        'applicant_name': f"{lb.loan.application.applicants.first().first_name} {lb.loan.application.applicants.first().last_name}" if lb.loan.application.applicants.first() else "Unknown"
-                    } for lb in new_loanbooks[:10]  # Limit to first 10 for preview
-                ]
-            },
-            'active_contracts': {
-                'count': len(active_loanbooks),
-                'details': [
-                    {
-                        'loanbook_id': lb.id,
-                        'loan_id': lb.loan.id,
-                        'amount': float(lb.initial_amount),
-                        'first_reported': lb.ccr_record.first_reported_date if hasattr(lb, 'ccr_record') else None,
-                        'applicant_name': f"{lb.loan.application.applicants.first().first_name} {lb.loan.application.applicants.first().last_name}" if lb.loan.application.applicants.first() else "Unknown"
-                    } for lb in active_loanbooks[:10]  # Limit to first 10 for preview
-                ]
-            },
-            'settled_contracts': {
-                'count': len(settled_loanbooks),
-                'details': [
-                    {
-                        'loanbook_id': lb.id,
-                        'loan_id': lb.loan.id,
-                        'amount': float(lb.initial_amount),
-                        'settled_date': lb.loan.settled_date,
-                        'applicant_name': f"{lb.loan.application.applicants.first().first_name} {lb.loan.application.applicants.first().last_name}" if lb.loan.application.applicants.first() else "Unknown"
-                    } for lb in settled_loanbooks[:10]  # Limit to first 10 for preview
-                ]
-            },
-            'breakdown': {
-                'header_records': header_count,
-                'id_records': id_record_count,
-                'ci_records': ci_record_count,
-                'footer_records': footer_count,
-            }
-        }
+    def get_submission_preview(self, reference_date, include_balances=False):
+        """Get preview data for potential submission without generating file
 
-        print(f"=== GET_SUBMISSION_PREVIEW COMPLETE ===")
-        return preview_data
+        Counts and the first rows of each group come from a few SQL queries (see CCRSubmissionPreview), balances
+        of the sampled active contracts are only computed with ``include_balances``.
+        """
+        return CCRSubmissionPreview(self).build(reference_date, include_balances=include_balances)
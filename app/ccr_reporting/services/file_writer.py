@@ -0,0 +1,88 @@
+# ccr_reporting/services/file_writer.py - Streaming CCR file writer
+import gzip
+import hashlib
+import os
+import tempfile
+from collections import Counter
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+
+
+class CCRFileWriter:
+    """
+    Write a CCR file record by record.
+
+    Records are spooled to a temporary file (in memory up to ``spool_size``, on disk above it) while the SHA-256
+    and the per record type counts are computed, so the whole file is never held as one string. finish() saves
+    it, and its gzip sibling when ``compress`` is set, to the storage backend. Without a ``name`` nothing is
+    stored and the content can be read back with read_text().
+    """
+    spool_size = 1024 * 1024
+
+    def __init__(self, name=None, storage=None, compress=False):
+        self.target_name = name
+        self.storage = storage or default_storage
+        self.name = ''
+        self.compressed_name = ''
+        self.record_count = 0
+        self.record_counts = Counter()
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+        self._file = tempfile.SpooledTemporaryFile(max_size=self.spool_size)
+        self._gzip_file = tempfile.SpooledTemporaryFile(max_size=self.spool_size) if compress else None
+        # mtime=0 keeps the gzip bytes identical for identical content
+        self._gzip = gzip.GzipFile(fileobj=self._gzip_file, mode='wb', mtime=0) if compress else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    @property
+    def checksum(self):
+        """SHA-256 hex digest of the records written so far"""
+        return self._sha256.hexdigest()
+
+    def write_record(self, line):
+        """Append one record, records are separated by newlines with none after the last one"""
+        data = (('\n' if self.record_count else '') + line).encode('utf-8')
+        self._file.write(data)
+        self._sha256.update(data)
+        if self._gzip is not None:
+            self._gzip.write(data)
+        self.size += len(data)
+        self.record_count += 1
+        self.record_counts[line[:2]] += 1
+
+    def finish(self):
+        """Save the file, and its gzip sibling, to the storage backend. Returns the stored name."""
+        if self._gzip is not None:
+            self._gzip.close()
+        if self.target_name:
+            self._file.seek(0)
+            self.name = self.storage.save(self.target_name, File(self._file, os.path.basename(self.target_name)))
+            if self._gzip_file is not None:
+                self._gzip_file.seek(0)
+                self.compressed_name = self.storage.save(
+                    f'{self.name}.gz', File(self._gzip_file, f'{os.path.basename(self.name)}.gz'))
+        return self.name
+
+    def discard(self):
+        """Delete whatever finish() stored, e.g. when the submission could not be saved"""
+        for name in (self.name, self.compressed_name):
+            if name:
+                self.storage.delete(name)
+        self.name = self.compressed_name = ''
+
+    def read_text(self):
+        self._file.seek(0)
+        return self._file.read().decode('utf-8')
+
+    def close(self):
+        if self._gzip is not None:
+            self._gzip.close()
+        self._file.close()
+        if self._gzip_file is not None:
+            self._gzip_file.close()
@@ -0,0 +1,109 @@
+# ccr_reporting/services/preview.py - SQL only preview of the next monthly submission
+from django.db.models import Count, Exists, OuterRef, Q, Subquery
+
+from core.models import Applicant
+
+SAMPLE_SIZE = 10
+
+
+class CCRSubmissionPreview:
+    """
+    What the monthly submission of ``reference_date`` would contain, without building it.
+
+    The counts come from aggregate queries over the collector's new/active/settled querysets and only the first
+    SAMPLE_SIZE rows of each group are fetched, so the number of queries and the rows read do not depend on the
+    size of the portfolio. Valuing contracts is the expensive part of a run, it is only done for the sample rows
+    of the active contracts and only when ``include_balances`` is set.
+    """
+
+    def __init__(self, collector):
+        self.collector = collector
+
+    def build(self, reference_date, include_balances=False):
+        new_loanbooks = self.collector.new_loanbooks_queryset(reference_date)
+        active_loanbooks = self.collector.active_loanbooks_queryset(reference_date)
+        settled_loanbooks = self.collector.settled_loanbooks_queryset(reference_date)
+
+        # An ID record is written for every new contract with an applicant
+        new_counts = new_loanbooks.aggregate(
+            count=Count('pk'),
+            with_applicant=Count('pk', filter=Q(Exists(
+                Applicant.objects.filter(application_id=OuterRef('loan__application_id'))
+            ))),
+        )
+        new_count = new_counts['count']
+        active_count = active_loanbooks.count()
+        settled_count = settled_loanbooks.count()
+
+        has_contracts = bool(new_count or active_count or settled_count)
+        header_count = 1 if has_contracts else 0
+        footer_count = 1 if has_contracts else 0
+        id_record_count = new_counts['with_applicant']
+        # new contracts only get ID records, CI records come next month
+        ci_record_count = active_count + settled_count
+
+        active_details = self.sample(active_loanbooks, first_reported='ccr_record__first_reported_date')
+        if include_balances:
+            self.add_balances(active_details, reference_date)
+
+        return {
+            'reference_date': reference_date,
+            'total_records': header_count + id_record_count + ci_record_count + footer_count,
+            'new_contracts': {
+                'count': new_count,
+                'details': self.sample(new_loanbooks, created_at='created_at'),
+            },
+            'active_contracts': {
+                'count': active_count,
+                'details': active_details,
+            },
+            'settled_contracts': {
+                'count': settled_count,
+                'details': self.sample(settled_loanbooks, settled_date='loan__settled_date'),
+            },
+            'breakdown': {
+                'header_records': header_count,
+                'id_records': id_record_count,
+                'ci_records': ci_record_count,
+                'footer_records': footer_count,
+            },
+            'balances_included': include_balances,
+        }
+
+    @staticmethod
+    def sample(loanbooks, **extra_fields):
+        """First SAMPLE_SIZE rows of ``loanbooks`` with the name of their first applicant, in one query"""
+        # Same applicant as applicants.first() in the submission builder (Applicant.Meta.ordering)
+        first_applicant = Applicant.objects.filter(application_id=OuterRef('loan__application_id')).order_by(
+            'last_name', 'first_name', 'pk')
+        rows = loanbooks.values(
+            'pk', 'initial_amount', *extra_fields.values(),
+            first_name=Subquery(first_applicant.values('first_name')[:1]),
+            last_name=Subquery(first_applicant.values('last_name')[:1]),
+        )[:SAMPLE_SIZE]
+
+        details = []
+        for row in rows:
+            detail = {
+                'loanbook_id': row['pk'],
+                'loan_id': row['pk'],
+                'amount': float(row['initial_amount']),
+            }
+            for key, field in extra_fields.items():
+                detail[key] = row[field]
+            detail['applicant_name'] = (f"{row['first_name']} {row['last_name']}" if row['first_name'] is not None
+                                        else "Unknown")
+            details.append(detail)
+        return details
+
+    def add_balances(self, details, reference_date):
+        """Outstanding balance and amount due at maturity of the sampled active contracts"""
+        from loanbook.models import LoanBook
+
+        loanbooks = list(LoanBook.objects.filter(pk__in=[detail['loanbook_id'] for detail in details])
+                         .select_related('loan').prefetch_related('loan__transactions').order_by('pk'))
+        valuations = self.collector.value_contracts(loanbooks, reference_date)
+        for detail in details:
+            valuation = valuations.get(detail['loanbook_id'])
+            detail['outstanding_balance'] = float(valuation[0]) if valuation else None
+            detail['next_payment_amount'] = float(valuation[1]) if valuation else None
@@ -0,0 +1,120 @@
+# ccr_reporting/services/response_parser.py - Streaming import of CCR response files
+import re
+
+from django.db import transaction
+
+from ..models import CCRContractRecord, CCRErrorRecord, CCRStatusHistory
+
+# "Contract No: 123", "CONTRACT=123", "contract #123" in free text error lines
+CONTRACT_NO_PATTERN = re.compile(r'contract(?:\s*no\.?)?\s*[:=#]?\s*([A-Za-z0-9_-]+)', re.IGNORECASE)
+# Position of the Provider Contract No in an echoed CI record
+CI_CONTRACT_NO_FIELD = 7
+
+
+def is_error_line(line):
+    return line.startswith('ERROR') or 'REJECT' in line.upper()
+
+
+class CCRResponseParser:
+    """
+    Import the response file of a submission line by line.
+
+    The file is never decoded or split as a whole, error lines are collected into batches of ``batch_size``
+    written with bulk_create. Each error is linked to the CCR record of its contract through an in-memory index of
+    the provider contract numbers of the submission, and the new submission status is worked out in the same pass.
+    Everything is written in one transaction.
+    """
+
+    def __init__(self, submission, batch_size=1000):
+        self.submission = submission
+        self.batch_size = batch_size
+        self.contract_index = {}
+        self.lines_read = 0
+        self.errors_found = 0
+        self.matched_errors = 0
+
+    def build_contract_index(self):
+        """Provider contract number -> CCR record id of the contracts of the submission (of all contracts for
+        submissions generated before contract tracking)"""
+        records = CCRContractRecord.objects.filter(ccrcontractsubmission__submission=self.submission)
+        if not records.exists():
+            records = CCRContractRecord.objects.all()
+
+        index = {}
+        for record_id, ccr_contract_id, loanbook_id in records.values_list('id', 'ccr_contract_id', 'loanbook_id'):
+            # The CI lines carry the loan id, the same as the loanbook pk and, for our records, ccr_contract_id
+            index[str(loanbook_id)] = record_id
+            index[ccr_contract_id] = record_id
+        return index
+
+    def contract_record_id(self, line):
+        """CCR record id of the contract an error line is about, None when it names no known contract"""
+        fields = [field.strip() for field in line.split('|')]
+        if 'CI' in fields:
+            position = fields.index('CI') + CI_CONTRACT_NO_FIELD
+            if position < len(fields) and fields[position] in self.contract_index:
+                return self.contract_index[fields[position]]
+
+        for match in CONTRACT_NO_PATTERN.finditer(line):
+            if match.group(1) in self.contract_index:
+                return self.contract_index[match.group(1)]
+        return None
+
+    def iter_lines(self, response_file):
+        """Decoded, stripped lines of an uploaded file, read chunk by chunk"""
+        response_file.seek(0)
+        for raw_line in response_file:
+            if isinstance(raw_line, bytes):
+                raw_line = raw_line.decode('utf-8', errors='replace')
+            yield raw_line.strip()
+
+    def parse(self, response_file, changed_by=None):
+        """Import the errors of ``response_file`` and update the submission status, returns the new status"""
+        self.contract_index = self.build_contract_index()
+
+        with transaction.atomic():
+            batch = []
+            for line_number, line in enumerate(self.iter_lines(response_file), start=1):
+                self.lines_read = line_number
+                if not is_error_line(line):
+                    continue
+
+                contract_record_id = self.contract_record_id(line)
+                if contract_record_id is not None:
+                    self.matched_errors += 1
+                batch.append(CCRErrorRecord(
+                    submission=self.submission,
+                    contract_record_id=contract_record_id,
+                    error_type='VALIDATION',
+                    error_description=line,
+                    line_number=line_number,
+                    original_line_content=line,
+                ))
+                self.errors_found += 1
+
+                if len(batch) >= self.batch_size:
+                    CCRErrorRecord.objects.bulk_create(batch)
+                    batch = []
+            CCRErrorRecord.objects.bulk_create(batch)
+
+            self.update_status(changed_by)
+        return self.submission.status
+
+    def update_status(self, changed_by):
+        submission = self.submission
+        old_status = submission.status
+        if not self.errors_found:
+            submission.status = 'ACKNOWLEDGED'
+            notes = 'Auto-updated after parsing CCR response file: no errors found'
+        else:
+            submission.status = 'ERROR' if self.errors_found == submission.total_records else 'PARTIAL_ERROR'
+            notes = f'Auto-updated after parsing CCR response file: {self.errors_found} errors found'
+        submission.save(update_fields=['status', 'status_updated_at'])
+
+        CCRStatusHistory.objects.create(
+            submission=submission,
+            old_status=old_status,
+            new_status=submission.status,
+            changed_by=changed_by,
+            notes=notes,
+        )
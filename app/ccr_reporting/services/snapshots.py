@@ -0,0 +1,106 @@
+# ccr_reporting/services/snapshots.py - Frozen per-contract data of a submission
+import hashlib
+from datetime import date
+from decimal import Decimal
+
+from core.pps import decrypt_pps_number, encrypt_pps_number
+from .ccr_formatter import CCRFileFormatter
+from ..models import CCRContractSnapshot
+
+# Values the JSON encoder turns into strings, turned back so the formatter renders the same line
+PERSONAL_INFO_DATES = ('date_of_birth',)
+CREDIT_INFO_DATES = ('start_date', 'maturity_date', 'contract_end_date', 'next_payment_date')
+CREDIT_INFO_AMOUNTS = ('financed_amount', 'outstanding_balance', 'next_payment_amount')
+
+
+def content_checksum(file_content):
+    """SHA-256 hex digest of a submission file"""
+    return hashlib.sha256(file_content.encode('utf-8')).hexdigest()
+
+
+def build_snapshot(submission, contract_record, submission_type, applicant=None, personal_info=None,
+                   credit_info=None, id_line_number=None, ci_line_number=None):
+    """Unsaved snapshot of one contract, the PPSN of personal_info is stored encrypted"""
+    encrypted_ppsn = None
+    if personal_info is not None:
+        personal_info = dict(personal_info)
+        ppsn = personal_info.pop('ppsn', None)
+        encrypted_ppsn = encrypt_pps_number(ppsn) if ppsn else None
+    return CCRContractSnapshot(
+        submission=submission,
+        contract_record=contract_record,
+        submission_type=submission_type,
+        applicant_name=f"{applicant.first_name} {applicant.last_name}" if applicant else '',
+        personal_info=personal_info,
+        encrypted_ppsn=encrypted_ppsn,
+        credit_info=credit_info,
+        id_line_number=id_line_number,
+        ci_line_number=ci_line_number,
+    )
+
+
+def _thaw(data, dates=(), amounts=()):
+    data = dict(data)
+    for key in dates:
+        if data.get(key):
+            data[key] = date.fromisoformat(data[key][:10])
+    for key in amounts:
+        if isinstance(data.get(key), str):
+            data[key] = Decimal(data[key])
+    return data
+
+
+def thaw_personal_info(snapshot):
+    personal_info = _thaw(snapshot.personal_info, dates=PERSONAL_INFO_DATES)
+    personal_info['ppsn'] = decrypt_pps_number(snapshot.encrypted_ppsn) or ''
+    return personal_info
+
+
+def thaw_credit_info(snapshot):
+    return _thaw(snapshot.credit_info, dates=CREDIT_INFO_DATES, amounts=CREDIT_INFO_AMOUNTS)
+
+
+def render_submission(submission, formatter=None):
+    """
+    Render the file of a submission again from its snapshots, without reading the loans.
+
+    Returns (file_content, total_records, summary) like CCRFileGenerator.generate_monthly_submission, the
+    summary tells whether the content still matches the checksum stored at generation time.
+    """
+    formatter = formatter or CCRFileFormatter()
+    reference_date = submission.reference_date
+    snapshots = list(submission.snapshots.all())
+
+    lines = []
+    for snapshot in snapshots:
+        if snapshot.id_line_number is not None:
+            lines.append((snapshot.id_line_number,
+                          formatter.format_id_line(thaw_personal_info(snapshot), reference_date)))
+        if snapshot.ci_line_number is not None:
+            lines.append((snapshot.ci_line_number,
+                          formatter.format_ci_line(thaw_credit_info(snapshot), reference_date)))
+    submission_lines = [line for _, line in sorted(lines, key=lambda item: item[0])]
+
+    # A header is written whenever the month had contracts, even if none of their lines could be built
+    if submission.total_records:
+        submission_lines.insert(0, formatter.create_file_header(reference_date))
+    if len(submission_lines) > 1:
+        submission_lines.append(formatter.create_file_footer(len(submission_lines), reference_date))
+
+    file_content = '\n'.join(submission_lines)
+    checksum = content_checksum(file_content)
+    types = [snapshot.submission_type for snapshot in snapshots]
+    summary = {
+        'reference_date': reference_date,
+        'total_records': len(submission_lines),
+        'new_contracts': types.count('NEW'),
+        'active_contracts': types.count('UPDATE'),
+        'settled_contracts': types.count('SETTLEMENT'),
+        'is_test_mode': submission.is_test_submission,
+        'submission_id': submission.id,
+        'regenerated': True,
+        'source': 'snapshot',
+        'checksum': checksum,
+        'checksum_matches': checksum == submission.content_checksum,
+    }
+    return file_content, len(submission_lines), summary
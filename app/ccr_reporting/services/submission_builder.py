@@ -0,0 +1,247 @@
+# ccr_reporting/services/submission_builder.py - Set based monthly submission
+import logging
+
+from django.db import transaction
+from django.db.models import Prefetch, prefetch_related_objects
+
+from core.models import Transaction
+from .snapshots import build_snapshot
+from ..models import CCRSubmission, CCRContractRecord, CCRContractSubmission, CCRContractSnapshot
+
+logger = logging.getLogger(__name__)
+
+
+class CCRSubmissionBuilder:
+    """
+    Build the monthly CCR submission for all contracts at once.
+
+    The contracts of the month and everything their lines need (loan, application, first applicant,
+    transactions, existing CCR record) are read in a constant number of queries, the active contracts are valued
+    by ``workers`` processes, the records are streamed into a CCRFileWriter as they are built and the submission is
+    written with its CCR records, tracking rows and snapshots in bulk, in one transaction.
+    """
+
+    def __init__(self, collector, formatter, workers=1):
+        self.collector = collector
+        self.formatter = formatter
+        self.workers = workers
+
+    def load_contracts(self, reference_date, is_regeneration):
+        """New, active and settled loanbooks of the month, with their related rows prefetched"""
+        if is_regeneration:
+            groups = [
+                self.collector.new_loanbooks_queryset(reference_date, ignore_already_reported=True),
+                self.collector.active_loanbooks_queryset(reference_date, for_regeneration=True),
+                self.collector.settled_loanbooks_queryset(reference_date, for_regeneration=True),
+            ]
+        else:
+            groups = [
+                self.collector.new_loanbooks_queryset(reference_date),
+                self.collector.active_loanbooks_queryset(reference_date),
+                self.collector.settled_loanbooks_queryset(reference_date),
+            ]
+
+        # One instance per loanbook, so a contract in two groups is prefetched and tracked once
+        loanbooks = {}
+        groups = [[loanbooks.setdefault(loanbook.pk, loanbook) for loanbook in group] for group in groups]
+        prefetch_related_objects(
+            list(loanbooks.values()),
+            'loan__application__applicants',
+            Prefetch('loan__transactions', queryset=Transaction.objects.order_by('transaction_date')),
+        )
+        return groups
+
+    def build(self, writer, reference_date, is_test_mode=False, create_submission=True):
+        """Write the records into ``writer`` (a CCRFileWriter) as they are built, returns (total_records, summary)"""
+        is_regeneration = not create_submission
+        new_loanbooks, active_loanbooks, settled_loanbooks = self.load_contracts(reference_date, is_regeneration)
+        logger.debug(
+            "Found %s new, %s active, %s settled contracts", len(new_loanbooks), len(active_loanbooks),
+            len(settled_loanbooks)
+        )
+
+        # *** MONTH 3 SETTLEMENT SIMULATION FOR TEST MODE ***
+        is_month_3_test = (
+                is_test_mode and
+                reference_date.month == 9 and
+                reference_date.year == 2025 and
+                len(active_loanbooks) > 0
+        )
+        if is_month_3_test:
+            logger.debug(
+                "*** MONTH 3 SETTLEMENT SIMULATION: %s active loans moved to settled ***", len(active_loanbooks)
+            )
+            settled_loanbooks = settled_loanbooks + active_loanbooks
+            active_loanbooks = []
+
+        tracking = []  # one entry per contract, in file order, with the data its lines were built from
+        closed_dates = {}  # loanbook pk -> date the contract closes in CCR
+
+        if new_loanbooks or active_loanbooks or settled_loanbooks:
+            writer.write_record(self.formatter.create_file_header(reference_date))
+
+        # --- Onboard new applicants (ID record only, if never reported to CCR)
+        applicants_reported_this_file = set()
+        for loanbook in new_loanbooks:
+            try:
+                applicant = loanbook.loan.application.applicants.first()
+                if not applicant:
+                    logger.warning("No applicant found for loanbook %s", loanbook.id)
+                    continue
+
+                if is_regeneration:
+                    # Add the ID again if the contract was new in the original submission
+                    ccr_record = getattr(loanbook, 'ccr_record', None)
+                    should_add_id = ccr_record is not None and ccr_record.first_reported_date == reference_date
+                else:
+                    should_add_id = not getattr(applicant, 'ccr_reported', False)
+
+                entry = {'loanbook': loanbook, 'submission_type': 'NEW', 'applicant': applicant}
+                if should_add_id and applicant.id not in applicants_reported_this_file:
+                    personal_info = self.collector.get_personal_info(applicant)
+                    id_line = self.formatter.format_id_line(personal_info, reference_date)
+                    entry.update(personal_info=personal_info, id_line_number=writer.record_count)
+                    writer.write_record(id_line)
+                    applicants_reported_this_file.add(applicant.id)
+
+                tracking.append(entry)
+            except Exception as e:
+                logger.error("Error processing new loanbook %s: %s", loanbook.id, e)
+
+        # --- CI records for all contracts active or settling this month
+        settled_ids = {loanbook.pk for loanbook in settled_loanbooks}
+        unique_loanbooks = list({loanbook.pk: loanbook for loanbook in active_loanbooks + settled_loanbooks}.values())
+
+        # Balances of the active contracts are the expensive part of the run, computed up front by the worker pool
+        valuations = {}
+        if not is_month_3_test:
+            valuations = self.collector.value_contracts([
+                loanbook for loanbook in unique_loanbooks
+                if loanbook.created_at and loanbook.created_at.date() <= reference_date and not loanbook.loan.is_settled
+            ], reference_date, workers=self.workers)
+
+        for loanbook in unique_loanbooks:
+            try:
+                if loanbook.created_at.date() > reference_date:
+                    continue
+
+                is_settlement = loanbook.pk in settled_ids or is_month_3_test
+                loan = loanbook.loan
+                if is_month_3_test:
+                    # Report the contract as settled mid-month without touching the loan
+                    original_is_settled, original_settled_date = loan.is_settled, loan.settled_date
+                    loan.is_settled, loan.settled_date = True, reference_date.replace(day=15)
+                    try:
+                        credit_info = self.collector.get_credit_info(loanbook, reference_date)
+                    finally:
+                        loan.is_settled, loan.settled_date = original_is_settled, original_settled_date
+                    if credit_info.get('is_settled', False):
+                        closed_dates[loanbook.pk] = credit_info.get('contract_end_date', reference_date)
+                else:
+                    credit_info = self.collector.get_credit_info(loanbook, reference_date,
+                                                                 valuation=valuations.get(loanbook.pk))
+                    if loan.is_settled:
+                        closed_dates[loanbook.pk] = getattr(loan, 'settled_date', reference_date)
+
+                ci_line = self.formatter.format_ci_line(credit_info, reference_date)
+                tracking.append({
+                    'loanbook': loanbook,
+                    'submission_type': 'SETTLEMENT' if is_settlement else 'UPDATE',
+                    'applicant': loan.application.applicants.first(),
+                    'credit_info': credit_info,
+                    'ci_line_number': writer.record_count,
+                })
+                writer.write_record(ci_line)
+            except Exception as e:
+                closed_dates.pop(loanbook.pk, None)
+                logger.error("Error processing CI record for loanbook %s: %s", loanbook.id, e)
+
+        # --- FOOTER
+        if writer.record_count > 1:
+            writer.write_record(self.formatter.create_file_footer(writer.record_count, reference_date))
+
+        total_records = writer.record_count
+        writer.finish()
+
+        submission = None
+        if create_submission:
+            try:
+                submission = self.save_submission(writer, tracking, closed_dates, reference_date, is_test_mode)
+            except Exception:
+                writer.discard()
+                raise
+            logger.debug(
+                "Created submission %s with %s contract submission tracking records", submission.id, len(tracking)
+            )
+
+        summary = {
+            'reference_date': reference_date,
+            'total_records': total_records,
+            'record_counts': dict(writer.record_counts),
+            'checksum': writer.checksum,
+            'new_contracts': len(new_loanbooks),
+            'active_contracts': len(active_loanbooks),
+            'settled_contracts': len(settled_loanbooks),
+            'is_test_mode': is_test_mode,
+            'submission_id': submission.id if submission else None,
+            'note': 'MONTH 3 SETTLEMENT SIMULATION' if is_month_3_test else 'Standard processing',
+            'regenerated': is_regeneration
+        }
+        return total_records, summary
+
+    def save_submission(self, writer, tracking, closed_dates, reference_date, is_test_mode):
+        """The submission with its CCR records, tracking rows and snapshots, in one transaction"""
+        with transaction.atomic():
+            submission = CCRSubmission.objects.create(
+                reference_date=reference_date,
+                file_path=writer.name or f'ccr_submission_{reference_date.strftime("%Y%m%d")}.txt',
+                compressed_file_path=writer.compressed_name,
+                total_records=writer.record_count,
+                status='GENERATED',
+                is_test_submission=is_test_mode,
+                content_checksum=writer.checksum,
+            )
+            records = self.save_contract_records(tracking, closed_dates, reference_date)
+            CCRContractSubmission.objects.bulk_create([
+                CCRContractSubmission(contract_record=records[entry['loanbook'].pk], submission=submission,
+                                      submission_type=entry['submission_type'])
+                for entry in tracking
+            ])
+            CCRContractSnapshot.objects.bulk_create([
+                build_snapshot(submission, records[entry['loanbook'].pk], entry['submission_type'],
+                               applicant=entry['applicant'], personal_info=entry.get('personal_info'),
+                               credit_info=entry.get('credit_info'), id_line_number=entry.get('id_line_number'),
+                               ci_line_number=entry.get('ci_line_number'))
+                for entry in tracking
+            ])
+        return submission
+
+    def save_contract_records(self, tracking, closed_dates, reference_date):
+        """Create or update the CCR record of every tracked contract in bulk, returns them by loanbook pk"""
+        records = {}
+        new_records, existing_records = [], []
+        for entry in tracking:
+            loanbook = entry['loanbook']
+            if loanbook.pk in records:
+                continue
+            record = getattr(loanbook, 'ccr_record', None)
+            if record is None:
+                record = CCRContractRecord(
+                    loanbook=loanbook,
+                    ccr_contract_id=str(loanbook.pk),
+                    first_reported_date=reference_date,
+                    last_reported_date=reference_date,
+                )
+                new_records.append(record)
+            else:
+                existing_records.append(record)
+            record.last_reported_date = reference_date
+            if loanbook.pk in closed_dates and not record.is_closed_in_ccr:
+                record.is_closed_in_ccr = True
+                record.closed_date = closed_dates[loanbook.pk]
+            records[loanbook.pk] = record
+
+        CCRContractRecord.objects.bulk_create(new_records)
+        CCRContractRecord.objects.bulk_update(existing_records,
+                                              ['last_reported_date', 'is_closed_in_ccr', 'closed_date'])
+        return records
@@ -0,0 +1,74 @@
+# ccr_reporting/services/valuation.py - Contract valuations of a CCR run, optionally in worker processes
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+
+
+def valuation_input(loanbook, dates):
+    """
+    Plain, picklable data needed to value ``loanbook`` on each of ``dates``.
+
+    Read from the loanbook and its (prefetched) loan and transactions, so the workers never touch the database.
+    """
+    loan = loanbook.loan
+    transactions = sorted(loan.transactions.all(), key=lambda tx: tx.transaction_date)
+    return {
+        'loan_id': loan.pk,
+        'dates': tuple(dates),
+        'initial_amount': loanbook.initial_amount,
+        'initial_fee_percentage': loanbook.initial_fee_percentage,
+        'daily_fee_after_year_percentage': loanbook.daily_fee_after_year_percentage,
+        'exit_fee_percentage': loanbook.exit_fee_percentage,
+        'paid_out_date': loan.paid_out_date,
+        'approved_date': loan.approved_date,
+        'is_settled': loan.is_settled,
+        'settled_date': loan.settled_date,
+        'transactions': [(tx.transaction_date, tx.amount, tx.description) for tx in transactions],
+    }
+
+
+def value_contract(data):
+    """Total due on each date of a valuation_input, computed by LoanBook.calculate_total_due on unsaved models"""
+    from core.models import Loan, Transaction
+    from loanbook.models import LoanBook
+
+    loan = Loan(pk=data['loan_id'], paid_out_date=data['paid_out_date'], approved_date=data['approved_date'],
+                is_settled=data['is_settled'], settled_date=data['settled_date'])
+    loanbook = LoanBook(loan=loan, initial_amount=data['initial_amount'],
+                        initial_fee_percentage=data['initial_fee_percentage'],
+                        daily_fee_after_year_percentage=data['daily_fee_after_year_percentage'],
+                        exit_fee_percentage=data['exit_fee_percentage'])
+    transactions = [Transaction(transaction_date=transaction_date, amount=amount, description=description)
+                    for transaction_date, amount, description in data['transactions']]
+    return tuple(loanbook.calculate_total_due(on_date, transactions=transactions) for on_date in data['dates'])
+
+
+def _value_contract_or_none(data):
+    # A contract that cannot be valued must not fail the whole run, the caller values it again in process
+    # so the error is reported against its loanbook
+    try:
+        return value_contract(data)
+    except Exception:
+        return None
+
+
+def value_contracts(inputs, workers=1):
+    """
+    Valuations of ``inputs`` (valuation_input dicts), in the same order.
+
+    The day by day statements are CPU bound Decimal work, with ``workers`` > 1 they are computed by a process
+    pool. Each worker only gets plain data, results come back in input order so the file is the same whatever
+    the number of workers. A contract whose valuation failed gets None.
+    """
+    if workers <= 1 or len(inputs) < 2:
+        return [_value_contract_or_none(data) for data in inputs]
+
+    workers = min(workers, len(inputs))
+    chunksize = max(1, len(inputs) // (workers * 4))
+    # Workers come from a fork server, never from forking this process: it may be a daphne worker with running
+    # threads (log listener, committee notifier) whose locks a fork would copy. They run django.setup before
+    # unpickling models.
+    mp_context = multiprocessing.get_context('forkserver')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=mp_context, initializer=django.setup) as executor:
+        return list(executor.map(_value_contract_or_none, inputs, chunksize=chunksize))
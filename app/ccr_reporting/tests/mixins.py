@@ -0,0 +1,57 @@
+"""
+Paid out loans and CCR contract records shared by the CCR reporting tests
+"""
+import shutil
+import tempfile
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import override_settings
+from rest_framework.test import APIClient
+
+from ccr_reporting.models import CCRContractRecord
+from core.models import Applicant, Application, Loan
+
+FEES = {'INITIAL_FEE_PERCENTAGE': '15.00', 'DAILY_FEE_AFTER_YEAR_PERCENTAGE': '0.07', 'EXIT_FEE_PERCENTAGE': '1.50'}
+REFERENCE_DATE = date(2025, 6, 30)
+
+
+class CCRTestMixin:
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.solicitor = get_user_model().objects.create_user(email='solicitor@example.com', password='pass',
+                                                              country='IE')
+
+    def create_loan(self, paid_out_date, settled_date=None):
+        """Paid out loan, its loanbook is created by the signal with created_at = paid_out_date"""
+        application = Application.objects.create(user=self.solicitor, amount=10000, term=12)
+        Applicant.objects.create(application=application, title='Mr', first_name='John', last_name='Smith')
+        return Loan.objects.create(application=application, amount_agreed=Decimal('10000.00'),
+                                   fee_agreed=Decimal('1500.00'), term_agreed=12, is_paid_out=True,
+                                   paid_out_date=paid_out_date, is_settled=settled_date is not None,
+                                   settled_date=settled_date)
+
+    def report(self, loan, first_reported_date=date(2025, 3, 31)):
+        return CCRContractRecord.objects.create(loanbook=loan.loanbook, ccr_contract_id=str(loan.loanbook.pk),
+                                                first_reported_date=first_reported_date,
+                                                last_reported_date=first_reported_date)
+
+    def create_contracts(self, count):
+        """``count`` new, active and settled contracts for REFERENCE_DATE"""
+        for _ in range(count):
+            self.create_loan(date(2025, 6, 10))
+            self.report(self.create_loan(date(2025, 3, 10)))
+            self.report(self.create_loan(date(2025, 2, 10), settled_date=date(2025, 6, 20)))
+
+    def staff_client(self):
+        staff = get_user_model().objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        client = APIClient()
+        client.force_authenticate(user=staff)
+        return client
@@ -0,0 +1,81 @@
+"""
+Tests for the CCR submission files streamed into the storage backend and back out to the client
+"""
+import gzip
+import os
+from unittest.mock import patch
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.files.storage import default_storage
+from django.test import AsyncRequestFactory, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import force_authenticate
+
+from ccr_reporting.models import CCRSubmission
+from ccr_reporting.services.file_generator import CCRFileGenerator
+from ccr_reporting.services.file_writer import CCRFileWriter
+from ccr_reporting.services.snapshots import content_checksum
+from ccr_reporting.tests.mixins import FEES, REFERENCE_DATE, CCRTestMixin
+from ccr_reporting.views import download_submission_file
+
+
+async def read_chunks(response):
+    return [chunk async for chunk in response]
+
+
+@patch.dict(os.environ, FEES)
+@override_settings(CCR_TEST_MODE=False)
+class CCRFileWriterTests(CCRTestMixin, TestCase):
+
+    def test_writer_streams_into_storage(self):
+        with CCRFileWriter(name='ccr_submissions/test.txt', compress=True) as writer:
+            for line in ['HD|x', 'ID|1', 'CI|1', 'CI|2', 'FT|x|4']:
+                writer.write_record(line)
+            name = writer.finish()
+
+        content = 'HD|x\nID|1\nCI|1\nCI|2\nFT|x|4'
+        self.assertEqual(writer.record_count, 5)
+        self.assertEqual(writer.record_counts, {'HD': 1, 'ID': 1, 'CI': 2, 'FT': 1})
+        self.assertEqual(writer.checksum, content_checksum(content))
+        with default_storage.open(name) as stored:
+            self.assertEqual(stored.read().decode(), content)
+        with default_storage.open(writer.compressed_name) as stored:
+            self.assertEqual(gzip.decompress(stored.read()).decode(), content)
+
+    def test_generate_view_streams_the_stored_file(self):
+        self.create_contracts(2)
+        client = self.staff_client()
+
+        with self.settings(CCR_COMPRESS_SUBMISSIONS=True):
+            response = client.post(reverse('ccr_reporting:generate_submission'),
+                                   {'reference_date': REFERENCE_DATE.isoformat()}, format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content).decode()
+        submission = CCRSubmission.objects.get()
+        self.assertEqual(content_checksum(content), submission.content_checksum)
+        self.assertEqual(response['X-CCR-Checksum'], submission.content_checksum)
+        self.assertEqual(response['X-CCR-Record-Count'], '8')
+        self.assertTrue(default_storage.exists(submission.file_path))
+
+        response = client.post(reverse('ccr_reporting:download_submission_file'),
+                               {'submission_id': submission.id, 'compressed': True}, format='json')
+        self.assertEqual(response['X-CCR-Source'], 'existing_file')
+        self.assertEqual(gzip.decompress(b''.join(response.streaming_content)).decode(), content)
+
+    def test_download_is_streamed_asynchronously_under_asgi(self):
+        self.create_contracts(1)
+        file_content, _, _ = CCRFileGenerator().generate_monthly_submission(REFERENCE_DATE)
+        submission = CCRSubmission.objects.get()
+        staff = get_user_model().objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        request = AsyncRequestFactory().post(reverse('ccr_reporting:download_submission_file'),
+                                             {'submission_id': submission.id}, content_type='application/json')
+        force_authenticate(request, user=staff)
+
+        response = download_submission_file(request)
+
+        self.assertTrue(response.is_async)
+        self.assertEqual(response['X-CCR-Source'], 'existing_file')
+        self.assertEqual(b''.join(async_to_sync(read_chunks)(response)).decode(), file_content)
@@ -0,0 +1,71 @@
+"""
+Tests for the preview of the next CCR submission
+"""
+import os
+from datetime import date
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ccr_reporting.services.file_generator import CCRFileGenerator
+from ccr_reporting.tests.mixins import FEES, REFERENCE_DATE, CCRTestMixin
+from core.models import Applicant, Loan
+
+
+@patch.dict(os.environ, FEES)
+@override_settings(CCR_TEST_MODE=False)
+class CCRSubmissionPreviewTests(CCRTestMixin, TestCase):
+
+    def preview(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            preview = CCRFileGenerator().get_submission_preview(REFERENCE_DATE, **params)
+        return preview, len(queries)
+
+    def test_preview_counts_match_the_submission(self):
+        self.create_contracts(2)
+
+        preview, _ = self.preview()
+        _, total_records, summary = CCRFileGenerator().generate_monthly_submission(REFERENCE_DATE)
+
+        self.assertEqual(preview['total_records'], total_records)
+        self.assertEqual((preview['new_contracts']['count'], preview['active_contracts']['count'],
+                          preview['settled_contracts']['count']), (2, 2, 2))
+        self.assertEqual(preview['breakdown'], {'header_records': 1, 'id_records': 2, 'ci_records': 4,
+                                                'footer_records': 1})
+        self.assertEqual(preview['new_contracts']['details'][0]['applicant_name'], 'John Smith')
+        self.assertEqual(preview['settled_contracts']['details'][0]['settled_date'], date(2025, 6, 20))
+        self.assertNotIn('outstanding_balance', preview['active_contracts']['details'][0])
+
+    def test_preview_names_the_applicant_of_the_submission(self):
+        self.create_contracts(1)
+        loan = Loan.objects.get(paid_out_date=date(2025, 6, 10))
+        Applicant.objects.create(application=loan.application, title='Ms', first_name='Mary', last_name='Adams')
+
+        preview, _ = self.preview()
+
+        applicant = loan.application.applicants.first()
+        self.assertEqual(preview['new_contracts']['details'][0]['applicant_name'],
+                         f'{applicant.first_name} {applicant.last_name}')
+        self.assertEqual(applicant.last_name, 'Adams')
+
+    def test_preview_query_count_does_not_grow_with_contracts(self):
+        self.create_contracts(1)
+        _, small = self.preview()
+        self.create_contracts(15)
+        preview, large = self.preview()
+
+        self.assertEqual(small, large)
+        self.assertEqual(preview['active_contracts']['count'], 16)
+        self.assertEqual(len(preview['active_contracts']['details']), 10)
+
+    def test_preview_balances_on_request(self):
+        self.create_contracts(1)
+        loanbook = Loan.objects.get(paid_out_date=date(2025, 3, 10)).loanbook
+
+        preview, _ = self.preview(include_balances=True)
+
+        detail = preview['active_contracts']['details'][0]
+        self.assertTrue(preview['balances_included'])
+        self.assertEqual(detail['outstanding_balance'], float(loanbook.calculate_total_due(REFERENCE_DATE)))
@@ -0,0 +1,45 @@
+"""
+Tests for the CCR response files parsed into error records
+"""
+import os
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ccr_reporting.models import CCRContractRecord, CCRErrorRecord, CCRStatusHistory, CCRSubmission
+from ccr_reporting.services.file_generator import CCRFileGenerator
+from ccr_reporting.tests.mixins import FEES, REFERENCE_DATE, CCRTestMixin
+
+
+@patch.dict(os.environ, FEES)
+@override_settings(CCR_TEST_MODE=False)
+class CCRResponseParserTests(CCRTestMixin, TestCase):
+
+    def test_response_upload_links_errors_to_contracts(self):
+        self.create_contracts(1)
+        file_content, _, _ = CCRFileGenerator().generate_monthly_submission(REFERENCE_DATE)
+        submission = CCRSubmission.objects.get()
+        ci_line = next(line for line in file_content.split('\n') if line.startswith('CI'))
+        contract_no = ci_line.split('|')[7]
+        record = CCRContractRecord.objects.get(ccr_contract_id=contract_no)
+        response_file = SimpleUploadedFile('response.txt', '\n'.join([
+            'HD|OK',
+            f'ERROR|E042|{ci_line}',
+            f'REJECTED: Contract No: {contract_no} invalid maturity date',
+            'ERROR|E001|unknown record',
+            'FT|OK',
+        ]).encode())
+
+        response = self.staff_client().post(reverse('ccr_reporting:upload_ccr_response'),
+                                            {'submission_id': submission.id, 'response_file': response_file},
+                                            format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['errors_found'], response.data['errors_matched_to_contracts']), (3, 2))
+        self.assertEqual(response.data['new_status'], 'PARTIAL_ERROR')
+        errors = CCRErrorRecord.objects.filter(submission=submission).order_by('line_number')
+        self.assertEqual([error.line_number for error in errors], [2, 3, 4])
+        self.assertEqual([error.contract_record_id for error in errors], [record.id, record.id, None])
+        self.assertEqual(CCRStatusHistory.objects.get(submission=submission).new_status, 'PARTIAL_ERROR')
@@ -0,0 +1,63 @@
+"""
+Tests for the CCR contract snapshots filed with each submission
+"""
+import os
+from datetime import date
+from unittest.mock import patch
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from ccr_reporting.models import CCRSubmission
+from ccr_reporting.services.file_generator import CCRFileGenerator
+from ccr_reporting.services.snapshots import content_checksum
+from ccr_reporting.tests.mixins import FEES, REFERENCE_DATE, CCRTestMixin
+from core.models import Applicant, Loan
+
+
+@patch.dict(os.environ, FEES)
+@override_settings(CCR_TEST_MODE=False)
+class CCRSnapshotTests(CCRTestMixin, TestCase):
+
+    def test_regeneration_renders_the_snapshot(self):
+        self.create_contracts(1)
+        applicant = Applicant.objects.get(application__loan__paid_out_date=date(2025, 6, 10))
+        applicant.pps_number = '1234567T'
+        applicant.save()
+        file_content, _, _ = CCRFileGenerator().generate_monthly_submission(REFERENCE_DATE)
+        submission = CCRSubmission.objects.get()
+        self.assertEqual(submission.content_checksum, content_checksum(file_content))
+        self.assertIn('|1234567T|', file_content)
+
+        snapshot = submission.snapshots.get(submission_type='NEW')
+        self.assertNotIn('ppsn', snapshot.personal_info)
+        self.assertNotIn(b'1234567T', bytes(snapshot.encrypted_ppsn))
+
+        # Later changes to the loans and applicants do not leak into the filed file
+        Applicant.objects.update(first_name='Jane')
+        Loan.objects.filter(paid_out_date=date(2025, 3, 10)).update(is_settled=True, settled_date=date(2025, 7, 1))
+        regenerated, total_records, summary = CCRFileGenerator().generate_file_content_only(REFERENCE_DATE)
+
+        self.assertEqual(regenerated, file_content)
+        self.assertEqual(total_records, submission.total_records)
+        self.assertEqual(summary['source'], 'snapshot')
+        self.assertTrue(summary['checksum_matches'])
+
+        details = CCRFileGenerator().get_submission_details(submission.id)
+        self.assertEqual(details['breakdown']['NEW'][0]['applicant_name'], 'John Smith')
+        self.assertEqual(details['summary']['total_contract_records'], 3)
+
+    def test_download_uses_the_snapshot(self):
+        self.create_contracts(1)
+        file_content, _, _ = CCRFileGenerator().generate_monthly_submission(REFERENCE_DATE)
+        submission = CCRSubmission.objects.get()
+        client = self.staff_client()
+
+        response = client.post(reverse('ccr_reporting:download_submission_file'), {'submission_id': submission.id},
+                               format='json')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content.decode(), file_content)
+        self.assertEqual(response['X-CCR-Source'], 'snapshot')
+        self.assertEqual(response['X-CCR-Checksum'], submission.content_checksum)
+        self.assertEqual(response['X-CCR-Checksum-Match'], 'True')
@@ -0,0 +1,81 @@
+"""
+Tests for the set based CCR monthly submission builder
+"""
+import os
+from datetime import date
+from unittest.mock import patch
+
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ccr_reporting.models import CCRContractRecord, CCRContractSnapshot, CCRContractSubmission, CCRSubmission
+from ccr_reporting.services.file_generator import CCRFileGenerator
+from ccr_reporting.tests.mixins import FEES, REFERENCE_DATE, CCRTestMixin
+
+
+@patch.dict(os.environ, FEES)
+@override_settings(CCR_TEST_MODE=False)
+class CCRSubmissionBuilderTests(CCRTestMixin, TestCase):
+
+    def generate(self):
+        with CaptureQueriesContext(connection) as queries:
+            result = CCRFileGenerator().generate_monthly_submission(REFERENCE_DATE)
+        return result, len(queries)
+
+    def test_lines_and_tracking(self):
+        self.create_contracts(2)
+
+        (file_content, total_records, summary), _ = self.generate()
+
+        lines = file_content.split('\n')
+        self.assertEqual(total_records, 1 + 2 + 4 + 1)
+        self.assertEqual([line[:2] for line in lines[1:-1]], ['ID', 'ID', 'CI', 'CI', 'CI', 'CI'])
+        self.assertEqual((summary['new_contracts'], summary['active_contracts'], summary['settled_contracts']),
+                         (2, 2, 2))
+
+        submission = CCRSubmission.objects.get()
+        self.assertEqual(submission.total_records, total_records)
+        self.assertEqual(summary['submission_id'], submission.id)
+        tracking = CCRContractSubmission.objects.filter(submission=submission)
+        self.assertEqual(sorted(tracking.values_list('submission_type', flat=True)),
+                         ['NEW', 'NEW', 'SETTLEMENT', 'SETTLEMENT', 'UPDATE', 'UPDATE'])
+
+        self.assertEqual(CCRContractRecord.objects.filter(last_reported_date=REFERENCE_DATE).count(), 6)
+        self.assertEqual(CCRContractRecord.objects.filter(first_reported_date=REFERENCE_DATE).count(), 2)
+        closed = CCRContractRecord.objects.filter(is_closed_in_ccr=True)
+        self.assertEqual([record.closed_date for record in closed], [date(2025, 6, 20)] * 2)
+
+    def test_query_count_does_not_grow_with_contracts(self):
+        self.create_contracts(1)
+        _, small = self.generate()
+
+        CCRSubmission.objects.all().delete()
+        CCRContractRecord.objects.filter(first_reported_date=REFERENCE_DATE).delete()
+        CCRContractRecord.objects.update(last_reported_date=date(2025, 3, 31), is_closed_in_ccr=False,
+                                         closed_date=None)
+        self.create_contracts(4)
+        (_, total_records, _), large = self.generate()
+
+        self.assertEqual(total_records, 1 + 5 + 10 + 1)
+        self.assertEqual(small, large)
+
+    def test_regeneration_without_snapshots_writes_nothing(self):
+        self.create_contracts(1)
+        file_content, _, _ = CCRFileGenerator().generate_monthly_submission(REFERENCE_DATE)
+        CCRContractSnapshot.objects.all().delete()
+
+        regenerated, _, summary = CCRFileGenerator().generate_file_content_only(REFERENCE_DATE)
+
+        self.assertTrue(summary['regenerated'])
+        self.assertIsNone(summary['submission_id'])
+        self.assertEqual(CCRContractSubmission.objects.count(), 3)
+        # Same records, only the header/footer timestamps may differ
+        self.assertEqual([line[:2] for line in regenerated.split('\n')],
+                         [line[:2] for line in file_content.split('\n')])
+
+    def test_existing_submission(self):
+        CCRSubmission.objects.create(reference_date=REFERENCE_DATE, file_path='x.txt')
+
+        with self.assertRaises(ValueError):
+            CCRFileGenerator().generate_monthly_submission(REFERENCE_DATE)
@@ -0,0 +1,51 @@
+"""
+Tests for the valuation of active CCR contracts in a process pool
+"""
+import os
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+from ccr_reporting.services.data_collector import CCRDataCollector
+from ccr_reporting.services.file_generator import CCRFileGenerator
+from ccr_reporting.tests.mixins import FEES, REFERENCE_DATE, CCRTestMixin
+from core.models import Loan, Transaction
+
+
+@patch.dict(os.environ, FEES)
+@override_settings(CCR_TEST_MODE=False)
+class CCRValuationTests(CCRTestMixin, TestCase):
+
+    def add_payments(self):
+        for loan in Loan.objects.filter(is_settled=False):
+            Transaction.objects.create(loan=loan, amount=Decimal('250.00'), created_by=self.solicitor,
+                                       transaction_date=loan.loanbook.created_at + timedelta(days=20))
+
+    def test_worker_pool_valuations_match_the_statement(self):
+        self.create_contracts(2)
+        self.add_payments()
+        collector = CCRDataCollector()
+        loanbooks = [loan.loanbook for loan in Loan.objects.filter(is_settled=False).order_by('pk')]
+
+        valuations = collector.value_contracts(loanbooks, REFERENCE_DATE, workers=2)
+
+        self.assertEqual(list(valuations), [loanbook.pk for loanbook in loanbooks])
+        for loanbook in loanbooks:
+            self.assertEqual(valuations[loanbook.pk], (
+                loanbook.calculate_total_due(REFERENCE_DATE),
+                loanbook.calculate_total_due(collector.maturity_date(loanbook)),
+            ))
+
+    def test_worker_pool_writes_the_same_file(self):
+        self.create_contracts(3)
+        self.add_payments()
+
+        with transaction.atomic():
+            serial, _, _ = CCRFileGenerator().generate_monthly_submission(REFERENCE_DATE, workers=1)
+            transaction.set_rollback(True)
+        parallel, _, _ = CCRFileGenerator().generate_monthly_submission(REFERENCE_DATE, workers=3)
+
+        self.assertEqual(parallel, serial)
@@ -1,6 +1,8 @@
 # ccr_reporting/views.py - Fixed version with proper 3-month sequence generation
+import logging
 import os
 
+from django.core.files.storage import default_storage
 from django.http import HttpResponse
 from django.utils import timezone
 from rest_framework.decorators import api_view, permission_classes
@@ -12,10 +14,15 @@ import io
 import calendar
 
 from app import settings
+from core.downloads import serve_file
+from core.structured_logging import SAMPLED
 from .services.file_generator import CCRFileGenerator
+from .services.response_parser import CCRResponseParser
 from .models import CCRSubmission, CCRContractRecord, CCRStatusHistory, CCRErrorRecord, CCRContractSubmission
 from agents_loan.permissions import IsStaff
 
+logger = logging.getLogger(__name__)
+
 
 def get_month_end_date(year, month):
     """Get the last day of a given month"""
@@ -40,55 +47,56 @@ def add_months(date, months):
 @permission_classes([IsAuthenticated, IsStaff])
 def generate_ccr_submission(request):
     """Generate CCR submission file and return it to frontend with settlement handling"""
-    print("=== CCR SUBMISSION REQUEST STARTED ===")
+    logger.debug("=== CCR SUBMISSION REQUEST STARTED ===")
     try:
         data = request.data
-        print(f"Request data: {data}")
-        print(f"Request method: {request.method}")
-        print(f"User: {request.user}")
+        logger.debug("Request data: %s", data)
+        logger.debug("Request method: %s", request.method)
+        logger.debug("User: %s", request.user)
 
         # Validate request data
         if not data:
-            print("ERROR: No data provided in request body")
+            logger.error("No data provided in request body")
             return Response({
                 'error': 'No data provided in request body'
             }, status=400)
 
         # Test mode allows multiple submissions and date manipulation
         test_mode = data.get('test_mode', False)
-        print(f"Test mode: {test_mode}")
+        logger.debug("Test mode: %s", test_mode)
 
         # Get reference date
         if 'force_date' in data and test_mode:
             reference_date = datetime.strptime(data['force_date'], '%Y-%m-%d').date()
-            print(f"Using force_date: {reference_date}")
+            logger.debug("Using force_date: %s", reference_date)
         elif 'reference_date' in data:
             reference_date = datetime.strptime(data['reference_date'], '%Y-%m-%d').date()
-            print(f"Using reference_date: {reference_date}")
+            logger.debug("Using reference_date: %s", reference_date)
         else:
             today = timezone.now().date()
             reference_date = today.replace(day=1) - timedelta(days=1)
-            print(f"Using calculated reference_date: {reference_date}")
+            logger.debug("Using calculated reference_date: %s", reference_date)
 
-        print(f"Final reference date: {reference_date}")
+        logger.debug("Final reference date: %s", reference_date)
 
         # Generate CCR submission
-        print("Creating CCRFileGenerator...")
+        logger.debug("Creating CCRFileGenerator...")
         generator = CCRFileGenerator()
 
-        print("Calling generate_monthly_submission...")
-        file_content, record_count, summary = generator.generate_monthly_submission(
+        logger.debug("Calling write_monthly_submission...")
+        submission, summary = generator.write_monthly_submission(
             reference_date,
             force_test_mode=test_mode
         )
+        record_count = summary['total_records']
 
-        print(f"Generation completed!")
-        print(f"Record count: {record_count}")
-        print(f"File content length: {len(file_content) if file_content else 0}")
-        print(f"Summary: {summary}")
+        logger.debug("Generation completed!")
+        logger.debug("Record count: %s", record_count)
+        logger.debug("Stored file: %s", submission.file_path)
+        logger.debug("Summary: %s", summary)
 
-        if not file_content:
-            print("ERROR: No file content generated")
+        if not record_count:
+            logger.error("No file content generated")
             return Response({
                 'error': 'No data to generate - no qualifying loans found',
                 'summary': summary,
@@ -99,32 +107,27 @@ def generate_ccr_submission(request):
                 }
             }, status=400)
 
-        print("Preparing file response...")
-        # Prepare file for download
-        response = HttpResponse(
-            file_content.encode('utf-8'),
-            content_type='text/plain'
-        )
-
+        logger.debug("Preparing file response...")
         provider_code = os.getenv('CCR_PROVIDER_CODE') or getattr(settings, 'CCR_PROVIDER_CODE', 'UNKNOWN')
         timestamp_str = timezone.now().strftime('%Y%m%d%H%M%S')
         filename = f'{provider_code}_CSDF_{timestamp_str}.txt'
 
-        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        # Streamed from the storage backend block by block (through an async iterator under daphne), the file is
+        # never loaded whole
+        response = serve_file(request, default_storage, submission.file_path, filename=filename,
+                              content_type='text/plain')
         response['X-CCR-Record-Count'] = str(record_count)
+        response['X-CCR-Checksum'] = submission.content_checksum
         response['X-CCR-Reference-Date'] = reference_date.strftime('%Y-%m-%d')
         response['X-CCR-Test-Mode'] = str(test_mode)
         response['X-CCR-Summary'] = str(summary)
 
-        print(f"Returning response with filename: {filename}")
-        print("=== CCR SUBMISSION REQUEST COMPLETED SUCCESSFULLY ===")
+        logger.debug("Returning response with filename: %s", filename)
+        logger.debug("=== CCR SUBMISSION REQUEST COMPLETED SUCCESSFULLY ===")
         return response
 
     except Exception as e:
-        print(f"=== CCR SUBMISSION REQUEST FAILED ===")
-        print(f"Error in generate_ccr_submission: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("generate_ccr_submission failed")
         return Response({
             'error': str(e),
             'test_mode_hint': 'Try adding "test_mode": true to allow multiple submissions'
@@ -145,7 +148,7 @@ def generate_test_sequence(request):
         "return_files": true  // Optional: return file contents for inspection
     }
     """
-    print("=== GENERATE_TEST_SEQUENCE STARTED ===")
+    logger.debug("=== GENERATE_TEST_SEQUENCE STARTED ===")
     try:
         data = request.data
 
@@ -157,7 +160,7 @@ def generate_test_sequence(request):
         months = data.get('months', 3)
         return_files = data.get('return_files', False)
 
-        print(f"Start date: {start_date}, Months: {months}, Return files: {return_files}")
+        logger.debug("Start date: %s, Months: %s, Return files: %s", start_date, months, return_files)
 
         generator = CCRFileGenerator()
         results = []
@@ -166,7 +169,7 @@ def generate_test_sequence(request):
         current_date = start_date
         for i in range(months):
             try:
-                print(f"\n--- Generating month {i + 1}/{months} for date {current_date} ---")
+                logger.debug("--- Generating month %s/%s for date %s ---", i + 1, months, current_date)
 
                 file_content, record_count, summary = generator.generate_monthly_submission(
                     current_date,
@@ -189,19 +192,17 @@ def generate_test_sequence(request):
                         'content': file_content,
                         'size': len(file_content)
                     })
-                    print(f"Added file for month {i + 1}: {len(file_content)} characters")
+                    logger.debug("Added file for month %s: %s characters", i + 1, len(file_content))
 
                 results.append(month_result)
-                print(f"Month {i + 1} completed: {record_count} records")
+                logger.debug("Month %s completed: %s records", i + 1, record_count)
 
                 # Calculate next month end date properly
                 current_date = add_months(current_date, 1)
-                print(f"Next date will be: {current_date}")
+                logger.debug("Next date will be: %s", current_date)
 
             except Exception as e:
-                print(f"Error in month {i + 1}: {e}")
-                import traceback
-                traceback.print_exc()
+                logger.exception("Error in month %s: %s", i + 1, e)
                 results.append({
                     'month': i + 1,
                     'reference_date': current_date.isoformat(),
@@ -227,15 +228,12 @@ def generate_test_sequence(request):
                 'note': 'File contents included in response for inspection'
             }
 
-        print(f"\n=== GENERATE_TEST_SEQUENCE COMPLETED ===")
-        print(f"Processed {len(results)} months, {len(files)} files generated")
+        logger.debug("=== GENERATE_TEST_SEQUENCE COMPLETED ===")
+        logger.debug("Processed %s months, %s files generated", len(results), len(files))
         return Response(response_data)
 
     except Exception as e:
-        print(f"=== GENERATE_TEST_SEQUENCE FAILED ===")
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("generate_test_sequence failed")
         return Response({
             'error': str(e)
         }, status=500)
@@ -253,7 +251,7 @@ def simulate_loan_settlement(request):
         "settlement_date": "2025-01-15"
     }
     """
-    print("=== SIMULATE_LOAN_SETTLEMENT STARTED ===")
+    logger.debug("=== SIMULATE_LOAN_SETTLEMENT STARTED ===")
     try:
         data = request.data
         loan_id = data.get('loan_id')
@@ -265,7 +263,7 @@ def simulate_loan_settlement(request):
             return Response({'error': 'settlement_date is required'}, status=400)
 
         settlement_date = datetime.strptime(settlement_date_str, '%Y-%m-%d').date()
-        print(f"Simulating settlement of loan {loan_id} on {settlement_date}")
+        logger.debug("Simulating settlement of loan %s on %s", loan_id, settlement_date)
 
         # Import here to avoid circular imports
         from loanbook.models import Loan
@@ -287,7 +285,7 @@ def simulate_loan_settlement(request):
         loan.settled_date = settlement_date
         loan.save()
 
-        print(f"Loan {loan_id} marked as settled on {settlement_date}")
+        logger.debug("Loan %s marked as settled on %s", loan_id, settlement_date)
 
         return Response({
             'success': True,
@@ -298,10 +296,7 @@ def simulate_loan_settlement(request):
         })
 
     except Exception as e:
-        print(f"=== SIMULATE_LOAN_SETTLEMENT FAILED ===")
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("simulate_loan_settlement failed")
         return Response({
             'error': str(e)
         }, status=500)
@@ -312,28 +307,34 @@ def simulate_loan_settlement(request):
 def ccr_submission_preview(request):
     """
     Preview CCR submission data without generating file - includes settlement data
+
+    Query params: reference_date / test_date (YYYY-MM-DD), include_balances=true to value the sampled active
+    contracts.
     """
-    print("=== CCR_SUBMISSION_PREVIEW STARTED ===")
+    logger.debug("=== CCR_SUBMISSION_PREVIEW STARTED ===")
     try:
         reference_date_str = request.GET.get('reference_date')
         test_date_str = request.GET.get('test_date')  # For testing with custom dates
 
         if test_date_str:
             reference_date = datetime.strptime(test_date_str, '%Y-%m-%d').date()
-            print(f"Using test_date: {reference_date}")
+            logger.debug("Using test_date: %s", reference_date)
         elif reference_date_str:
             reference_date = datetime.strptime(reference_date_str, '%Y-%m-%d').date()
-            print(f"Using reference_date: {reference_date}")
+            logger.debug("Using reference_date: %s", reference_date)
         else:
             today = timezone.now().date()
             reference_date = today.replace(day=1) - timedelta(days=1)
-            print(f"Using calculated reference_date: {reference_date}")
+            logger.debug("Using calculated reference_date: %s", reference_date)
+
+        # Valuing contracts is expensive, the sampled active contracts only get balances on request
+        include_balances = request.GET.get('include_balances', 'false').lower() == 'true'
 
         generator = CCRFileGenerator()
-        preview_data = generator.get_submission_preview(reference_date)
+        preview_data = generator.get_submission_preview(reference_date, include_balances=include_balances)
 
-        print(f"Preview completed for {reference_date}")
-        print(f"Total records would be: {preview_data['total_records']}")
+        logger.debug("Preview completed for %s", reference_date)
+        logger.debug("Total records would be: %s", preview_data['total_records'])
 
         return Response({
             'success': True,
@@ -353,10 +354,7 @@ def ccr_submission_preview(request):
         })
 
     except Exception as e:
-        print(f"=== CCR_SUBMISSION_PREVIEW FAILED ===")
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("ccr_submission_preview failed")
         return Response({
             'error': str(e)
         }, status=500)
@@ -366,18 +364,17 @@ def ccr_submission_preview(request):
 @permission_classes([IsAuthenticated, IsStaff])
 def ccr_submission_history(request):
     """Get history of CCR submissions with test filtering and settlement tracking"""
-    print("=== CCR_SUBMISSION_HISTORY STARTED ===")
+    logger.debug("=== CCR_SUBMISSION_HISTORY STARTED ===")
 
     try:
         show_test = request.GET.get('show_test', 'true').lower() == 'true'
-        print(f"Show test submissions: {show_test}")
+        logger.debug("Show test submissions: %s", show_test)
 
         submissions_query = CCRSubmission.objects.all()
         if not show_test:
             submissions_query = submissions_query.filter(is_test_submission=False)
 
         submissions = submissions_query.order_by('-reference_date')[:20]
-        print(f"Found {submissions.count()} submissions")
 
         submission_data = []
         for submission in submissions:
@@ -420,17 +417,14 @@ def ccr_submission_history(request):
                 'breakdown': breakdown
             })
 
-        print("=== CCR_SUBMISSION_HISTORY COMPLETED ===")
+        logger.debug("=== CCR_SUBMISSION_HISTORY COMPLETED ===")
         return Response({
             'submissions': submission_data,
             'showing_test_submissions': show_test
         })
 
     except Exception as e:
-        print(f"=== CCR_SUBMISSION_HISTORY FAILED ===")
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("ccr_submission_history failed")
         return Response({
             'error': str(e)
         }, status=500)
@@ -440,12 +434,12 @@ def ccr_submission_history(request):
 @permission_classes([IsAuthenticated, IsStaff])
 def clear_test_submissions(request):
     """Clear all test submissions and related CCR contract records - useful for testing"""
-    print("=== CLEAR_TEST_SUBMISSIONS STARTED ===")
+    logger.debug("=== CLEAR_TEST_SUBMISSIONS STARTED ===")
     try:
         # Get test submissions
         test_submissions = CCRSubmission.objects.filter(is_test_submission=True)
         test_submission_count = test_submissions.count()
-        print(f"Found {test_submission_count} test submissions")
+        logger.debug("Found %s test submissions", test_submission_count)
 
         # Get CCR contract records that were created during test submissions
         # We'll identify these by finding records where first_reported_date matches test submission dates
@@ -455,7 +449,7 @@ def clear_test_submissions(request):
             first_reported_date__in=test_submission_dates
         )
         ccr_record_count = ccr_records_to_delete.count()
-        print(f"Found {ccr_record_count} CCR contract records linked to test submissions")
+        logger.debug("Found %s CCR contract records linked to test submissions", ccr_record_count)
 
         # Reset ccr_reported flag on applicants that were only reported in test submissions
         from loanbook.models import LoanBook
@@ -476,14 +470,14 @@ def clear_test_submissions(request):
                     if not non_test_records.exists():
                         applicants_to_reset.append(applicant)
             except Exception as e:
-                print(f"Error checking applicant for loanbook {loanbook.id}: {e}")
+                logger.error("Error checking applicant for loanbook %s: %s", loanbook.id, e)
                 continue
 
         # Delete in proper order
-        print(f"Deleting {ccr_record_count} CCR contract records...")
+        logger.debug("Deleting %s CCR contract records...", ccr_record_count)
         ccr_records_to_delete.delete()
 
-        print(f"Deleting {test_submission_count} test submissions...")
+        logger.debug("Deleting %s test submissions...", test_submission_count)
         test_submissions.delete()
 
         # Reset applicant flags
@@ -494,8 +488,8 @@ def clear_test_submissions(request):
             applicants_reset_count += 1
 
         message = f'Cleared {test_submission_count} test submissions, {ccr_record_count} CCR contract records, and reset {applicants_reset_count} applicant flags'
-        print(f"=== CLEAR_TEST_SUBMISSIONS COMPLETED ===")
-        print(message)
+        logger.debug("=== CLEAR_TEST_SUBMISSIONS COMPLETED ===")
+        logger.info("%s", message)
 
         return Response({
             'success': True,
@@ -506,10 +500,7 @@ def clear_test_submissions(request):
         })
 
     except Exception as e:
-        print(f"=== CLEAR_TEST_SUBMISSIONS FAILED ===")
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("clear_test_submissions failed")
         return Response({
             'error': str(e)
         }, status=500)
@@ -524,7 +515,7 @@ def download_submission_file(request):
     Download an existing submission file or regenerate if missing
     Handles both production and test data properly
     """
-    print("=== DOWNLOAD_SUBMISSION_FILE STARTED ===")
+    logger.debug("=== DOWNLOAD_SUBMISSION_FILE STARTED ===")
     try:
         submission_id = request.data.get('submission_id')
         if not submission_id:
@@ -535,54 +526,40 @@ def download_submission_file(request):
         except CCRSubmission.DoesNotExist:
             return Response({'error': 'Submission not found'}, status=404)
 
-        print(f"Attempting to download file for submission {submission_id} ({submission.reference_date})")
-        print(f"Submission is_test_submission: {submission.is_test_submission}")
-
-        # First, try to download existing file if it exists
-        if submission.file_path and os.path.exists(submission.file_path):
-            print(f"Found existing file at: {submission.file_path}")
-
-            try:
-                with open(submission.file_path, 'r', encoding='utf-8') as file:
-                    file_content = file.read()
-
-                # Extract filename from path or create a proper one
-                filename = os.path.basename(submission.file_path)
-                if not filename or filename == '':
-                    provider_code = os.getenv('CCR_PROVIDER_CODE') or getattr(settings, 'CCR_PROVIDER_CODE', 'UNKNOWN')
-                    filename = f'{provider_code}_CSDF_{submission.reference_date.strftime("%Y%m%d")}.txt'
-
-                # Return existing file
-                response = HttpResponse(
-                    file_content.encode('utf-8'),
-                    content_type='text/plain'
-                )
-
-                response['Content-Disposition'] = f'attachment; filename="{filename}"'
-                response['X-CCR-Record-Count'] = str(submission.total_records)
-                response['X-CCR-Reference-Date'] = submission.reference_date.strftime('%Y-%m-%d')
-                response['X-CCR-Test-Mode'] = str(submission.is_test_submission)
-                response['X-CCR-Filename'] = filename
-                response['X-CCR-Source'] = 'existing_file'
-
-                # Add CORS headers
-                response[
-                    'Access-Control-Expose-Headers'] = 'Content-Disposition, X-CCR-Record-Count, X-CCR-Reference-Date, X-CCR-Test-Mode, X-CCR-Filename, X-CCR-Source'
-
-                print(f"Successfully downloaded existing file: {filename}")
-                print("=== DOWNLOAD_SUBMISSION_FILE COMPLETED (EXISTING) ===")
-                return response
-
-            except Exception as file_error:
-                print(f"Error reading existing file: {file_error}")
-                # Fall through to regeneration
+        logger.debug("Attempting to download file for submission %s (%s)", submission_id, submission.reference_date)
+        logger.debug("Submission is_test_submission: %s", submission.is_test_submission)
+
+        # First, stream the stored file (or its gzip copy) if it exists
+        compressed = str(request.data.get('compressed', '')).lower() in ('1', 'true')
+        stored_name = submission.compressed_file_path if compressed else submission.file_path
+        if stored_name and default_storage.exists(stored_name):
+            logger.debug("Found existing file at: %s", stored_name)
+            filename = os.path.basename(stored_name)
+
+            # Streamed block by block like the generated file, never loaded whole
+            response = serve_file(request, default_storage, stored_name, filename=filename,
+                                  content_type='application/gzip' if compressed else 'text/plain')
+            response['X-CCR-Record-Count'] = str(submission.total_records)
+            response['X-CCR-Reference-Date'] = submission.reference_date.strftime('%Y-%m-%d')
+            response['X-CCR-Test-Mode'] = str(submission.is_test_submission)
+            response['X-CCR-Filename'] = filename
+            response['X-CCR-Source'] = 'existing_file'
+            response['X-CCR-Checksum'] = submission.content_checksum
+
+            # Add CORS headers
+            response[
+                'Access-Control-Expose-Headers'] = 'Content-Disposition, X-CCR-Record-Count, X-CCR-Reference-Date, X-CCR-Test-Mode, X-CCR-Filename, X-CCR-Source, X-CCR-Checksum'
+
+            logger.debug("Streaming existing file: %s", filename)
+            logger.debug("=== DOWNLOAD_SUBMISSION_FILE COMPLETED (EXISTING) ===")
+            return response
 
         # File not found, need to regenerate
-        print(f"File not found, regenerating for submission {submission_id}")
-        print(f"Submission was test mode: {submission.is_test_submission}")
+        logger.warning("File not found, regenerating for submission %s", submission_id)
+        logger.debug("Submission was test mode: %s", submission.is_test_submission)
 
         # Try regeneration using generator (works for both test and production)
-        print("=== TRYING GENERATOR REGENERATION ===")
+        logger.debug("=== TRYING GENERATOR REGENERATION ===")
         generator = CCRFileGenerator()
 
         try:
@@ -595,12 +572,14 @@ def download_submission_file(request):
             )
 
             if file_content and record_count > 0:
-                print(f"Successfully regenerated file content: {record_count} records")
+                logger.debug("Successfully regenerated file content: %s records", record_count)
+                # 'snapshot' when rendered from the data frozen at generation time, identical to the filed file
+                source = summary.get('source', 'regenerated')
 
                 # Create proper filename
                 provider_code = os.getenv('CCR_PROVIDER_CODE') or getattr(settings, 'CCR_PROVIDER_CODE', 'UNKNOWN')
                 timestamp_str = timezone.now().strftime('%Y%m%d%H%M%S')
-                filename = f'{provider_code}_CSDF_{timestamp_str}_regenerated.txt'
+                filename = f'{provider_code}_CSDF_{timestamp_str}_{source}.txt'
 
                 # Return regenerated file
                 response = HttpResponse(
@@ -613,25 +592,26 @@ def download_submission_file(request):
                 response['X-CCR-Reference-Date'] = submission.reference_date.strftime('%Y-%m-%d')
                 response['X-CCR-Test-Mode'] = str(force_test)
                 response['X-CCR-Filename'] = filename
-                response['X-CCR-Source'] = 'regenerated'
+                response['X-CCR-Source'] = source
+                if 'checksum' in summary:
+                    response['X-CCR-Checksum'] = summary['checksum']
+                    response['X-CCR-Checksum-Match'] = str(summary['checksum_matches'])
 
                 # Add CORS headers
                 response[
-                    'Access-Control-Expose-Headers'] = 'Content-Disposition, X-CCR-Record-Count, X-CCR-Reference-Date, X-CCR-Test-Mode, X-CCR-Filename, X-CCR-Source'
+                    'Access-Control-Expose-Headers'] = 'Content-Disposition, X-CCR-Record-Count, X-CCR-Reference-Date, X-CCR-Test-Mode, X-CCR-Filename, X-CCR-Source, X-CCR-Checksum, X-CCR-Checksum-Match'
 
-                print(f"File regenerated and downloaded: {filename}")
-                print("=== DOWNLOAD_SUBMISSION_FILE COMPLETED (REGENERATED) ===")
+                logger.debug("File regenerated and downloaded: %s", filename)
+                logger.debug("=== DOWNLOAD_SUBMISSION_FILE COMPLETED (REGENERATED) ===")
                 return response
             else:
-                print("Generator returned no content")
+                logger.debug("Generator returned no content")
 
         except Exception as generation_error:
-            print(f"Generator regeneration failed: {generation_error}")
-            import traceback
-            traceback.print_exc()
+            logger.exception("Generator regeneration failed: %s", generation_error)
 
         # Final fallback - create basic file from submission data
-        print("=== CREATING FALLBACK FILE ===")
+        logger.debug("=== CREATING FALLBACK FILE ===")
         provider_code = os.getenv('CCR_PROVIDER_CODE') or getattr(settings, 'CCR_PROVIDER_CODE', 'UNKNOWN')
 
         file_content = f"# CCR Submission File (Fallback)\n"
@@ -661,15 +641,12 @@ def download_submission_file(request):
         response[
             'Access-Control-Expose-Headers'] = 'Content-Disposition, X-CCR-Record-Count, X-CCR-Reference-Date, X-CCR-Test-Mode, X-CCR-Filename, X-CCR-Source'
 
-        print(f"Returning fallback file: {filename}")
-        print("=== DOWNLOAD_SUBMISSION_FILE COMPLETED (FALLBACK) ===")
+        logger.debug("Returning fallback file: %s", filename)
+        logger.debug("=== DOWNLOAD_SUBMISSION_FILE COMPLETED (FALLBACK) ===")
         return response
 
     except Exception as e:
-        print(f"=== DOWNLOAD_SUBMISSION_FILE FAILED ===")
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("download_submission_file failed")
         return Response({
             'error': str(e)
         }, status=500)
@@ -679,7 +656,7 @@ def download_submission_file(request):
 @permission_classes([IsAuthenticated, IsStaff])
 def update_submission_status(request):
     """Update the status of a CCR submission"""
-    print("=== UPDATE_SUBMISSION_STATUS STARTED ===")
+    logger.debug("=== UPDATE_SUBMISSION_STATUS STARTED ===")
     try:
         data = request.data
         submission_id = data.get('submission_id')
@@ -740,7 +717,7 @@ def update_submission_status(request):
 
         submission.save()
 
-        print(f"Status updated: {old_status} → {new_status} for submission {submission_id}")
+        logger.debug("Status updated: %s → %s for submission %s", old_status, new_status, submission_id)
 
         return Response({
             'success': True,
@@ -753,10 +730,7 @@ def update_submission_status(request):
         })
 
     except Exception as e:
-        print(f"=== UPDATE_SUBMISSION_STATUS FAILED ===")
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("update_submission_status failed")
         return Response({'error': str(e)}, status=500)
 
 
@@ -764,7 +738,7 @@ def update_submission_status(request):
 @permission_classes([IsAuthenticated, IsStaff])
 def add_error_record(request):
     """Add an error record for a submission"""
-    print("=== ADD_ERROR_RECORD STARTED ===")
+    logger.debug("=== ADD_ERROR_RECORD STARTED ===")
     try:
         data = request.data
         submission_id = data.get('submission_id')
@@ -791,7 +765,7 @@ def add_error_record(request):
             try:
                 contract_record = CCRContractRecord.objects.get(ccr_contract_id=contract_id)
             except CCRContractRecord.DoesNotExist:
-                print(f"Warning: Contract record {contract_id} not found")
+                logger.warning("Contract record %s not found", contract_id)
 
         # Create error record
         error_record = CCRErrorRecord.objects.create(
@@ -818,7 +792,7 @@ def add_error_record(request):
                 notes=f'Auto-updated due to error record: {error_description[:100]}'
             )
 
-        print(f"Error record created for submission {submission_id}: {error_type}")
+        logger.info("Error record created for submission %s: %s", submission_id, error_type)
 
         return Response({
             'success': True,
@@ -828,10 +802,7 @@ def add_error_record(request):
         })
 
     except Exception as e:
-        print(f"=== ADD_ERROR_RECORD FAILED ===")
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("add_error_record failed")
         return Response({'error': str(e)}, status=500)
 
 
@@ -839,7 +810,7 @@ def add_error_record(request):
 @permission_classes([IsAuthenticated, IsStaff])
 def resolve_error_record(request):
     """Resolve an error record"""
-    print("=== RESOLVE_ERROR_RECORD STARTED ===")
+    logger.debug("=== RESOLVE_ERROR_RECORD STARTED ===")
     try:
         data = request.data
         error_record_id = data.get('error_record_id')
@@ -874,9 +845,9 @@ def resolve_error_record(request):
             # Add to modification notes for next potential submission
             carry_forward_note = f"Error from {error_record.submission.reference_date}: {error_record.error_description}"
 
-            print(f"Error marked for carry forward to {next_month_date}")
+            logger.info("Error marked for carry forward to %s", next_month_date)
 
-        print(f"Error record {error_record_id} resolved as {resolution_status}")
+        logger.info("Error record %s resolved as %s", error_record_id, resolution_status)
 
         return Response({
             'success': True,
@@ -886,10 +857,7 @@ def resolve_error_record(request):
         })
 
     except Exception as e:
-        print(f"=== RESOLVE_ERROR_RECORD FAILED ===")
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("resolve_error_record failed")
         return Response({'error': str(e)}, status=500)
 
 
@@ -897,7 +865,7 @@ def resolve_error_record(request):
 @permission_classes([IsAuthenticated, IsStaff])
 def get_submission_details(request, submission_id):
     """Get detailed information about a submission including errors and status history"""
-    print(f"=== GET_SUBMISSION_DETAILS STARTED for {submission_id} ===")
+    logger.debug("=== GET_SUBMISSION_DETAILS STARTED for %s ===", submission_id)
     try:
         try:
             submission = CCRSubmission.objects.get(id=submission_id)
@@ -956,19 +924,17 @@ def get_submission_details(request, submission_id):
             'test_notes': submission.test_notes,
             'has_modifications': submission.has_modifications,
             'modification_notes': submission.modification_notes,
+            'content_checksum': submission.content_checksum,
             'error_records': error_data,
             'status_history': history_data,
             'error_statistics': error_stats
         }
 
-        print(f"Retrieved details for submission {submission_id}")
+        logger.debug("Retrieved details for submission %s", submission_id)
         return Response(submission_data)
 
     except Exception as e:
-        print(f"=== GET_SUBMISSION_DETAILS FAILED ===")
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("get_submission_details failed")
         return Response({'error': str(e)}, status=500)
 
 
@@ -976,7 +942,7 @@ def get_submission_details(request, submission_id):
 @permission_classes([IsAuthenticated, IsStaff])
 def upload_ccr_response(request):
     """Upload CCR response file and parse errors"""
-    print("=== UPLOAD_CCR_RESPONSE STARTED ===")
+    logger.debug("=== UPLOAD_CCR_RESPONSE STARTED ===")
     try:
         submission_id = request.data.get('submission_id')
         response_file = request.FILES.get('response_file')
@@ -996,69 +962,24 @@ def upload_ccr_response(request):
         submission.ccr_response_file = response_file
         submission.save()
 
-        # Parse the response file for errors (basic implementation)
-        response_content = response_file.read().decode('utf-8')
-        lines = response_content.split('\n')
-
-        errors_found = 0
-        for i, line in enumerate(lines):
-            line = line.strip()
-            if line.startswith('ERROR') or 'REJECT' in line.upper():
-                # Create error record
-                CCRErrorRecord.objects.create(
-                    submission=submission,
-                    error_type='VALIDATION',
-                    error_description=line,
-                    line_number=i + 1,
-                    original_line_content=line
-                )
-                errors_found += 1
-
-        # Update submission status based on findings
-        if errors_found > 0:
-            old_status = submission.status
-            if errors_found == submission.total_records:
-                submission.status = 'ERROR'
-            else:
-                submission.status = 'PARTIAL_ERROR'
-
-            submission.save()
-
-            CCRStatusHistory.objects.create(
-                submission=submission,
-                old_status=old_status,
-                new_status=submission.status,
-                changed_by=request.user,
-                notes=f'Auto-updated after parsing CCR response file: {errors_found} errors found'
-            )
-        else:
-            # No errors found, mark as acknowledged
-            old_status = submission.status
-            submission.status = 'ACKNOWLEDGED'
-            submission.save()
-
-            CCRStatusHistory.objects.create(
-                submission=submission,
-                old_status=old_status,
-                new_status='ACKNOWLEDGED',
-                changed_by=request.user,
-                notes='Auto-updated after parsing CCR response file: no errors found'
-            )
+        # Streamed line by line, errors are bulk inserted and linked to their contract records
+        parser = CCRResponseParser(submission)
+        parser.parse(response_file, changed_by=request.user)
+        errors_found = parser.errors_found
 
-        print(f"CCR response processed: {errors_found} errors found")
+        logger.debug("CCR response processed: %s errors found", errors_found)
 
         return Response({
             'success': True,
             'message': f'CCR response file processed',
             'errors_found': errors_found,
+            'errors_matched_to_contracts': parser.matched_errors,
+            'lines_read': parser.lines_read,
             'new_status': submission.status
         })
 
     except Exception as e:
-        print(f"=== UPLOAD_CCR_RESPONSE FAILED ===")
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("upload_ccr_response failed")
         return Response({'error': str(e)}, status=500)
 
 
@@ -1067,26 +988,21 @@ def upload_ccr_response(request):
 @permission_classes([IsAuthenticated, IsStaff])
 def ccr_submission_history_enhanced(request):
     """Get enhanced history of CCR submissions with accurate contract breakdowns."""
-    print("=== CCR_SUBMISSION_HISTORY_ENHANCED STARTED ===")
+    logger.debug("=== CCR_SUBMISSION_HISTORY_ENHANCED STARTED ===")
 
     try:
         show_test = request.GET.get('show_test', 'true').lower() == 'true'
-        print(f"Show test submissions: {show_test}")
+        logger.debug("Show test submissions: %s", show_test)
 
         submissions_query = CCRSubmission.objects.all()
         if not show_test:
             submissions_query = submissions_query.filter(is_test_submission=False)
 
         submissions = submissions_query.order_by('-reference_date')[:20]
-        print(f"Found {submissions.count()} submissions")
 
         submission_data = []
 
         for submission in submissions:
-            print("-----")
-            print(f"Processing submission ID: {submission.id}")
-            print(f"Reference Date: {submission.reference_date}")
-            print(f"Generated At: {submission.generated_at}")
 
             # Get CCRContractSubmission records linked to this submission
             contract_links = CCRContractSubmission.objects.filter(submission=submission)
@@ -1095,10 +1011,6 @@ def ccr_submission_history_enhanced(request):
             active_updates = contract_links.filter(submission_type='UPDATE').count()
             settlements = contract_links.filter(submission_type='SETTLEMENT').count()
 
-            print(f"Breakdown:")
-            print(f"- NEW: {new_contracts}")
-            print(f"- UPDATE: {active_updates}")
-            print(f"- SETTLEMENT: {settlements}")
 
             # Get error statistics
             error_records = CCRErrorRecord.objects.filter(submission=submission)
@@ -1106,7 +1018,9 @@ def ccr_submission_history_enhanced(request):
             pending_errors = error_records.filter(resolution_status='PENDING').count()
             resolved_errors = total_errors - pending_errors
 
-            print(f"Errors: Total={total_errors}, Pending={pending_errors}, Resolved={resolved_errors}")
+            logger.debug("Submission %s (%s): %s new, %s updates, %s settlements, %s errors (%s pending)",
+                         submission.id, submission.reference_date, new_contracts, active_updates, settlements,
+                         total_errors, pending_errors, extra=SAMPLED)
 
             breakdown = {
                 'new': new_contracts,
@@ -1137,15 +1051,12 @@ def ccr_submission_history_enhanced(request):
                 'error_statistics': error_stats,
             })
 
-        print("=== CCR_SUBMISSION_HISTORY_ENHANCED COMPLETED ===")
+        logger.debug("=== CCR_SUBMISSION_HISTORY_ENHANCED COMPLETED ===")
         return Response({
             'submissions': submission_data,
             'showing_test_submissions': show_test
         })
 
     except Exception as e:
-        print(f"=== CCR_SUBMISSION_HISTORY_ENHANCED FAILED ===")
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("ccr_submission_history_enhanced failed")
         return Response({'error': str(e)}, status=500)
@@ -1,6 +1,9 @@
+import logging
 from django.apps import AppConfig
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
 
 class CommunicationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
@@ -10,5 +13,5 @@ class CommunicationsConfig(AppConfig):
         # Only start the scheduler if not in test mode
         if not settings.TESTING:
             from .scheduler import start_scheduler
-            print("Starting the scheduler from ready method.")
+            logger.info("Starting the scheduler from ready method.")
             start_scheduler()
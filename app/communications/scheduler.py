@@ -1,8 +1,11 @@
+import logging
 import asyncio
 from apscheduler.schedulers.background import BackgroundScheduler
 
 from communications.utils import fetch_emails
 
+logger = logging.getLogger(__name__)
+
 
 def start_scheduler():
     scheduler = BackgroundScheduler()
@@ -14,4 +17,4 @@ def fetch_emails_sync():
     # Running the async function in a synchronous context
     asyncio.run(fetch_emails())
 
-    print("Scheduler started: Email fetch job will run every minute.")
+    logger.info("Scheduler started: Email fetch job will run every minute.")
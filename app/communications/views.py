@@ -1,4 +1,5 @@
 # communications/views.py
+import logging
 import os
 import uuid
 
@@ -12,14 +13,19 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter, OpenApiTypes
 from rest_framework.views import APIView
-from django.http import FileResponse, Http404
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.http import Http404
 
 from agents_loan.permissions import IsStaff
+from app.pagination import KeysetPaginationMixin
+from core.downloads import serve_file
 from core.models import EmailLog, Application, Solicitor, UserEmailLog, User
 from .serializers import SendEmailSerializerByApplicationId, EmailLogSerializer, SendEmailToRecipientsSerializer, \
     ReplyEmailSerializer, UpdateEmailLogApplicationSerializer, UpdateEmailLogSeenSerializer, ReplyUserEmailSerializer
 from .utils import send_email_f, fetch_emails
 
+logger = logging.getLogger(__name__)
+
 
 # Custom ViewSet with only the 'list' and 'send_email' actions
 @extend_schema_view(
@@ -176,7 +182,7 @@ from .utils import send_email_f, fetch_emails
     ),
 
 )
-class SendEmailViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+class SendEmailViewSet(KeysetPaginationMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
     """
     A ViewSet for sending emails and listing all email logs.
     """
@@ -395,11 +401,15 @@ class AttachmentDownloadView(APIView):
             if not file_path:
                 raise Http404("Attachment not found in this email log entry.")
 
-            # Serve the file using FileResponse
-            return FileResponse(open(file_path, 'rb'), as_attachment=True, filename=filename)
+            # Attachments saved from the mailbox live on the local disk, sent ones in the storage backend
+            if os.path.exists(file_path):
+                return serve_file(request, FileSystemStorage(location=os.path.dirname(file_path)), filename)
+            return serve_file(request, default_storage, f'email_attachments/{filename}')
 
         except (EmailLog.DoesNotExist, UserEmailLog.DoesNotExist):
             return Response({"error": "Email log entry not found."}, status=status.HTTP_404_NOT_FOUND)
+        except Http404 as e:
+            return Response({"error": str(e)}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
@@ -451,7 +461,7 @@ class DeleteAttachmentView(APIView):
             # Validate the file path and delete the file if it exists
             if os.path.exists(file_path) and os.path.isfile(file_path):
                 os.remove(file_path)
-                print(f"Attachment {filename} deleted from {file_path}.")
+                logger.debug("Attachment %s deleted from %s.", filename, file_path)
             else:
                 raise Http404("Attachment file not found on server.")
 
@@ -24,7 +24,15 @@ def is_valid_file_size(file):
     Checks if the file size is within allowed limits.
     Returns True if valid, False otherwise.
     """
-    file_extension = f".{file.name.lower().split('.')[-1]}"
+    return is_valid_upload_size(file.name, file.size)
+
+
+def is_valid_upload_size(filename, size):
+    """
+    Same check as is_valid_file_size, for uploads that are announced by name and size before
+    any content is received (chunked uploads).
+    """
+    file_extension = f".{filename.lower().split('.')[-1]}"
 
     # Ensure the file extension is allowed
     if file_extension not in ALLOWED_FILE_EXTENSIONS:
@@ -40,4 +48,4 @@ def is_valid_file_size(file):
     else:
         max_size = DEFAULT_MAX_SIZE  # Fallback for unknown file types
 
-    return file.size <= max_size  # ✅ Return True if within size limit, False otherwise
+    return size <= max_size  # ✅ Return True if within size limit, False otherwise
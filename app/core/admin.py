@@ -1623,6 +1623,34 @@ class LoanBookAdmin(admin.ModelAdmin):
     search_fields = ('loan__id',)  # Search by the related Loan's ID
 
 
+@admin.register(models.EstateTotals)
+class EstateTotalsAdmin(admin.ModelAdmin):
+    """Read only, the totals follow the estate items and are repaired with reconcile_estate_totals"""
+    list_display = ('application', 'total_assets', 'total_debts', 'net_value', 'updated_at')
+    readonly_fields = ('application', 'total_assets', 'total_debts', 'net_value', 'breakdown', 'updated_at')
+    search_fields = ('application__id',)
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(models.LoanLedgerEntry)
+class LoanLedgerEntryAdmin(admin.ModelAdmin):
+    """Read only, the ledger is appended by core.loan_ledger and rebuilt with rebuild_loan_ledger"""
+    list_display = ('loan', 'sequence', 'entry_type', 'effective_at', 'principal_change', 'fee_change',
+                    'principal_balance', 'fee_balance')
+    list_filter = ('entry_type',)
+    readonly_fields = ('loan', 'sequence', 'entry_type', 'effective_at', 'principal_change', 'fee_change',
+                       'principal_balance', 'fee_balance', 'payment', 'extension', 'created_at')
+    search_fields = ('loan__id',)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
 @admin.register(EmailCommunication)
 class EmailCommunicationAdmin(admin.ModelAdmin):
     list_display = [
@@ -0,0 +1,128 @@
+# core/applicant_search.py
+
+import logging
+import re
+import unicodedata
+
+from django.conf import settings
+from django.contrib.postgres.fields import ArrayField
+from django.contrib.postgres.search import TrigramWordSimilarity
+from django.db import connection
+from django.db.models import Case, F, FloatField, Func, IntegerField, Max, Q, Value, When
+
+from core.pps import pps_search_q
+
+logger = logging.getLogger(__name__)
+
+# Applicant columns copied into the search document, in this order
+DOCUMENT_FIELDS = [
+    'first_name', 'last_name', 'email', 'phone_number',
+    'address_line_1', 'address_line_2', 'city', 'county', 'postal_code',
+]
+
+_trigram_available = {}
+
+
+def normalize_search_text(value):
+    """Lower case, accents removed and whitespace collapsed, used for both the document and the search term"""
+    value = unicodedata.normalize('NFKD', str(value or ''))
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return re.sub(r'\s+', ' ', value).strip().lower()
+
+
+def normalize_phone(value):
+    """Phone numbers are indexed as digits only, so '087 123 4567' and '0871234567' match"""
+    return re.sub(r'\D', '', value or '')
+
+
+def build_search_document(applicant):
+    """Text searched for an applicant, stored in Applicant.search_document"""
+    parts = []
+    for field in DOCUMENT_FIELDS:
+        value = getattr(applicant, field, '')
+        parts.append(normalize_phone(value) if field == 'phone_number' else normalize_search_text(value))
+    return ' '.join(part for part in parts if part)
+
+
+def trigram_available():
+    """True when the pg_trgm extension is installed, checked once per process and database"""
+    alias = connection.alias
+    if alias not in _trigram_available:
+        available = False
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+                available = cursor.fetchone() is not None
+        if not available:
+            logger.warning("pg_trgm is not installed, applicant search falls back to substring matching")
+        _trigram_available[alias] = available
+    return _trigram_available[alias]
+
+
+def search_term_variants(term):
+    term = normalize_search_text(term)
+    phone = normalize_phone(term)
+    # A term made of digits and phone punctuation only is matched against the digits-only phone number
+    if phone and re.fullmatch(r'[\d\s()+-]+', term):
+        return phone
+    return term
+
+
+def search_application_ids(term, limit=None, scope=None):
+    """IDs of the applications whose applicants match ``term``, best match first.
+
+    ``scope`` (a queryset of application IDs, e.g. the applications of a solicitor) restricts the search before the
+    ``limit`` best matches are taken, so matches outside of it cannot push the caller's own ones out.
+
+    Uses the trigram GIN index on Applicant.search_document when pg_trgm is installed, ranking by word
+    similarity. An exact PPS number always ranks first. Without pg_trgm only substring matches are returned,
+    newest application first.
+    """
+    limit = limit or getattr(settings, 'APPLICANT_SEARCH_LIMIT', 500)
+    document_term = search_term_variants(term)
+    if not document_term:
+        return []
+
+    from core.models import Applicant
+
+    pps_match = pps_search_q(term)
+    matches = Q(search_document__contains=document_term) | pps_match
+    applicants = Applicant.objects.all() if scope is None else Applicant.objects.filter(application_id__in=scope)
+
+    if not trigram_available():
+        application_ids = applicants.filter(matches).values_list('application_id', flat=True)
+        return list(application_ids.distinct().order_by('-application_id')[:limit])
+
+    if len(document_term) >= 3:
+        # Trigrams need at least three characters to say anything useful
+        matches |= Q(search_document__trigram_word_similar=document_term)
+
+    similarity = TrigramWordSimilarity(document_term, 'search_document')
+    if pps_match:
+        similarity = Case(When(pps_match, then=Value(2.0)), default=similarity, output_field=FloatField())
+
+    ranked = (
+        applicants.filter(matches)
+        .values('application_id')
+        .annotate(rank=Max(similarity))
+        .order_by('-rank', '-application_id')
+    )
+    return [row['application_id'] for row in ranked[:limit]]
+
+
+def search_applications(queryset, term, field='id'):
+    """Restrict ``queryset`` to the applications matching ``term``, ordered by rank.
+
+    ``field`` is the path from the queryset model to the application ID, e.g. 'application_id' for loans. The
+    search only ranks the applications of ``queryset``.
+    """
+    application_ids = search_application_ids(term, scope=queryset.order_by().values(field))
+    if not application_ids:
+        return queryset.none()
+
+    # Keep the ranking of the search, a single array lookup per row instead of a CASE with one branch per ID
+    ordering = Func(
+        Value(application_ids, output_field=ArrayField(IntegerField())), F(field),
+        function='array_position', output_field=IntegerField(),
+    )
+    return queryset.filter(**{f'{field}__in': application_ids}).order_by(ordering)
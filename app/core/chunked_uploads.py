@@ -0,0 +1,198 @@
+# core/chunked_uploads.py
+
+import base64
+import hashlib
+import logging
+import mimetypes
+import os
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage, default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import ChunkedUpload
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkedUploadError(Exception):
+    """Raised when a chunk or an upload session is rejected"""
+
+
+class LocalChunkStore:
+    """Writes chunks straight into a staging file under MEDIA_ROOT, moved into place on completion"""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def staging_path(self, upload):
+        return self.storage.path(os.path.join('chunked_uploads', f'{upload.id}.part'))
+
+    def write_chunk(self, upload, index, data):
+        path = self.staging_path(upload)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        # Chunks have a fixed size, so each one lands at its own offset whatever order they arrive in. The file is
+        # created if needed but never truncated, chunks written in parallel cannot wipe each other out
+        with os.fdopen(os.open(path, os.O_RDWR | os.O_CREAT), 'r+b') as staging_file:
+            staging_file.seek(index * upload.chunk_size)
+            staging_file.write(data)
+
+    def reserve_name(self, upload):
+        return self.storage.get_available_name(upload.storage_name)
+
+    def commit(self, upload, name):
+        destination = self.storage.path(name)
+        os.makedirs(os.path.dirname(destination), exist_ok=True)
+        os.replace(self.staging_path(upload), destination)
+
+    def abort(self, upload):
+        path = self.staging_path(upload)
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class AzureChunkStore:
+    """Stages every chunk as a block of the final blob, the block list is committed on completion"""
+
+    def __init__(self, storage):
+        self.storage = storage
+
+    def get_blob_client(self, upload):
+        return self.storage.client.get_blob_client(self.storage._get_valid_path(upload.storage_name))
+
+    @staticmethod
+    def block_id(index):
+        return base64.b64encode(f'{index:08d}'.encode()).decode()
+
+    def write_chunk(self, upload, index, data):
+        self.get_blob_client(upload).stage_block(self.block_id(index), data, length=len(data))
+
+    def reserve_name(self, upload):
+        return upload.storage_name
+
+    def commit(self, upload, name):
+        from azure.storage.blob import BlobBlock, ContentSettings
+
+        content_type = mimetypes.guess_type(upload.filename)[0] or 'application/octet-stream'
+        self.get_blob_client(upload).commit_block_list(
+            [BlobBlock(block_id=self.block_id(index)) for index in range(upload.total_chunks)],
+            content_settings=ContentSettings(content_type=content_type),
+        )
+
+    def abort(self, upload):
+        # Uncommitted blocks are garbage collected by Azure, there is nothing to delete
+        pass
+
+
+def get_chunk_store(storage=None):
+    storage = storage or default_storage
+    if isinstance(storage, FileSystemStorage):
+        return LocalChunkStore(storage)
+    return AzureChunkStore(storage)
+
+
+def start_upload(application, user, target, filename, total_size, storage_name, metadata=None):
+    """Open an upload session, nothing is written to the storage backend yet"""
+    if total_size <= 0:
+        raise ChunkedUploadError("total_size must be a positive number of bytes.")
+
+    return ChunkedUpload.objects.create(
+        application=application,
+        created_by=user,
+        target=target,
+        filename=filename,
+        storage_name=default_storage.get_available_name(storage_name),
+        total_size=total_size,
+        chunk_size=getattr(settings, 'CHUNKED_UPLOAD_CHUNK_SIZE', 4 * 1024 * 1024),
+        metadata=metadata or {},
+    )
+
+
+def check_pending(upload):
+    if upload.status != ChunkedUpload.STATUS_PENDING:
+        raise ChunkedUploadError(f"Upload is already {upload.status}.")
+    if upload.is_expired():
+        raise ChunkedUploadError("Upload has expired, please start a new one.")
+
+
+def receive_chunk(upload, index, data, checksum):
+    """Verify one chunk against its SHA-256 checksum and stream it into the storage backend.
+
+    Sending a chunk again replaces it, which is what a client does when it resumes after a dropped connection.
+    """
+    check_pending(upload)
+
+    if not 0 <= index < upload.total_chunks:
+        raise ChunkedUploadError(f"Chunk index must be between 0 and {upload.total_chunks - 1}.")
+    if len(data) != upload.expected_chunk_size(index):
+        raise ChunkedUploadError(
+            f"Chunk {index} must be {upload.expected_chunk_size(index)} bytes, received {len(data)}."
+        )
+
+    digest = hashlib.sha256(data).hexdigest()
+    if not checksum or digest != checksum.strip().lower():
+        raise ChunkedUploadError(f"Checksum mismatch for chunk {index}.")
+
+    get_chunk_store().write_chunk(upload, index, data)
+
+    # Chunks may be sent in parallel, record them under a row lock so none is lost
+    with transaction.atomic():
+        upload = ChunkedUpload.objects.select_for_update().get(pk=upload.pk)
+        upload.received_chunks[str(index)] = digest
+        upload.save(update_fields=['received_chunks', 'updated_at'])
+    return upload
+
+
+def finish_upload(upload, create_record):
+    """Create the database row through ``create_record(storage_name)`` and commit the stored chunks under that name.
+
+    The row is only created once every chunk has been received, and before the chunks are committed: when creating
+    it fails the staged chunks are left as they are and ``/complete/`` can be retried. Returns the created object.
+    """
+    with transaction.atomic():
+        upload = ChunkedUpload.objects.select_for_update().get(pk=upload.pk)
+        check_pending(upload)
+
+        missing = upload.missing_chunks
+        if missing:
+            raise ChunkedUploadError(f"Upload is incomplete, missing chunks: {missing}.")
+
+        store = get_chunk_store()
+        storage_name = store.reserve_name(upload)
+        instance = create_record(storage_name)
+        store.commit(upload, storage_name)
+
+        upload.storage_name = storage_name
+        upload.status = ChunkedUpload.STATUS_COMPLETED
+        upload.object_id = instance.pk
+        upload.completed_at = timezone.now()
+        upload.save(update_fields=['storage_name', 'status', 'object_id', 'completed_at', 'updated_at'])
+
+    logger.info(f"Chunked upload {upload.id} completed as {upload.target} {instance.pk}")
+    return instance
+
+
+def abort_upload(upload):
+    check_pending(upload)
+    get_chunk_store().abort(upload)
+    upload.status = ChunkedUpload.STATUS_ABORTED
+    upload.save(update_fields=['status', 'updated_at'])
+
+
+def cleanup_expired_uploads():
+    """Abort pending uploads that can no longer be resumed and drop their staged chunks"""
+    expiry_hours = getattr(settings, 'CHUNKED_UPLOAD_EXPIRY_HOURS', 24)
+    expired = ChunkedUpload.objects.filter(
+        status=ChunkedUpload.STATUS_PENDING,
+        created_at__lt=timezone.now() - timedelta(hours=expiry_hours),
+    )
+    count = 0
+    for upload in expired:
+        get_chunk_store().abort(upload)
+        upload.status = ChunkedUpload.STATUS_ABORTED
+        upload.save(update_fields=['status', 'updated_at'])
+        count += 1
+    return count
@@ -0,0 +1,67 @@
+# core/detail_cache.py
+
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+from django.utils.http import parse_etags, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from core.loan_summaries import get_summaries_version
+from core.models import ApplicationVersion
+
+# Headers the estate_summary link depends on besides the host
+FORWARDED_HEADERS = ('X-Forwarded-Proto', 'X-Forwarded-Ssl', 'X-Scheme')
+
+
+def get_application_version(application_id):
+    version = ApplicationVersion.objects.filter(application_id=application_id).values_list(
+        'version', flat=True).first()
+    if version is None:
+        version = ApplicationVersion.objects.get_or_create(application_id=application_id)[0].version
+    return version
+
+
+def bump_application_versions(**lookup):
+    """Invalidate the cached detail responses of the applications matching ``lookup``, e.g. application__loan=1"""
+    ApplicationVersion.objects.filter(**lookup).update(version=F('version') + 1)
+
+
+def detail_cache_key(request, application, serializer_class):
+    """Cache key of a detail response, also used as its ETag.
+
+    Besides the version, the response depends on the committee members and checklist configuration shown in the
+    loan's committee status (the loan summaries version), the serializer, the application's country (currency), the
+    day (loan balances and maturity) and the origin the estate_summary link is built from.
+    """
+    parts = [
+        str(application.pk),
+        str(get_application_version(application.pk)),
+        str(get_summaries_version()),
+        serializer_class.__name__,
+        application.country or '',
+        timezone.localdate().isoformat(),
+        request.build_absolute_uri('/'),
+        *(request.headers.get(header, '') for header in FORWARDED_HEADERS),
+    ]
+    return hashlib.sha256('|'.join(parts).encode()).hexdigest()
+
+
+def cached_detail_response(request, application, serializer_class, context):
+    """Detail response of an application, serialized once per version and answered with 304 when unchanged"""
+    key = detail_cache_key(request, application, serializer_class)
+    etag = quote_etag(key)
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and etag in parse_etags(if_none_match):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+    cache_key = f'application_detail:{key}'
+    data = cache.get(cache_key)
+    if data is None:
+        data = dict(serializer_class(application, context=context).data)
+        cache.set(cache_key, data, timeout=getattr(settings, 'APPLICATION_DETAIL_CACHE_SECONDS', 300))
+    return Response(data, headers={'ETag': etag})
@@ -0,0 +1,212 @@
+# core/downloads.py
+
+import hashlib
+import logging
+import os
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseNotModified, HttpResponseRedirect
+from django.utils.http import content_disposition_header, http_date, parse_etags, quote_etag
+
+logger = logging.getLogger(__name__)
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeNotSatisfiable(Exception):
+    """Raised when the requested byte range lies outside of the file"""
+
+
+async def aread_blocks(stream, block_size):
+    """Blocks of a file-like ``stream``, each read in a worker thread so the event loop never waits on storage I/O"""
+    read = sync_to_async(stream.read, thread_sensitive=False)
+    try:
+        while True:
+            block = await read(block_size)
+            if not block:
+                break
+            yield block
+    finally:
+        stream.close()
+
+
+class StorageFileResponse(FileResponse):
+    """FileResponse reading the storage stream in 64KB blocks instead of 4KB.
+
+    With ``asynchronous`` the blocks are read by an async iterator: under ASGI StreamingHttpResponse reads a
+    synchronous iterator to the end (sync_to_async(list)) before sending anything, an asynchronous one is sent block
+    by block. Under WSGI the synchronous iterator is already sent as it is read.
+    """
+    block_size = 64 * 1024
+
+    def __init__(self, *args, asynchronous=False, **kwargs):
+        super().__init__(*args, **kwargs)
+        if asynchronous and self.file_to_stream is not None:
+            # The headers are set from the file above, only the iteration changes
+            self.streaming_content = aread_blocks(self.file_to_stream, self.block_size)
+
+
+def is_asgi_request(request):
+    """Whether ``request`` (a Django or DRF request) is served by the ASGI handler (daphne)"""
+    return isinstance(getattr(request, '_request', request), ASGIRequest)
+
+
+class LimitedReader:
+    """File-like wrapper that stops after ``length`` bytes, used to serve a byte range"""
+
+    def __init__(self, stream, length):
+        self.stream = stream
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.stream.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        if hasattr(self.stream, 'close'):
+            self.stream.close()
+
+
+def is_azure_storage(storage):
+    return hasattr(storage, 'client') and hasattr(storage, '_get_valid_path')
+
+
+def stat_file(storage, name):
+    """Return (size, modified datetime, etag) of a stored file in a single backend call"""
+    if is_azure_storage(storage):
+        from azure.core.exceptions import ResourceNotFoundError
+
+        try:
+            properties = storage.client.get_blob_client(storage._get_valid_path(name)).get_blob_properties()
+        except ResourceNotFoundError:
+            raise Http404("File not found.")
+        return properties.size, properties.last_modified, properties.etag.strip('"')
+
+    try:
+        path = storage.path(name)
+        file_stat = os.stat(path)
+    except (FileNotFoundError, NotImplementedError):
+        if not storage.exists(name):
+            raise Http404("File not found.")
+        return storage.size(name), storage.get_modified_time(name), hashlib.md5(name.encode()).hexdigest()
+
+    etag = hashlib.md5(f'{name}:{file_stat.st_size}:{file_stat.st_mtime_ns}'.encode()).hexdigest()
+    return file_stat.st_size, file_stat.st_mtime, etag
+
+
+def open_range(storage, name, start, length):
+    """Open a stream positioned at ``start``. Azure blobs are downloaded in chunks for the range only."""
+    if is_azure_storage(storage):
+        blob_client = storage.client.get_blob_client(storage._get_valid_path(name))
+        return LimitedReader(blob_client.download_blob(offset=start, length=length), length)
+
+    stream = storage.open(name, 'rb')
+    stream.seek(start)
+    return LimitedReader(stream, length)
+
+
+def parse_range(header, size):
+    """Parse a single ``bytes=`` range into inclusive (start, end). Returns None to serve the whole file."""
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ('', ''):
+        # Malformed or multi-part ranges are ignored and the whole file is sent, as allowed by RFC 9110
+        return None
+
+    first, last = match.groups()
+    if not first:
+        suffix_length = int(last)
+        if suffix_length == 0:
+            raise RangeNotSatisfiable()
+        return max(0, size - suffix_length), size - 1
+
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+def get_signed_url(storage, name, filename, as_attachment):
+    """Short-lived SAS URL for the blob, or None when the storage cannot sign URLs"""
+    if not is_azure_storage(storage):
+        return None
+    try:
+        return storage.url(
+            name,
+            expire=getattr(settings, 'DOWNLOAD_SAS_EXPIRY_SECONDS', 300),
+            parameters={'content_disposition': content_disposition_header(as_attachment, filename)},
+        )
+    except Exception as e:
+        logger.warning(f"Could not sign download URL for {name}, streaming it instead: {e}")
+        return None
+
+
+def serve_file(request, storage, name, filename=None, as_attachment=True, content_type=None):
+    """Stream a stored file, honouring Range, If-Range and If-None-Match.
+
+    Only one block of the file is held in memory at a time: under ASGI (daphne) the response iterates
+    asynchronously, each block read in a worker thread, under WSGI (runserver, the test client) synchronously.
+
+    When DOWNLOAD_SAS_REDIRECT is enabled and the file lives in Azure, the client is redirected to a
+    short-lived signed URL instead, so the bytes never pass through our workers.
+    """
+    filename = filename or os.path.basename(name)
+
+    if getattr(settings, 'DOWNLOAD_SAS_REDIRECT', False):
+        signed_url = get_signed_url(storage, name, filename, as_attachment)
+        if signed_url:
+            return HttpResponseRedirect(signed_url)
+
+    size, modified, etag = stat_file(storage, name)
+    etag = quote_etag(etag)
+    last_modified = http_date(modified if isinstance(modified, (int, float)) else modified.timestamp())
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and (etag in parse_etags(if_none_match) or if_none_match.strip() == '*'):
+        response = HttpResponseNotModified()
+        response['ETag'] = etag
+        return response
+
+    byte_range = None
+    range_header = request.headers.get('Range')
+    if range_header and size and request.headers.get('If-Range', etag) == etag:
+        try:
+            byte_range = parse_range(range_header, size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+
+    start, end = byte_range or (0, size - 1)
+    length = end - start + 1 if size else 0
+
+    response = StorageFileResponse(
+        open_range(storage, name, start, length), as_attachment=as_attachment, filename=filename,
+        content_type=content_type, asynchronous=is_asgi_request(request),
+    )
+    # The ranged stream has no size of its own, the headers are set from the stat above
+    response['Content-Length'] = length
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = last_modified
+
+    if byte_range:
+        response.status_code = 206
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    return response
+
+
+def serve_field_file(request, field_file, filename=None, as_attachment=True, content_type=None):
+    """serve_file for a model FileField value"""
+    if not field_file:
+        raise Http404("File not found.")
+    return serve_file(request, field_file.storage, field_file.name, filename=filename,
+                      as_attachment=as_attachment, content_type=content_type)
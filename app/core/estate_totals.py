@@ -0,0 +1,115 @@
+# core/estate_totals.py
+
+from collections import defaultdict
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import DecimalField, Q, Sum, Value
+from django.db.models.functions import Coalesce
+
+from core.models import Application, EstateTotals
+
+# Reverse relations of Application holding estate items, each item is an asset or a debt according to is_asset
+ESTATE_RELATIONS = [
+    'real_and_leasehold',
+    'household_contents',
+    'cars_boats',
+    'business_farming',
+    'business_other',
+    'unpaid_purchase_money',
+    'financial_assets',
+    'life_insurance',
+    'debts_owing',
+    'securities_quoted',
+    'securities_unquoted',
+    'other_property',
+    'irish_debts',
+]
+
+ZERO = Decimal('0.00')
+
+
+def estate_models():
+    """Estate item model of each relation"""
+    return {relation: Application._meta.get_field(relation).related_model for relation in ESTATE_RELATIONS}
+
+
+def _category_sums():
+    return {
+        'assets': Sum('value', filter=Q(is_asset=True)),
+        'debts': Sum('value', filter=Q(is_asset=False)),
+    }
+
+
+def _category(sums):
+    """Breakdown entry of a category, None when it has no valued items"""
+    if sums['assets'] is None and sums['debts'] is None:
+        return None
+    return {'assets': str(sums['assets'] or ZERO), 'debts': str(sums['debts'] or ZERO)}
+
+
+def summarize_breakdown(breakdown):
+    """EstateTotals field values for a breakdown of {relation: {'assets': str, 'debts': str}}"""
+    total_assets = sum((Decimal(category['assets']) for category in breakdown.values()), ZERO)
+    total_debts = sum((Decimal(category['debts']) for category in breakdown.values()), ZERO)
+    return {
+        'breakdown': breakdown,
+        'total_assets': total_assets,
+        'total_debts': total_debts,
+        'net_value': total_assets - total_debts,
+    }
+
+
+def collect_breakdowns(application_ids=None):
+    """Breakdown of every application (or of ``application_ids``), one grouped query per estate model.
+
+    Applications without valued estate items are left out.
+    """
+    breakdowns = defaultdict(dict)
+    for relation, model in estate_models().items():
+        queryset = model.objects.all()
+        if application_ids is not None:
+            queryset = queryset.filter(application_id__in=application_ids)
+        for row in queryset.values('application_id').order_by().annotate(**_category_sums()):
+            category = _category(row)
+            if category is not None:
+                breakdowns[row['application_id']][relation] = category
+    return breakdowns
+
+
+@transaction.atomic
+def refresh_estate_category(application_id, relation):
+    """Recompute a single category of an application's totals after one of its items was written or deleted.
+
+    The totals row is locked so concurrent writes to the same estate are applied one after the other.
+    """
+    totals, _ = EstateTotals.objects.select_for_update().get_or_create(application_id=application_id)
+    sums = estate_models()[relation].objects.filter(application_id=application_id).aggregate(**_category_sums())
+
+    breakdown = dict(totals.breakdown)
+    category = _category(sums)
+    if category is None:
+        breakdown.pop(relation, None)
+    else:
+        breakdown[relation] = category
+
+    for field, value in summarize_breakdown(breakdown).items():
+        setattr(totals, field, value)
+    totals.save()
+    return totals
+
+
+@transaction.atomic
+def rebuild_estate_totals(application_id):
+    """Recompute every category of an application's totals"""
+    breakdown = collect_breakdowns(application_ids=[application_id]).get(application_id, {})
+    totals, _ = EstateTotals.objects.update_or_create(application_id=application_id,
+                                                      defaults=summarize_breakdown(breakdown))
+    return totals
+
+
+def with_estate_value(queryset):
+    """Annotate ``estate_value`` (net estate value, 0 without estate items) on an Application queryset"""
+    return queryset.annotate(estate_value=Coalesce(
+        'estate_totals__net_value', Value(ZERO), output_field=DecimalField(max_digits=14, decimal_places=2)
+    ))
@@ -0,0 +1,244 @@
+# core/loan_ledger.py
+
+import datetime
+import logging
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Count, Min, Q, Sum
+from django.utils import timezone
+
+from core.models import Loan, LoanLedgerEntry
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0.00')
+
+# Fields the ledger follows, a save limited to other fields leaves the ledger alone
+LEDGER_LOAN_FIELDS = {'amount_agreed', 'fee_agreed', 'is_paid_out', 'paid_out_date', 'is_settled', 'settled_date'}
+LEDGER_PAYMENT_FIELDS = {'amount', 'transaction_date'}
+LEDGER_EXTENSION_FIELDS = {'extension_fee', 'created_date'}
+
+_NOT_LOADED = object()
+
+
+def as_amount(value):
+    """Amount of a model field as saved, whatever was assigned to it (int, float, str or Decimal)"""
+    return Decimal(str(value)).quantize(ZERO)
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+# When each kind of entry takes effect, the same for the entries written as records change and for a replayed ledger
+def opened_at(loan):
+    return start_of_day(loan.approved_date) if loan.approved_date else timezone.now()
+
+
+def paid_out_at(loan):
+    return start_of_day(loan.paid_out_date) if loan.paid_out_date else timezone.now()
+
+
+def settled_at(loan):
+    return start_of_day(loan.settled_date) if loan.settled_date else timezone.now()
+
+
+def _lock_ledger(loan_id):
+    """Lock the loan row, so the entries of a loan are appended one after the other, and return its last entry"""
+    list(Loan.objects.select_for_update().filter(pk=loan_id).values_list('pk', flat=True))
+    return LoanLedgerEntry.objects.filter(loan_id=loan_id).order_by('-sequence').first()
+
+
+def _append(loan_id, latest, entry_type, effective_at, principal_change=ZERO, fee_change=ZERO, **sources):
+    """Write the entry following ``latest`` (None for the first one), with the balances after the change"""
+    return LoanLedgerEntry.objects.create(
+        loan_id=loan_id,
+        sequence=latest.sequence + 1 if latest else 1,
+        entry_type=entry_type,
+        effective_at=effective_at,
+        principal_change=principal_change,
+        fee_change=fee_change,
+        principal_balance=(latest.principal_balance if latest else ZERO) + principal_change,
+        fee_balance=(latest.fee_balance if latest else ZERO) + fee_change,
+        **sources,
+    )
+
+
+@transaction.atomic
+def record_loan(loan):
+    """
+    Append the entries for what changed on ``loan`` since its ledger was last written: an agreement entry for the
+    opening or a change of the agreed amount or fee (effective with the opening), and a marker entry when it was
+    paid out or settled (or no longer is). Called by Loan.save, inside its transaction.
+    """
+    latest = _lock_ledger(loan.pk)
+    state = LoanLedgerEntry.objects.filter(loan_id=loan.pk).aggregate(
+        opened_at=Min('effective_at', filter=Q(entry_type=LoanLedgerEntry.TYPE_AGREEMENT)),
+        principal_agreed=Sum('principal_change', filter=Q(entry_type=LoanLedgerEntry.TYPE_AGREEMENT)),
+        fee_agreed=Sum('fee_change', filter=Q(entry_type=LoanLedgerEntry.TYPE_AGREEMENT)),
+        payouts=Count('pk', filter=Q(entry_type=LoanLedgerEntry.TYPE_PAID_OUT)),
+        payouts_cancelled=Count('pk', filter=Q(entry_type=LoanLedgerEntry.TYPE_PAYOUT_CANCELLED)),
+        settlements=Count('pk', filter=Q(entry_type=LoanLedgerEntry.TYPE_SETTLED)),
+        settlements_cancelled=Count('pk', filter=Q(entry_type=LoanLedgerEntry.TYPE_SETTLEMENT_CANCELLED)),
+    )
+
+    principal_change = as_amount(loan.amount_agreed) - (state['principal_agreed'] or ZERO)
+    fee_change = as_amount(loan.fee_agreed) - (state['fee_agreed'] or ZERO)
+    if latest is None or principal_change or fee_change:
+        latest = _append(loan.pk, latest, LoanLedgerEntry.TYPE_AGREEMENT, state['opened_at'] or opened_at(loan),
+                         principal_change, fee_change)
+
+    paid_out = state['payouts'] > state['payouts_cancelled']
+    if loan.is_paid_out and not paid_out:
+        latest = _append(loan.pk, latest, LoanLedgerEntry.TYPE_PAID_OUT, paid_out_at(loan))
+    elif paid_out and not loan.is_paid_out:
+        latest = _append(loan.pk, latest, LoanLedgerEntry.TYPE_PAYOUT_CANCELLED, timezone.now())
+
+    settled = state['settlements'] > state['settlements_cancelled']
+    if loan.is_settled and not settled:
+        latest = _append(loan.pk, latest, LoanLedgerEntry.TYPE_SETTLED, settled_at(loan))
+    elif settled and not loan.is_settled:
+        latest = _append(loan.pk, latest, LoanLedgerEntry.TYPE_SETTLEMENT_CANCELLED, timezone.now())
+    return latest
+
+
+def _record_source(loan_id, recorded, change_field, amount, effective_at, entry_type, **source):
+    """
+    Append the entries bringing the ledger in line with a payment or an extension: ``amount`` effective at
+    ``effective_at`` (its own date) and nothing at any other date. ``recorded`` are its entries so far.
+
+    The amount recorded at a former date (the record's date was edited) is reversed at that date, so the changes
+    effective at any moment always add up to the same as in a replayed ledger.
+    """
+    latest = _lock_ledger(loan_id)
+    totals = dict(recorded.values('effective_at').order_by().annotate(total=Sum(change_field))
+                  .values_list('effective_at', 'total'))
+
+    for moment, total in sorted(totals.items()):
+        if moment != effective_at and total:
+            latest = _append(loan_id, latest, LoanLedgerEntry.TYPE_REVERSAL, moment, **{change_field: -total},
+                             **source)
+
+    change = amount - totals.get(effective_at, ZERO)
+    if not change:
+        return latest
+    if not amount:
+        entry_type = LoanLedgerEntry.TYPE_REVERSAL
+    elif totals.get(effective_at):
+        entry_type = LoanLedgerEntry.TYPE_ADJUSTMENT
+    return _append(loan_id, latest, entry_type, effective_at, **{change_field: change}, **source)
+
+
+@transaction.atomic
+def record_payment(payment, removed=False):
+    """
+    Bring the ledger in line with a transaction (payment) that was created, edited or is about to be deleted
+    (``removed``). Called by Transaction.save and delete.
+    """
+    return _record_source(payment.loan_id, payment.ledger_entries.all(), 'principal_change',
+                          ZERO if removed else -as_amount(payment.amount), payment.transaction_date,
+                          LoanLedgerEntry.TYPE_PAYMENT, payment=payment)
+
+
+@transaction.atomic
+def record_extension(extension, removed=False):
+    """Same as record_payment for the fee of a loan extension"""
+    return _record_source(extension.loan_id, extension.ledger_entries.all(), 'fee_change',
+                          ZERO if removed else as_amount(extension.extension_fee), extension.created_date,
+                          LoanLedgerEntry.TYPE_EXTENSION_FEE, extension=extension)
+
+
+def replay(loan, payments, extensions):
+    """
+    Unsaved ledger of ``loan`` replayed from its payments and extensions, in effective order.
+
+    Edits are not replayed: the agreement gives one entry with the current amount and fee, each payment and
+    extension one entry with its current amount, and the payout and settlement one marker each.
+    """
+    events = [(payment.transaction_date, LoanLedgerEntry.TYPE_PAYMENT, -payment.amount, ZERO,
+               {'payment_id': payment.pk}) for payment in payments]
+    events += [(extension.created_date, LoanLedgerEntry.TYPE_EXTENSION_FEE, ZERO, extension.extension_fee,
+                {'extension_id': extension.pk}) for extension in extensions]
+    if loan.is_paid_out:
+        events.append((paid_out_at(loan), LoanLedgerEntry.TYPE_PAID_OUT, ZERO, ZERO, {}))
+    if loan.is_settled:
+        events.append((settled_at(loan), LoanLedgerEntry.TYPE_SETTLED, ZERO, ZERO, {}))
+    events.sort(key=lambda event: event[0])
+    events.insert(0, (opened_at(loan), LoanLedgerEntry.TYPE_AGREEMENT, loan.amount_agreed, loan.fee_agreed, {}))
+
+    entries = []
+    principal_balance = fee_balance = ZERO
+    for sequence, (effective_at, entry_type, principal_change, fee_change, sources) in enumerate(events, 1):
+        principal_balance += principal_change
+        fee_balance += fee_change
+        entries.append(LoanLedgerEntry(
+            loan_id=loan.pk, sequence=sequence, entry_type=entry_type, effective_at=effective_at,
+            principal_change=principal_change, fee_change=fee_change,
+            principal_balance=principal_balance, fee_balance=fee_balance, **sources,
+        ))
+    return entries
+
+
+def latest_entries(loan_ids):
+    """{loan id: last entry} of the loans with a ledger, one DISTINCT ON query"""
+    entries = LoanLedgerEntry.objects.filter(loan_id__in=loan_ids).order_by('loan_id', '-sequence').distinct('loan_id')
+    return {entry.loan_id: entry for entry in entries}
+
+
+def prefetch_latest_entries(loans):
+    """Load the last ledger entry of every loan of ``loans`` (e.g. a page of the loan list) in one query, read by
+    the balance properties of Loan instead of one lookup per loan and property"""
+    loans = [loan for loan in loans if loan is not None and loan.pk is not None]
+    entries = latest_entries([loan.pk for loan in loans])
+    for loan in loans:
+        loan.prefetched_ledger_entry = entries.get(loan.pk)
+    return loans
+
+
+def latest_entry(loan):
+    """Last entry of ``loan``, from the page prefetch when there is one, None when it has no ledger"""
+    if loan.pk is None:
+        return None
+    entry = getattr(loan, 'prefetched_ledger_entry', _NOT_LOADED)
+    if entry is _NOT_LOADED:
+        entry = LoanLedgerEntry.objects.filter(loan_id=loan.pk).order_by('-sequence').first()
+    return entry
+
+
+def current_balances(loan):
+    """
+    (principal, fee) balances of ``loan`` from its last ledger entry.
+
+    Reads never write: a loan without a ledger (written around Loan.save) falls back to the sums of its
+    transactions and extensions until rebuild_loan_ledger repairs it.
+    """
+    entry = latest_entry(loan)
+    if entry is not None:
+        return entry.principal_balance, entry.fee_balance
+
+    principal, fee = as_amount(loan.amount_agreed), as_amount(loan.fee_agreed)
+    if loan.pk is None:
+        return principal, fee
+    logger.warning("Loan %s has no balances ledger, run rebuild_loan_ledger", loan.pk)
+    paid = loan.transactions.aggregate(total=Sum('amount'))['total'] or ZERO
+    extension_fees = loan.extensions.aggregate(total=Sum('extension_fee'))['total'] or ZERO
+    return principal - paid, fee + extension_fees
+
+
+def balances_on(loan_id, moment):
+    """
+    (principal, fee) balances of a loan at ``moment``, None before its first entry.
+
+    ``moment`` is a datetime, or a date meaning the end of that day. The changes effective by then are summed
+    rather than read from the running balances of an entry: those follow the order entries were written in, and a
+    back-dated payment is written after entries effective later.
+    """
+    if not isinstance(moment, datetime.datetime):
+        moment = start_of_day(moment + datetime.timedelta(days=1)) - datetime.timedelta(microseconds=1)
+    sums = LoanLedgerEntry.objects.filter(loan_id=loan_id, effective_at__lte=moment).aggregate(
+        principal=Sum('principal_change'), fee=Sum('fee_change'), entries=Count('pk'),
+    )
+    if not sums['entries']:
+        return None
+    return sums['principal'], sums['fee']
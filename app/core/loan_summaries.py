@@ -0,0 +1,147 @@
+# core/loan_summaries.py
+
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Prefetch, prefetch_related_objects
+
+COMMITTEE_TEAM = 'committee_members'
+VERSION_KEY = 'loan_summaries:version'
+
+# Committee members and checklist configuration, loaded once per process, version and LOAN_SUMMARIES_CACHE_SECONDS
+_cached = {}
+_cached_lock = threading.Lock()
+
+
+def get_summaries_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(VERSION_KEY, version, timeout=None)
+    return version
+
+
+def invalidate_summaries():
+    """
+    Drop the cached committee members and checklist configuration, called by the signals whenever a team
+    membership, a checklist item or the checklist configuration changes.
+
+    The version is bumped in the Django cache, which reaches every process only with a shared CACHES backend. With
+    the default per-process cache the other processes (daphne instances, the scheduler, management commands) pick
+    the change up once their copy is LOAN_SUMMARIES_CACHE_SECONDS old.
+    """
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, timeout=None)
+    _cached.clear()
+
+
+def _get_cached(name, load):
+    version = get_summaries_version()
+    entry = _cached.get(name)
+    if entry is None or entry[0] != version or time.monotonic() >= entry[1]:
+        with _cached_lock:
+            entry = (version, time.monotonic() + settings.LOAN_SUMMARIES_CACHE_SECONDS, load())
+            _cached[name] = entry
+    return entry[2]
+
+
+def committee_member_emails():
+    """Emails of the committee members, in id order"""
+    from core.models import User
+
+    return _get_cached('committee_member_emails', lambda: list(
+        User.objects.filter(teams__name=COMMITTEE_TEAM).distinct().order_by('pk').values_list('email', flat=True)
+    ))
+
+
+def checklist_configuration():
+    """(required approvers of the active configuration or None, ids of the active checklist items)"""
+    from finance_checklist.models import ChecklistConfiguration, FinanceChecklistItem
+
+    def load():
+        config = ChecklistConfiguration.objects.filter(is_active=True).first()
+        item_ids = tuple(FinanceChecklistItem.objects.filter(is_active=True).values_list('pk', flat=True))
+        return (config.required_approvers if config else None), item_ids
+
+    return _get_cached('checklist_configuration', load)
+
+
+def summary_prefetches():
+    """
+    Prefetches the committee and checklist summaries of a loan read instead of querying.
+
+    They go to their own attributes (``summary_committee_votes``, ``summary_checklist_submissions`` and the
+    ``checked_item_checks`` of each submission), so a plain prefetch of the same relations elsewhere is left alone.
+    """
+    from core.models import CommitteeApproval
+    from finance_checklist.models import LoanChecklistItemCheck, LoanChecklistSubmission
+
+    return [
+        Prefetch('committee_approvals', queryset=CommitteeApproval.objects.select_related('member').order_by('pk'),
+                 to_attr='summary_committee_votes'),
+        Prefetch('checklist_submissions', queryset=LoanChecklistSubmission.objects.select_related('submitted_by'),
+                 to_attr='summary_checklist_submissions'),
+        Prefetch('summary_checklist_submissions__item_checks',
+                 queryset=LoanChecklistItemCheck.objects.filter(is_checked=True), to_attr='checked_item_checks'),
+    ]
+
+
+def prefetch_loan_summaries(loans):
+    """
+    Load what ``committee_approvements_status``, ``finance_checklist_complete`` and ``checklist_submissions_summary``
+    need for all ``loans`` (e.g. a page of the loan list) in three queries, whatever the number of loans.
+    """
+    loans = [loan for loan in loans if loan is not None]
+    if loans:
+        prefetch_related_objects(loans, *summary_prefetches())
+    return loans
+
+
+def load_committee_votes(loan):
+    """Committee votes of ``loan`` with their members, from the page prefetch when there is one"""
+    votes = getattr(loan, 'summary_committee_votes', None)
+    if votes is None:
+        votes = list(loan.committee_approvals.select_related('member').order_by('pk'))
+    return votes
+
+
+def load_checklist_submissions(loan):
+    """Checklist submissions of ``loan`` with their checked item checks in ``checked_item_checks``, from the page
+    prefetch when there is one"""
+    from finance_checklist.models import LoanChecklistItemCheck
+
+    submissions = getattr(loan, 'summary_checklist_submissions', None)
+    if submissions is None:
+        submissions = list(loan.checklist_submissions.select_related('submitted_by').prefetch_related(
+            Prefetch('item_checks', queryset=LoanChecklistItemCheck.objects.filter(is_checked=True),
+                     to_attr='checked_item_checks')
+        ))
+    return submissions
+
+
+def is_checklist_complete(submissions):
+    """
+    Whether the finance checklist of a loan with these ``load_checklist_submissions`` is complete: an active
+    configuration and active items exist, enough users submitted and every active item was checked by the required
+    number of users.
+    """
+    required_approvers, active_item_ids = checklist_configuration()
+    if required_approvers is None or not active_item_ids:
+        return False
+
+    # Check if we have enough unique users who submitted
+    if len({submission.submitted_by_id for submission in submissions}) < required_approvers:
+        return False
+
+    # Check if all required items are checked by required number of users
+    checked_by = {item_id: set() for item_id in active_item_ids}
+    for submission in submissions:
+        for check in submission.checked_item_checks:
+            if check.checklist_item_id in checked_by:
+                checked_by[check.checklist_item_id].add(submission.submitted_by_id)
+
+    return all(len(users_who_checked) >= required_approvers for users_who_checked in checked_by.values())
@@ -0,0 +1,58 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import Application
+
+
+class Command(BaseCommand):
+    """
+    Recompute the denormalized Application.stage and Application.country columns.
+
+    The migration that adds the columns fills them in, run this whenever loan or application flags were changed
+    outside of the model save() methods (queryset updates, raw SQL, admin imports).
+
+    Usage:
+    python manage.py backfill_application_stage [--batch-size 1000] [--dry-run]
+    """
+    help = 'Recompute the lifecycle stage and country of every application'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Applications updated per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Report the changes without saving them')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        queryset = Application.objects.select_related('loan', 'user').order_by('id')
+        checked = 0
+        changed = 0
+        batch = []
+
+        for application in queryset.iterator(chunk_size=batch_size):
+            checked += 1
+            stage = Application.stage_for(application.is_rejected, application.approved,
+                                          getattr(application, 'loan', None))
+            country = application.user.country if application.user else None
+
+            if stage != application.stage or country != application.country:
+                application.stage = stage
+                application.country = country
+                batch.append(application)
+
+            if len(batch) >= batch_size:
+                changed += self.flush(batch, dry_run)
+                batch = []
+
+        changed += self.flush(batch, dry_run)
+
+        prefix = '[dry run] ' if dry_run else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}{changed} of {checked} applications updated'
+        ))
+
+    def flush(self, batch, dry_run):
+        if batch and not dry_run:
+            with transaction.atomic():
+                Application.objects.bulk_update(batch, ['stage', 'country'])
+        return len(batch)
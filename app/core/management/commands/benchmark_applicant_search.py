@@ -0,0 +1,95 @@
+import random
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Q
+
+from core.applicant_search import build_search_document, search_applications, trigram_available
+from core.models import Applicant, Application
+
+FIRST_NAMES = ['John', 'Mary', 'Patrick', 'Siobhan', 'Liam', 'Aoife', 'Sean', 'Niamh', 'Declan', 'Orla']
+LAST_NAMES = ['Murphy', 'Kelly', "O'Sullivan", 'Walsh', 'Smith', 'Byrne', 'Ryan', "O'Brien", 'Doyle', 'McCarthy']
+COUNTIES = ['Dublin', 'Cork', 'Galway', 'Limerick', 'Kerry', 'Mayo', 'Wexford', 'Donegal', 'Clare', 'Sligo']
+
+
+class Command(BaseCommand):
+    """
+    Compare the old icontains/DISTINCT applicant search with the search service on synthetic data.
+
+    Everything runs inside a transaction that is rolled back, nothing is left in the database.
+
+    Usage:
+    python manage.py benchmark_applicant_search [--applicants 100000] [--repeat 5]
+    """
+    help = "Benchmark the applicant search over synthetic applicants."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--applicants', type=int, default=100000, help="Synthetic applicants to create")
+        parser.add_argument('--repeat', type=int, default=5, help="Runs per search term")
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"pg_trgm installed: {trigram_available()}")
+
+        with transaction.atomic():
+            self.create_applicants(options['applicants'])
+            terms = ['murphy', 'siobhan kelly', 'osullivan', 'galway', '0871234', 'mcarthy']
+
+            for term in terms:
+                legacy = self.time_query(lambda: list(self.legacy_search(term)[:500]), options['repeat'])
+                service = self.time_query(
+                    lambda: list(search_applications(Application.objects.all(), term)), options['repeat']
+                )
+                self.stdout.write(
+                    f"{term!r}: icontains {legacy * 1000:.1f} ms, search service {service * 1000:.1f} ms "
+                    f"({legacy / service:.1f}x)"
+                )
+
+            transaction.set_rollback(True)
+
+    @staticmethod
+    def legacy_search(term):
+        """The filter the list endpoints used before the search service"""
+        return Application.objects.filter(
+            Q(applicants__first_name__icontains=term) |
+            Q(applicants__last_name__icontains=term) |
+            Q(applicants__email__icontains=term) |
+            Q(applicants__phone_number__icontains=term) |
+            Q(applicants__city__icontains=term) |
+            Q(applicants__county__icontains=term)
+        ).distinct()
+
+    def create_applicants(self, count):
+        started = time.perf_counter()
+        user = get_user_model().objects.create_user(email='benchmark-applicant-search@example.com')
+        applications = Application.objects.bulk_create(
+            [Application(user=user, amount=1000, term=12) for _ in range(count)], batch_size=5000
+        )
+
+        applicants = []
+        for application in applications:
+            first_name, last_name = random.choice(FIRST_NAMES), random.choice(LAST_NAMES)
+            county = random.choice(COUNTIES)
+            applicant = Applicant(
+                application=application, title='Mr', first_name=first_name, last_name=last_name,
+                email=f'{first_name}.{last_name}{random.randint(1, 9999)}@example.com'.lower().replace("'", ''),
+                phone_number=f'08{random.randint(10000000, 99999999)}',
+                address_line_1=f'{random.randint(1, 200)} Main Street', city=county, county=county,
+            )
+            applicant.search_document = build_search_document(applicant)
+            applicants.append(applicant)
+        Applicant.objects.bulk_create(applicants, batch_size=5000)
+
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE core_application')
+            cursor.execute('ANALYZE core_applicant')
+        self.stdout.write(f"Created {count} applicants in {time.perf_counter() - started:.1f}s")
+
+    @staticmethod
+    def time_query(func, repeat):
+        func()  # warm up
+        started = time.perf_counter()
+        for _ in range(repeat):
+            func()
+        return (time.perf_counter() - started) / repeat
@@ -6,6 +6,6 @@ class Command(BaseCommand):
     help = "Delete expired API keys from the database"
 
     def handle(self, *args, **kwargs):
-        print("Deleting Expired API keys Cronjob started")
+        self.stdout.write("Deleting Expired API keys Cronjob started")
         FrontendAPIKey.cleanup_expired_keys()
         self.stdout.write(self.style.SUCCESS("✅ Expired API keys deleted"))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+from core.chunked_uploads import cleanup_expired_uploads
+
+
+class Command(BaseCommand):
+    help = "Abort expired chunked uploads and delete their staged chunks"
+
+    def handle(self, *args, **kwargs):
+        count = cleanup_expired_uploads()
+        self.stdout.write(self.style.SUCCESS(f"✅ {count} expired chunked uploads aborted"))
@@ -1,7 +1,7 @@
 import os
 from django.core.management.base import BaseCommand
-from cryptography.fernet import Fernet
 from core.models import Applicant
+from core.pps import get_pps_cipher, pps_blind_index
 
 
 class Command(BaseCommand):
@@ -14,7 +14,7 @@ class Command(BaseCommand):
             self.stderr.write(self.style.ERROR("PPS_ENCRYPTION_KEY is not set."))
             return
 
-        cipher = Fernet(encryption_key.encode())  # Initialize the cipher
+        cipher = get_pps_cipher()  # Shared cipher, encrypts with the newest key
 
         # Use defer to avoid triggering decryption logic in __getattribute__
         applicants = Applicant.objects.defer("pps_number").all()
@@ -56,7 +56,9 @@ class Command(BaseCommand):
                 self.stdout.write(f"PPS (before encryption): {raw_pps}")
                 encrypted_pps = cipher.encrypt(raw_pps)
                 # Update the PPS field directly
-                Applicant.objects.filter(id=applicant.id).update(pps_number=encrypted_pps)
+                Applicant.objects.filter(id=applicant.id).update(
+                    pps_number=encrypted_pps, pps_blind_index=pps_blind_index(raw_pps.decode())
+                )
                 updated_count += 1
                 self.stdout.write(
                     self.style.SUCCESS(
@@ -0,0 +1,70 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.loan_ledger import latest_entries, replay
+from core.models import Loan, LoanLedgerEntry
+
+
+class Command(BaseCommand):
+    """
+    Compare the balances ledger of every loan with its agreed amounts, transactions and extensions and rebuild the
+    ledgers that do not end on the same balances.
+
+    The ledger follows the saves of loans, transactions and extensions, run this after those records were changed
+    around them (queryset updates, imports, raw SQL) or to check for drift. A rebuilt ledger has one entry per
+    record with its current amount, the history of edits is dropped.
+
+    Usage:
+    python manage.py rebuild_loan_ledger [--loan 12 34] [--all] [--batch-size 500] [--dry-run]
+    """
+    help = 'Rebuild the balances ledger of the loans whose balances do not match their transactions and extensions'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loan', type=int, nargs='+', dest='loan_ids', help='Only check these loans')
+        parser.add_argument('--all', action='store_true', help='Rebuild every ledger checked, even matching ones')
+        parser.add_argument('--batch-size', type=int, default=500, help='Loans checked per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Report the differences without saving them')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        loans = Loan.objects.order_by('id')
+        if options['loan_ids']:
+            loans = loans.filter(id__in=options['loan_ids'])
+        loan_ids = list(loans.values_list('id', flat=True))
+        rebuilt = 0
+
+        for start in range(0, len(loan_ids), batch_size):
+            with transaction.atomic():
+                ledgers = self.outdated_ledgers(loan_ids[start:start + batch_size], options['all'])
+                for loan_id, (stored, entries) in ledgers.items():
+                    stored_balance = f'{stored.principal_balance} + {stored.fee_balance}' if stored else 'no ledger'
+                    self.stdout.write(f'Loan {loan_id}: {stored_balance}, expected '
+                                      f'{entries[-1].principal_balance} + {entries[-1].fee_balance}')
+
+                if not dry_run:
+                    LoanLedgerEntry.objects.filter(loan_id__in=ledgers).delete()
+                    LoanLedgerEntry.objects.bulk_create([entry for _, entries in ledgers.values() for entry in entries])
+            rebuilt += len(ledgers)
+
+        prefix = '[dry run] ' if dry_run else ''
+        self.stdout.write(self.style.SUCCESS(f'{prefix}{len(loan_ids)} loans checked, {rebuilt} ledgers rebuilt'))
+
+    def outdated_ledgers(self, loan_ids, rebuild_all=False):
+        """{loan id: (stored last entry or None, replayed entries)} of the loans of a batch to rebuild, their rows
+        locked so no entry is appended meanwhile"""
+        loans = Loan.objects.select_for_update().filter(id__in=loan_ids).prefetch_related('transactions', 'extensions')
+        loans = list(loans)
+        stored = latest_entries(loan_ids)
+        ledgers = {}
+
+        for loan in loans:
+            entries = replay(loan, loan.transactions.all(), loan.extensions.all())
+            last = stored.get(loan.pk)
+            if (rebuild_all or last is None
+                    or (last.principal_balance, last.fee_balance) != (entries[-1].principal_balance,
+                                                                      entries[-1].fee_balance)):
+                ledgers[loan.pk] = (last, entries)
+
+        return ledgers
@@ -0,0 +1,63 @@
+from cryptography.fernet import InvalidToken
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.models import Applicant
+from core.pps import pps_blind_index
+
+
+class Command(BaseCommand):
+    """
+    Recompute the PPS blind index of every applicant with the current (first) key of PPS_BLIND_INDEX_KEYS.
+
+    Safe to run while the application is serving requests: searches match any configured key, so rows that
+    still hold a digest of the previous key keep being found until they are rebuilt.
+
+    Key rotation:
+    1. Prepend the new key to PPS_BLIND_INDEX_KEYS, keeping the old one, and deploy
+    2. python manage.py rebuild_pps_blind_index
+    3. Remove the old key and deploy
+    """
+    help = 'Rebuild the HMAC blind index of the encrypted PPS numbers'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Applicants updated per transaction')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        queryset = Applicant.objects.exclude(pps_number=None).only('id', 'pps_number', 'pps_blind_index')
+
+        checked = 0
+        updated = 0
+        failed = 0
+        batch = []
+
+        for applicant in queryset.order_by('id').iterator(chunk_size=batch_size):
+            checked += 1
+            try:
+                digest = pps_blind_index(applicant.decrypted_pps)
+            except InvalidToken:
+                failed += 1
+                self.stderr.write(self.style.ERROR(f"Could not decrypt PPS of Applicant ID {applicant.id}"))
+                continue
+
+            if digest != applicant.pps_blind_index:
+                applicant.pps_blind_index = digest
+                batch.append(applicant)
+
+            if len(batch) >= batch_size:
+                updated += self.flush(batch)
+                batch = []
+
+        updated += self.flush(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f"✅ Blind index rebuilt: {updated} of {checked} applicants updated, {failed} failed"
+        ))
+
+    @staticmethod
+    def flush(batch):
+        if batch:
+            with transaction.atomic():
+                Applicant.objects.bulk_update(batch, ['pps_blind_index'])
+        return len(batch)
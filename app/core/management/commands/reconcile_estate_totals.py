@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from core.estate_totals import collect_breakdowns, summarize_breakdown
+from core.models import Application, EstateTotals
+
+TOTALS_FIELDS = ['breakdown', 'total_assets', 'total_debts', 'net_value']
+
+
+class Command(BaseCommand):
+    """
+    Compare the stored estate totals of every application with the sums of its estate items and repair them.
+
+    The totals follow the estate items through model signals, run this after estate items were changed
+    without them (queryset updates, bulk imports, raw SQL) or to check for drift.
+
+    Usage:
+    python manage.py reconcile_estate_totals [--batch-size 1000] [--dry-run]
+    """
+    help = 'Recompute estate totals that do not match the estate items of their application'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Applications checked per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Report the differences without saving them')
+
+    def handle(self, *args, **options):
+        batch_size = options['batch_size']
+        dry_run = options['dry_run']
+
+        application_ids = list(Application.objects.order_by('id').values_list('id', flat=True))
+        created = 0
+        updated = 0
+
+        for start in range(0, len(application_ids), batch_size):
+            batch = application_ids[start:start + batch_size]
+            missing, changed = self.reconcile(batch)
+            for totals in changed:
+                self.stdout.write(f'Application {totals.application_id}: net value {totals.net_value}')
+
+            if not dry_run:
+                with transaction.atomic():
+                    EstateTotals.objects.bulk_create(missing)
+                    EstateTotals.objects.bulk_update(changed, TOTALS_FIELDS)
+            created += len(missing)
+            updated += len(changed)
+
+        prefix = '[dry run] ' if dry_run else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefix}{len(application_ids)} applications checked, {created} totals created, {updated} corrected'
+        ))
+
+    def reconcile(self, application_ids):
+        """Missing and out of date totals of a batch of applications, with the expected values set"""
+        breakdowns = collect_breakdowns(application_ids=application_ids)
+        stored = EstateTotals.objects.in_bulk(application_ids)
+        missing = []
+        changed = []
+
+        for application_id in application_ids:
+            expected = summarize_breakdown(breakdowns.get(application_id, {}))
+            totals = stored.get(application_id)
+            if totals is None:
+                missing.append(EstateTotals(application_id=application_id, **expected))
+            elif any(getattr(totals, field) != value for field, value in expected.items()):
+                for field, value in expected.items():
+                    setattr(totals, field, value)
+                changed.append(totals)
+
+        return missing, changed
@@ -0,0 +1,34 @@
+# core/maturity.py
+
+from datetime import date
+
+from django.db.models import DateField, F, Func, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from core.models import LoanExtension
+
+
+class AddMonths(Func):
+    """date + n months, clamped to the last day of the month like relativedelta"""
+    output_field = DateField()
+
+    def as_sql(self, compiler, connection, **extra_context):
+        date_sql, date_params = compiler.compile(self.source_expressions[0])
+        months_sql, months_params = compiler.compile(self.source_expressions[1])
+        return (f'CAST(({date_sql} + make_interval(months => CAST({months_sql} AS integer))) AS date)',
+                [*date_params, *months_params])
+
+
+def maturity_date_expression(loan_prefix=''):
+    """SQL version of Loan.maturity_date, sortable by the database.
+
+    ``loan_prefix`` is the path to the loan, e.g. ``loan__`` on an Application queryset. Loans not paid out sort
+    last, as date.max.
+    """
+    extension_months = Subquery(
+        LoanExtension.objects.filter(loan=OuterRef(f'{loan_prefix}pk'))
+        .order_by().values('loan').annotate(total=Sum('extension_term_months')).values('total')
+    )
+    months = F(f'{loan_prefix}term_agreed') + Coalesce(extension_months, 0)
+    maturity = AddMonths(f'{loan_prefix}paid_out_date', months)
+    return Coalesce(maturity, Value(date.max), output_field=DateField())
@@ -6,6 +6,8 @@ from django.utils.deprecation import MiddlewareMixin
 from django.http import JsonResponse
 from django.core.exceptions import PermissionDenied
 
+logger = logging.getLogger(__name__)
+
 
 class LogEventOnErrorMiddleware(MiddlewareMixin):
     def process_response(self, request, response):
@@ -154,7 +156,7 @@ class ValidateAPIKeyMiddleware:
                 status=401
             )
         except Exception as e:
-            print("JWT Authentication failed:", str(e))
+            logger.warning("JWT Authentication failed: %s", e)
             return JsonResponse(
                 {"detail": "Unauthorized: Token validation failed", "code": "token_not_valid"},
                 status=401
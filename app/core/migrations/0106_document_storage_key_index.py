@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:03
+
+import core.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0105_chunkedupload'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='document',
+            name='document',
+            field=models.FileField(db_index=True, upload_to=core.utils.get_application_document_file_path),
+        ),
+    ]
@@ -0,0 +1,73 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:08
+
+from collections import defaultdict
+
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+LOAN_FIELDS = ['needs_committee_approval', 'is_committee_approved', 'is_paid_out', 'paid_out_date', 'is_settled']
+
+
+def stage_for(is_rejected, approved, loan):
+    """Frozen copy of Application.stage_for as of this migration, ``loan`` is a dict of LOAN_FIELDS or None"""
+    if is_rejected:
+        return 'rejected'
+    if not approved:
+        return 'active'
+    if loan is None:
+        return 'other'
+    if loan['needs_committee_approval'] and loan['is_committee_approved'] is None:
+        return 'active'
+    if loan['needs_committee_approval'] and loan['is_committee_approved'] is False:
+        return 'rejected'
+    if loan['is_paid_out'] and loan['is_settled']:
+        return 'settled'
+    if loan['is_settled']:
+        return 'other'
+    if loan['is_paid_out']:
+        return 'paid_out' if loan['paid_out_date'] else 'paid_out_pending'
+    return 'approved'
+
+
+def populate_stage_and_country(apps, schema_editor):
+    Application = apps.get_model('core', 'Application')
+    User = apps.get_model('core', 'User')
+    Application.objects.update(country=Subquery(User.objects.filter(pk=OuterRef('user_id')).values('country')[:1]))
+
+    ids_by_stage = defaultdict(list)
+    rows = Application.objects.values('id', 'is_rejected', 'approved', 'loan__id',
+                                      *(f'loan__{field}' for field in LOAN_FIELDS))
+    for row in rows.iterator(chunk_size=2000):
+        loan = {field: row[f'loan__{field}'] for field in LOAN_FIELDS} if row['loan__id'] is not None else None
+        stage = stage_for(row['is_rejected'], row['approved'], loan)
+        if stage != 'active':
+            ids_by_stage[stage].append(row['id'])
+
+    for stage, application_ids in ids_by_stage.items():
+        for start in range(0, len(application_ids), 1000):
+            Application.objects.filter(id__in=application_ids[start:start + 1000]).update(stage=stage)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0106_document_storage_key_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='country',
+            field=models.CharField(blank=True, max_length=2, null=True),
+        ),
+        migrations.AddField(
+            model_name='application',
+            name='stage',
+            field=models.CharField(choices=[('active', 'Active'), ('rejected', 'Rejected'), ('approved', 'Approved'), ('paid_out_pending', 'Paid out (date pending)'), ('paid_out', 'Paid out'), ('settled', 'Settled'), ('other', 'Other')], default='active', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['stage', 'country', 'id'], name='application_stage_country_idx'),
+        ),
+        migrations.RunPython(populate_stage_and_country, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0107_application_stage'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicant',
+            name='pps_blind_index',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64, null=True),
+        ),
+    ]
@@ -0,0 +1,88 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:40
+
+import logging
+import re
+import unicodedata
+
+from django.db import DatabaseError, migrations, models, transaction
+
+logger = logging.getLogger(__name__)
+
+TRIGRAM_INDEX = 'applicant_search_trgm_idx'
+
+# Frozen copy of core.applicant_search as of this migration, later changes to the search do not apply here
+DOCUMENT_FIELDS = [
+    'first_name', 'last_name', 'email', 'phone_number',
+    'address_line_1', 'address_line_2', 'city', 'county', 'postal_code',
+]
+
+
+def normalize_search_text(value):
+    value = unicodedata.normalize('NFKD', str(value or ''))
+    value = ''.join(char for char in value if not unicodedata.combining(char))
+    return re.sub(r'\s+', ' ', value).strip().lower()
+
+
+def normalize_phone(value):
+    return re.sub(r'\D', '', value or '')
+
+
+def build_search_document(applicant):
+    parts = []
+    for field in DOCUMENT_FIELDS:
+        value = getattr(applicant, field, '')
+        parts.append(normalize_phone(value) if field == 'phone_number' else normalize_search_text(value))
+    return ' '.join(part for part in parts if part)
+
+
+def populate_search_document(apps, schema_editor):
+    Applicant = apps.get_model('core', 'Applicant')
+    batch = []
+    for applicant in Applicant.objects.only('id', *DOCUMENT_FIELDS).iterator(chunk_size=1000):
+        applicant.search_document = build_search_document(applicant)
+        batch.append(applicant)
+        if len(batch) >= 1000:
+            Applicant.objects.bulk_update(batch, ['search_document'])
+            batch = []
+    Applicant.objects.bulk_update(batch, ['search_document'])
+
+
+def create_trigram_index(apps, schema_editor):
+    """GIN trigram index on the search document, skipped where pg_trgm cannot be installed.
+
+    The index is not declared on the model because it depends on the extension being available, the search
+    service falls back to substring matching without it.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+            schema_editor.execute(
+                f'CREATE INDEX IF NOT EXISTS {TRIGRAM_INDEX} ON core_applicant '
+                f'USING gin (search_document gin_trgm_ops)'
+            )
+    except DatabaseError as e:
+        logger.warning(f"pg_trgm is not available, applicant search index not created: {e}")
+
+
+def drop_trigram_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(f'DROP INDEX IF EXISTS {TRIGRAM_INDEX}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0108_applicant_pps_blind_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applicant',
+            name='search_document',
+            field=models.TextField(blank=True, default='', editable=False),
+        ),
+        migrations.RunPython(populate_search_document, migrations.RunPython.noop),
+        migrations.RunPython(create_trigram_index, drop_trigram_index),
+    ]
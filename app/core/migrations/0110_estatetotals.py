@@ -0,0 +1,92 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:42
+
+from collections import defaultdict
+from decimal import Decimal
+
+import django.db.models.deletion
+from django.db import migrations, models
+from django.db.models import Q, Sum
+
+# Frozen copy of core.estate_totals as of this migration, later changes to the totals do not apply here
+ESTATE_RELATIONS = [
+    'real_and_leasehold',
+    'household_contents',
+    'cars_boats',
+    'business_farming',
+    'business_other',
+    'unpaid_purchase_money',
+    'financial_assets',
+    'life_insurance',
+    'debts_owing',
+    'securities_quoted',
+    'securities_unquoted',
+    'other_property',
+    'irish_debts',
+]
+
+ZERO = Decimal('0.00')
+
+
+def collect_breakdowns(Application, application_ids):
+    """{application id: {relation: {'assets': str, 'debts': str}}}, one grouped query per estate model"""
+    breakdowns = defaultdict(dict)
+    for relation in ESTATE_RELATIONS:
+        model = Application._meta.get_field(relation).related_model
+        rows = (model.objects.filter(application_id__in=application_ids).values('application_id').order_by()
+                .annotate(assets=Sum('value', filter=Q(is_asset=True)), debts=Sum('value', filter=Q(is_asset=False))))
+        for row in rows:
+            if row['assets'] is not None or row['debts'] is not None:
+                breakdowns[row['application_id']][relation] = {
+                    'assets': str(row['assets'] or ZERO), 'debts': str(row['debts'] or ZERO),
+                }
+    return breakdowns
+
+
+def summarize_breakdown(breakdown):
+    total_assets = sum((Decimal(category['assets']) for category in breakdown.values()), ZERO)
+    total_debts = sum((Decimal(category['debts']) for category in breakdown.values()), ZERO)
+    return {
+        'breakdown': breakdown,
+        'total_assets': total_assets,
+        'total_debts': total_debts,
+        'net_value': total_assets - total_debts,
+    }
+
+
+def populate_estate_totals(apps, schema_editor):
+    Application = apps.get_model('core', 'Application')
+    EstateTotals = apps.get_model('core', 'EstateTotals')
+    application_ids = list(Application.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(application_ids), 1000):
+        batch = application_ids[start:start + 1000]
+        breakdowns = collect_breakdowns(Application, batch)
+        EstateTotals.objects.bulk_create([
+            EstateTotals(application_id=application_id, **summarize_breakdown(breakdowns.get(application_id, {})))
+            for application_id in batch
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0109_applicant_search_document'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EstateTotals',
+            fields=[
+                ('application', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='estate_totals', serialize=False, to='core.application')),
+                ('total_assets', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('total_debts', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('net_value', models.DecimalField(db_index=True, decimal_places=2, default=0, max_digits=14)),
+                ('breakdown', models.JSONField(blank=True, default=dict)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Estate totals',
+                'verbose_name_plural': 'Estate totals',
+            },
+        ),
+        migrations.RunPython(populate_estate_totals, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.2.1 on 2026-10-18 21:54
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0110_estatetotals'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ApplicationVersion',
+            fields=[
+                ('application', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='version_counter', serialize=False, to='core.application')),
+                ('version', models.PositiveBigIntegerField(default=1)),
+            ],
+        ),
+    ]
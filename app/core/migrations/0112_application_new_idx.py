@@ -0,0 +1,17 @@
+# Generated by Django 5.2.1 on 2026-10-18 22:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0111_applicationversion'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(condition=models.Q(('is_new', True)), fields=['country', 'id'], name='application_new_idx'),
+        ),
+    ]
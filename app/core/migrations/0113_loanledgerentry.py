@@ -0,0 +1,88 @@
+# Generated by Django 5.2.1 on 2026-10-18 23:10
+
+import datetime
+from decimal import Decimal
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.utils import timezone
+
+ZERO = Decimal('0.00')
+
+
+def start_of_day(day):
+    return timezone.make_aware(datetime.datetime.combine(day, datetime.time.min))
+
+
+def replay(loan, LoanLedgerEntry):
+    """Frozen copy of core.loan_ledger.replay as of this migration: one entry for the agreement, one per payment and
+    extension and one marker for the payout and the settlement, in effective order"""
+    now = timezone.now()
+    events = [(payment.transaction_date, 'payment', -payment.amount, ZERO, {'payment_id': payment.pk})
+              for payment in loan.transactions.all()]
+    events += [(extension.created_date, 'extension_fee', ZERO, extension.extension_fee,
+                {'extension_id': extension.pk}) for extension in loan.extensions.all()]
+    if loan.is_paid_out:
+        events.append((start_of_day(loan.paid_out_date) if loan.paid_out_date else now, 'paid_out', ZERO, ZERO, {}))
+    if loan.is_settled:
+        events.append((start_of_day(loan.settled_date) if loan.settled_date else now, 'settled', ZERO, ZERO, {}))
+    events.sort(key=lambda event: event[0])
+    events.insert(0, (start_of_day(loan.approved_date) if loan.approved_date else now, 'agreement',
+                      loan.amount_agreed, loan.fee_agreed, {}))
+
+    entries = []
+    principal_balance = fee_balance = ZERO
+    for sequence, (effective_at, entry_type, principal_change, fee_change, sources) in enumerate(events, 1):
+        principal_balance += principal_change
+        fee_balance += fee_change
+        entries.append(LoanLedgerEntry(
+            loan_id=loan.pk, sequence=sequence, entry_type=entry_type, effective_at=effective_at,
+            principal_change=principal_change, fee_change=fee_change,
+            principal_balance=principal_balance, fee_balance=fee_balance, **sources,
+        ))
+    return entries
+
+
+def populate_loan_ledger(apps, schema_editor):
+    Loan = apps.get_model('core', 'Loan')
+    LoanLedgerEntry = apps.get_model('core', 'LoanLedgerEntry')
+    loan_ids = list(Loan.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(loan_ids), 1000):
+        loans = Loan.objects.filter(id__in=loan_ids[start:start + 1000]).prefetch_related('transactions', 'extensions')
+        LoanLedgerEntry.objects.bulk_create([entry for loan in loans for entry in replay(loan, LoanLedgerEntry)])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0112_application_new_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LoanLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sequence', models.PositiveIntegerField()),
+                ('entry_type', models.CharField(choices=[('agreement', 'Agreement'), ('payment', 'Payment'), ('extension_fee', 'Extension fee'), ('adjustment', 'Adjustment'), ('reversal', 'Reversal'), ('paid_out', 'Paid out'), ('payout_cancelled', 'Payout cancelled'), ('settled', 'Settled'), ('settlement_cancelled', 'Settlement cancelled')], max_length=25)),
+                ('effective_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('principal_change', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('fee_change', models.DecimalField(decimal_places=2, default=0, max_digits=12)),
+                ('principal_balance', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('fee_balance', models.DecimalField(decimal_places=2, max_digits=12)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('extension', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='core.loanextension')),
+                ('loan', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ledger_entries', to='core.loan')),
+                ('payment', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='ledger_entries', to='core.transaction')),
+            ],
+            options={
+                'verbose_name': 'Loan ledger entry',
+                'verbose_name_plural': 'Loan ledger entries',
+                'ordering': ['loan', 'sequence'],
+                'indexes': [models.Index(fields=['loan', 'effective_at', 'sequence'], name='loan_ledger_effective_idx')],
+                'constraints': [models.UniqueConstraint(fields=('loan', 'sequence'), name='loan_ledger_sequence_unique')],
+            },
+        ),
+        migrations.RunPython(populate_loan_ledger, migrations.RunPython.noop),
+    ]
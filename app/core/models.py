@@ -1,8 +1,9 @@
+import logging
 import secrets
 from datetime import datetime
 from decimal import Decimal
 
-from cryptography.fernet import Fernet, InvalidToken
+from cryptography.fernet import InvalidToken
 from dateutil.relativedelta import relativedelta
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django.db import models, transaction
@@ -12,7 +13,6 @@ from django.contrib.auth.models import (
     BaseUserManager,
     PermissionsMixin
 )
-from django.template.loader import render_to_string
 from django.utils import timezone
 
 from auditlog.registry import auditlog
@@ -27,8 +27,14 @@ from django.core.exceptions import ValidationError
 from django.utils.timezone import now
 from datetime import timedelta
 
+from core.applicant_search import build_search_document
+from core.loan_summaries import (checklist_configuration, committee_member_emails, is_checklist_complete,
+                                 load_checklist_submissions, load_committee_votes)
+from core.pps import decrypt_pps_number, encrypt_pps_number, pps_blind_index
 from core.utils import get_application_document_file_path
 
+logger = logging.getLogger(__name__)
+
 
 # helper function to get file name for the documents uploaded
 
@@ -127,7 +133,18 @@ class User(AbstractBaseUser, PermissionsMixin):
         # Automatically generate activation token for non-staff and inactive users if not set
         if not self.is_staff and not self.is_active and not self.activation_token:
             self.activation_token = uuid.uuid4()
-        super().save(*args, **kwargs)
+
+        update_fields = kwargs.get('update_fields')
+        country_changed = False
+        if self.pk and (update_fields is None or 'country' in update_fields):
+            previous_country = User.objects.filter(pk=self.pk).values_list('country', flat=True).first()
+            country_changed = previous_country != self.country
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if country_changed:
+                # Keep the denormalized country of the firm's applications in sync
+                Application.objects.filter(user=self).update(country=self.country)
 
 
 # this is for One Time password email verification
@@ -209,6 +226,38 @@ class Dispute(models.Model):
 
 class Application(models.Model):
     """Application model"""
+    # Lifecycle stage, derived from the application and loan flags (see stage_for) and kept in sync on save
+    STAGE_ACTIVE = 'active'
+    STAGE_REJECTED = 'rejected'
+    STAGE_APPROVED = 'approved'
+    STAGE_PAID_OUT_PENDING = 'paid_out_pending'  # Loan marked as paid out, paid out date not set yet
+    STAGE_PAID_OUT = 'paid_out'
+    STAGE_SETTLED = 'settled'
+    STAGE_OTHER = 'other'  # Approved without a loan, or settled without being paid out
+    STAGE_CHOICES = [
+        (STAGE_ACTIVE, 'Active'),
+        (STAGE_REJECTED, 'Rejected'),
+        (STAGE_APPROVED, 'Approved'),
+        (STAGE_PAID_OUT_PENDING, 'Paid out (date pending)'),
+        (STAGE_PAID_OUT, 'Paid out'),
+        (STAGE_SETTLED, 'Settled'),
+        (STAGE_OTHER, 'Other'),
+    ]
+
+    # Stages listed under each ?status= filter of the agent and solicitor application lists
+    AGENT_STATUS_STAGES = {
+        'active': [STAGE_ACTIVE],
+        'rejected': [STAGE_REJECTED],
+        'approved': [STAGE_APPROVED, STAGE_PAID_OUT_PENDING],
+        'paid_out': [STAGE_PAID_OUT],
+        'settled': [STAGE_SETTLED],
+    }
+    SOLICITOR_STATUS_STAGES = {
+        **AGENT_STATUS_STAGES,
+        'active': [STAGE_ACTIVE, STAGE_PAID_OUT_PENDING],
+        'approved': [STAGE_APPROVED],
+    }
+
     amount = models.DecimalField(max_digits=10, decimal_places=2)
     term = models.IntegerField(validators=[MinValueValidator(1), MaxValueValidator(36)])
     user = models.ForeignKey(
@@ -246,6 +295,10 @@ class Application(models.Model):
         help_text="Was this will professionally prepared by a solicitor?"
     )
 
+    # Denormalized for the application lists, maintained in save() / Loan.save() / User.save()
+    stage = models.CharField(max_length=20, choices=STAGE_CHOICES, default=STAGE_ACTIVE)
+    country = models.CharField(max_length=2, null=True, blank=True)  # Copy of user.country
+
     class Meta:
         indexes = [
             models.Index(fields=['date_submitted']),
@@ -254,35 +307,66 @@ class Application(models.Model):
             models.Index(fields=['user']),
             models.Index(fields=['solicitor']),
             models.Index(fields=['assigned_to']),
+            models.Index(fields=['stage', 'country', 'id'], name='application_stage_country_idx'),
+            # Only the few unseen applications, for the agents' new applications queue
+            models.Index(fields=['country', 'id'], condition=models.Q(is_new=True), name='application_new_idx'),
         ]
 
-    def value_of_the_estate_after_expenses(self):
-        total_assets = Decimal(0)
-        total_debts = Decimal(0)
-
-        related_fields = [
-            self.real_and_leasehold.all(),
-            self.household_contents.all(),
-            self.cars_boats.all(),
-            self.business_farming.all(),
-            self.business_other.all(),
-            self.unpaid_purchase_money.all(),
-            self.financial_assets.all(),
-            self.life_insurance.all(),
-            self.debts_owing.all(),
-            self.securities_quoted.all(),
-            self.securities_unquoted.all(),
-            self.other_property.all(),
-            self.irish_debts.all(),
-        ]
+    @classmethod
+    def stage_for(cls, is_rejected, approved, loan):
+        """Lifecycle stage for the given application flags and loan (None when there is no loan)"""
+        if is_rejected:
+            return cls.STAGE_REJECTED
+        if not approved:
+            return cls.STAGE_ACTIVE
+        if loan is None:
+            return cls.STAGE_OTHER
+        if loan.needs_committee_approval and loan.is_committee_approved is None:
+            return cls.STAGE_ACTIVE
+        if loan.needs_committee_approval and loan.is_committee_approved is False:
+            return cls.STAGE_REJECTED
+        if loan.is_paid_out and loan.is_settled:
+            return cls.STAGE_SETTLED
+        if loan.is_settled:
+            return cls.STAGE_OTHER
+        if loan.is_paid_out:
+            return cls.STAGE_PAID_OUT if loan.paid_out_date else cls.STAGE_PAID_OUT_PENDING
+        return cls.STAGE_APPROVED
+
+    def compute_stage(self, loan=None):
+        if loan is None and not self._state.adding:
+            loan = getattr(self, 'loan', None)
+        return self.stage_for(self.is_rejected, self.approved, loan)
+
+    def sync_stage(self, loan=None):
+        """Recompute the stage after a loan change and store it if it changed"""
+        stage = self.stage_for(self.is_rejected, self.approved, loan)
+        if stage != self.stage:
+            self.stage = stage
+            Application.objects.filter(pk=self.pk).update(stage=stage)
+        return stage
 
-        for related in related_fields:
-            assets_sum = related.filter(is_asset=True).aggregate(sum=Sum('value'))['sum'] or Decimal(0)
-            debts_sum = related.filter(is_asset=False).aggregate(sum=Sum('value'))['sum'] or Decimal(0)
-            total_assets += assets_sum
-            total_debts += debts_sum
+    def save(self, *args, **kwargs):
+        self.stage = self.compute_stage()
+        if self.user_id:
+            self.country = self.user.country
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'stage', 'country'}
+        super().save(*args, **kwargs)
 
-        return total_assets - total_debts
+    def value_of_the_estate_after_expenses(self):
+        """Net estate value, a primary key read of the totals kept up to date by core.estate_totals"""
+        if self.pk is None:
+            return Decimal(0)
+        net_value = EstateTotals.objects.filter(application_id=self.pk).values_list('net_value', flat=True).first()
+        if net_value is None:
+            # Computed without saving, reads never write: the missing row is repaired by reconcile_estate_totals
+            from core.estate_totals import collect_breakdowns, summarize_breakdown
+            logger.warning("Estate totals of application %s are missing, run reconcile_estate_totals", self.pk)
+            net_value = summarize_breakdown(collect_breakdowns(application_ids=[self.pk]).get(self.pk, {}))['net_value']
+        return net_value
 
     @property
     def undertaking_ready(self) -> bool:
@@ -367,6 +451,10 @@ class Applicant(models.Model):
     first_name = models.CharField(max_length=255)
     last_name = models.CharField(max_length=255)
     pps_number = models.BinaryField(null=True, blank=True)
+    # Keyed HMAC of the plain PPS number, exact match lookups without decrypting (see core.pps)
+    pps_blind_index = models.CharField(max_length=64, null=True, blank=True, db_index=True, editable=False)
+    # Normalized name/email/phone/address text behind the trigram search index (see core.applicant_search)
+    search_document = models.TextField(default='', blank=True, editable=False)
     application = models.ForeignKey(
         'Application', on_delete=models.CASCADE, related_name='applicants')
 
@@ -408,26 +496,39 @@ class Applicant(models.Model):
 
     @property
     def decrypted_pps(self):
-        """Decrypt and return the PPS number."""
+        """Decrypt and return the PPS number, decrypted once per instance."""
         if not self.pps_number:
             return None
-        cipher = Fernet(settings.PPS_ENCRYPTION_KEY)
-        encrypted_pps = (
-            self.pps_number.tobytes()
-            if isinstance(self.pps_number, memoryview)
-            else self.pps_number
-        )
-        return cipher.decrypt(encrypted_pps).decode()
+        cached = self.__dict__.get('_decrypted_pps')
+        if cached is not None and cached[0] is self.pps_number:
+            return cached[1]
+        return self.cache_decrypted_pps(decrypt_pps_number(self.pps_number))
+
+    def cache_decrypted_pps(self, pps):
+        """Remember the plain PPS for the current encrypted value (see core.pps.decrypt_applicants_pps)"""
+        self._decrypted_pps = (self.pps_number, pps)
+        return pps
 
     def encrypt_pps(self, pps):
         """Encrypt the given PPS number."""
-        cipher = Fernet(settings.PPS_ENCRYPTION_KEY)
-        return cipher.encrypt(pps.encode())
+        return encrypt_pps_number(pps)
 
     def save(self, *args, **kwargs):
         """Ensure encryption happens before saving."""
         if self.pps_number and isinstance(self.pps_number, str):  # Encrypt if it's plain text
+            self.pps_blind_index = pps_blind_index(self.pps_number)
             self.pps_number = self.encrypt_pps(self.pps_number)
+        elif not self.pps_number:
+            self.pps_blind_index = None
+
+        self.search_document = build_search_document(self)
+
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields) | {'search_document'}
+            if 'pps_number' in update_fields:
+                update_fields.add('pps_blind_index')
+            kwargs['update_fields'] = update_fields
         super().save(*args, **kwargs)
 
     def __str__(self):
@@ -557,6 +658,31 @@ class IrishDebt(models.Model):
     is_asset = models.BooleanField(default=False)
 
 
+class EstateTotals(models.Model):
+    """Asset and debt totals of an application's estate, with the sums of each estate category in breakdown"""
+    application = models.OneToOneField(Application, on_delete=models.CASCADE, primary_key=True,
+                                       related_name='estate_totals')
+    total_assets = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    total_debts = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    net_value = models.DecimalField(max_digits=14, decimal_places=2, default=0, db_index=True)
+    breakdown = models.JSONField(default=dict, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Estate totals'
+        verbose_name_plural = 'Estate totals'
+
+    def __str__(self):
+        return f'Estate totals of application {self.application_id}: {self.net_value}'
+
+
+class ApplicationVersion(models.Model):
+    """Counter bumped on every write to an application or to the records shown with it, see core.detail_cache"""
+    application = models.OneToOneField(Application, on_delete=models.CASCADE, primary_key=True,
+                                       related_name='version_counter')
+    version = models.PositiveBigIntegerField(default=1)
+
+
 class Expense(models.Model):
     description = models.CharField(max_length=255)
     value = models.DecimalField(max_digits=10, decimal_places=2)
@@ -575,7 +701,7 @@ class Document(models.Model):
 
     application = models.ForeignKey(
         Application, on_delete=models.CASCADE, related_name='documents')
-    document = models.FileField(upload_to=get_application_document_file_path)
+    document = models.FileField(upload_to=get_application_document_file_path, db_index=True)
     original_name = models.CharField(max_length=255, blank=True)
     is_signed = models.BooleanField(default=False)
     is_undertaking = models.BooleanField(default=False)
@@ -764,6 +890,12 @@ class Loan(models.Model):
             # Save the instance to ensure self.id is assigned
             super().save(*args, **kwargs)
 
+            # Agreement, payout and settlement entries of the balances ledger, written in the same transaction
+            from core.loan_ledger import LEDGER_LOAN_FIELDS, record_loan  # here because of the circular import
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None or LEDGER_LOAN_FIELDS.intersection(update_fields):
+                record_loan(self)
+
             # Notify committee members if approval is needed and this is a new instance
             if is_new and self.needs_committee_approval:
                 self.notify_committee_members(
@@ -775,6 +907,9 @@ class Loan(models.Model):
                 self.application.approved = True
                 self.application.save(update_fields=['approved'])
 
+            if self.application:
+                self.application.sync_stage(loan=self)
+
     @property
     def maturity_date(self):
         """
@@ -791,21 +926,25 @@ class Loan(models.Model):
         # Calculate maturity date based on paid_out_date
         return self.paid_out_date + relativedelta(months=self.term_agreed + extensions_term_sum)
 
+    def ledger_balances(self):
+        """(principal, fee) balances from the last entry of the balances ledger, see core.loan_ledger"""
+        from core.loan_ledger import current_balances  # importing it here because of the circular import
+        return current_balances(self)
+
     @property
     def current_balance(self):
-        transactions_sum = self.transactions.aggregate(total_paid=Sum('amount'))['total_paid'] or 0
-        extensions_fee_sum = self.extensions.aggregate(total_extension_fee=Sum('extension_fee'))[
-                                 'total_extension_fee'] or 0
-        return self.amount_agreed + self.fee_agreed - transactions_sum + extensions_fee_sum
+        principal_balance, fee_balance = self.ledger_balances()
+        return principal_balance + fee_balance
 
     @property
     def amount_paid(self):
-        transactions_sum = self.transactions.aggregate(total_paid=Sum('amount'))['total_paid'] or 0
-        return transactions_sum
+        # Payments are the only entries taking principal off what was agreed
+        return Decimal(str(self.amount_agreed)) - self.ledger_balances()[0]
 
     @property
     def extension_fees_total(self):
-        return self.extensions.aggregate(total_extension_fee=Sum('extension_fee'))['total_extension_fee'] or 0
+        # Extension fees are the only entries adding fees to what was agreed
+        return self.ledger_balances()[1] - Decimal(str(self.fee_agreed))
 
     @property
     def committee_approvements_status(self):
@@ -833,12 +972,12 @@ class Loan(models.Model):
             - If there are no recorded interactions, returns "No interactions recorded".
             - Committee members are identified as users in the "committee_members" team.
             """
-        # Check if there are any recorded approvals or rejections
-        approvals = self.committee_approvals.filter(approved=True)
-        rejections = self.committee_approvals.filter(approved=False)
-        total_interactions = approvals.count() + rejections.count()
+        # Approvals and rejections are prefetched for a whole page by core.loan_summaries, the committee is cached
+        votes = load_committee_votes(self)
+        approvals = [vote for vote in votes if vote.approved]
+        rejections = [vote for vote in votes if not vote.approved]
 
-        if total_interactions == 0:
+        if not votes:
             return "No interactions recorded"
 
         # Get lists of emails for each status
@@ -848,12 +987,11 @@ class Loan(models.Model):
             f"{rejection.member.email} \n<strong >Reason:</strong> {rejection.rejection_reason or 'No reason provided'}"
             for rejection in rejections
         ]
-        all_committee_members = User.objects.filter(teams__name="committee_members")
 
         # Exclude members who have already responded
         pending_emails = [
-            member.email for member in all_committee_members
-            if member.email not in approved_emails and member.email not in rejected_emails
+            email for email in committee_member_emails()
+            if email not in approved_emails and email not in rejected_emails
         ]
 
         # Build the status message
@@ -872,103 +1010,34 @@ class Loan(models.Model):
         return str(applicant) if applicant else 'No applicants'
 
     def notify_committee_members(self, message, subject):
-
-        from communications.utils import send_email_f  # importing it here because of the circular import
-        committee_members = User.objects.filter(teams__name='committee_members')
-
-        notification_message = ""
-        for member in committee_members:
-            # Render the HTML email template
-            email_content = render_to_string("emails/committee_notification.html", {
-                "member": member.name.strip() if member.name and member.name.strip() else member.email,
-                "application": self.application,
-                "subject": subject,
-                "message": message,
-
-            })
-
-            res = send_email_f(
-                sender=settings.DEFAULT_FROM_EMAIL,
-                recipient=member.email,
-                subject=f'Committee Approval notification',
-                message=email_content,
-                application=self.application,
-                solicitor_firm=self.application.user,
-                save_in_email_log=False
-            )
-            notification_message += f'Advancement committee approval {res}. Send to {member.email}\n'
-        try:
-            # print("Creating notification object...")
-            notification = Notification.objects.create(
-                recipient=None,
-                text=notification_message,
-                seen=False,
-                created_by=None,
-                application=self.application,
-            )
-            return True  # Return True if all emails are sent successfully
-        except Exception as e:
-            print(f"Error creating notification: {e}")
-            return False  # Return False if any error occurs
+        """Email the committee about this loan over one SMTP connection, False when the emails were not sent"""
+        from loan.committee_notifier import send_committee_emails  # importing it here because of the circular import
+        return send_committee_emails([(self, message, subject)])
 
     @property
     def finance_checklist_complete(self):
-        from finance_checklist.models import ChecklistConfiguration, FinanceChecklistItem, LoanChecklistItemCheck
         """Check if finance checklist is complete for this loan"""
-        config = ChecklistConfiguration.objects.filter(is_active=True).first()
-        if not config:
-            return False
-
-        # Get all active checklist items
-        active_items = FinanceChecklistItem.objects.filter(is_active=True)
-        if not active_items.exists():
-            return False
-
-        # Get all submissions for this loan
-        submissions = self.checklist_submissions.all()
-
-        # Check if we have enough unique users who submitted
-        unique_submitters = submissions.values_list('submitted_by', flat=True).distinct()
-        if len(unique_submitters) < config.required_approvers:
-            return False
-
-        # Check if all required items are checked by required number of users
-        for item in active_items:
-            # Count how many different users checked this item
-            users_who_checked = LoanChecklistItemCheck.objects.filter(
-                submission__loan=self,
-                checklist_item=item,
-                is_checked=True
-            ).values_list('submission__submitted_by', flat=True).distinct()
-
-            if len(users_who_checked) < config.required_approvers:
-                return False
-
-        return True
+        return is_checklist_complete(load_checklist_submissions(self))
 
     @property
     def checklist_submissions_summary(self):
         """Get summary of checklist submissions"""
-        from finance_checklist.models import ChecklistConfiguration, FinanceChecklistItem
-        submissions = self.checklist_submissions.all().select_related('submitted_by')
-        config = ChecklistConfiguration.objects.filter(is_active=True).first()
+        submissions = load_checklist_submissions(self)
+        required_approvers, active_item_ids = checklist_configuration()
 
         summary = {
-            'total_submissions': submissions.count(),
-            'required_submissions': config.required_approvers if config else 1,
-            'is_complete': self.finance_checklist_complete,
+            'total_submissions': len(submissions),
+            'required_submissions': required_approvers or 1,
+            'is_complete': is_checklist_complete(submissions),
             'submissions': []
         }
 
         for submission in submissions:
-            checked_count = submission.item_checks.filter(is_checked=True).count()
-            total_items = FinanceChecklistItem.objects.filter(is_active=True).count()
-
             summary['submissions'].append({
                 'user': submission.submitted_by.username,
                 'submitted_at': submission.submitted_at,
-                'checked_items': checked_count,
-                'total_items': total_items,
+                'checked_items': len(submission.checked_item_checks),
+                'total_items': len(active_item_ids),
                 'notes': submission.notes
             })
 
@@ -1022,6 +1091,22 @@ class Transaction(models.Model):
                                    related_name='loan_transactions_created', default=None)
     description = models.TextField(blank=True, null=True)
 
+    # The payment entry (or the adjustment / reversal) of the loan's balances ledger is written in the same
+    # transaction as the row, whether it comes from TransactionViewSet, the admin or a script
+    def save(self, *args, **kwargs):
+        from core.loan_ledger import LEDGER_PAYMENT_FIELDS, record_payment  # here because of the circular import
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None or LEDGER_PAYMENT_FIELDS.intersection(update_fields):
+                record_payment(self)
+
+    def delete(self, *args, **kwargs):
+        from core.loan_ledger import record_payment  # importing it here because of the circular import
+        with transaction.atomic():
+            record_payment(self, removed=True)
+            return super().delete(*args, **kwargs)
+
 
 class LoanExtension(models.Model):
     loan = models.ForeignKey(Loan, on_delete=models.CASCADE, related_name='extensions')
@@ -1032,6 +1117,84 @@ class LoanExtension(models.Model):
     description = models.TextField(blank=True, null=True)
     created_date = models.DateTimeField(default=timezone.now)
 
+    # Same as Transaction for the extension fee entries of the loan's balances ledger
+    def save(self, *args, **kwargs):
+        from core.loan_ledger import LEDGER_EXTENSION_FIELDS, record_extension  # here because of the circular import
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            update_fields = kwargs.get('update_fields')
+            if update_fields is None or LEDGER_EXTENSION_FIELDS.intersection(update_fields):
+                record_extension(self)
+
+    def delete(self, *args, **kwargs):
+        from core.loan_ledger import record_extension  # importing it here because of the circular import
+        with transaction.atomic():
+            record_extension(self, removed=True)
+            return super().delete(*args, **kwargs)
+
+
+class LoanLedgerEntry(models.Model):
+    """
+    One movement of a loan's balances, appended by core.loan_ledger and never updated.
+
+    Each entry carries the principal and fee balances after it, so the current balance of a loan is its last entry
+    by sequence instead of a sum over its transactions and extensions. Entries can be back-dated, so the balance at
+    a past moment is the sum of the changes effective until then (core.loan_ledger.balances_on).
+    """
+    TYPE_AGREEMENT = 'agreement'  # Amount and fee agreed, or a change of them
+    TYPE_PAYMENT = 'payment'
+    TYPE_EXTENSION_FEE = 'extension_fee'
+    TYPE_ADJUSTMENT = 'adjustment'  # Amount of a payment or extension fee edited
+    TYPE_REVERSAL = 'reversal'  # Payment or extension deleted
+    TYPE_PAID_OUT = 'paid_out'
+    TYPE_PAYOUT_CANCELLED = 'payout_cancelled'
+    TYPE_SETTLED = 'settled'
+    TYPE_SETTLEMENT_CANCELLED = 'settlement_cancelled'
+    TYPE_CHOICES = [
+        (TYPE_AGREEMENT, 'Agreement'),
+        (TYPE_PAYMENT, 'Payment'),
+        (TYPE_EXTENSION_FEE, 'Extension fee'),
+        (TYPE_ADJUSTMENT, 'Adjustment'),
+        (TYPE_REVERSAL, 'Reversal'),
+        (TYPE_PAID_OUT, 'Paid out'),
+        (TYPE_PAYOUT_CANCELLED, 'Payout cancelled'),
+        (TYPE_SETTLED, 'Settled'),
+        (TYPE_SETTLEMENT_CANCELLED, 'Settlement cancelled'),
+    ]
+
+    loan = models.ForeignKey(Loan, on_delete=models.CASCADE, related_name='ledger_entries')
+    sequence = models.PositiveIntegerField()  # Position in the loan's ledger, from 1
+    entry_type = models.CharField(max_length=25, choices=TYPE_CHOICES)
+    effective_at = models.DateTimeField(default=timezone.now)
+    principal_change = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    fee_change = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    principal_balance = models.DecimalField(max_digits=12, decimal_places=2)
+    fee_balance = models.DecimalField(max_digits=12, decimal_places=2)
+    # Record the entry comes from, the entry stays when the record is deleted (a reversal is appended first)
+    payment = models.ForeignKey(Transaction, on_delete=models.SET_NULL, null=True, blank=True,
+                                related_name='ledger_entries')
+    extension = models.ForeignKey(LoanExtension, on_delete=models.SET_NULL, null=True, blank=True,
+                                  related_name='ledger_entries')
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['loan', 'sequence']
+        verbose_name = 'Loan ledger entry'
+        verbose_name_plural = 'Loan ledger entries'
+        constraints = [
+            models.UniqueConstraint(fields=['loan', 'sequence'], name='loan_ledger_sequence_unique'),
+        ]
+        indexes = [
+            models.Index(fields=['loan', 'effective_at', 'sequence'], name='loan_ledger_effective_idx'),
+        ]
+
+    @property
+    def balance(self):
+        return self.principal_balance + self.fee_balance
+
+    def __str__(self):
+        return f'Loan {self.loan_id} #{self.sequence} {self.entry_type}: {self.balance}'
+
 
 class Notification(models.Model):
     recipient = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='notifications')
@@ -1229,6 +1392,69 @@ class InternalFile(models.Model):
         return f"{self.title} - {self.application.id}"
 
 
+class ChunkedUpload(models.Model):
+    """Upload session for a file sent in several chunks (init / append / complete)"""
+    TARGET_DOCUMENT = 'document'
+    TARGET_INTERNAL_FILE = 'internal_file'
+    TARGET_CHOICES = [
+        (TARGET_DOCUMENT, 'Document'),
+        (TARGET_INTERNAL_FILE, 'Internal File'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_COMPLETED = 'completed'
+    STATUS_ABORTED = 'aborted'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_COMPLETED, 'Completed'),
+        (STATUS_ABORTED, 'Aborted'),
+    ]
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    application = models.ForeignKey(Application, on_delete=models.CASCADE, related_name='chunked_uploads')
+    created_by = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE,
+                                   related_name='chunked_uploads')
+    target = models.CharField(max_length=20, choices=TARGET_CHOICES)
+    filename = models.CharField(max_length=255)
+    storage_name = models.CharField(max_length=500)  # Final path of the file in the storage backend
+    total_size = models.BigIntegerField()
+    chunk_size = models.PositiveIntegerField()
+    received_chunks = models.JSONField(default=dict, blank=True)  # {chunk index: sha256 hex digest}
+    metadata = models.JSONField(default=dict, blank=True)  # Fields used to create the row on completion
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    object_id = models.PositiveIntegerField(null=True, blank=True)  # Document / InternalFile created on completion
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    completed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['status', 'created_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.filename} ({self.status}) - {self.application_id}"
+
+    @property
+    def total_chunks(self):
+        return max(1, -(-self.total_size // self.chunk_size))
+
+    def expected_chunk_size(self, index):
+        """Size in bytes the chunk with the given index must have"""
+        if index < self.total_chunks - 1:
+            return self.chunk_size
+        return self.total_size - self.chunk_size * (self.total_chunks - 1)
+
+    @property
+    def missing_chunks(self):
+        return [index for index in range(self.total_chunks) if str(index) not in self.received_chunks]
+
+    def is_expired(self):
+        expiry_hours = getattr(settings, 'CHUNKED_UPLOAD_EXPIRY_HOURS', 24)
+        return now() > self.created_at + timedelta(hours=expiry_hours)
+
+
 # User model - exclude sensitive fields
 auditlog.register(
     User,
@@ -1259,7 +1485,7 @@ auditlog.register(
         'address_line_1', 'address_line_2', 'city', 'county', 'postal_code',
         'country', 'date_of_birth'
     ],
-    exclude_fields=['pps_number'],  # Exclude encrypted PPS for security
+    exclude_fields=['pps_number', 'pps_blind_index', 'search_document'],  # Exclude encrypted PPS for security
 )
 
 # Document model - track document status and types
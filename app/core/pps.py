@@ -0,0 +1,100 @@
+# core/pps.py
+
+import functools
+import hashlib
+import hmac
+import re
+
+from cryptography.fernet import Fernet, MultiFernet
+from django.conf import settings
+from django.db.models import Q
+
+PPS_RE = re.compile(r'^\d{7}[A-Z]{1,2}$')
+
+# Shown instead of the PPS number where the full number is not needed, nothing is decrypted
+PPS_MASK = '*********'
+
+
+@functools.lru_cache(maxsize=4)
+def _build_cipher(keys):
+    return MultiFernet([Fernet(key) for key in keys])
+
+
+def get_pps_cipher():
+    """Process-wide cipher for PPS numbers.
+
+    PPS_ENCRYPTION_KEYS lists the keys newest first: new values are encrypted with the first one, values
+    encrypted with an older key can still be read. Falls back to PPS_ENCRYPTION_KEY.
+    """
+    keys = getattr(settings, 'PPS_ENCRYPTION_KEYS', None) or [settings.PPS_ENCRYPTION_KEY]
+    return _build_cipher(tuple(keys))
+
+
+def _token_bytes(token):
+    return token.tobytes() if isinstance(token, memoryview) else token
+
+
+def encrypt_pps_number(pps):
+    return get_pps_cipher().encrypt(pps.encode())
+
+
+def decrypt_pps_number(token):
+    """Plain PPS number of an encrypted value, None when there is none"""
+    if not token:
+        return None
+    return get_pps_cipher().decrypt(_token_bytes(token)).decode()
+
+
+def decrypt_pps_numbers(tokens):
+    """Decrypt many values with a single cipher lookup, in the same order"""
+    cipher = get_pps_cipher()
+    return [cipher.decrypt(_token_bytes(token)).decode() if token else None for token in tokens]
+
+
+def decrypt_applicants_pps(applicants):
+    """Decrypt the PPS numbers of ``applicants`` in one pass, cached on each instance for decrypted_pps"""
+    applicants = list(applicants)
+    for applicant, pps in zip(applicants, decrypt_pps_numbers([a.pps_number for a in applicants])):
+        applicant.cache_decrypted_pps(pps)
+    return applicants
+
+
+def mask_pps(token):
+    return PPS_MASK if token else None
+
+
+def normalize_pps(pps):
+    """Canonical form used for the blind index: upper case, without spaces or dashes"""
+    return re.sub(r'[\s-]', '', pps or '').upper()
+
+
+def get_blind_index_keys():
+    """HMAC keys for the PPS blind index, the first one is used for new values.
+
+    Falls back to a key derived from PPS_ENCRYPTION_KEY so the index works without extra configuration.
+    """
+    keys = getattr(settings, 'PPS_BLIND_INDEX_KEYS', None)
+    if keys:
+        return [key.encode() if isinstance(key, str) else key for key in keys]
+    return [hmac.new(settings.PPS_ENCRYPTION_KEY.encode(), b'pps-blind-index', hashlib.sha256).digest()]
+
+
+def pps_blind_index(pps, key=None):
+    """Keyed HMAC-SHA256 of the normalized PPS number, or None for an empty value"""
+    pps = normalize_pps(pps)
+    if not pps:
+        return None
+    key = key or get_blind_index_keys()[0]
+    return hmac.new(key, pps.encode(), hashlib.sha256).hexdigest()
+
+
+def pps_search_q(search_term, prefix=''):
+    """Exact match filter on the blind index, empty Q when the term is not a PPS number.
+
+    Every configured key is tried, so rows not yet rebuilt after a key rotation are still found.
+    """
+    pps = normalize_pps(search_term)
+    if not PPS_RE.match(pps):
+        return Q()
+    digests = [pps_blind_index(pps, key) for key in get_blind_index_keys()]
+    return Q(**{f'{prefix}pps_blind_index__in': digests})
@@ -0,0 +1,29 @@
+# core/serializers.py
+
+from django.db.models.manager import BaseManager
+from rest_framework import serializers
+
+from core.pps import decrypt_applicants_pps, mask_pps
+
+
+class ApplicantListSerializer(serializers.ListSerializer):
+    """Decrypts the PPS numbers of all the applicants in one pass before serializing them"""
+
+    def to_representation(self, data):
+        applicants = list(data.all() if isinstance(data, BaseManager) else data)
+        if not getattr(self.child, 'mask_pps', False):
+            decrypt_applicants_pps(applicants)
+        return [self.child.to_representation(applicant) for applicant in applicants]
+
+
+class ApplicantPPSMixin:
+    """Writes the plain PPS number into the representation, or a mask when ``mask_pps`` is set.
+
+    Masked serializers are meant for list views, they never decrypt anything.
+    """
+    mask_pps = False
+
+    def to_representation(self, instance):
+        ret = super().to_representation(instance)
+        ret['pps_number'] = mask_pps(instance.pps_number) if self.mask_pps else instance.decrypted_pps
+        return ret
@@ -1,9 +1,19 @@
 from decimal import Decimal
 
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import m2m_changed, post_delete, post_save
 from django.dispatch import receiver
-from core.models import Loan
+from core.detail_cache import bump_application_versions
+from core.estate_totals import estate_models, refresh_estate_category
+from core.loan_summaries import invalidate_summaries
+from core.models import (Applicant, Application, ApplicationProcessingStatus, CommitteeApproval, Deceased, Dispute,
+                         Document, EstateTotals, Expense, Loan, LoanExtension, Team, Transaction, User)
+from document_emails.models import EmailCommunication
+from finance_checklist.models import ChecklistConfiguration, FinanceChecklistItem
+from core.tab_counts import invalidate_counts
 from loanbook.models import LoanBook
+from notifications.utils import broadcast_new_application
 
 
 @receiver(post_save, sender=Loan)
@@ -29,3 +39,91 @@ def create_loanbook_on_paid_out(sender, instance, **kwargs):
             estate_net_value=estate_value,
             created_at=paid_out_datetime  # Now it's a proper datetime
         )
+
+
+@receiver(post_delete, sender=Loan)
+def sync_application_stage_on_loan_delete(sender, instance, **kwargs):
+    if instance.application_id:
+        instance.application.sync_stage(loan=None)
+
+
+@receiver([post_save, post_delete], sender=Application)
+@receiver([post_save, post_delete], sender=Loan)
+def invalidate_tab_counts(sender, **kwargs):
+    invalidate_counts()
+
+
+@receiver(post_save, sender=Application)
+def push_new_application(sender, instance, created, **kwargs):
+    if created and instance.is_new:
+        transaction.on_commit(lambda: broadcast_new_application(instance))
+
+
+@receiver(post_save, sender=Application)
+def create_estate_totals(sender, instance, created, **kwargs):
+    # Start every application with empty totals, so reading its valuation never has to rebuild them
+    if created:
+        EstateTotals.objects.get_or_create(application=instance)
+
+
+ESTATE_RELATION_BY_MODEL = {model: relation for relation, model in estate_models().items()}
+
+
+def refresh_estate_totals_on_change(sender, instance, origin=None, **kwargs):
+    # Items deleted in cascade from their application go away together with its totals
+    if origin is not None and (origin.model if isinstance(origin, QuerySet) else type(origin)) is not sender:
+        return
+    if instance.application_id:
+        refresh_estate_category(instance.application_id, ESTATE_RELATION_BY_MODEL[sender])
+
+
+for estate_model in ESTATE_RELATION_BY_MODEL:
+    post_save.connect(refresh_estate_totals_on_change, sender=estate_model)
+    post_delete.connect(refresh_estate_totals_on_change, sender=estate_model)
+
+
+# (ApplicationVersion lookup, instance attribute) finding the application of each record shown in its detail
+APPLICATION_VERSION_LOOKUPS = {
+    Application: ('application', 'pk'),
+    Applicant: ('application', 'application_id'),
+    ApplicationProcessingStatus: ('application', 'application_id'),
+    Document: ('application', 'application_id'),
+    EmailCommunication: ('application', 'application_id'),
+    EstateTotals: ('application', 'application_id'),
+    Expense: ('application', 'application_id'),
+    Loan: ('application', 'application_id'),
+    Deceased: ('application__deceased', 'pk'),
+    Dispute: ('application__dispute', 'pk'),
+    CommitteeApproval: ('application__loan', 'loan_id'),
+    LoanBook: ('application__loan', 'loan_id'),
+    LoanExtension: ('application__loan', 'loan_id'),
+    Transaction: ('application__loan', 'loan_id'),
+}
+
+
+def bump_application_version_on_change(sender, instance, **kwargs):
+    lookup, attribute = APPLICATION_VERSION_LOOKUPS[sender]
+    value = getattr(instance, attribute)
+    if value is not None:
+        bump_application_versions(**{lookup: value})
+
+
+for versioned_model in APPLICATION_VERSION_LOOKUPS:
+    post_save.connect(bump_application_version_on_change, sender=versioned_model)
+    post_delete.connect(bump_application_version_on_change, sender=versioned_model)
+
+
+@receiver(m2m_changed, sender=User.teams.through)
+@receiver([post_save, post_delete], sender=Team)
+@receiver([post_save, post_delete], sender=ChecklistConfiguration)
+@receiver([post_save, post_delete], sender=FinanceChecklistItem)
+def invalidate_loan_summaries(sender, **kwargs):
+    invalidate_summaries()
+
+
+@receiver(post_delete, sender=User)
+@receiver(post_save, sender=User)
+def invalidate_loan_summaries_on_user_change(sender, update_fields=None, **kwargs):
+    # Logins only write last_login, the committee emails change with the email or when a member is removed
+    if update_fields is None or 'email' in update_fields:
+        invalidate_summaries()
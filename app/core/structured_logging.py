@@ -0,0 +1,67 @@
+# core/structured_logging.py
+
+import atexit
+import itertools
+import json
+import logging
+import logging.handlers
+import queue
+import sys
+import threading
+
+# Pass as ``extra`` on per-record debug messages (one per loan, file, line...), only one in LOG_SAMPLE_RATE of
+# them is written
+SAMPLED = {'sampled': True}
+
+# Attributes every LogRecord has, anything else was passed in ``extra`` and goes into the JSON output
+RECORD_ATTRIBUTES = set(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {'message', 'asctime', 'sampled'}
+
+
+class JSONFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message, the ``extra`` fields and the traceback"""
+
+    def format(self, record):
+        entry = {
+            'time': self.formatTime(record, '%Y-%m-%dT%H:%M:%S'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RECORD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SampleFilter(logging.Filter):
+    """Let through every ``rate``-th record logged with extra=SAMPLED, per logger, all other records untouched"""
+
+    def __init__(self, rate=100):
+        super().__init__()
+        self.rate = max(1, int(rate))
+        self.counters = {}
+        self.lock = threading.Lock()
+
+    def filter(self, record):
+        if not getattr(record, 'sampled', False) or self.rate == 1:
+            return True
+        with self.lock:
+            counter = self.counters.setdefault(record.name, itertools.count())
+            return next(counter) % self.rate == 0
+
+
+class BackgroundStreamHandler(logging.handlers.QueueHandler):
+    """
+    Hand formatted records to a thread that writes them to stderr.
+
+    Request handlers (and the daphne event loop) only format the record and put it on a queue, the stream I/O
+    happens in the listener thread. The queue is flushed when the process exits.
+    """
+
+    def __init__(self, stream=None):
+        super().__init__(queue.SimpleQueue())
+        self.listener = logging.handlers.QueueListener(self.queue, logging.StreamHandler(stream or sys.stderr))
+        self.listener.start()
+        atexit.register(self.listener.stop)
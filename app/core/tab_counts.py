@@ -0,0 +1,42 @@
+# core/tab_counts.py
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+
+VERSION_KEY = 'tab_counts:version'
+
+
+def get_counts_version():
+    version = cache.get(VERSION_KEY)
+    if version is None:
+        version = 1
+        cache.add(VERSION_KEY, version, timeout=None)
+    return version
+
+
+def invalidate_counts():
+    """Drop every cached tab count, called whenever an application or a loan is written"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, timeout=None)
+
+
+def count_tabs(queryset, tab_filters):
+    """Count every tab in one query with conditional aggregation.
+
+    ``tab_filters`` maps a tab name to the Q filter of its list, a ``total`` of the whole queryset is added.
+    """
+    aggregates = {name: Count('id', filter=condition) for name, condition in tab_filters.items()}
+    return queryset.aggregate(total=Count('id'), **aggregates)
+
+
+def get_cached_counts(scope, queryset, tab_filters):
+    """count_tabs cached for TAB_COUNTS_CACHE_SECONDS under ``scope`` (which user / countries the counts are for)"""
+    key = f'tab_counts:{get_counts_version()}:{scope}'
+    counts = cache.get(key)
+    if counts is None:
+        counts = count_tabs(queryset, tab_filters)
+        cache.set(key, counts, timeout=getattr(settings, 'TAB_COUNTS_CACHE_SECONDS', 30))
+    return counts
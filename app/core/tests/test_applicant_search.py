@@ -0,0 +1,138 @@
+"""
+Tests for the applicant search service
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.db.models import QuerySet
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.applicant_search import build_search_document, search_application_ids, search_applications
+from core.models import Applicant, Application, Loan, Team
+
+
+class SearchDocumentTests(TestCase):
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(email='solicitor@example.com', password='pass', country='IE')
+        self.application = Application.objects.create(user=user, amount=1000, term=12)
+
+    def test_document_is_normalized(self):
+        applicant = Applicant(first_name='Siobhán', last_name="O'Brien", email='S.OBrien@Example.com',
+                              phone_number='087 123 4567', city='  Galway ', county='Galway')
+
+        self.assertEqual(build_search_document(applicant),
+                         "siobhan o'brien s.obrien@example.com 0871234567 galway galway")
+
+    def test_save_updates_document(self):
+        applicant = Applicant.objects.create(application=self.application, title='Mr', first_name='John',
+                                             last_name='Doe')
+
+        applicant.last_name = 'Murphy'
+        applicant.save(update_fields=['last_name'])
+
+        applicant.refresh_from_db()
+        self.assertEqual(applicant.search_document, 'john murphy')
+
+
+@patch('core.applicant_search._trigram_available', {'default': False})
+class SearchServiceTests(TestCase):
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(email='solicitor@example.com', password='pass', country='IE')
+        self.murphy = Application.objects.create(user=user, amount=1000, term=12)
+        Applicant.objects.create(application=self.murphy, title='Mr', first_name='John', last_name='Murphy',
+                                 phone_number='087 123 4567', county='Cork')
+        Applicant.objects.create(application=self.murphy, title='Ms', first_name='Mary', last_name='Murphy')
+        self.kelly = Application.objects.create(user=user, amount=1000, term=12)
+        Applicant.objects.create(application=self.kelly, title='Ms', first_name='Siobhan', last_name='Kelly',
+                                 email='siobhan@example.com', county='Cork', pps_number='1234567TA')
+
+    def test_matches_each_application_once(self):
+        self.assertEqual(search_application_ids('murphy'), [self.murphy.id])
+
+    def test_case_is_ignored(self):
+        self.assertEqual(search_application_ids('SIOBHAN'), [self.kelly.id])
+
+    def test_phone_with_different_spacing(self):
+        self.assertEqual(search_application_ids('0871 234567'), [self.murphy.id])
+
+    def test_pps_number(self):
+        self.assertEqual(search_application_ids('1234567ta'), [self.kelly.id])
+
+    def test_newest_first_without_trigram(self):
+        self.assertEqual(search_application_ids('cork'), [self.kelly.id, self.murphy.id])
+
+    def test_search_applications_keeps_rank_order(self):
+        with patch('core.applicant_search.search_application_ids', return_value=[self.murphy.id, self.kelly.id]):
+            results = search_applications(Application.objects.order_by('-id'), 'cork')
+
+            self.assertEqual(list(results), [self.murphy, self.kelly])
+
+    @override_settings(APPLICANT_SEARCH_LIMIT=2)
+    def test_limit_applies_within_the_callers_applications(self):
+        other_firm = get_user_model().objects.create_user(email='other@example.com', password='pass', country='IE')
+        for _ in range(3):
+            # Newer, so ranked before the caller's match without trigram
+            application = Application.objects.create(user=other_firm, amount=1000, term=12)
+            Applicant.objects.create(application=application, title='Mr', first_name='Sean', last_name='Murphy')
+
+        self.assertNotIn(self.murphy.id, search_application_ids('murphy'))
+        results = search_applications(Application.objects.exclude(user=other_firm), 'murphy')
+
+        self.assertEqual(list(results), [self.murphy])
+
+    def test_no_match_returns_empty_queryset(self):
+        self.assertFalse(search_applications(Application.objects.all(), 'nobody').exists())
+
+    def test_trigram_query_is_ranked_by_similarity(self):
+        with patch('core.applicant_search._trigram_available', {'default': True}):
+            with patch.object(QuerySet, '__getitem__', autospec=True, return_value=[]) as patched:
+                search_application_ids('murphy')
+
+        sql = str(patched.call_args.args[0].query)
+        self.assertIn('%>', sql)
+        self.assertIn('WORD_SIMILARITY', sql)
+
+
+@patch('core.applicant_search._trigram_available', {'default': False})
+class SearchEndpointTests(TestCase):
+
+    def setUp(self):
+        self.solicitor = get_user_model().objects.create_user(email='solicitor@example.com', password='pass',
+                                                              country='IE')
+        self.application = Application.objects.create(user=self.solicitor, amount=1000, term=12)
+        Applicant.objects.create(application=self.application, title='Mr', first_name='John', last_name='Murphy',
+                                 email='john.murphy@example.com')
+        Applicant.objects.create(application=self.application, title='Ms', first_name='Mary', last_name='Murphy')
+        other = Application.objects.create(user=self.solicitor, amount=1000, term=12)
+        Applicant.objects.create(application=other, title='Ms', first_name='Jane', last_name='Roe')
+
+        self.staff = get_user_model().objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        self.staff.teams.add(Team.objects.create(name='ie_team'))
+        self.client = APIClient()
+
+    def search(self, url_name, search_term):
+        response = self.client.get(reverse(url_name), {'search_term': search_term})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [result['id'] for result in response.data['results']]
+
+    def test_agent_search(self):
+        self.client.force_authenticate(user=self.staff)
+
+        self.assertEqual(self.search('agents_loan:agent_application-list', 'Murphy'), [self.application.id])
+
+    def test_solicitor_search(self):
+        self.client.force_authenticate(user=self.solicitor)
+
+        self.assertEqual(self.search('solicitors_loan:solicitor_application-list', 'john.murphy@'),
+                         [self.application.id])
+
+    def test_loan_search(self):
+        loan = Loan.objects.create(application=self.application, amount_agreed=1000, fee_agreed=100)
+        self.client.force_authenticate(user=self.staff)
+
+        self.assertEqual(self.search('loans:loan-list', 'mary'), [loan.id])
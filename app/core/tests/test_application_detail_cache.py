@@ -0,0 +1,119 @@
+"""
+Tests for the versioned application detail cache
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.detail_cache import get_application_version
+from core.loan_summaries import COMMITTEE_TEAM
+from core.models import Applicant, Application, Deceased, Expense, FinancialAsset, Loan, Team, Transaction
+
+
+class DetailCacheTestMixin:
+
+    def setUp(self):
+        cache.clear()
+        self.solicitor = get_user_model().objects.create_user(email='solicitor@example.com', password='pass',
+                                                              country='IE')
+        self.deceased = Deceased.objects.create(first_name='John', last_name='Doe')
+        self.application = Application.objects.create(user=self.solicitor, amount=1000, term=12,
+                                                      deceased=self.deceased)
+        Applicant.objects.create(application=self.application, title='Mr', first_name='Jim', last_name='Doe',
+                                 pps_number='1234567TA')
+        self.url = reverse(self.detail_url, args=[self.application.id])
+        self.client = APIClient()
+
+    def get(self, **headers):
+        response = self.client.get(self.url, **headers)
+        self.assertIn(response.status_code, [status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED])
+        return response
+
+    def count_queries(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.get()
+        return len(queries)
+
+    def test_cached_response_skips_serialization(self):
+        first = self.count_queries()
+        second = self.count_queries()
+
+        self.assertLess(second, first)
+        self.assertEqual(self.get().data, self.get().data)
+
+    def test_not_modified(self):
+        etag = self.get()['ETag']
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_related_writes_change_the_version(self):
+        writes = [
+            lambda: Applicant.objects.create(application=self.application, title='Ms', first_name='Ann',
+                                             last_name='Doe'),
+            lambda: Expense.objects.create(application=self.application, description='Fees', value=10),
+            lambda: Deceased.objects.filter(pk=self.deceased.pk).first().save(),
+            lambda: FinancialAsset.objects.create(application=self.application, value=Decimal('5.00')),
+        ]
+        for write in writes:
+            etag = self.get()['ETag']
+            write()
+            self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_new_data_is_served_after_a_write(self):
+        self.get()
+
+        Expense.objects.create(application=self.application, description='Fees', value=10)
+
+        self.assertEqual(len(self.get().data['expenses']), 1)
+
+
+class AgentDetailCacheTests(DetailCacheTestMixin, TestCase):
+    detail_url = 'agents_loan:agent_application-detail'
+
+    def setUp(self):
+        super().setUp()
+        staff = get_user_model().objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        staff.teams.add(Team.objects.create(name='ie_team'))
+        self.client.force_authenticate(user=staff)
+
+    def test_loan_child_writes_change_the_version(self):
+        loan = Loan.objects.create(application=self.application, amount_agreed=1000, fee_agreed=100)
+        version = get_application_version(self.application.id)
+
+        Transaction.objects.create(loan=loan, amount=100, created_by=loan.application.user)
+
+        self.assertEqual(get_application_version(self.application.id), version + 1)
+
+    def test_committee_changes_change_the_response(self):
+        Loan.objects.create(application=self.application, amount_agreed=1000, fee_agreed=100)
+        etag = self.get()['ETag']
+        member = get_user_model().objects.create_user(email='member@example.com', password='pass', is_staff=True)
+
+        member.teams.add(Team.objects.create(name=COMMITTEE_TEAM))
+
+        self.assertEqual(self.get(HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+
+class SolicitorDetailCacheTests(DetailCacheTestMixin, TestCase):
+    detail_url = 'solicitors_loan:solicitor_application-detail'
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.solicitor)
+
+    def test_other_solicitors_are_still_refused(self):
+        self.get()
+        other = get_user_model().objects.create_user(email='other@example.com', password='pass', country='IE')
+        self.client.force_authenticate(user=other)
+
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_404_NOT_FOUND)
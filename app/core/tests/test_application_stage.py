@@ -0,0 +1,198 @@
+"""
+Tests for the denormalized application lifecycle stage
+"""
+import itertools
+from datetime import date
+from importlib import import_module
+from io import StringIO
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db.models import Q
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Application, Loan, Team
+
+# The status filters the application lists used before the stage column, kept here as the reference
+NOT_PAID_OUT = Q(loan__is_paid_out=False) | Q(loan__is_paid_out=True, loan__paid_out_date__isnull=True)
+COMMITTEE_OK = Q(loan__needs_committee_approval=False) | Q(loan__needs_committee_approval=True,
+                                                           loan__is_committee_approved=True)
+AGENT_FILTERS = {
+    'active': Q(is_rejected=False, approved=False) | Q(
+        approved=True, loan__isnull=False, loan__needs_committee_approval=True,
+        loan__is_committee_approved__isnull=True,
+    ),
+    'rejected': Q(is_rejected=True) | Q(
+        is_rejected=False, approved=True, loan__isnull=False, loan__needs_committee_approval=True,
+        loan__is_committee_approved=False,
+    ),
+    'approved': Q(approved=True, loan__isnull=False) & COMMITTEE_OK & NOT_PAID_OUT & Q(loan__is_settled=False),
+    'paid_out': Q(approved=True, loan__isnull=False, loan__paid_out_date__isnull=False) & COMMITTEE_OK & Q(
+        loan__is_paid_out=True, loan__is_settled=False),
+    'settled': Q(approved=True, loan__isnull=False) & COMMITTEE_OK & Q(loan__is_paid_out=True, loan__is_settled=True),
+}
+SOLICITOR_FILTERS = {
+    **AGENT_FILTERS,
+    'active': AGENT_FILTERS['active'] | Q(
+        approved=True, loan__isnull=False, loan__is_paid_out=True, loan__paid_out_date__isnull=True
+    ),
+}
+
+
+class StageParityTests(TestCase):
+    """Every combination of flags must land in the same list as with the old filters"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(email='solicitor@example.com', password='pass', country='IE')
+
+        loans = []
+        for is_rejected, approved in itertools.product([False, True], repeat=2):
+            applications = [Application.objects.create(user=cls.user, amount=1000, term=12)]
+            for needs_committee, committee, paid_out, paid_out_date, settled in itertools.product(
+                    [False, True], [None, False, True], [False, True], [None, date(2024, 1, 1)], [False, True]):
+                application = Application.objects.create(user=cls.user, amount=1000, term=12)
+                applications.append(application)
+                loans.append(Loan(
+                    application=application, amount_agreed=1000, fee_agreed=100,
+                    needs_committee_approval=needs_committee, is_committee_approved=committee,
+                    is_paid_out=paid_out, paid_out_date=paid_out_date, is_settled=settled,
+                ))
+            Application.objects.filter(id__in=[application.id for application in applications]).update(
+                is_rejected=is_rejected, approved=approved
+            )
+
+        # bulk_create and update() skip save(), the backfill command brings the stage up to date
+        Loan.objects.bulk_create(loans)
+        call_command('backfill_application_stage', stdout=StringIO())
+
+    def assert_parity(self, legacy_filters, status_stages):
+        legacy = {name: set(Application.objects.filter(q).values_list('id', flat=True))
+                  for name, q in legacy_filters.items()}
+        current = {name: set(Application.objects.filter(stage__in=stages).values_list('id', flat=True))
+                   for name, stages in status_stages.items()}
+
+        for application_id in Application.objects.values_list('id', flat=True):
+            legacy_lists = {name for name, ids in legacy.items() if application_id in ids}
+            current_lists = {name for name, ids in current.items() if application_id in ids}
+            if len(legacy_lists) <= 1:
+                self.assertEqual(current_lists, legacy_lists, application_id)
+            else:
+                # Contradictory flags used to show up in several lists, the stage picks one of them
+                self.assertEqual(len(current_lists), 1, application_id)
+                self.assertTrue(current_lists <= legacy_lists, application_id)
+
+    def test_every_combination_is_covered(self):
+        self.assertEqual(Application.objects.count(), 4 * 49)
+        self.assertEqual(Application.objects.filter(is_rejected=True, approved=True).count(), 49)
+
+    def test_agent_lists_match_legacy_filters(self):
+        self.assert_parity(AGENT_FILTERS, Application.AGENT_STATUS_STAGES)
+
+    def test_solicitor_lists_match_legacy_filters(self):
+        self.assert_parity(SOLICITOR_FILTERS, Application.SOLICITOR_STATUS_STAGES)
+
+    def test_backfill_is_idempotent(self):
+        stages = dict(Application.objects.values_list('id', 'stage'))
+
+        call_command('backfill_application_stage', stdout=StringIO())
+
+        self.assertEqual(dict(Application.objects.values_list('id', 'stage')), stages)
+
+    def test_migration_backfill_matches_the_model(self):
+        stages = dict(Application.objects.values_list('id', 'stage'))
+        Application.objects.update(stage=Application.STAGE_ACTIVE, country=None)
+
+        migration = import_module('core.migrations.0107_application_stage')
+        migration.populate_stage_and_country(apps, None)
+
+        self.assertEqual(dict(Application.objects.values_list('id', 'stage')), stages)
+        self.assertEqual(set(Application.objects.values_list('country', flat=True)), {self.user.country})
+
+
+class StageSyncTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='solicitor@example.com', password='pass', country='IE')
+        self.application = Application.objects.create(user=self.user, amount=1000, term=12)
+
+    def refresh(self):
+        self.application.refresh_from_db()
+        return self.application
+
+    def test_new_application_is_active_and_copies_country(self):
+        self.assertEqual(self.refresh().stage, Application.STAGE_ACTIVE)
+        self.assertEqual(self.application.country, 'IE')
+
+    def test_rejecting_application(self):
+        self.application.is_rejected = True
+        self.application.save(update_fields=['is_rejected'])
+
+        self.assertEqual(self.refresh().stage, Application.STAGE_REJECTED)
+
+    def test_loan_lifecycle(self):
+        loan = Loan.objects.create(application=self.application, amount_agreed=1000, fee_agreed=100)
+        self.assertEqual(self.refresh().stage, Application.STAGE_APPROVED)
+
+        loan.is_paid_out = True
+        loan.save()
+        self.assertEqual(self.refresh().stage, Application.STAGE_PAID_OUT_PENDING)
+
+        loan.is_settled = True
+        loan.save()
+        self.assertEqual(self.refresh().stage, Application.STAGE_SETTLED)
+
+    def test_loan_pending_committee_approval_stays_active(self):
+        loan = Loan(application=self.application, amount_agreed=1000, fee_agreed=100)
+        loan.save()
+        Loan.objects.filter(pk=loan.pk).update(needs_committee_approval=True, is_committee_approved=None)
+        loan.refresh_from_db()
+
+        self.application.sync_stage(loan=loan)
+
+        self.assertEqual(self.refresh().stage, Application.STAGE_ACTIVE)
+
+    def test_user_country_change_is_copied(self):
+        self.user.country = 'UK'
+        self.user.save()
+
+        self.assertEqual(self.refresh().country, 'UK')
+
+
+class StageListTests(TestCase):
+
+    def setUp(self):
+        self.solicitor = get_user_model().objects.create_user(email='solicitor@example.com', password='pass',
+                                                              country='IE')
+        self.active = Application.objects.create(user=self.solicitor, amount=1000, term=12)
+        self.pending_payout = Application.objects.create(user=self.solicitor, amount=1000, term=12)
+        Loan.objects.create(application=self.pending_payout, amount_agreed=1000, fee_agreed=100, is_paid_out=True)
+        self.client = APIClient()
+
+    def list_ids(self, url_name, stat):
+        response = self.client.get(reverse(url_name), {'status': stat})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [application['id'] for application in response.data['results']]
+
+    def test_agent_list_filters_by_stage_and_team_country(self):
+        staff = get_user_model().objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        staff.teams.add(Team.objects.create(name='ie_team'))
+        uk_solicitor = get_user_model().objects.create_user(email='uk@example.com', password='pass', country='UK')
+        Application.objects.create(user=uk_solicitor, amount=1000, term=12)
+        self.client.force_authenticate(user=staff)
+
+        self.assertEqual(self.list_ids('agents_loan:agent_application-list', 'active'), [self.active.id])
+        self.assertEqual(self.list_ids('agents_loan:agent_application-list', 'approved'), [self.pending_payout.id])
+
+    def test_solicitor_active_list_includes_pending_payouts(self):
+        self.client.force_authenticate(user=self.solicitor)
+
+        self.assertEqual(
+            self.list_ids('solicitors_loan:solicitor_application-list', 'active'),
+            [self.pending_payout.id, self.active.id],
+        )
+        self.assertEqual(self.list_ids('solicitors_loan:solicitor_application-list', 'approved'), [])
@@ -0,0 +1,260 @@
+"""
+Tests for the chunked upload API
+"""
+import hashlib
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.chunked_uploads import cleanup_expired_uploads
+from core.models import Application, ChunkedUpload, Deceased, Document, InternalFile
+
+CHUNK_SIZE = 8
+ALLOWED_FILE_EXTENSIONS = ['.pdf']
+
+
+def checksum(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+class ChunkedUploadTestMixin:
+    url_prefix = None
+    content = b'%PDF-1.4 scanned will content'  # 29 bytes -> 4 chunks
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+
+        settings_override = override_settings(
+            MEDIA_ROOT=self.media_root,
+            CHUNKED_UPLOAD_CHUNK_SIZE=CHUNK_SIZE,
+            ALLOWED_FILE_EXTENSIONS=ALLOWED_FILE_EXTENSIONS,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        extensions_patch = patch('core.Validators.validate_file_size.ALLOWED_FILE_EXTENSIONS', ALLOWED_FILE_EXTENSIONS)
+        extensions_patch.start()
+        self.addCleanup(extensions_patch.stop)
+
+    def url(self, suffix, *args):
+        return reverse(f'{self.url_prefix}{suffix}', args=[self.application.id, *args])
+
+    def start(self, **fields):
+        payload = {'filename': 'will.pdf', 'total_size': len(self.content), **fields}
+        return self.client.post(self.url(''), payload, format='json')
+
+    def send_chunk(self, upload_id, index, data=None, digest=None):
+        if data is None:
+            data = self.content[index * CHUNK_SIZE:(index + 1) * CHUNK_SIZE]
+        return self.client.put(
+            self.url('-chunk', upload_id, index), data=data, content_type='application/octet-stream',
+            HTTP_X_CHUNK_CHECKSUM=digest or checksum(data),
+        )
+
+    def upload_all(self, **fields):
+        upload_id = self.start(**fields).data['upload_id']
+        for index in range(4):
+            self.assertEqual(self.send_chunk(upload_id, index).status_code, status.HTTP_200_OK)
+        return upload_id
+
+
+class AgentChunkedUploadTests(ChunkedUploadTestMixin, TestCase):
+    url_prefix = 'agents_loan:agent_application-chunked-upload'
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        deceased = Deceased.objects.create(first_name='John', last_name='Doe')
+        self.application = Application.objects.create(user=self.user, amount=1000, term=12, deceased=deceased)
+
+    def test_start_upload(self):
+        response = self.start(is_signed=True)
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['total_chunks'], 4)
+        self.assertEqual(response.data['missing_chunks'], [0, 1, 2, 3])
+        upload = ChunkedUpload.objects.get(id=response.data['upload_id'])
+        self.assertEqual(upload.metadata, {'is_signed': True})
+        self.assertTrue(upload.storage_name.startswith('uploads/application/'))
+
+    def test_start_upload_rejects_invalid_extension(self):
+        response = self.start(filename='will.exe')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(ChunkedUpload.objects.exists())
+
+    def test_start_upload_rejects_oversized_file(self):
+        response = self.start(total_size=500 * 1024 * 1024)
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_chunk_with_bad_checksum_is_rejected(self):
+        upload_id = self.start().data['upload_id']
+
+        response = self.send_chunk(upload_id, 0, digest=checksum(b'something else'))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(ChunkedUpload.objects.get(id=upload_id).received_chunks, {})
+
+    def test_chunk_with_wrong_size_is_rejected(self):
+        upload_id = self.start().data['upload_id']
+
+        response = self.send_chunk(upload_id, 0, data=b'short')
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_status_lists_missing_chunks_for_resume(self):
+        upload_id = self.start().data['upload_id']
+        self.send_chunk(upload_id, 2)
+        self.send_chunk(upload_id, 0)
+
+        response = self.client.get(self.url('-detail', upload_id))
+
+        self.assertEqual(response.data['received_chunks'], [0, 2])
+        self.assertEqual(response.data['missing_chunks'], [1, 3])
+
+    def test_complete_requires_every_chunk(self):
+        upload_id = self.start().data['upload_id']
+        self.send_chunk(upload_id, 0)
+
+        response = self.client.post(self.url('-complete', upload_id))
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Document.objects.exists())
+
+    def test_complete_creates_document(self):
+        upload_id = self.upload_all(is_signed=True)
+        self.assertFalse(Document.objects.exists())
+
+        response = self.client.post(self.url('-complete', upload_id))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        document = Document.objects.get(application=self.application)
+        self.assertTrue(document.is_signed)
+        self.assertEqual(document.original_name, 'will')
+        self.assertEqual(document.uploaded_by, self.user)
+        with document.document.open('rb') as stored:
+            self.assertEqual(stored.read(), self.content)
+
+        upload = ChunkedUpload.objects.get(id=upload_id)
+        self.assertEqual(upload.status, ChunkedUpload.STATUS_COMPLETED)
+        self.assertEqual(upload.object_id, document.id)
+
+        response = self.send_chunk(upload_id, 0)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_complete_can_be_retried_when_creating_the_row_fails(self):
+        upload_id = self.upload_all()
+
+        with patch('agents_loan.views.AgentChunkedDocumentUploadViewSet.save_record', side_effect=RuntimeError):
+            with self.assertRaises(RuntimeError):
+                self.client.post(self.url('-complete', upload_id))
+        self.assertFalse(Document.objects.exists())
+        self.assertEqual(ChunkedUpload.objects.get(id=upload_id).status, ChunkedUpload.STATUS_PENDING)
+
+        response = self.client.post(self.url('-complete', upload_id))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        with Document.objects.get().document.open('rb') as stored:
+            self.assertEqual(stored.read(), self.content)
+
+    def test_resent_chunk_replaces_previous_one(self):
+        upload_id = self.start().data['upload_id']
+        self.send_chunk(upload_id, 0, data=b'XXXXXXXX')
+        for index in range(4):
+            self.send_chunk(upload_id, index)
+
+        self.client.post(self.url('-complete', upload_id))
+
+        with Document.objects.get().document.open('rb') as stored:
+            self.assertEqual(stored.read(), self.content)
+
+    def test_abort_discards_chunks(self):
+        upload_id = self.start().data['upload_id']
+        self.send_chunk(upload_id, 0)
+
+        response = self.client.delete(self.url('-detail', upload_id))
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.assertEqual(ChunkedUpload.objects.get(id=upload_id).status, ChunkedUpload.STATUS_ABORTED)
+        self.assertFalse(os.listdir(os.path.join(self.media_root, 'chunked_uploads')))
+
+    def test_upload_of_another_user_is_not_found(self):
+        upload_id = self.start().data['upload_id']
+        other = get_user_model().objects.create_user(email='other@example.com', password='pass', is_staff=True)
+        self.client.force_authenticate(user=other)
+
+        response = self.client.get(self.url('-detail', upload_id))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_cleanup_aborts_expired_uploads(self):
+        upload_id = self.start().data['upload_id']
+        self.send_chunk(upload_id, 0)
+
+        with override_settings(CHUNKED_UPLOAD_EXPIRY_HOURS=-1):
+            self.assertEqual(cleanup_expired_uploads(), 1)
+
+        self.assertEqual(ChunkedUpload.objects.get(id=upload_id).status, ChunkedUpload.STATUS_ABORTED)
+
+
+class SolicitorChunkedUploadTests(ChunkedUploadTestMixin, TestCase):
+    url_prefix = 'solicitors_loan:solicitor_application-chunked-upload'
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(email='solicitor@example.com', password='pass')
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.application = Application.objects.create(user=self.user, amount=1000, term=12)
+
+    def test_complete_creates_document_and_notification(self):
+        upload_id = self.upload_all()
+
+        response = self.client.post(self.url('-complete', upload_id))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(Document.objects.filter(application=self.application).exists())
+        self.assertTrue(self.application.notifications_application.filter(text='New document uploaded').exists())
+
+    def test_application_of_another_solicitor_is_not_found(self):
+        other = get_user_model().objects.create_user(email='other@example.com', password='pass')
+        self.application = Application.objects.create(user=other, amount=1000, term=12)
+
+        response = self.start()
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class InternalFileChunkedUploadTests(ChunkedUploadTestMixin, TestCase):
+    url_prefix = 'internal-file-chunked-upload'
+
+    def setUp(self):
+        super().setUp()
+        self.user = get_user_model().objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.application = Application.objects.create(user=self.user, amount=1000, term=12)
+
+    def test_complete_creates_internal_file(self):
+        upload_id = self.upload_all(title='Grant of probate scan')
+
+        response = self.client.post(self.url('-complete', upload_id))
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        internal_file = InternalFile.objects.get(application=self.application)
+        self.assertEqual(internal_file.title, 'Grant of probate scan')
+        self.assertEqual(internal_file.uploaded_by, self.user)
+        self.assertTrue(internal_file.file.name.startswith('internal_files/'))
+        with internal_file.file.open('rb') as stored:
+            self.assertEqual(stored.read(), self.content)
@@ -0,0 +1,173 @@
+"""
+Tests for the streaming download service
+"""
+import shutil
+import tempfile
+from unittest.mock import MagicMock, patch
+
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage
+from django.test import AsyncRequestFactory, RequestFactory, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.downloads import RangeNotSatisfiable, StorageFileResponse, parse_range, serve_file
+from core.models import Application, Document, InternalFile
+
+CONTENT = b'0123456789abcdefghij'
+
+
+def read(response):
+    return b''.join(response.streaming_content)
+
+
+class ParseRangeTests(SimpleTestCase):
+
+    def test_ranges(self):
+        self.assertEqual(parse_range('bytes=0-4', 20), (0, 4))
+        self.assertEqual(parse_range('bytes=5-', 20), (5, 19))
+        self.assertEqual(parse_range('bytes=-5', 20), (15, 19))
+        self.assertEqual(parse_range('bytes=10-100', 20), (10, 19))
+
+    def test_unsupported_ranges_serve_whole_file(self):
+        self.assertIsNone(parse_range('bytes=0-1,4-5', 20))
+        self.assertIsNone(parse_range('items=0-1', 20))
+
+    def test_unsatisfiable_ranges(self):
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_range('bytes=20-', 20)
+        with self.assertRaises(RangeNotSatisfiable):
+            parse_range('bytes=-0', 20)
+
+
+class ServeFileTests(SimpleTestCase):
+
+    def setUp(self):
+        self.location = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.location, ignore_errors=True)
+        self.storage = FileSystemStorage(location=self.location)
+        self.name = self.storage.save('uploads/report.pdf', ContentFile(CONTENT))
+        self.factory = RequestFactory()
+
+    def test_streams_whole_file(self):
+        response = serve_file(self.factory.get('/'), self.storage, self.name)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(read(response), CONTENT)
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertEqual(response['Content-Type'], 'application/pdf')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('attachment; filename="report.pdf"', response['Content-Disposition'])
+        self.assertTrue(response['ETag'])
+
+    def test_range_request(self):
+        response = serve_file(self.factory.get('/', HTTP_RANGE='bytes=5-9'), self.storage, self.name)
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(read(response), CONTENT[5:10])
+        self.assertEqual(response['Content-Range'], f'bytes 5-9/{len(CONTENT)}')
+        self.assertEqual(response['Content-Length'], '5')
+
+    def test_unsatisfiable_range(self):
+        response = serve_file(self.factory.get('/', HTTP_RANGE='bytes=50-'), self.storage, self.name)
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], f'bytes */{len(CONTENT)}')
+
+    def test_asgi_requests_are_streamed_block_by_block(self):
+        async def read_blocks(response):
+            return [block async for block in response]
+
+        request = AsyncRequestFactory().get('/', headers={'Range': 'bytes=2-'})
+        with patch.object(StorageFileResponse, 'block_size', 8):
+            response = serve_file(request, self.storage, self.name)
+
+            self.assertTrue(response.is_async)
+            blocks = async_to_sync(read_blocks)(response)
+
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(blocks, [CONTENT[2:10], CONTENT[10:18], CONTENT[18:]])
+        self.assertEqual(response['Content-Length'], str(len(CONTENT) - 2))
+        self.assertIn('attachment; filename="report.pdf"', response['Content-Disposition'])
+
+    def test_wsgi_requests_are_streamed_synchronously(self):
+        self.assertFalse(serve_file(self.factory.get('/'), self.storage, self.name).is_async)
+
+    def test_if_none_match_returns_not_modified(self):
+        etag = serve_file(self.factory.get('/'), self.storage, self.name)['ETag']
+
+        response = serve_file(self.factory.get('/', HTTP_IF_NONE_MATCH=etag), self.storage, self.name)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_stale_if_range_serves_whole_file(self):
+        response = serve_file(
+            self.factory.get('/', HTTP_RANGE='bytes=0-1', HTTP_IF_RANGE='"stale"'), self.storage, self.name
+        )
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(read(response), CONTENT)
+
+    @override_settings(DOWNLOAD_SAS_REDIRECT=True)
+    def test_azure_storage_redirects_to_signed_url(self):
+        storage = MagicMock(spec=['client', '_get_valid_path', 'url'])
+        storage.url.return_value = 'https://account.blob.core.windows.net/container/report.pdf?sig=abc'
+
+        response = serve_file(self.factory.get('/'), storage, 'uploads/report.pdf')
+
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(response['Location'], storage.url.return_value)
+        self.assertEqual(storage.url.call_args.kwargs['expire'], 300)
+
+    @override_settings(DOWNLOAD_SAS_REDIRECT=True)
+    def test_local_storage_is_streamed_even_with_redirect_enabled(self):
+        response = serve_file(self.factory.get('/'), self.storage, self.name)
+
+        self.assertEqual(response.status_code, 200)
+
+
+class DownloadViewTests(TestCase):
+
+    def setUp(self):
+        self.media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.media_root, ignore_errors=True)
+        settings_override = override_settings(MEDIA_ROOT=self.media_root)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.user = get_user_model().objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+        self.application = Application.objects.create(user=self.user, amount=1000, term=12)
+
+    def test_agent_document_download_by_storage_key(self):
+        document = Document(application=self.application)
+        document.document.save('will.pdf', ContentFile(CONTENT))
+        filename = document.document.name.rsplit('/', 1)[-1]
+
+        response = self.client.get(
+            reverse('agents_loan:download-file', args=[filename]), HTTP_RANGE='bytes=0-3'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(read(response), CONTENT[:4])
+
+    def test_agent_document_download_unknown_file(self):
+        response = self.client.get(reverse('agents_loan:download-file', args=['missing.pdf']))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_internal_file_download(self):
+        internal_file = InternalFile(title='Report', application=self.application, uploaded_by=self.user)
+        internal_file.file.save('report.pdf', ContentFile(CONTENT))
+
+        response = self.client.get(reverse('internal-file-download', args=[internal_file.id]))
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Content-Type'], 'application/octet-stream')
+        self.assertEqual(read(response), CONTENT)
@@ -0,0 +1,147 @@
+"""
+Tests for the maintained estate totals
+"""
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.estate_totals import with_estate_value
+from core.models import (Application, CarsBoats, EstateTotals, FinancialAsset, IrishDebt, RealAndLeaseholdProperty,
+                         Team)
+
+
+class EstateTotalsTestMixin:
+
+    def setUp(self):
+        self.solicitor = get_user_model().objects.create_user(email='solicitor@example.com', password='pass',
+                                                              country='IE')
+        self.application = Application.objects.create(user=self.solicitor, amount=1000, term=12)
+
+    def add_items(self, application=None):
+        application = application or self.application
+        RealAndLeaseholdProperty.objects.create(application=application, value=Decimal('250000.00'))
+        FinancialAsset.objects.create(application=application, value=Decimal('1500.50'))
+        FinancialAsset.objects.create(application=application, value=Decimal('500.00'), is_asset=False)
+        IrishDebt.objects.create(application=application, value=Decimal('10000.00'))
+
+    def legacy_value(self, application):
+        """The previous implementation: two aggregates per estate relation"""
+        total = Decimal(0)
+        for model in [RealAndLeaseholdProperty, FinancialAsset, IrishDebt, CarsBoats]:
+            items = model.objects.filter(application=application)
+            total += sum(item.value or 0 for item in items if item.is_asset)
+            total -= sum(item.value or 0 for item in items if not item.is_asset)
+        return total
+
+
+class EstateTotalsTests(EstateTotalsTestMixin, TestCase):
+
+    def test_totals_follow_item_writes(self):
+        self.add_items()
+
+        totals = EstateTotals.objects.get(application=self.application)
+        self.assertEqual(totals.total_assets, Decimal('251500.50'))
+        self.assertEqual(totals.total_debts, Decimal('10500.00'))
+        self.assertEqual(totals.breakdown['financial_assets'], {'assets': '1500.50', 'debts': '500.00'})
+        self.assertEqual(self.application.value_of_the_estate_after_expenses(), self.legacy_value(self.application))
+
+    def test_update_and_delete(self):
+        self.add_items()
+        house = RealAndLeaseholdProperty.objects.get(application=self.application)
+
+        house.value = Decimal('300000.00')
+        house.save()
+        self.assertEqual(self.application.value_of_the_estate_after_expenses(), Decimal('291000.50'))
+
+        house.delete()
+        totals = EstateTotals.objects.get(application=self.application)
+        self.assertNotIn('real_and_leasehold', totals.breakdown)
+        self.assertEqual(totals.net_value, Decimal('-8999.50'))
+
+    def test_valuation_is_a_single_query(self):
+        self.add_items()
+
+        with self.assertNumQueries(1):
+            self.application.value_of_the_estate_after_expenses()
+
+    def test_new_application_starts_with_empty_totals(self):
+        totals = EstateTotals.objects.get(application=self.application)
+
+        self.assertEqual((totals.total_assets, totals.total_debts, totals.breakdown), (0, 0, {}))
+        with self.assertNumQueries(1):
+            self.assertEqual(self.application.value_of_the_estate_after_expenses(), 0)
+
+    def test_missing_totals_are_computed_without_writing(self):
+        self.add_items()
+        EstateTotals.objects.all().delete()
+
+        self.assertEqual(self.application.value_of_the_estate_after_expenses(), Decimal('241000.50'))
+        self.assertFalse(EstateTotals.objects.exists())
+
+    def test_application_delete_cascades(self):
+        self.add_items()
+
+        self.application.delete()
+
+        self.assertFalse(EstateTotals.objects.exists())
+
+    def test_sort_by_estate_value(self):
+        richer = Application.objects.create(user=self.solicitor, amount=1000, term=12)
+        RealAndLeaseholdProperty.objects.create(application=richer, value=Decimal('900000.00'))
+        self.add_items()
+        empty = Application.objects.create(user=self.solicitor, amount=1000, term=12)
+
+        ordered = with_estate_value(Application.objects.all()).order_by('-estate_value')
+        self.assertEqual([a.id for a in ordered], [richer.id, self.application.id, empty.id])
+
+        staff = get_user_model().objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        staff.teams.add(Team.objects.create(name='ie_team'))
+        client = APIClient()
+        client.force_authenticate(user=staff)
+        response = client.get(reverse('agents_loan:agent_application-list'), {'sort_by': 'estate_value'})
+        self.assertEqual([a['id'] for a in response.data['results']], [empty.id, self.application.id, richer.id])
+
+
+class EstateViewSetTotalsTests(EstateTotalsTestMixin, TestCase):
+
+    def test_viewset_writes_update_totals(self):
+        client = APIClient()
+        client.force_authenticate(user=self.solicitor)
+
+        response = client.post('/api/estates/cars_boats/', {'application': self.application.id, 'value': '12000.00'},
+                               format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(self.application.value_of_the_estate_after_expenses(), Decimal('12000.00'))
+
+        response = client.patch(f"/api/estates/cars_boats/{response.data['id']}/", {'is_asset': False}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.application.value_of_the_estate_after_expenses(), Decimal('-12000.00'))
+
+
+class ReconcileEstateTotalsTests(EstateTotalsTestMixin, TestCase):
+
+    def reconcile(self, *args):
+        out = StringIO()
+        call_command('reconcile_estate_totals', *args, stdout=out)
+        return out.getvalue()
+
+    def test_repairs_drift_and_missing_rows(self):
+        self.add_items()
+        other = Application.objects.create(user=self.solicitor, amount=1000, term=12)
+        FinancialAsset.objects.filter(application=self.application).update(value=Decimal('1.00'))
+        EstateTotals.objects.filter(application=other).delete()
+
+        output = self.reconcile('--dry-run')
+        self.assertIn('1 totals created, 1 corrected', output)
+        self.assertFalse(EstateTotals.objects.filter(application=other).exists())
+
+        self.reconcile()
+        self.assertEqual(self.application.value_of_the_estate_after_expenses(), self.legacy_value(self.application))
+        self.assertEqual(EstateTotals.objects.get(application=other).net_value, 0)
+        self.assertIn('0 totals created, 0 corrected', self.reconcile())
@@ -0,0 +1,67 @@
+"""
+Tests for the consolidated estates_by_application endpoint
+"""
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Application, DebtOwed, FinancialAsset, IrishDebt, RealAndLeaseholdProperty
+from estates.serializers import FinancialAssetSerializer, RealAndLeaseholdSerializer
+
+
+class EstatesByApplicationTests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='solicitor@example.com', password='pass', country='IE')
+        self.application = Application.objects.create(user=self.user, amount=1000, term=12)
+        RealAndLeaseholdProperty.objects.create(application=self.application, address='1 Main Street',
+                                                county='Cork', nature='House', value=Decimal('250000.00'))
+        FinancialAsset.objects.create(application=self.application, institution='AIB', account_number='123',
+                                      value=Decimal('1500.50'))
+        FinancialAsset.objects.create(application=self.application, institution='BOI', value=None)
+        IrishDebt.objects.create(application=self.application, creditor='Revenue', value=Decimal('99.99'))
+
+        other = Application.objects.create(user=self.user, amount=1000, term=12)
+        DebtOwed.objects.create(application=other, debtor='Someone', value=Decimal('10.00'))
+
+        self.url = reverse('estates-by-application', args=[self.application.id])
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+    def test_matches_per_category_serializers(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['real_and_leasehold'], RealAndLeaseholdSerializer(
+            RealAndLeaseholdProperty.objects.filter(application=self.application), many=True).data)
+        self.assertEqual(response.data['financial_assets'], FinancialAssetSerializer(
+            FinancialAsset.objects.filter(application=self.application).order_by('id'), many=True).data)
+        self.assertEqual(response.data['irish_debts'][0]['value'], '99.99')
+        self.assertEqual(response.data['debts_owing'], [])
+        self.assertEqual(len(response.data), 13)
+
+    def test_single_estate_query(self):
+        with self.assertNumQueries(2):  # the application and the estate items
+            self.client.get(self.url)
+
+    def test_not_modified_until_an_item_changes(self):
+        etag = self.client.get(self.url)['ETag']
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+
+        FinancialAsset.objects.filter(institution='BOI').update(account_number='456')
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_unknown_application(self):
+        response = self.client.get(reverse('estates-by-application', args=[self.application.id + 100]))
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,151 @@
+"""
+Tests for the loan balances ledger
+"""
+import datetime
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from core.loan_ledger import balances_on, prefetch_latest_entries
+from core.models import Application, Loan, LoanExtension, LoanLedgerEntry, Transaction
+
+
+class LoanLedgerTestMixin:
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        self.loan = self.create_loan()
+
+    def create_loan(self):
+        application = Application.objects.create(user=self.user, amount=1000, term=12)
+        return Loan.objects.create(application=application, amount_agreed=Decimal('1000.00'),
+                                   fee_agreed=Decimal('150.00'), term_agreed=12)
+
+    def legacy_balance(self, loan):
+        """The previous implementation: one aggregate over the transactions and one over the extensions"""
+        paid = sum(payment.amount for payment in loan.transactions.all())
+        fees = sum(extension.extension_fee for extension in loan.extensions.all())
+        return loan.amount_agreed + loan.fee_agreed - paid + fees
+
+
+class LoanLedgerTests(LoanLedgerTestMixin, TestCase):
+
+    def test_balances_follow_payments_extensions_and_the_agreement(self):
+        payment = Transaction.objects.create(loan=self.loan, amount=Decimal('200.00'), created_by=self.user)
+        extension = LoanExtension.objects.create(loan=self.loan, extension_term_months=6,
+                                                 extension_fee=Decimal('50.00'), created_by=self.user)
+        payment.amount = Decimal('250.00')
+        payment.save()
+        self.loan.fee_agreed = Decimal('175.00')
+        self.loan.is_paid_out = True
+        self.loan.save()
+        extension.delete()
+
+        loan = Loan.objects.get(pk=self.loan.pk)
+        self.assertEqual(loan.current_balance, self.legacy_balance(loan))
+        self.assertEqual(loan.current_balance, Decimal('925.00'))
+        self.assertEqual(loan.amount_paid, Decimal('250.00'))
+        self.assertEqual(loan.extension_fees_total, Decimal('0.00'))
+        self.assertEqual(list(loan.ledger_entries.values_list('entry_type', flat=True)), [
+            LoanLedgerEntry.TYPE_AGREEMENT, LoanLedgerEntry.TYPE_PAYMENT, LoanLedgerEntry.TYPE_EXTENSION_FEE,
+            LoanLedgerEntry.TYPE_ADJUSTMENT, LoanLedgerEntry.TYPE_AGREEMENT, LoanLedgerEntry.TYPE_PAID_OUT,
+            LoanLedgerEntry.TYPE_REVERSAL,
+        ])
+
+        # Saves not touching the balances append nothing
+        loan.save(update_fields=['is_committee_approved'])
+        payment.save()
+        self.assertEqual(loan.ledger_entries.count(), 7)
+
+    def test_balances_on_a_past_date_include_back_dated_payments(self):
+        now = timezone.now()
+        LoanLedgerEntry.objects.filter(loan=self.loan).update(effective_at=now - datetime.timedelta(days=10))
+        Transaction.objects.create(loan=self.loan, amount=Decimal('300.00'), created_by=self.user)
+        # Written after the payment above, effective before it
+        back_dated = Transaction.objects.create(loan=self.loan, amount=Decimal('100.00'), created_by=self.user,
+                                                transaction_date=now - datetime.timedelta(days=2))
+        yesterday = timezone.localdate() - datetime.timedelta(days=1)
+
+        self.assertEqual(balances_on(self.loan.pk, yesterday), (Decimal('900.00'), Decimal('150.00')))
+        self.assertEqual(balances_on(self.loan.pk, timezone.now()), (Decimal('600.00'), Decimal('150.00')))
+        self.assertIsNone(balances_on(self.loan.pk, now - datetime.timedelta(days=20)))
+
+        # Moving the payment to another date moves its amount
+        back_dated.transaction_date = now - datetime.timedelta(days=5)
+        back_dated.save()
+        history = [balances_on(self.loan.pk, timezone.now() - datetime.timedelta(days=days)) for days in (6, 3, 0)]
+        self.assertEqual(history, [(Decimal('1000.00'), Decimal('150.00')), (Decimal('900.00'), Decimal('150.00')),
+                                   (Decimal('600.00'), Decimal('150.00'))])
+
+        # A rebuilt ledger has the same history
+        Loan.objects.filter(pk=self.loan.pk).update(approved_date=timezone.localdate() - datetime.timedelta(days=10))
+        call_command('rebuild_loan_ledger', '--all', stdout=StringIO())
+        self.assertEqual([balances_on(self.loan.pk, timezone.now() - datetime.timedelta(days=days))
+                          for days in (6, 3, 0)], history)
+
+    def test_saving_only_the_date_moves_the_entry(self):
+        now = timezone.now()
+        LoanLedgerEntry.objects.filter(loan=self.loan).update(effective_at=now - datetime.timedelta(days=10))
+        payment = Transaction.objects.create(loan=self.loan, amount=Decimal('100.00'), created_by=self.user)
+        extension = LoanExtension.objects.create(loan=self.loan, extension_term_months=6,
+                                                 extension_fee=Decimal('50.00'), created_by=self.user)
+
+        payment.transaction_date = extension.created_date = now - datetime.timedelta(days=5)
+        payment.save(update_fields=['transaction_date'])
+        extension.save(update_fields=['created_date'])
+
+        self.assertEqual(balances_on(self.loan.pk, now - datetime.timedelta(days=3)),
+                         (Decimal('900.00'), Decimal('200.00')))
+
+    def test_reading_a_loan_without_ledger_writes_nothing(self):
+        Transaction.objects.create(loan=self.loan, amount=Decimal('100.00'), created_by=self.user)
+        LoanLedgerEntry.objects.all().delete()
+
+        loan = Loan.objects.get(pk=self.loan.pk)
+        self.assertEqual(loan.current_balance, self.legacy_balance(loan))
+        self.assertEqual(loan.amount_paid, Decimal('100.00'))
+        self.assertFalse(LoanLedgerEntry.objects.exists())
+
+        unsaved = Loan(application=loan.application, amount_agreed=Decimal('500.00'), fee_agreed=Decimal('50.00'))
+        self.assertEqual(unsaved.current_balance, Decimal('550.00'))
+
+    def test_page_of_loans_reads_balances_from_one_query(self):
+        other = self.create_loan()
+        Transaction.objects.create(loan=other, amount=Decimal('100.00'), created_by=self.user)
+        loans = list(Loan.objects.order_by('pk'))
+
+        with self.assertNumQueries(1):
+            prefetch_latest_entries(loans)
+        with self.assertNumQueries(0):
+            balances = [loan.current_balance for loan in loans]
+
+        self.assertEqual(balances, [Decimal('1150.00'), Decimal('1050.00')])
+
+
+class RebuildLoanLedgerTests(LoanLedgerTestMixin, TestCase):
+
+    def rebuild(self, *args):
+        out = StringIO()
+        call_command('rebuild_loan_ledger', *args, stdout=out)
+        return out.getvalue()
+
+    def test_rebuilds_drifted_and_missing_ledgers(self):
+        Transaction.objects.create(loan=self.loan, amount=Decimal('100.00'), created_by=self.user)
+        Transaction.objects.filter(loan=self.loan).update(amount=Decimal('400.00'))
+        other = self.create_loan()
+        LoanLedgerEntry.objects.filter(loan=other).delete()
+
+        output = self.rebuild('--dry-run')
+        self.assertIn('2 loans checked, 2 ledgers rebuilt', output)
+        self.assertEqual(Loan.objects.get(pk=self.loan.pk).current_balance, Decimal('1050.00'))
+
+        self.rebuild()
+        loan = Loan.objects.get(pk=self.loan.pk)
+        self.assertEqual(loan.current_balance, self.legacy_balance(loan))
+        self.assertEqual(list(loan.ledger_entries.values_list('sequence', flat=True)), [1, 2])
+        self.assertTrue(LoanLedgerEntry.objects.filter(loan=other).exists())
+        self.assertIn('0 ledgers rebuilt', self.rebuild())
@@ -0,0 +1,134 @@
+"""
+Tests for the opt-in keyset pagination of the staff list endpoints
+"""
+from datetime import date
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Application, Event, Loan, LoanExtension, RealAndLeaseholdProperty, Team
+
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        self.solicitor = get_user_model().objects.create_user(email='solicitor@example.com', password='pass',
+                                                              country='IE')
+        self.applications = [Application.objects.create(user=self.solicitor, amount=1000, term=12)
+                             for _ in range(7)]
+
+        self.staff = get_user_model().objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        self.staff.teams.add(Team.objects.create(name='ie_team'))
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.staff)
+
+    def walk(self, url, params):
+        """ids of every page, following the next links"""
+        ids = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(row['id'] for row in response.data['results'])
+            if not response.data['next']:
+                return ids
+            response = self.client.get(response.data['next'])
+
+    def test_pages_follow_the_list_order(self):
+        url = reverse('agents_loan:agent_application-list')
+
+        ids = self.walk(url, {'pagination': 'cursor', 'page_size': 3})
+
+        self.assertEqual(ids, sorted((a.id for a in self.applications), reverse=True))
+
+    def test_no_count_query_unless_asked(self):
+        url = reverse('agents_loan:agent_application-list')
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url, {'pagination': 'cursor', 'page_size': 3})
+        self.assertNotIn('count', response.data)
+        self.assertFalse([q for q in queries if 'COUNT(' in q['sql']])
+
+        response = self.client.get(url, {'pagination': 'cursor', 'count': 'exact'})
+        self.assertEqual(response.data['count'], 7)
+
+        response = self.client.get(url, {'pagination': 'cursor', 'count': 'approximate'})
+        self.assertIsInstance(response.data['count'], int)
+
+    def test_mixed_directions_with_ties(self):
+        for application, value in zip(self.applications[:3], ['300.00', '100.00', '100.00']):
+            RealAndLeaseholdProperty.objects.create(application=application, value=Decimal(value))
+        url = reverse('agents_loan:agent_application-list')
+
+        ids = self.walk(url, {'pagination': 'cursor', 'page_size': 2, 'sort_by': 'estate_value'})
+
+        response = self.client.get(url, {'sort_by': 'estate_value'})
+        self.assertEqual(ids, [row['id'] for row in response.data['results']])
+
+    def test_page_number_pagination_is_unchanged(self):
+        response = self.client.get(reverse('agents_loan:agent_application-list'), {'page_size': 3})
+
+        self.assertEqual(response.data['count'], 7)
+        self.assertEqual(len(response.data['results']), 3)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(reverse('agents_loan:agent_application-list'), {'cursor': 'not-a-cursor'})
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_events_by_created_at(self):
+        for _ in range(5):
+            Event.objects.create(user='staff@example.com', method='GET', path='/')
+
+        ids = self.walk(reverse('event:events-list'), {'pagination': 'cursor', 'page_size': 2})
+
+        self.assertEqual(ids, list(Event.objects.order_by('-created_at', '-id').values_list('id', flat=True)))
+
+
+class PaidOutOrderingTests(TestCase):
+
+    def setUp(self):
+        solicitor = get_user_model().objects.create_user(email='solicitor@example.com', password='pass',
+                                                         country='IE')
+        self.staff = get_user_model().objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        self.staff.teams.add(Team.objects.create(name='ie_team'))
+
+        # Loans are created with bulk_create to skip the loan book creation on payout
+        loans = []
+        for paid_out_date, term in [(date(2024, 1, 31), 1), (date(2023, 6, 1), 12), (date(2024, 1, 1), 3),
+                                    (date(2023, 12, 31), 2)]:
+            application = Application.objects.create(user=solicitor, amount=1000, term=term, approved=True)
+            loans.append(Loan(application=application, amount_agreed=1000, fee_agreed=100, term_agreed=term,
+                              is_paid_out=True, paid_out_date=paid_out_date, is_committee_approved=True))
+        Loan.objects.bulk_create(loans)
+        for application in Application.objects.all():
+            application.save()
+        LoanExtension.objects.bulk_create([
+            LoanExtension(loan=Loan.objects.get(term_agreed=3), extension_term_months=6, extension_fee=10,
+                          created_by=self.staff),
+        ])
+
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.staff)
+
+    def test_loans_sorted_by_maturity_in_sql(self):
+        response = self.client.get(reverse('loans:loan-list'), {'status': 'paid_out', 'pagination': 'cursor',
+                                                                'page_size': 2})
+        ids = [row['id'] for row in response.data['results']]
+        ids += [row['id'] for row in self.client.get(response.data['next']).data['results']]
+
+        expected = sorted(Loan.objects.order_by('-id'), key=lambda loan: loan.maturity_date)
+        self.assertEqual(ids, [loan.id for loan in expected])
+
+    def test_agent_paid_out_tab_is_paginated(self):
+        response = self.client.get(reverse('agents_loan:agent_application-list'), {'status': 'paid_out'})
+
+        self.assertEqual(response.data['count'], 4)
+        expected = sorted(Loan.objects.order_by('-id'), key=lambda loan: loan.maturity_date)
+        self.assertEqual([row['id'] for row in response.data['results']],
+                         [loan.application_id for loan in expected])
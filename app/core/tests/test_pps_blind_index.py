@@ -0,0 +1,139 @@
+"""
+Tests for the PPS blind index
+"""
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Applicant, Application, Loan, Team
+from core.pps import normalize_pps, pps_blind_index
+
+PPS = '1234567TA'
+
+
+class BlindIndexModelTests(TestCase):
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(email='solicitor@example.com', password='pass', country='IE')
+        self.application = Application.objects.create(user=user, amount=1000, term=12)
+
+    def create_applicant(self, pps_number=PPS):
+        return Applicant.objects.create(application=self.application, title='Mr', first_name='John',
+                                        last_name='Doe', pps_number=pps_number)
+
+    def test_normalize(self):
+        self.assertEqual(normalize_pps(' 1234567 ta '), PPS)
+        self.assertEqual(normalize_pps('1234567-TA'), PPS)
+
+    def test_save_sets_blind_index(self):
+        applicant = self.create_applicant('1234567ta')
+
+        self.assertEqual(applicant.pps_blind_index, pps_blind_index(PPS))
+        self.assertNotIn(PPS, applicant.pps_blind_index)
+        self.assertEqual(applicant.decrypted_pps, '1234567ta')
+
+    def test_changing_pps_updates_blind_index(self):
+        applicant = self.create_applicant()
+
+        applicant.pps_number = '7654321AB'
+        applicant.save(update_fields=['pps_number'])
+
+        applicant.refresh_from_db()
+        self.assertEqual(applicant.pps_blind_index, pps_blind_index('7654321AB'))
+
+    def test_clearing_pps_clears_blind_index(self):
+        applicant = self.create_applicant()
+
+        applicant.pps_number = None
+        applicant.save()
+
+        self.assertIsNone(applicant.pps_blind_index)
+
+    def test_index_depends_on_key(self):
+        with override_settings(PPS_BLIND_INDEX_KEYS=['first-key']):
+            first = pps_blind_index(PPS)
+        with override_settings(PPS_BLIND_INDEX_KEYS=['second-key']):
+            second = pps_blind_index(PPS)
+
+        self.assertNotEqual(first, second)
+
+    def test_rebuild_after_key_rotation(self):
+        with override_settings(PPS_BLIND_INDEX_KEYS=['old-key']):
+            applicant = self.create_applicant()
+
+        with override_settings(PPS_BLIND_INDEX_KEYS=['new-key', 'old-key']):
+            # Old digests are still matched until the rebuild has run
+            self.assertTrue(Applicant.objects.filter(pps_blind_index__in=[
+                pps_blind_index(PPS, key) for key in [b'new-key', b'old-key']
+            ]).exists())
+
+            out = StringIO()
+            call_command('rebuild_pps_blind_index', stdout=out)
+
+            applicant.refresh_from_db()
+            self.assertEqual(applicant.pps_blind_index, pps_blind_index(PPS))
+            self.assertIn('1 of 1 applicants updated', out.getvalue())
+
+    def test_encrypt_pps_command_sets_blind_index(self):
+        applicant = self.create_applicant()
+        Applicant.objects.filter(pk=applicant.pk).update(pps_number=PPS.encode(), pps_blind_index=None)
+
+        call_command('encrypt_pps', stdout=StringIO())
+
+        applicant.refresh_from_db()
+        self.assertEqual(applicant.decrypted_pps, PPS)
+        self.assertEqual(applicant.pps_blind_index, pps_blind_index(PPS))
+
+
+class BlindIndexSearchTests(TestCase):
+
+    def setUp(self):
+        self.solicitor = get_user_model().objects.create_user(email='solicitor@example.com', password='pass',
+                                                              country='IE')
+        self.application = Application.objects.create(user=self.solicitor, amount=1000, term=12)
+        Applicant.objects.create(application=self.application, title='Mr', first_name='John', last_name='Doe',
+                                 pps_number=PPS)
+        other = Application.objects.create(user=self.solicitor, amount=1000, term=12)
+        Applicant.objects.create(application=other, title='Ms', first_name='Jane', last_name='Roe',
+                                 pps_number='7654321AB')
+
+        self.staff = get_user_model().objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        self.staff.teams.add(Team.objects.create(name='ie_team'))
+        self.client = APIClient()
+
+    def search(self, url_name, search_term):
+        response = self.client.get(reverse(url_name), {'search_term': search_term})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['results']
+
+    def test_agent_search_by_pps(self):
+        self.client.force_authenticate(user=self.staff)
+
+        results = self.search('agents_loan:agent_application-list', '1234567 ta')
+
+        self.assertEqual([application['id'] for application in results], [self.application.id])
+
+    def test_solicitor_search_by_pps(self):
+        self.client.force_authenticate(user=self.solicitor)
+
+        results = self.search('solicitors_loan:solicitor_application-list', PPS)
+
+        self.assertEqual([application['id'] for application in results], [self.application.id])
+
+    def test_loan_search_by_pps(self):
+        loan = Loan.objects.create(application=self.application, amount_agreed=1000, fee_agreed=100)
+        self.client.force_authenticate(user=self.staff)
+
+        results = self.search('loans:loan-list', PPS)
+
+        self.assertEqual([result['id'] for result in results], [loan.id])
+
+    def test_partial_pps_does_not_match(self):
+        self.client.force_authenticate(user=self.solicitor)
+
+        self.assertEqual(self.search('solicitors_loan:solicitor_application-list', '1234567'), [])
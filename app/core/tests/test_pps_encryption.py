@@ -0,0 +1,95 @@
+"""
+Tests for PPS encryption helpers and masked list representations
+"""
+from unittest.mock import patch
+
+from cryptography.fernet import Fernet
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core import pps
+from core.models import Applicant, Application
+from solicitors_loan.serializers import SolicitorApplicantSerializer, SolicitorMaskedApplicantSerializer
+
+OLD_KEY = Fernet.generate_key().decode()
+NEW_KEY = Fernet.generate_key().decode()
+
+
+class CipherTests(TestCase):
+
+    def test_cipher_is_built_once(self):
+        self.assertIs(pps.get_pps_cipher(), pps.get_pps_cipher())
+
+    def test_values_encrypted_with_previous_key_are_readable(self):
+        with override_settings(PPS_ENCRYPTION_KEYS=[OLD_KEY]):
+            token = pps.encrypt_pps_number('1234567TA')
+
+        with override_settings(PPS_ENCRYPTION_KEYS=[NEW_KEY, OLD_KEY]):
+            self.assertEqual(pps.decrypt_pps_number(token), '1234567TA')
+            new_token = pps.encrypt_pps_number('1234567TA')
+
+        with override_settings(PPS_ENCRYPTION_KEYS=[NEW_KEY]):
+            self.assertEqual(pps.decrypt_pps_number(new_token), '1234567TA')
+
+    def test_batch_decrypt_keeps_order_and_empty_values(self):
+        tokens = [pps.encrypt_pps_number('1234567TA'), None, memoryview(pps.encrypt_pps_number('7654321AB'))]
+
+        self.assertEqual(pps.decrypt_pps_numbers(tokens), ['1234567TA', None, '7654321AB'])
+
+
+class ApplicantPPSTests(TestCase):
+
+    def setUp(self):
+        user = get_user_model().objects.create_user(email='solicitor@example.com', password='pass', country='IE')
+        self.application = Application.objects.create(user=user, amount=1000, term=12)
+        for number in ['1234567TA', '7654321AB']:
+            Applicant.objects.create(application=self.application, title='Mr', first_name='John', last_name='Doe',
+                                     pps_number=number, date_of_birth='1960-01-01')
+
+    def test_decrypted_once_per_instance(self):
+        applicant = Applicant.objects.first()
+
+        with patch('core.models.decrypt_pps_number', wraps=pps.decrypt_pps_number) as patched:
+            applicant.decrypted_pps
+            applicant.decrypted_pps
+
+        self.assertEqual(patched.call_count, 1)
+
+    def test_new_value_is_not_served_from_cache(self):
+        applicant = Applicant.objects.first()
+        applicant.decrypted_pps
+
+        applicant.pps_number = '1111111A'
+        applicant.save()
+
+        self.assertEqual(applicant.decrypted_pps, '1111111A')
+
+    def test_list_serializer_decrypts_in_one_batch(self):
+        with patch('core.pps.decrypt_pps_numbers', wraps=pps.decrypt_pps_numbers) as patched:
+            data = SolicitorApplicantSerializer(self.application.applicants.all(), many=True).data
+
+        self.assertEqual(patched.call_count, 1)
+        self.assertEqual(sorted(item['pps_number'] for item in data), ['1234567TA', '7654321AB'])
+
+    def test_masked_serializer_never_decrypts(self):
+        with patch('core.pps.get_pps_cipher') as patched:
+            data = SolicitorMaskedApplicantSerializer(self.application.applicants.all(), many=True).data
+
+        patched.assert_not_called()
+        self.assertEqual([item['pps_number'] for item in data], [pps.PPS_MASK, pps.PPS_MASK])
+
+    def test_list_endpoint_masks_and_detail_endpoint_decrypts(self):
+        client = APIClient()
+        client.force_authenticate(user=self.application.user)
+
+        response = client.get(reverse('solicitors_loan:solicitor_application-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([a['pps_number'] for a in response.data['results'][0]['applicants']],
+                         [pps.PPS_MASK, pps.PPS_MASK])
+
+        response = client.get(reverse('solicitors_loan:solicitor_application-detail', args=[self.application.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sorted(a['pps_number'] for a in response.data['applicants']), ['1234567TA', '7654321AB'])
@@ -0,0 +1,68 @@
+"""
+Tests for the JSON log formatter, the sampling filter and the absence of print() in the request paths
+"""
+import ast
+import json
+import logging
+from pathlib import Path
+
+from django.apps import apps
+from django.test import SimpleTestCase
+
+from core.structured_logging import SAMPLED, JSONFormatter, SampleFilter
+
+
+def make_record(name='ccr_reporting.views', level=logging.DEBUG, msg='LoanBook %s', args=(1,), extra=None):
+    record = logging.LogRecord(name, level, __file__, 1, msg, args, None)
+    for key, value in (extra or {}).items():
+        setattr(record, key, value)
+    return record
+
+
+class SampleFilterTests(SimpleTestCase):
+
+    def test_only_sampled_records_are_thinned_per_logger(self):
+        sample_filter = SampleFilter(rate=3)
+
+        sampled = [sample_filter.filter(make_record(extra=SAMPLED)) for _ in range(7)]
+        other_logger = sample_filter.filter(make_record(name='internal_files.views', extra=SAMPLED))
+        unsampled = [sample_filter.filter(make_record()) for _ in range(3)]
+
+        self.assertEqual(sampled, [True, False, False, True, False, False, True])
+        self.assertTrue(other_logger)
+        self.assertEqual(unsampled, [True, True, True])
+
+
+class JSONFormatterTests(SimpleTestCase):
+
+    def test_one_json_object_with_extra_fields(self):
+        record = make_record(level=logging.WARNING, extra={'submission_id': 7, **SAMPLED})
+
+        entry = json.loads(JSONFormatter().format(record))
+
+        self.assertEqual((entry['level'], entry['logger'], entry['message']),
+                         ('WARNING', 'ccr_reporting.views', 'LoanBook 1'))
+        self.assertEqual(entry['submission_id'], 7)
+        self.assertNotIn('sampled', entry)
+        self.assertNotIn('exception', entry)
+
+
+class NoPrintTests(SimpleTestCase):
+
+    def test_apps_log_instead_of_printing(self):
+        """Views, serializers, services and models of the project apps write to the loggers, print() is left to
+        the management commands and the tests"""
+        base_dir = Path(apps.get_app_config('core').path).parent
+        calls = []
+        for app_config in apps.get_app_configs():
+            app_path = Path(app_config.path)
+            if base_dir not in app_path.parents:
+                continue
+            for path in app_path.rglob('*.py'):
+                if {'management', 'migrations', 'tests'} & set(path.relative_to(app_path).parts):
+                    continue
+                for node in ast.walk(ast.parse(path.read_text(encoding='utf-8'))):
+                    if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and node.func.id == 'print':
+                        calls.append(f'{path.relative_to(base_dir)}:{node.lineno}')
+
+        self.assertEqual(calls, [])
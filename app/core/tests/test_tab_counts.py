@@ -0,0 +1,135 @@
+"""
+Tests for the status tab counts endpoints
+"""
+import itertools
+from datetime import date
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Application, Loan, Team
+
+
+class TabCountsTestMixin:
+
+    def setUp(self):
+        cache.clear()
+        self.solicitor = get_user_model().objects.create_user(email='solicitor@example.com', password='pass',
+                                                              country='IE')
+        self.staff = get_user_model().objects.create_user(email='staff@example.com', password='pass', is_staff=True)
+        self.staff.teams.add(Team.objects.create(name='ie_team'))
+
+        # One application per combination of flags, loans are created with bulk_create to skip save() side effects
+        loans = []
+        for needs_committee, committee, paid_out, paid_out_date, settled in itertools.product(
+                [False, True], [None, False, True], [False, True], [None, date(2024, 1, 1)], [False, True]):
+            application = Application.objects.create(user=self.solicitor, amount=1000, term=12)
+            loans.append(Loan(
+                application=application, amount_agreed=1000, fee_agreed=100,
+                needs_committee_approval=needs_committee, is_committee_approved=committee,
+                is_paid_out=paid_out, paid_out_date=paid_out_date, is_settled=settled,
+            ))
+        Loan.objects.bulk_create(loans)
+        Application.objects.update(approved=True)
+        for application in Application.objects.all():
+            application.save()
+
+        Application.objects.create(user=self.solicitor, amount=1000, term=12)
+        rejected = Application.objects.create(user=self.solicitor, amount=1000, term=12)
+        rejected.is_rejected = True
+        rejected.save()
+
+        uk_solicitor = get_user_model().objects.create_user(email='uk@example.com', password='pass', country='UK')
+        Application.objects.create(user=uk_solicitor, amount=1000, term=12)
+
+        self.client = APIClient()
+
+    def create_row(self):
+        return Application.objects.create(user=self.solicitor, amount=1000, term=12)
+
+    def list_count(self, params):
+        response = self.client.get(reverse(self.list_url), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['count']
+
+    def get_counts(self, params=None):
+        response = self.client.get(reverse(self.counts_url), params or {})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data
+
+    def test_counts_match_list_endpoint(self):
+        counts = self.get_counts()
+
+        self.assertEqual(counts['total'], self.list_count({}))
+        for tab, params in self.tabs.items():
+            self.assertEqual(counts[tab], self.list_count(params), tab)
+
+    def test_counts_use_single_query_and_cache(self):
+        self.get_counts()  # warm up
+
+        cache.clear()
+        with self.assertNumQueries(self.expected_queries):
+            self.get_counts()
+        with self.assertNumQueries(self.expected_queries - 1):
+            self.get_counts()
+
+    def test_write_invalidates_cached_counts(self):
+        before = self.get_counts()
+
+        self.create_row()
+
+        self.assertEqual(self.get_counts()['total'], before['total'] + 1)
+
+
+class AgentApplicationCountsTests(TabCountsTestMixin, TestCase):
+    list_url = 'agents_loan:agent_application-list'
+    counts_url = 'agents_loan:agent_application-counts'
+    tabs = {tab: {'status': tab} for tab in Application.AGENT_STATUS_STAGES}
+    expected_queries = 3  # two team lookups and the aggregate
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.staff)
+
+    def test_counts_are_scoped_to_team_countries(self):
+        self.assertEqual(self.get_counts()['total'], Application.objects.filter(user=self.solicitor).count())
+
+    def test_assigned_filter(self):
+        Application.objects.filter(pk=Application.objects.first().pk).update(assigned_to=self.staff)
+
+        self.assertEqual(self.get_counts({'assigned': 'true'})['total'], 1)
+
+
+class SolicitorApplicationCountsTests(TabCountsTestMixin, TestCase):
+    list_url = 'solicitors_loan:solicitor_application-list'
+    counts_url = 'solicitors_loan:solicitor_application-counts'
+    tabs = {tab: {'status': tab} for tab in Application.SOLICITOR_STATUS_STAGES}
+    expected_queries = 1
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.solicitor)
+
+
+class LoanCountsTests(TabCountsTestMixin, TestCase):
+    list_url = 'loans:loan-list'
+    counts_url = 'loans:loan-counts'
+    tabs = {
+        'active': {'status': 'active'},
+        'paid_out': {'status': 'paid_out'},
+        'settled': {'status': 'settled'},
+        'not_committee_approved': {'status': 'not_committee_approved'},
+        'awaiting_approval': {'awaiting_approval_only': 'true'},
+    }
+    expected_queries = 3
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(user=self.staff)
+
+    def create_row(self):
+        return Loan.objects.create(application=super().create_row(), amount_agreed=1000, fee_agreed=100)
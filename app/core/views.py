@@ -2,13 +2,25 @@ from django.http import HttpResponseServerError
 
 import json
 import logging
+import os
+
 from django.http import JsonResponse
+from django.shortcuts import get_object_or_404
 from django.views.decorators.csrf import csrf_exempt
 from django.utils.timezone import now
 
 from communications.utils import send_email_f
 
 from django.conf import settings
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.response import Response
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from core.chunked_uploads import ChunkedUploadError, abort_upload, finish_upload, receive_chunk, start_upload
+from core.models import ChunkedUpload
+from core.Validators.validate_file_extension import is_valid_file_extension
+from core.Validators.validate_file_size import is_valid_upload_size
 
 logger = logging.getLogger(__name__)  # Use Django's logging system
 
@@ -61,3 +73,137 @@ def csp_report(request):
             return JsonResponse({"error": str(e)}, status=400)
 
     return JsonResponse({"error": "Invalid request"}, status=400)
+
+
+class ChunkedUploadViewSet(viewsets.ViewSet):
+    """
+    Base views for uploading a file in chunks: init, append every chunk, complete.
+
+    - POST   .../chunked/                                 {"filename", "total_size", <serializer fields>}
+    - GET    .../chunked/<upload_id>/                     status of the upload, used to resume
+    - PUT    .../chunked/<upload_id>/chunks/<index>/      raw chunk bytes, X-Chunk-Checksum: <sha256 hex>
+    - POST   .../chunked/<upload_id>/complete/            creates the Document / InternalFile row
+    - DELETE .../chunked/<upload_id>/                     abort
+
+    Subclasses set upload_target and serializer_class, and implement get_application, get_storage_name
+    and save_record.
+    """
+    authentication_classes = (JWTAuthentication,)
+    upload_target = None
+    serializer_class = None
+    protocol_fields = ('filename', 'total_size')
+
+    def get_application(self, application_id):
+        raise NotImplementedError
+
+    def get_storage_name(self, filename):
+        raise NotImplementedError
+
+    def save_record(self, serializer, application, upload, storage_name):
+        raise NotImplementedError
+
+    def upload_completed(self, request, application, upload, instance):
+        """Hook for logging and notifications once the row has been created"""
+
+    def get_upload(self, application_id, upload_id):
+        return get_object_or_404(
+            ChunkedUpload, id=upload_id, application_id=application_id, target=self.upload_target,
+            created_by=self.request.user,
+        )
+
+    @staticmethod
+    def get_upload_data(upload):
+        return {
+            'upload_id': str(upload.id),
+            'filename': upload.filename,
+            'status': upload.status,
+            'total_size': upload.total_size,
+            'chunk_size': upload.chunk_size,
+            'total_chunks': upload.total_chunks,
+            'received_chunks': sorted(int(index) for index in upload.received_chunks),
+            'missing_chunks': upload.missing_chunks,
+        }
+
+    def create(self, request, application_id):
+        application = self.get_application(application_id)
+
+        filename = os.path.basename(str(request.data.get('filename') or ''))
+        try:
+            total_size = int(request.data.get('total_size'))
+        except (TypeError, ValueError):
+            return Response({"error": "total_size must be an integer."}, status=status.HTTP_400_BAD_REQUEST)
+
+        if not filename:
+            return Response({"error": "No filename provided."}, status=status.HTTP_400_BAD_REQUEST)
+        if not is_valid_file_extension(filename):
+            return Response(
+                {"error": f"Invalid file type. Allowed: {', '.join(settings.ALLOWED_FILE_EXTENSIONS)}"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not is_valid_upload_size(filename, total_size):
+            return Response(
+                {"error": f"File is too large. Max allowed size for {filename.split('.')[-1]} is exceeded."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        metadata = {key: value for key, value in request.data.items() if key not in self.protocol_fields}
+        serializer = self.serializer_class(data=metadata, partial=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            upload = start_upload(application, request.user, self.upload_target, filename, total_size,
+                                  self.get_storage_name(filename), metadata)
+        except ChunkedUploadError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(self.get_upload_data(upload), status=status.HTTP_201_CREATED)
+
+    def retrieve(self, request, application_id, upload_id):
+        self.get_application(application_id)
+        return Response(self.get_upload_data(self.get_upload(application_id, upload_id)))
+
+    @action(detail=True, methods=['put'])
+    def chunk(self, request, application_id, upload_id, index):
+        self.get_application(application_id)
+        upload = self.get_upload(application_id, upload_id)
+
+        # Read the raw body straight from the request stream, one byte past the limit to spot oversized chunks
+        data = request.stream.read(upload.chunk_size + 1) if request.stream else b''
+
+        try:
+            upload = receive_chunk(upload, index, data, request.headers.get('X-Chunk-Checksum'))
+        except ChunkedUploadError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(self.get_upload_data(upload))
+
+    @action(detail=True, methods=['post'])
+    def complete(self, request, application_id, upload_id):
+        application = self.get_application(application_id)
+        upload = self.get_upload(application_id, upload_id)
+
+        serializer = self.serializer_class(data=upload.metadata, partial=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            instance = finish_upload(
+                upload, lambda storage_name: self.save_record(serializer, application, upload, storage_name)
+            )
+        except ChunkedUploadError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        self.upload_completed(request, application, upload, instance)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    def destroy(self, request, application_id, upload_id):
+        self.get_application(application_id)
+        upload = self.get_upload(application_id, upload_id)
+
+        try:
+            abort_upload(upload)
+        except ChunkedUploadError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -5,6 +5,8 @@ from django.template.loader import render_to_string
 import logging
 from django.utils import timezone
 
+from core.structured_logging import SAMPLED
+
 logger = logging.getLogger(__name__)
 
 
@@ -154,11 +156,10 @@ class EmailCommunicationCreateSerializer(serializers.ModelSerializer):
                 # Render template to get message content
                 template_path = f'email_templates/{email_template}.html'
 
-                print(f"=== TEMPLATE DEBUG ===")
-                print(f"Template path: {template_path}")
-                print(f"Application ID: {application.id if application else 'None'}")
-                print(f"Recipient: {validated_data.get('recipient_name', '')}")
-                print(f"Application URL: {application_url}")
+                logger.debug(
+                    "Rendering %s for application %s, recipient %s, url %s", template_path,
+                    application.id if application else None, validated_data.get('recipient_name', ''), application_url
+                )
 
                 rendered_message = render_to_string(template_path, {
                     'application': application,
@@ -168,20 +169,13 @@ class EmailCommunicationCreateSerializer(serializers.ModelSerializer):
                     'application_url': application_url,  # Add the application URL to context
                 })
 
-                print(f"Rendered message length: {len(rendered_message)}")
-                print(f"Rendered message preview: {rendered_message[:200]}...")
-                print("=====================")
+                logger.debug("Rendered message length: %s", len(rendered_message))
 
                 # Set the rendered message
                 validated_data['message'] = rendered_message
                 logger.info(f"Generated message from template: {email_template}")
 
             except Exception as e:
-                print(f"=== TEMPLATE ERROR ===")
-                print(f"Error: {str(e)}")
-                print(f"Template path attempted: email_templates/{email_template}.html")
-                print("=====================")
-
                 logger.error(f"Failed to render template {email_template}: {e}")
 
                 # Fallback message with application link
@@ -257,10 +251,10 @@ class EmailCommunicationCreateSerializer(serializers.ModelSerializer):
                         )
 
                     email_doc.save()
-                    print(f"Copied: {original_name} -> {email_doc.document.name}")
+                    logger.debug("Copied: %s -> %s", original_name, email_doc.document.name, extra=SAMPLED)
 
                 except Exception as e:
-                    print(f"Error copying document {doc.id}: {e}")
+                    logger.error("Error copying document %s: %s", doc.id, e)
 
 
 class SendEmailSerializer(serializers.Serializer):
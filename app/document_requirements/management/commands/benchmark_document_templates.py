@@ -0,0 +1,51 @@
+import time
+from io import BytesIO
+from types import SimpleNamespace
+
+from django.core.management.base import BaseCommand
+
+from document_requirements.services import DocumentTemplateService
+
+
+class Command(BaseCommand):
+    help = "Compare requests/sec of the python-docx forms built from scratch vs cloned from the cached skeleton."
+
+    FORMS = [
+        ('Renunciation of Probate', '_build_renunciation_skeleton', '_generate_renunciation_word_document'),
+        ('Land Registry Form 51', '_build_land_registry_form_51_skeleton', '_generate_land_registry_form_51'),
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200, help="Documents generated per form and mode")
+
+    def handle(self, *args, **options):
+        iterations = options['iterations']
+
+        # Plain stand-ins for the requirement/application rows, so only document generation is measured
+        deceased = SimpleNamespace(first_name='John', last_name='Doe')
+        requirement = SimpleNamespace(id=0, application=SimpleNamespace(id=0, deceased=deceased))
+
+        for name, builder, generator in self.FORMS:
+            def build_from_scratch():
+                buffer = BytesIO()
+                getattr(DocumentTemplateService, builder)().save(buffer)
+
+            def clone_skeleton():
+                getattr(DocumentTemplateService, generator)(requirement)
+
+            clone_skeleton()  # build the skeleton outside of the timed loop
+
+            before = self._requests_per_second(build_from_scratch, iterations)
+            after = self._requests_per_second(clone_skeleton, iterations)
+
+            self.stdout.write(
+                f"{name}: built per request {before:.1f} req/s, "
+                f"cached skeleton {after:.1f} req/s ({after / before:.2f}x)"
+            )
+
+    @staticmethod
+    def _requests_per_second(func, iterations):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        return iterations / (time.perf_counter() - started)
@@ -1,25 +1,30 @@
 # document_requirements/mortgage_generators.py
 
 import os
-import tempfile
-from datetime import datetime
+import threading
 from docxtpl import DocxTemplate
 from io import BytesIO
 import logging
 from django.utils import timezone
 from django.conf import settings
 
+from document_requirements.pdf_conversion import ConversionError, convert_docx_to_pdf
+
 logger = logging.getLogger(__name__)
 
 
 class MortgageChargeGenerator:
     """Generator for filling DOCX template with mortgage data - Django integration"""
 
-    def __init__(self, template_dir="static/documents",
+    # Raw template bytes keyed by path, shared by every request in the process
+    _template_cache = {}
+    _template_cache_lock = threading.Lock()
+
+    def __init__(self, template_dir=None,
                  template_filename="Precedent_Mortgage_and_Charge_with_Placeholders.docx"):
-        self.template_dir = template_dir
+        self.template_dir = template_dir or os.path.join(settings.BASE_DIR, 'static', 'documents')
         self.template_filename = template_filename
-        self.template_path = os.path.join(template_dir, template_filename)
+        self.template_path = os.path.join(self.template_dir, template_filename)
 
     @classmethod
     def generate_document(cls, requirement):
@@ -51,41 +56,45 @@ class MortgageChargeGenerator:
 
     @classmethod
     def generate_temp_pdf_response(cls, requirement):
-        """Generate temporary PDF and return BytesIO - FIXED VERSION"""
-        temp_docx = None
-        temp_pdf = None
-
+        """Generate the mortgage document as PDF through the shared conversion worker and return BytesIO"""
         try:
             logger.info(f"Starting PDF generation for requirement {requirement.id}")
 
-            # Get context and generate temporary files
             context = cls._get_mortgage_context(requirement)
             generator = cls()
-            temp_docx, temp_pdf = generator.generate_temp_files(context, requirement.application.id)
-
-            # Only return PDF - fail if PDF conversion didn't work
-            if temp_pdf and os.path.exists(temp_pdf):
-                # Read PDF content into BytesIO
-                with open(temp_pdf, 'rb') as pdf_file:
-                    pdf_content = pdf_file.read()
+            docx_buffer = generator._generate_bytesio_response(context, requirement.application.id)
 
-                result = BytesIO(pdf_content)
-                result.seek(0)
-                logger.info("PDF generated successfully")
-                return result
-            else:
-                logger.error("PDF conversion failed - no PDF file generated")
+            if not docx_buffer:
+                logger.error("PDF conversion skipped - DOCX rendering failed")
                 return None
 
+            result = BytesIO(convert_docx_to_pdf(docx_buffer.getvalue()))
+            result.seek(0)
+            logger.info("PDF generated successfully")
+            return result
+
+        except ConversionError as e:
+            logger.error(f"PDF conversion failed: {str(e)}")
+            return None
         except Exception as e:
             logger.error(f"Error generating PDF response: {str(e)}")
             import traceback
             logger.error(f"Full traceback: {traceback.format_exc()}")
             return None
 
-        finally:
-            # Cleanup temporary files with retry logic for Windows
-            cls._cleanup_temp_files(temp_docx, temp_pdf)
+    @classmethod
+    def _load_template_bytes(cls, template_path):
+        """Read the DOCX template once per process, re-reading it only when the file changes on disk"""
+        mtime = os.path.getmtime(template_path)
+        cached = cls._template_cache.get(template_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+        with cls._template_cache_lock:
+            with open(template_path, 'rb') as template_file:
+                template_bytes = template_file.read()
+            cls._template_cache[template_path] = (mtime, template_bytes)
+        return template_bytes
 
     def _generate_bytesio_response(self, context, application_id):
         """Generate document and return BytesIO for Django response"""
@@ -95,8 +104,8 @@ class MortgageChargeGenerator:
                 logger.error(f"Template not found at: {self.template_path}")
                 return None
 
-            # Render the template with context
-            doc = DocxTemplate(self.template_path)
+            # Render a fresh copy of the cached template with context
+            doc = DocxTemplate(BytesIO(self._load_template_bytes(self.template_path)))
             doc.render(context)
 
             # Save to BytesIO instead of file
@@ -111,155 +120,6 @@ class MortgageChargeGenerator:
             logger.error(f"Error rendering document template: {str(e)}")
             return None
 
-    def generate_temp_files(self, context, application_id):
-        """Generate temporary DOCX and PDF files - FIXED VERSION"""
-        try:
-            # Check if template exists
-            if not os.path.exists(self.template_path):
-                logger.error(f"Template not found at: {self.template_path}")
-                return None, None
-
-            # Create temporary files
-            temp_dir = tempfile.gettempdir()
-            timestamp = datetime.now().strftime('%Y%m%d_%H%M%S_%f')[:-3]  # Include microseconds
-            base_filename = f"Mortgage_and_Charge_{application_id}_{timestamp}"
-
-            temp_docx = os.path.join(temp_dir, base_filename + ".docx")
-            temp_pdf = os.path.join(temp_dir, base_filename + ".pdf")
-
-            # Render the template with the provided context
-            doc = DocxTemplate(self.template_path)
-            doc.render(context)
-            doc.save(temp_docx)
-
-            # Release the document object explicitly
-            doc = None
-
-            logger.info(f"Temporary DOCX created: {temp_docx}")
-
-            # Convert to PDF with proper error handling
-            pdf_success = self._convert_docx_to_pdf_safe(temp_docx, temp_pdf)
-
-            if pdf_success:
-                logger.info(f"Temporary PDF created: {temp_pdf}")
-                return temp_docx, temp_pdf
-            else:
-                logger.error("PDF conversion failed")
-                return temp_docx, None
-
-        except Exception as e:
-            logger.error(f"Error generating temporary files: {str(e)}")
-            return None, None
-
-    def _convert_docx_to_pdf_safe(self, temp_docx, temp_pdf):
-        """Convert DOCX to PDF with proper error handling and resource cleanup"""
-        try:
-            from docx2pdf import convert
-
-            # Method 1: Try with COM initialization (Windows)
-            if self._try_com_conversion(temp_docx, temp_pdf):
-                return True
-
-            # Method 2: Try without COM (fallback)
-            if self._try_simple_conversion(temp_docx, temp_pdf):
-                return True
-
-            logger.error("All PDF conversion methods failed")
-            return False
-
-        except ImportError:
-            logger.error("docx2pdf not available. Install with: pip install docx2pdf")
-            return False
-        except Exception as e:
-            logger.error(f"PDF conversion failed: {e}")
-            return False
-
-    def _try_com_conversion(self, temp_docx, temp_pdf):
-        """Try conversion with COM initialization"""
-        try:
-            from docx2pdf import convert
-            import pythoncom
-
-            # Initialize COM
-            pythoncom.CoInitialize()
-
-            try:
-                convert(temp_docx, temp_pdf)
-
-                if os.path.exists(temp_pdf):
-                    logger.info("PDF created using docx2pdf with COM")
-                    return True
-                else:
-                    logger.warning("COM conversion completed but no PDF file created")
-                    return False
-
-            finally:
-                # Always uninitialize COM
-                try:
-                    pythoncom.CoUninitialize()
-                except:
-                    pass
-
-        except ImportError:
-            logger.debug("pythoncom not available, trying without COM")
-            return False
-        except Exception as e:
-            logger.warning(f"COM conversion failed: {e}")
-            return False
-
-    def _try_simple_conversion(self, temp_docx, temp_pdf):
-        """Try conversion without COM"""
-        try:
-            from docx2pdf import convert
-
-            convert(temp_docx, temp_pdf)
-
-            if os.path.exists(temp_pdf):
-                logger.info("PDF created using docx2pdf (simple)")
-                return True
-            else:
-                logger.warning("Simple conversion completed but no PDF file created")
-                return False
-
-        except Exception as e:
-            logger.warning(f"Simple conversion failed: {e}")
-            return False
-
-    @classmethod
-    def _cleanup_temp_files(cls, temp_docx, temp_pdf):
-        """Cleanup temporary files with retry logic for Windows file locking"""
-        import time
-        import gc
-
-        # Force garbage collection first
-        gc.collect()
-
-        files_to_cleanup = []
-        if temp_docx:
-            files_to_cleanup.append(temp_docx)
-        if temp_pdf:
-            files_to_cleanup.append(temp_pdf)
-
-        for file_path in files_to_cleanup:
-            if not os.path.exists(file_path):
-                continue
-
-            # Try to delete with retries (Windows file locking)
-            for attempt in range(3):
-                try:
-                    os.remove(file_path)
-                    logger.info(f"Cleaned up temporary file: {os.path.basename(file_path)}")
-                    break
-                except PermissionError as e:
-                    if attempt < 2:  # Not the last attempt
-                        logger.debug(f"File locked, retrying in 0.5s: {os.path.basename(file_path)}")
-                        time.sleep(0.5)  # Wait and retry
-                    else:
-                        logger.warning(f"Could not delete file after 3 attempts: {os.path.basename(file_path)} - {e}")
-                except Exception as e:
-                    logger.warning(f"Error deleting file {os.path.basename(file_path)}: {e}")
-                    break
-
     @classmethod
     def _get_mortgage_context(cls, requirement):
         """Get context data for mortgage template - follows your existing pattern"""
@@ -0,0 +1,261 @@
+# document_requirements/pdf_conversion.py
+
+import atexit
+import os
+import queue
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import uuid
+from concurrent.futures import Future, TimeoutError as FutureTimeoutError
+import logging
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class ConversionError(Exception):
+    """Raised when a DOCX document could not be converted to PDF"""
+
+
+class ConversionTimeout(ConversionError):
+    """Raised when a conversion job did not finish within the configured timeout"""
+
+
+class LibreOfficeConverter:
+    """Headless LibreOffice backend bound to a private, pre-warmed user profile.
+
+    Every converter owns its own working directory and LibreOffice profile, so several converters can run
+    side by side without fighting over the profile lock, and nothing is ever written to the process CWD.
+    """
+
+    def __init__(self, binary):
+        self.binary = binary
+        self.work_dir = None
+        self.profile_dir = None
+
+    def start(self):
+        self.work_dir = tempfile.mkdtemp(prefix='docx2pdf-')
+        self.profile_dir = os.path.join(self.work_dir, 'profile')
+
+        # The first launch against an empty profile is by far the slowest one, pay it once up front
+        self._run([self.binary, f'-env:UserInstallation=file://{self.profile_dir}',
+                   '--headless', '--norestore', '--terminate_after_init'],
+                  timeout=getattr(settings, 'DOCX_PDF_CONVERTER_TIMEOUT', 60))
+        logger.info(f"LibreOffice converter warmed up in {self.work_dir}")
+
+    def stop(self):
+        if self.work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+        self.work_dir = None
+        self.profile_dir = None
+
+    def convert(self, docx_bytes, timeout):
+        job_name = uuid.uuid4().hex
+        docx_path = os.path.join(self.work_dir, f'{job_name}.docx')
+        pdf_path = os.path.join(self.work_dir, f'{job_name}.pdf')
+
+        try:
+            with open(docx_path, 'wb') as docx_file:
+                docx_file.write(docx_bytes)
+
+            self._run([self.binary, f'-env:UserInstallation=file://{self.profile_dir}',
+                       '--headless', '--norestore', '--convert-to', 'pdf', '--outdir', self.work_dir, docx_path],
+                      timeout=timeout)
+
+            if not os.path.exists(pdf_path):
+                raise ConversionError("LibreOffice finished without producing a PDF")
+
+            with open(pdf_path, 'rb') as pdf_file:
+                return pdf_file.read()
+        finally:
+            for path in (docx_path, pdf_path):
+                if os.path.exists(path):
+                    os.remove(path)
+
+    def _run(self, args, timeout):
+        # Own process group so a hung soffice.bin child is killed together with its launcher
+        process = subprocess.Popen(args, cwd=self.work_dir, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                   start_new_session=True)
+        try:
+            _, stderr = process.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.communicate()
+            raise ConversionTimeout(f"LibreOffice did not finish within {timeout}s")
+
+        if process.returncode != 0:
+            raise ConversionError(f"LibreOffice exited with {process.returncode}: {stderr.decode(errors='ignore')}")
+
+
+class Docx2PdfConverter:
+    """docx2pdf backend (Microsoft Word through COM on Windows, Word automation on macOS)"""
+
+    def __init__(self):
+        self.work_dir = None
+
+    def start(self):
+        from docx2pdf import convert  # noqa: F401 - fail early when the package is missing
+        self.work_dir = tempfile.mkdtemp(prefix='docx2pdf-')
+
+    def stop(self):
+        if self.work_dir:
+            shutil.rmtree(self.work_dir, ignore_errors=True)
+        self.work_dir = None
+
+    def convert(self, docx_bytes, timeout):
+        from docx2pdf import convert
+
+        job_name = uuid.uuid4().hex
+        docx_path = os.path.join(self.work_dir, f'{job_name}.docx')
+        pdf_path = os.path.join(self.work_dir, f'{job_name}.pdf')
+
+        try:
+            import pythoncom
+        except ImportError:
+            pythoncom = None
+
+        try:
+            with open(docx_path, 'wb') as docx_file:
+                docx_file.write(docx_bytes)
+
+            if pythoncom:
+                pythoncom.CoInitialize()
+            try:
+                convert(docx_path, pdf_path)
+            finally:
+                if pythoncom:
+                    pythoncom.CoUninitialize()
+
+            if not os.path.exists(pdf_path):
+                raise ConversionError("docx2pdf finished without producing a PDF")
+
+            with open(pdf_path, 'rb') as pdf_file:
+                return pdf_file.read()
+        except ConversionError:
+            raise
+        except Exception as e:
+            raise ConversionError(f"docx2pdf conversion failed: {e}")
+        finally:
+            for path in (docx_path, pdf_path):
+                try:
+                    if os.path.exists(path):
+                        os.remove(path)
+                except PermissionError as e:
+                    logger.warning(f"Could not delete temporary file {os.path.basename(path)}: {e}")
+
+
+class DocxToPdfWorker:
+    """Pool of long-lived converter threads fed from a bounded job queue.
+
+    Each thread keeps its converter started between jobs. A converter is restarted after a timeout, or after
+    ``max_failures`` consecutive errors, so one broken office process cannot poison later requests.
+    """
+
+    def __init__(self, converter_factory, workers=1, job_timeout=60, queue_size=32, max_failures=3):
+        self.converter_factory = converter_factory
+        self.job_timeout = job_timeout
+        self.max_failures = max_failures
+        self._jobs = queue.Queue(maxsize=queue_size)
+        self._threads = []
+
+        for index in range(workers):
+            thread = threading.Thread(target=self._run, name=f'docx2pdf-worker-{index}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def convert(self, docx_bytes, timeout=None):
+        """Queue a DOCX document and block until its PDF bytes are ready"""
+        timeout = timeout or self.job_timeout
+        future = Future()
+
+        try:
+            self._jobs.put((docx_bytes, future), timeout=timeout)
+        except queue.Full:
+            raise ConversionError("PDF conversion queue is full")
+
+        try:
+            # Leave room for the job itself once it has been picked up
+            return future.result(timeout=timeout * 2)
+        except FutureTimeoutError:
+            future.cancel()
+            raise ConversionTimeout(f"PDF conversion did not complete within {timeout * 2}s")
+
+    def shutdown(self):
+        for _ in self._threads:
+            self._jobs.put(None)
+        for thread in self._threads:
+            thread.join(timeout=self.job_timeout)
+        self._threads = []
+
+    def _run(self):
+        converter = None
+        failures = 0
+
+        while True:
+            job = self._jobs.get()
+            if job is None:
+                break
+
+            docx_bytes, future = job
+            if not future.set_running_or_notify_cancel():
+                continue
+
+            try:
+                if converter is None:
+                    converter = self.converter_factory()
+                    converter.start()
+
+                future.set_result(converter.convert(docx_bytes, self.job_timeout))
+                failures = 0
+
+            except Exception as e:
+                failures += 1
+                logger.warning(f"PDF conversion failed ({failures} in a row): {e}")
+                future.set_exception(e if isinstance(e, ConversionError) else ConversionError(str(e)))
+
+                if converter is not None and (isinstance(e, ConversionTimeout) or failures >= self.max_failures):
+                    logger.warning("Restarting PDF converter")
+                    converter.stop()
+                    converter = None
+                    failures = 0
+
+        if converter is not None:
+            converter.stop()
+
+
+def get_converter_factory():
+    """Pick the conversion backend available on this host, LibreOffice first"""
+    binary = (getattr(settings, 'DOCX_PDF_CONVERTER_BINARY', '')
+              or shutil.which('soffice') or shutil.which('libreoffice'))
+    if binary:
+        return lambda: LibreOfficeConverter(binary)
+    return Docx2PdfConverter
+
+
+_worker = None
+_worker_lock = threading.Lock()
+
+
+def get_conversion_worker():
+    """Return the process-wide conversion worker, starting it on first use"""
+    global _worker
+
+    if _worker is None:
+        with _worker_lock:
+            if _worker is None:
+                _worker = DocxToPdfWorker(
+                    get_converter_factory(),
+                    workers=getattr(settings, 'DOCX_PDF_CONVERTER_WORKERS', 1),
+                    job_timeout=getattr(settings, 'DOCX_PDF_CONVERTER_TIMEOUT', 60),
+                )
+                atexit.register(_worker.shutdown)
+    return _worker
+
+
+def convert_docx_to_pdf(docx_bytes):
+    """Convert DOCX bytes to PDF bytes through the shared worker"""
+    return get_conversion_worker().convert(docx_bytes)
@@ -1,22 +1,59 @@
 # document_requirements/services.py - Complete Document Generation Service
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connection
 from django.http import FileResponse
 from django.template.loader import render_to_string
 from django.utils import timezone
+from docx import Document
 from docx.enum.table import WD_ALIGN_VERTICAL
+from docx.enum.text import WD_ALIGN_PARAGRAPH
+from docx.opc.oxml import serialize_part_xml
+from docx.oxml.ns import qn
+from docx.oxml.parser import parse_xml
 from docx.shared import Inches, Pt
+from docx.text.run import Run
 from xhtml2pdf import pisa
 from io import BytesIO
 import logging
 import os
+import threading
+import zipfile
 
 from document_requirements.mortgage_generators import MortgageChargeGenerator
 
 logger = logging.getLogger(__name__)
 
+# Blank lines printed where the application data is not known
+NAME_LINE = '.' * 48
+ADDRESS_LINE = '.' * 192
+DAY_LINE = '.' * 8
+MONTH_YEAR_LINE = '........................ 20......'
+
+# The only package part of a cached Word skeleton that is parsed and rewritten per request
+SKELETON_DOCUMENT_PART = 'word/document.xml'
+
+# Placeholder tokens written into the cached Word skeletons and replaced per request
+RENUNCIATION_TITLE_NAME = '{{RENUNCIATION_TITLE_NAME}}'
+RENUNCIATION_DECEASED_NAME = '{{RENUNCIATION_DECEASED_NAME}}'
+RENUNCIATION_DECEASED_ADDRESS = '{{RENUNCIATION_DECEASED_ADDRESS}}'
+RENUNCIATION_DEATH_DAY = '{{RENUNCIATION_DEATH_DAY}}'
+RENUNCIATION_DEATH_MONTH_YEAR = '{{RENUNCIATION_DEATH_MONTH_YEAR}}'
+FORM_51_FOLIO_NUMBER = '{{FORM_51_FOLIO_NUMBER}}'
+FORM_51_COUNTY = '{{FORM_51_COUNTY}}'
+FORM_51_PROPERTY_ADDRESS = '{{FORM_51_PROPERTY_ADDRESS}}'
+
 
 class DocumentTemplateService:
     """Service for generating PDF/Word documents on-the-fly from HTML templates or serving static files"""
 
+    # Pre-built Word skeletons (docx bytes) keyed by form name, built once per process
+    _skeleton_cache = {}
+    _skeleton_cache_lock = threading.Lock()
+
     @classmethod
     def can_generate_template(cls, document_type):
         supported_templates = [
@@ -33,8 +70,12 @@ class DocumentTemplateService:
         return any(template_name in document_type.name for template_name in supported_templates)
 
     @classmethod
-    def generate_document_response(cls, requirement):
-        """Generate document (PDF/Word) and return BytesIO response for download"""
+    def generate_document_response(cls, requirement, context=None):
+        """Generate document (PDF/Word) and return BytesIO response for download
+
+        ``context`` is an already computed ``_get_template_context`` result, shared when several documents of
+        the same application are generated together.
+        """
         try:
             if not requirement.document_type.has_template:
                 logger.warning(f"Document type {requirement.document_type.name} does not have template enabled")
@@ -42,9 +83,9 @@ class DocumentTemplateService:
 
             # Handle different document types
             if "Beneficiaries Irrevocable Instruction to Law Firm" in requirement.document_type.name:
-                return cls._generate_beneficiaries_authorisation_pdf(requirement)
+                return cls._generate_beneficiaries_authorisation_pdf(requirement, context)
             elif "Solicitor Letter of Undertaking (Not to distribute estate)" in requirement.document_type.name:
-                return cls._generate_solicitors_letter_of_undertaking(requirement)
+                return cls._generate_solicitors_letter_of_undertaking(requirement, context)
             elif "Renunciation of Probate" in requirement.document_type.name:
                 return cls._generate_renunciation_word_document(requirement)
             elif "Certificate of Title" in requirement.document_type.name:
@@ -62,10 +103,10 @@ class DocumentTemplateService:
             return None
 
     @classmethod
-    def _generate_beneficiaries_authorisation_pdf(cls, requirement):
+    def _generate_beneficiaries_authorisation_pdf(cls, requirement, context=None):
         """Generate the Beneficiaries Authorisation PDF from HTML template"""
         try:
-            context = cls._get_template_context(requirement)
+            context = context or cls._get_template_context(requirement)
             html_string = render_to_string('document_templates/beneficiaries_authorisation.html', context)
 
             result = BytesIO()
@@ -82,10 +123,10 @@ class DocumentTemplateService:
             return None
 
     @classmethod
-    def _generate_solicitors_letter_of_undertaking(cls, requirement):
+    def _generate_solicitors_letter_of_undertaking(cls, requirement, context=None):
         """Generate the Solicitor Letter of Undertaking PDF from HTML template"""
         try:
-            context = cls._get_template_context(requirement)
+            context = context or cls._get_template_context(requirement)
             html_string = render_to_string('document_templates/solicitor_letter_of_undertaking.html', context)
 
             result = BytesIO()
@@ -103,216 +144,36 @@ class DocumentTemplateService:
 
     @classmethod
     def _generate_renunciation_word_document(cls, requirement):
-        """Generate the Renunciation of Probate Word document"""
+        """Generate the Renunciation of Probate Word document from the cached skeleton"""
         try:
-            # Import docx libraries
-            try:
-                from docx import Document
-                from docx.shared import Inches, Pt
-                from docx.enum.text import WD_ALIGN_PARAGRAPH
-            except ImportError as e:
-                logger.error(f"python-docx library not installed: {str(e)}")
-                logger.error("Please install with: pip install python-docx")
-                return None
-
             # Get application data
             application = requirement.application
             deceased = application.deceased if hasattr(application, 'deceased') else None
             logger.info(f"Processing renunciation for application {application.id}")
 
-            # Create Word document
-            doc = Document()
-
-            # Set margins
-            sections = doc.sections
-            for section in sections:
-                section.top_margin = Inches(1)
-                section.bottom_margin = Inches(0.8)
-                section.left_margin = Inches(1.2)
-                section.right_margin = Inches(1.2)
-
-            # Title
-            title = doc.add_paragraph()
-            title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            title_run = title.add_run('RENUNCIATION OF PROBATE')
-            title_run.bold = True
-            title_run.underline = True
-            title_run.font.size = Pt(16)
-            title_run.font.name = 'Times New Roman'
-            title.paragraph_format.space_after = Pt(24)
-
-            # Estate title
-            estate_title = doc.add_paragraph()
-            estate_title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            estate_title.add_run('In the estate of ')
-
-            if deceased and hasattr(deceased, 'first_name') and hasattr(deceased, 'last_name'):
-                name_run = estate_title.add_run(f'{deceased.first_name} {deceased.last_name}')
-                name_run.font.name = 'Times New Roman'
-                name_run.bold = True
-            else:
-                name_run = estate_title.add_run('................................................')
-                name_run.underline = True
-
-            estate_title.add_run(' (named the deceased)')
-            estate_title.paragraph_format.space_after = Pt(18)
-
-            # Main paragraph 1
-            para1 = doc.add_paragraph()
-            para1.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-            para1_format = para1.paragraph_format
-            para1_format.line_spacing = 1.15
-            para1_format.space_after = Pt(12)
-            para1_format.first_line_indent = Inches(0.25)
-
-            # Build first paragraph with Irish legal formatting
-            para1.add_run('Whereas ')
-
+            deceased_name = None
             if deceased and hasattr(deceased, 'first_name') and hasattr(deceased, 'last_name'):
-                name_run = para1.add_run(f'{deceased.first_name} {deceased.last_name}')
-                name_run.bold = True
-            else:
-                name_run = para1.add_run('................................................')
-                name_run.underline = True
-
-            para1.add_run(', late of ')
+                deceased_name = f'{deceased.first_name} {deceased.last_name}'
 
+            deceased_address = None
             if deceased and hasattr(deceased, 'address') and deceased.address:
-                addr_run = para1.add_run(str(deceased.address))
-                addr_run.bold = True
-            else:
-                addr_run = para1.add_run(
-                    '................................................................................................................................................................................................')
-                addr_run.underline = True
-
-            para1.add_run(' deceased, died on the ')
+                deceased_address = str(deceased.address)
 
+            date_of_death = None
             if deceased and hasattr(deceased, 'date_of_death') and deceased.date_of_death:
-                day_run = para1.add_run(str(deceased.date_of_death.day))
-                day_run.bold = True
-                para1.add_run(' day of ')
-                my_run = para1.add_run(deceased.date_of_death.strftime('%B %Y'))
-                my_run.bold = True
-            else:
-                day_run = para1.add_run('........')
-                day_run.underline = True
-                para1.add_run(' day of ')
-                month_run = para1.add_run('........................ 20......')
-                month_run.underline = True
-
-            para1.add_run(
-                ', at [where the application is made in District Probate Registry, add having at the time of his / her death a fixed abode at ')
-
-            fixed_addr_run = para1.add_run(
-                '................................................................................................................................................................................................')
-            fixed_addr_run.underline = True
-
-            para1.add_run(' within the district of ')
-
-            district_run = para1.add_run('......................................')
-            district_run.underline = True
-
-            para1.add_run(
-                '] and whereas he/she made and duly executed his/her last will [or will and codicils] bearing date the ')
-
-            will_day_run = para1.add_run('........')
-            will_day_run.underline = True
-
-            para1.add_run(' day of ')
-
-            will_month_run = para1.add_run('........................ 20......')
-            will_month_run.underline = True
-
-            para1.add_run(', and thereof naming ')
-
-            executor_run = para1.add_run('................................................')
-            executor_run.underline = True
-
-            para1.add_run(' sole executor.')
-
-            # Main paragraph 2
-            para2 = doc.add_paragraph()
-            para2.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
-            para2_format = para2.paragraph_format
-            para2_format.line_spacing = 1.15
-            para2_format.space_after = Pt(24)
-            para2_format.first_line_indent = Inches(0.25)
-
-            para2.add_run('Now I, the said ')
-            executor_name_run = para2.add_run('................................................')
-            executor_name_run.underline = True
-            para2.add_run(
-                ', aged 18 years and upwards, do declare that I have not intermeddled with the estate of the said deceased, and will not hereafter intermeddle therein with the intent to defraud creditors, and I do expressly renounce my right to probate of the said will and of the estate of the said deceased.')
-
-            # Signature section
-            dated_para = doc.add_paragraph()
-            dated_para.paragraph_format.space_before = Pt(12)
-            dated_para.paragraph_format.space_after = Pt(8)
-            dated_run = dated_para.add_run('Dated: ')
-            dated_run.font.name = 'Times New Roman'
-            dated_run.font.size = Pt(12)
-            dated_run.bold = True
-
-            date_line = doc.add_paragraph()
-            date_line.add_run(
-                '................................................................................................................................................................................................')
-            date_line.paragraph_format.space_after = Pt(16)
-
-            signed_para = doc.add_paragraph()
-            signed_para.paragraph_format.space_after = Pt(8)
-            signed_run = signed_para.add_run('Signed: ')
-            signed_run.font.name = 'Times New Roman'
-            signed_run.font.size = Pt(12)
-            signed_run.bold = True
-
-            sig_line = doc.add_paragraph()
-            sig_line.add_run(
-                '................................................................................................................................................................................................')
-            sig_line.paragraph_format.space_after = Pt(20)
-
-            # Witness section
-            witness_title = doc.add_paragraph()
-            witness_title.paragraph_format.space_before = Pt(8)
-            witness_run = witness_title.add_run('WITNESS')
-            witness_run.font.name = 'Times New Roman'
-            witness_run.font.size = Pt(12)
-            witness_run.bold = True
-            witness_run.underline = True
-            witness_title.paragraph_format.space_after = Pt(12)
-
-            # Witness fields
-            witness_name_label = doc.add_paragraph()
-            witness_name_label.add_run('Name: ').bold = True
-            witness_name_label.paragraph_format.space_after = Pt(4)
-
-            witness_name_line = doc.add_paragraph()
-            witness_name_line.add_run(
-                '................................................................................................................................................................................................')
-            witness_name_line.paragraph_format.space_after = Pt(10)
-
-            witness_addr_label = doc.add_paragraph()
-            witness_addr_label.add_run('Address: ').bold = True
-            witness_addr_label.paragraph_format.space_after = Pt(4)
-
-            for i in range(3):
-                addr_line = doc.add_paragraph()
-                addr_line.add_run(
-                    '................................................................................................................................................................................................')
-                addr_line.paragraph_format.space_after = Pt(6)
-
-            witness_sig_label = doc.add_paragraph()
-            witness_sig_label.add_run('Witness Signature: ').bold = True
-            witness_sig_label.paragraph_format.space_before = Pt(8)
-            witness_sig_label.paragraph_format.space_after = Pt(4)
-
-            witness_sig_line = doc.add_paragraph()
-            witness_sig_line.add_run(
-                '................................................................................................................................................................................................')
+                date_of_death = deceased.date_of_death
+
+            parts, document = cls._load_skeleton('renunciation_of_probate', cls._build_renunciation_skeleton)
+            cls._fill_skeleton(document, {
+                RENUNCIATION_TITLE_NAME: (deceased_name, NAME_LINE, 'Times New Roman'),
+                RENUNCIATION_DECEASED_NAME: (deceased_name, NAME_LINE, None),
+                RENUNCIATION_DECEASED_ADDRESS: (deceased_address, ADDRESS_LINE, None),
+                RENUNCIATION_DEATH_DAY: (str(date_of_death.day) if date_of_death else None, DAY_LINE, None),
+                RENUNCIATION_DEATH_MONTH_YEAR: (date_of_death.strftime('%B %Y') if date_of_death else None,
+                                                MONTH_YEAR_LINE, None),
+            })
 
-            # Save to BytesIO
-            result = BytesIO()
-            doc.save(result)
-            result.seek(0)
+            result = cls._save_skeleton(parts, document)
             logger.info("Renunciation Word document created successfully")
             return result
 
@@ -322,233 +183,190 @@ class DocumentTemplateService:
             logger.error(f"Full traceback: {traceback.format_exc()}")
             return None
 
+    @classmethod
+    def _build_renunciation_skeleton(cls):
+        """Build the static Renunciation of Probate layout with placeholder runs for the deceased details"""
+        doc = Document()
+
+        # Set margins
+        sections = doc.sections
+        for section in sections:
+            section.top_margin = Inches(1)
+            section.bottom_margin = Inches(0.8)
+            section.left_margin = Inches(1.2)
+            section.right_margin = Inches(1.2)
+
+        # Title
+        title = doc.add_paragraph()
+        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        title_run = title.add_run('RENUNCIATION OF PROBATE')
+        title_run.bold = True
+        title_run.underline = True
+        title_run.font.size = Pt(16)
+        title_run.font.name = 'Times New Roman'
+        title.paragraph_format.space_after = Pt(24)
+
+        # Estate title
+        estate_title = doc.add_paragraph()
+        estate_title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        estate_title.add_run('In the estate of ')
+        estate_title.add_run(RENUNCIATION_TITLE_NAME)
+
+        estate_title.add_run(' (named the deceased)')
+        estate_title.paragraph_format.space_after = Pt(18)
+
+        # Main paragraph 1
+        para1 = doc.add_paragraph()
+        para1.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+        para1_format = para1.paragraph_format
+        para1_format.line_spacing = 1.15
+        para1_format.space_after = Pt(12)
+        para1_format.first_line_indent = Inches(0.25)
+
+        # Build first paragraph with Irish legal formatting
+        para1.add_run('Whereas ')
+
+        para1.add_run(RENUNCIATION_DECEASED_NAME)
+
+        para1.add_run(', late of ')
+
+        para1.add_run(RENUNCIATION_DECEASED_ADDRESS)
+
+        para1.add_run(' deceased, died on the ')
+
+        para1.add_run(RENUNCIATION_DEATH_DAY)
+        para1.add_run(' day of ')
+        para1.add_run(RENUNCIATION_DEATH_MONTH_YEAR)
+
+        para1.add_run(
+            ', at [where the application is made in District Probate Registry, add having at the time of his / her death a fixed abode at ')
+
+        fixed_addr_run = para1.add_run(
+            '................................................................................................................................................................................................')
+        fixed_addr_run.underline = True
+
+        para1.add_run(' within the district of ')
+
+        district_run = para1.add_run('......................................')
+        district_run.underline = True
+
+        para1.add_run(
+            '] and whereas he/she made and duly executed his/her last will [or will and codicils] bearing date the ')
+
+        will_day_run = para1.add_run('........')
+        will_day_run.underline = True
+
+        para1.add_run(' day of ')
+
+        will_month_run = para1.add_run('........................ 20......')
+        will_month_run.underline = True
+
+        para1.add_run(', and thereof naming ')
+
+        executor_run = para1.add_run('................................................')
+        executor_run.underline = True
+
+        para1.add_run(' sole executor.')
+
+        # Main paragraph 2
+        para2 = doc.add_paragraph()
+        para2.alignment = WD_ALIGN_PARAGRAPH.JUSTIFY
+        para2_format = para2.paragraph_format
+        para2_format.line_spacing = 1.15
+        para2_format.space_after = Pt(24)
+        para2_format.first_line_indent = Inches(0.25)
+
+        para2.add_run('Now I, the said ')
+        executor_name_run = para2.add_run('................................................')
+        executor_name_run.underline = True
+        para2.add_run(
+            ', aged 18 years and upwards, do declare that I have not intermeddled with the estate of the said deceased, and will not hereafter intermeddle therein with the intent to defraud creditors, and I do expressly renounce my right to probate of the said will and of the estate of the said deceased.')
+
+        # Signature section
+        dated_para = doc.add_paragraph()
+        dated_para.paragraph_format.space_before = Pt(12)
+        dated_para.paragraph_format.space_after = Pt(8)
+        dated_run = dated_para.add_run('Dated: ')
+        dated_run.font.name = 'Times New Roman'
+        dated_run.font.size = Pt(12)
+        dated_run.bold = True
+
+        date_line = doc.add_paragraph()
+        date_line.add_run(
+            '................................................................................................................................................................................................')
+        date_line.paragraph_format.space_after = Pt(16)
+
+        signed_para = doc.add_paragraph()
+        signed_para.paragraph_format.space_after = Pt(8)
+        signed_run = signed_para.add_run('Signed: ')
+        signed_run.font.name = 'Times New Roman'
+        signed_run.font.size = Pt(12)
+        signed_run.bold = True
+
+        sig_line = doc.add_paragraph()
+        sig_line.add_run(
+            '................................................................................................................................................................................................')
+        sig_line.paragraph_format.space_after = Pt(20)
+
+        # Witness section
+        witness_title = doc.add_paragraph()
+        witness_title.paragraph_format.space_before = Pt(8)
+        witness_run = witness_title.add_run('WITNESS')
+        witness_run.font.name = 'Times New Roman'
+        witness_run.font.size = Pt(12)
+        witness_run.bold = True
+        witness_run.underline = True
+        witness_title.paragraph_format.space_after = Pt(12)
+
+        # Witness fields
+        witness_name_label = doc.add_paragraph()
+        witness_name_label.add_run('Name: ').bold = True
+        witness_name_label.paragraph_format.space_after = Pt(4)
+
+        witness_name_line = doc.add_paragraph()
+        witness_name_line.add_run(
+            '................................................................................................................................................................................................')
+        witness_name_line.paragraph_format.space_after = Pt(10)
+
+        witness_addr_label = doc.add_paragraph()
+        witness_addr_label.add_run('Address: ').bold = True
+        witness_addr_label.paragraph_format.space_after = Pt(4)
+
+        for i in range(3):
+            addr_line = doc.add_paragraph()
+            addr_line.add_run(
+                '................................................................................................................................................................................................')
+            addr_line.paragraph_format.space_after = Pt(6)
+
+        witness_sig_label = doc.add_paragraph()
+        witness_sig_label.add_run('Witness Signature: ').bold = True
+        witness_sig_label.paragraph_format.space_before = Pt(8)
+        witness_sig_label.paragraph_format.space_after = Pt(4)
+
+        witness_sig_line = doc.add_paragraph()
+        witness_sig_line.add_run(
+            '................................................................................................................................................................................................')
+
+        return doc
+
     @classmethod
     def _generate_land_registry_form_51(cls, requirement):
-        """Generate the Land Registry Form 51 Word document"""
+        """Generate the Land Registry Form 51 Word document from the cached skeleton"""
         try:
-            # Import docx libraries
-            try:
-                from docx import Document
-                from docx.shared import Inches, Pt
-                from docx.enum.text import WD_ALIGN_PARAGRAPH
-                from docx.enum.table import WD_ALIGN_VERTICAL
-            except ImportError as e:
-                logger.error(f"python-docx library not installed: {str(e)}")
-                logger.error("Please install with: pip install python-docx")
-                return None
-
             # Get application data
             application = requirement.application
             context = cls._get_land_registry_context(requirement)
             logger.info(f"Processing Land Registry Form 51 for application {application.id}")
 
-            # Create Word document
-            doc = Document()
-
-            # Set tight margins to fit more content
-            sections = doc.sections
-            for section in sections:
-                section.top_margin = Inches(0.5)
-                section.bottom_margin = Inches(0.5)
-                section.left_margin = Inches(0.7)
-                section.right_margin = Inches(0.7)
-
-            # Form header - compact
-            header = doc.add_paragraph()
-            header.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            header_run = header.add_run('FORM 51')
-            header_run.bold = True
-            header_run.font.size = Pt(14)
-            header_run.font.name = 'Times New Roman'
-            header.paragraph_format.space_after = Pt(3)
-
-            # Subtitle - compact
-            subtitle = doc.add_paragraph()
-            subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            subtitle_run = subtitle.add_run('Charge for present and future advances (Rules 52 and 105)')
-            subtitle_run.italic = True
-            subtitle_run.font.size = Pt(9)
-            subtitle_run.font.name = 'Times New Roman'
-            subtitle.paragraph_format.space_after = Pt(6)
-
-            # Land Registry title - compact
-            title = doc.add_paragraph()
-            title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            title_run = title.add_run('LAND REGISTRY')
-            title_run.bold = True
-            title_run.font.size = Pt(16)
-            title_run.font.name = 'Times New Roman'
-            title.paragraph_format.space_after = Pt(3)
-
-            # Mortgage subtitle - compact
-            mortgage_title = doc.add_paragraph()
-            mortgage_title.alignment = WD_ALIGN_PARAGRAPH.CENTER
-            mortgage_run = mortgage_title.add_run('MORTGAGE')
-            mortgage_run.bold = True
-            mortgage_run.font.size = Pt(12)
-            mortgage_run.font.name = 'Times New Roman'
-            mortgage_title.paragraph_format.space_after = Pt(8)
-
-            # Create main table - more compact
-            table = doc.add_table(rows=1, cols=2)
-            table.style = 'Table Grid'
-
-            # Set tighter column widths
-            table.columns[0].width = Inches(1.8)
-            table.columns[1].width = Inches(5.2)
-
-            # Remove the default row
-            table._element.remove(table.rows[0]._element)
-
-            # Date row
-            cls._add_form_row(table, 'Date:', '', fill_type='blank')
-
-            # Secured Party row
-            cls._add_form_row(table, 'Secured Party:', '', fill_type='blank')
-
-            # Mortgagor row
-            cls._add_form_row(table, 'Mortgagor:', '', fill_type='blank')
-
-            # Mortgaged Property row (more compact)
-            property_content = f"""The property comprised in Folio {context.get('folio_number', '____________________')} County {context.get('county', '____________________')}
-
-ALL THAT the property known as {context.get('property_address', '_' * 60)}
+            parts, document = cls._load_skeleton('land_registry_form_51',
+                                                 cls._build_land_registry_form_51_skeleton)
+            cls._fill_skeleton(document, replacements={
+                FORM_51_FOLIO_NUMBER: context.get('folio_number', '_' * 20),
+                FORM_51_COUNTY: context.get('county', '_' * 20),
+                FORM_51_PROPERTY_ADDRESS: context.get('property_address', '_' * 60),
+            })
 
-(*use a continuation sheet if necessary*)"""
-            cls._add_form_row(table, 'Mortgaged Property:', property_content, is_large=True, compact=True)
-
-            # General Mortgage Conditions row (more compact)
-            conditions_content = """This Mortgage incorporates the Loan Mortgage Conditions as if they were set out in this Mortgage in full and the Mortgagor acknowledges that the Mortgagor has been given a copy of the General Mortgage Conditions and has read them and agrees to be bound by them. The term 'Secured Liabilities' has the meaning given in the 'General Conditions'."""
-            cls._add_form_row(table, 'General Mortgage Conditions:', conditions_content, is_large=True, compact=True)
-
-            # Mortgage section (more compact)
-            mortgage_content = """As security for the payment and discharge of the Secured Liabilities, the Mortgagor as beneficial owner (and also in the case of registered land as registered owner or as the person entitled to be registered as registered owner) hereby charges in favour of the Secured Party the Mortgaged Property with the payment of the Secured Liabilities, and assents to the registration of this charge as a burden on the Mortgaged Property."""
-            cls._add_form_row(table, 'Mortgage:', mortgage_content, is_large=True, compact=True)
-
-            # Add minimal space before signatures
-            doc.add_paragraph().paragraph_format.space_after = Pt(8)
-
-            # Create signatures section with connected header
-            sig_header = doc.add_paragraph()
-            sig_header_run = sig_header.add_run('Signatures:')
-            sig_header_run.bold = True
-            sig_header_run.font.name = 'Times New Roman'
-            sig_header_run.font.size = Pt(11)
-            sig_header.paragraph_format.space_after = Pt(6)
-
-            # Create compact signatures table
-            sig_table = doc.add_table(rows=1, cols=2)
-            sig_table.style = 'Table Grid'
-
-            # Set signature table column widths
-            sig_table.columns[0].width = Inches(3.5)
-            sig_table.columns[1].width = Inches(3.5)
-
-            # Left column - First signatory (proper signature spacing)
-            left_cell = sig_table.cell(0, 0)
-            left_para = left_cell.paragraphs[0]
-            left_para.paragraph_format.space_after = Pt(0)
-            left_para.paragraph_format.line_spacing = 1.0
-
-            # Main signature section with substantial space
-            left_para.add_run('Signed and Delivered as a deed:').bold = True
-            left_para.add_run('\n\n')  # 5 line breaks for signature space
-            dot_run1 = left_para.add_run('.' * 35)  # Signature line
-            dot_run1.bold = False
-
-            # Witness signature with proper spacing
-            left_para.add_run('\n')  # 2 line breaks between sections
-            left_para.add_run('Signature of witness:').bold = True
-            left_para.add_run('\n\n')  # 3 line breaks for witness signature space
-            dot_run2 = left_para.add_run('.' * 35)
-            dot_run2.bold = False
-
-            # Witness details with clean spacing
-            left_para.add_run('\n')  # 2 line breaks before next field
-            left_para.add_run('Name of witness:').bold = True
-            left_para.add_run('\n\n')  # Single line break
-            dot_run3 = left_para.add_run('.' * 35)
-            dot_run3.bold = False
-
-            left_para.add_run('\n')  # 2 line breaks before address
-            left_para.add_run('Address of witness:').bold = True
-            left_para.add_run('\n\n')  # Single line break
-            dot_run4 = left_para.add_run('.' * 35)
-            dot_run4.bold = False
-            left_para.add_run('\n\n')  # Single line break
-            dot_run5 = left_para.add_run('.' * 35)
-            dot_run5.bold = False
-            left_para.add_run('\n\n')  # Single line break
-            dot_run6 = left_para.add_run('.' * 35)
-            dot_run6.bold = False
-
-            left_para.add_run('\n')  # 2 line breaks before occupation
-            left_para.add_run('Occupation of witness:').bold = True
-            left_para.add_run('\n\n')  # Single line break
-            dot_run7 = left_para.add_run('.' * 35)
-            dot_run7.bold = False
-
-            # Right column - Second signatory (proper signature spacing)
-            right_cell = sig_table.cell(0, 1)
-            right_para = right_cell.paragraphs[0]
-            right_para.paragraph_format.space_after = Pt(0)
-            right_para.paragraph_format.line_spacing = 1.0
-
-            # Main signature section with substantial space
-            right_para.add_run('Signed and Delivered as a deed:').bold = True
-            right_para.add_run('\n\n')  # 5 line breaks for signature space
-            dot_run8 = right_para.add_run('.' * 35)  # Signature line
-            dot_run8.bold = False
-
-            # Witness signature with proper spacing
-            right_para.add_run('\n')  # 2 line breaks between sections
-            right_para.add_run('Signature of witness:').bold = True
-            right_para.add_run('\n\n')  # 3 line breaks for witness signature space
-            dot_run9 = right_para.add_run('.' * 35)
-            dot_run9.bold = False
-
-            # Witness details with clean spacing
-            right_para.add_run('\n')  # 2 line breaks before next field
-            right_para.add_run('Name of witness:').bold = True
-            right_para.add_run('\n\n')  # Single line break
-            dot_run10 = right_para.add_run('.' * 35)
-            dot_run10.bold = False
-
-            right_para.add_run('\n')  # 2 line breaks before address
-            right_para.add_run('Address of witness:').bold = True
-            right_para.add_run('\n\n')  # Single line break
-            dot_run11 = right_para.add_run('.' * 35)
-            dot_run11.bold = False
-            right_para.add_run('\n\n')  # Single line break
-            dot_run12 = right_para.add_run('.' * 35)
-            dot_run12.bold = False
-            right_para.add_run('\n\n')  # Single line break
-            dot_run13 = right_para.add_run('.' * 35)
-            dot_run13.bold = False
-
-            right_para.add_run('\n')  # 2 line breaks before occupation
-            right_para.add_run('Occupation of witness:').bold = True
-            right_para.add_run('\n\n')  # Single line break
-            dot_run14 = right_para.add_run('.' * 35)
-            dot_run14.bold = False
-
-            right_para.add_run('\n\n')  # 2 line breaks before note
-            right_para.add_run('(*use a continuation sheet for additional signatories*)')
-
-            # Add compact note at bottom
-            doc.add_paragraph().paragraph_format.space_after = Pt(3)
-            note = doc.add_paragraph()
-            note_run = note.add_run(
-                'Note - For execution and the attestation of the execution of a charge - see Rules 54 and 55.')
-            note_run.bold = True
-            note_run.font.size = Pt(9)
-            note_run.font.name = 'Times New Roman'
-            note.paragraph_format.space_after = Pt(0)
-
-            # Save to BytesIO
-            result = BytesIO()
-            doc.save(result)
-            result.seek(0)
+            result = cls._save_skeleton(parts, document)
             logger.info("Land Registry Form 51 created successfully")
             return result
 
@@ -558,6 +376,274 @@ ALL THAT the property known as {context.get('property_address', '_' * 60)}
             logger.error(f"Full traceback: {traceback.format_exc()}")
             return None
 
+    @classmethod
+    def _build_land_registry_form_51_skeleton(cls):
+        """Build the static Land Registry Form 51 layout with inline tokens for the property details"""
+        doc = Document()
+
+        # Set tight margins to fit more content
+        sections = doc.sections
+        for section in sections:
+            section.top_margin = Inches(0.5)
+            section.bottom_margin = Inches(0.5)
+            section.left_margin = Inches(0.7)
+            section.right_margin = Inches(0.7)
+
+        # Form header - compact
+        header = doc.add_paragraph()
+        header.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        header_run = header.add_run('FORM 51')
+        header_run.bold = True
+        header_run.font.size = Pt(14)
+        header_run.font.name = 'Times New Roman'
+        header.paragraph_format.space_after = Pt(3)
+
+        # Subtitle - compact
+        subtitle = doc.add_paragraph()
+        subtitle.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        subtitle_run = subtitle.add_run('Charge for present and future advances (Rules 52 and 105)')
+        subtitle_run.italic = True
+        subtitle_run.font.size = Pt(9)
+        subtitle_run.font.name = 'Times New Roman'
+        subtitle.paragraph_format.space_after = Pt(6)
+
+        # Land Registry title - compact
+        title = doc.add_paragraph()
+        title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        title_run = title.add_run('LAND REGISTRY')
+        title_run.bold = True
+        title_run.font.size = Pt(16)
+        title_run.font.name = 'Times New Roman'
+        title.paragraph_format.space_after = Pt(3)
+
+        # Mortgage subtitle - compact
+        mortgage_title = doc.add_paragraph()
+        mortgage_title.alignment = WD_ALIGN_PARAGRAPH.CENTER
+        mortgage_run = mortgage_title.add_run('MORTGAGE')
+        mortgage_run.bold = True
+        mortgage_run.font.size = Pt(12)
+        mortgage_run.font.name = 'Times New Roman'
+        mortgage_title.paragraph_format.space_after = Pt(8)
+
+        # Create main table - more compact
+        table = doc.add_table(rows=1, cols=2)
+        table.style = 'Table Grid'
+
+        # Set tighter column widths
+        table.columns[0].width = Inches(1.8)
+        table.columns[1].width = Inches(5.2)
+
+        # Remove the default row
+        table._element.remove(table.rows[0]._element)
+
+        # Date row
+        cls._add_form_row(table, 'Date:', '', fill_type='blank')
+
+        # Secured Party row
+        cls._add_form_row(table, 'Secured Party:', '', fill_type='blank')
+
+        # Mortgagor row
+        cls._add_form_row(table, 'Mortgagor:', '', fill_type='blank')
+
+        # Mortgaged Property row (more compact)
+        property_content = f"""The property comprised in Folio {FORM_51_FOLIO_NUMBER} County {FORM_51_COUNTY}
+
+ALL THAT the property known as {FORM_51_PROPERTY_ADDRESS}
+
+(*use a continuation sheet if necessary*)"""
+        cls._add_form_row(table, 'Mortgaged Property:', property_content, is_large=True, compact=True)
+
+        # General Mortgage Conditions row (more compact)
+        conditions_content = """This Mortgage incorporates the Loan Mortgage Conditions as if they were set out in this Mortgage in full and the Mortgagor acknowledges that the Mortgagor has been given a copy of the General Mortgage Conditions and has read them and agrees to be bound by them. The term 'Secured Liabilities' has the meaning given in the 'General Conditions'."""
+        cls._add_form_row(table, 'General Mortgage Conditions:', conditions_content, is_large=True, compact=True)
+
+        # Mortgage section (more compact)
+        mortgage_content = """As security for the payment and discharge of the Secured Liabilities, the Mortgagor as beneficial owner (and also in the case of registered land as registered owner or as the person entitled to be registered as registered owner) hereby charges in favour of the Secured Party the Mortgaged Property with the payment of the Secured Liabilities, and assents to the registration of this charge as a burden on the Mortgaged Property."""
+        cls._add_form_row(table, 'Mortgage:', mortgage_content, is_large=True, compact=True)
+
+        # Add minimal space before signatures
+        doc.add_paragraph().paragraph_format.space_after = Pt(8)
+
+        # Create signatures section with connected header
+        sig_header = doc.add_paragraph()
+        sig_header_run = sig_header.add_run('Signatures:')
+        sig_header_run.bold = True
+        sig_header_run.font.name = 'Times New Roman'
+        sig_header_run.font.size = Pt(11)
+        sig_header.paragraph_format.space_after = Pt(6)
+
+        # Create compact signatures table
+        sig_table = doc.add_table(rows=1, cols=2)
+        sig_table.style = 'Table Grid'
+
+        # Set signature table column widths
+        sig_table.columns[0].width = Inches(3.5)
+        sig_table.columns[1].width = Inches(3.5)
+
+        # Left column - First signatory (proper signature spacing)
+        left_cell = sig_table.cell(0, 0)
+        left_para = left_cell.paragraphs[0]
+        left_para.paragraph_format.space_after = Pt(0)
+        left_para.paragraph_format.line_spacing = 1.0
+
+        # Main signature section with substantial space
+        left_para.add_run('Signed and Delivered as a deed:').bold = True
+        left_para.add_run('\n\n')  # 5 line breaks for signature space
+        dot_run1 = left_para.add_run('.' * 35)  # Signature line
+        dot_run1.bold = False
+
+        # Witness signature with proper spacing
+        left_para.add_run('\n')  # 2 line breaks between sections
+        left_para.add_run('Signature of witness:').bold = True
+        left_para.add_run('\n\n')  # 3 line breaks for witness signature space
+        dot_run2 = left_para.add_run('.' * 35)
+        dot_run2.bold = False
+
+        # Witness details with clean spacing
+        left_para.add_run('\n')  # 2 line breaks before next field
+        left_para.add_run('Name of witness:').bold = True
+        left_para.add_run('\n\n')  # Single line break
+        dot_run3 = left_para.add_run('.' * 35)
+        dot_run3.bold = False
+
+        left_para.add_run('\n')  # 2 line breaks before address
+        left_para.add_run('Address of witness:').bold = True
+        left_para.add_run('\n\n')  # Single line break
+        dot_run4 = left_para.add_run('.' * 35)
+        dot_run4.bold = False
+        left_para.add_run('\n\n')  # Single line break
+        dot_run5 = left_para.add_run('.' * 35)
+        dot_run5.bold = False
+        left_para.add_run('\n\n')  # Single line break
+        dot_run6 = left_para.add_run('.' * 35)
+        dot_run6.bold = False
+
+        left_para.add_run('\n')  # 2 line breaks before occupation
+        left_para.add_run('Occupation of witness:').bold = True
+        left_para.add_run('\n\n')  # Single line break
+        dot_run7 = left_para.add_run('.' * 35)
+        dot_run7.bold = False
+
+        # Right column - Second signatory (proper signature spacing)
+        right_cell = sig_table.cell(0, 1)
+        right_para = right_cell.paragraphs[0]
+        right_para.paragraph_format.space_after = Pt(0)
+        right_para.paragraph_format.line_spacing = 1.0
+
+        # Main signature section with substantial space
+        right_para.add_run('Signed and Delivered as a deed:').bold = True
+        right_para.add_run('\n\n')  # 5 line breaks for signature space
+        dot_run8 = right_para.add_run('.' * 35)  # Signature line
+        dot_run8.bold = False
+
+        # Witness signature with proper spacing
+        right_para.add_run('\n')  # 2 line breaks between sections
+        right_para.add_run('Signature of witness:').bold = True
+        right_para.add_run('\n\n')  # 3 line breaks for witness signature space
+        dot_run9 = right_para.add_run('.' * 35)
+        dot_run9.bold = False
+
+        # Witness details with clean spacing
+        right_para.add_run('\n')  # 2 line breaks before next field
+        right_para.add_run('Name of witness:').bold = True
+        right_para.add_run('\n\n')  # Single line break
+        dot_run10 = right_para.add_run('.' * 35)
+        dot_run10.bold = False
+
+        right_para.add_run('\n')  # 2 line breaks before address
+        right_para.add_run('Address of witness:').bold = True
+        right_para.add_run('\n\n')  # Single line break
+        dot_run11 = right_para.add_run('.' * 35)
+        dot_run11.bold = False
+        right_para.add_run('\n\n')  # Single line break
+        dot_run12 = right_para.add_run('.' * 35)
+        dot_run12.bold = False
+        right_para.add_run('\n\n')  # Single line break
+        dot_run13 = right_para.add_run('.' * 35)
+        dot_run13.bold = False
+
+        right_para.add_run('\n')  # 2 line breaks before occupation
+        right_para.add_run('Occupation of witness:').bold = True
+        right_para.add_run('\n\n')  # Single line break
+        dot_run14 = right_para.add_run('.' * 35)
+        dot_run14.bold = False
+
+        right_para.add_run('\n\n')  # 2 line breaks before note
+        right_para.add_run('(*use a continuation sheet for additional signatories*)')
+
+        # Add compact note at bottom
+        doc.add_paragraph().paragraph_format.space_after = Pt(3)
+        note = doc.add_paragraph()
+        note_run = note.add_run(
+            'Note - For execution and the attestation of the execution of a charge - see Rules 54 and 55.')
+        note_run.bold = True
+        note_run.font.size = Pt(9)
+        note_run.font.name = 'Times New Roman'
+        note.paragraph_format.space_after = Pt(0)
+
+        return doc
+
+    @classmethod
+    def _load_skeleton(cls, name, builder):
+        """Return the raw package parts of the cached skeleton and a freshly parsed copy of its document.xml
+
+        Only document.xml is parsed per request; styles, settings, numbering etc. are copied as raw bytes.
+        The skeleton is built with ``builder`` on first use.
+        """
+        skeleton = cls._skeleton_cache.get(name)
+        if skeleton is None:
+            with cls._skeleton_cache_lock:
+                skeleton = cls._skeleton_cache.get(name)
+                if skeleton is None:
+                    buffer = BytesIO()
+                    builder().save(buffer)
+                    with zipfile.ZipFile(buffer) as package:
+                        skeleton = [(info.filename, package.read(info.filename)) for info in package.infolist()]
+                    cls._skeleton_cache[name] = skeleton
+
+        document_xml = dict(skeleton)[SKELETON_DOCUMENT_PART]
+        return skeleton, parse_xml(document_xml)
+
+    @classmethod
+    def _save_skeleton(cls, parts, document):
+        """Write the filled document.xml back into a copy of the skeleton package and return BytesIO"""
+        result = BytesIO()
+        with zipfile.ZipFile(result, 'w', zipfile.ZIP_DEFLATED) as package:
+            for part_name, blob in parts:
+                if part_name == SKELETON_DOCUMENT_PART:
+                    blob = serialize_part_xml(document)
+                package.writestr(part_name, blob)
+        result.seek(0)
+        return result
+
+    @classmethod
+    def _fill_skeleton(cls, document, slots=None, replacements=None):
+        """Fill the placeholders of a parsed skeleton document.xml
+
+        ``slots`` maps a whole-run token to ``(value, blank_line, font_name)``: a value is written in bold, a
+        missing value falls back to an underlined blank line. ``replacements`` maps inline tokens to plain text.
+        """
+        slots = slots or {}
+        replacements = replacements or {}
+
+        for run_element in list(document.iter(qn('w:r'))):
+            run = Run(run_element, None)
+            if run.text in slots:
+                value, blank_line, font_name = slots[run.text]
+                if value:
+                    run.text = value
+                    run.bold = True
+                    if font_name:
+                        run.font.name = font_name
+                else:
+                    run.text = blank_line
+                    run.underline = True
+            elif '{{' in run.text:
+                text = run.text
+                for token, value in replacements.items():
+                    text = text.replace(token, value)
+                run.text = text
+
     @classmethod
     def _add_form_row(cls, table, label, content, is_large=False, compact=False, fill_type='content'):
         """Add a row to the form table"""
@@ -770,8 +856,89 @@ ALL THAT the property known as {context.get('property_address', '_' * 60)}
         else:
             return "application/pdf"
 
+    @classmethod
+    async def stream_requirements_pack(cls, requirements):
+        """Generate the templates of several requirements concurrently and yield them as ZIP archive chunks
+
+        The template context is computed once for the whole application. Documents are generated by a thread
+        pool and written to the archive in request order; each chunk is yielded as soon as its entry is
+        complete, so the archive is never held in memory as a whole. Documents that fail to generate are listed
+        in an ``errors.txt`` entry instead of aborting the download.
+
+        This is an async generator: under ASGI (daphne) StreamingHttpResponse reads a synchronous iterator to the
+        end before sending anything, an asynchronous one is sent chunk by chunk. Under WSGI Django collects it
+        first, which only concerns runserver.
+        """
+        context = await sync_to_async(cls._get_template_context)(requirements[0]) if requirements else None
+        max_workers = getattr(settings, 'DOCUMENT_PACK_WORKERS', 4)
+
+        def generate(requirement):
+            try:
+                return cls.generate_document_response(requirement, context)
+            finally:
+                # Worker threads open their own database connections
+                connection.close()
+
+        stream = _ZipStream()
+        errors = []
+
+        executor = ThreadPoolExecutor(max_workers=max_workers)
+        try:
+            futures = [(requirement, executor.submit(generate, requirement)) for requirement in requirements]
+
+            with zipfile.ZipFile(stream, 'w', zipfile.ZIP_DEFLATED) as archive:
+                for requirement, future in futures:
+                    try:
+                        document = await asyncio.wrap_future(future)
+                    except Exception as e:
+                        logger.error(f"Error generating requirement {requirement.id} for pack: {str(e)}")
+                        document = None
+
+                    if document is None:
+                        errors.append(f"{requirement.document_type.name}: document could not be generated")
+                        continue
+
+                    # Deflating a document is CPU work, done off the event loop
+                    await sync_to_async(archive.writestr, thread_sensitive=False)(
+                        cls.get_filename(requirement), document.getvalue()
+                    )
+                    yield stream.pop()
+
+                if errors:
+                    archive.writestr('errors.txt', '\n'.join(errors))
+
+            yield stream.pop()
+        finally:
+            # Drop queued documents if the client went away mid-download, without blocking the event loop on the
+            # ones being generated
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    @classmethod
+    def get_pack_filename(cls, application):
+        """Get the filename for a requirements pack archive"""
+        return f"Document_Requirements_{application.id}.zip"
+
     # Legacy method for backward compatibility
     @classmethod
     def generate_pdf_response(cls, requirement):
         """Legacy method - redirects to generate_document_response"""
         return cls.generate_document_response(requirement)
+
+
+class _ZipStream:
+    """Write-only, non-seekable file object collecting the bytes zipfile produces until they are streamed out"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
@@ -1,3 +1,304 @@
-from django.test import TestCase
+"""
+Tests for document requirement template generation.
+"""
+import threading
+import time
+import zipfile
+from io import BytesIO
+from types import SimpleNamespace
+from unittest.mock import patch
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth import get_user_model
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from docx import Document
+from rest_framework import status
+from rest_framework.test import APIClient
+
+from core.models import Application, Deceased
+from document_requirements.models import ApplicationDocumentRequirement, DocumentType
+
+from document_requirements.mortgage_generators import MortgageChargeGenerator
+from document_requirements.pdf_conversion import (
+    ConversionError,
+    ConversionTimeout,
+    DocxToPdfWorker,
+)
+from document_requirements.services import DocumentTemplateService
+
+
+class FakeConverter:
+    """In-memory converter that records its lifecycle"""
+    instances = []
+
+    def __init__(self, fail_with=None, delay=0):
+        self.fail_with = fail_with
+        self.delay = delay
+        self.started = False
+        self.stopped = False
+        FakeConverter.instances.append(self)
+
+    def start(self):
+        self.started = True
+
+    def stop(self):
+        self.stopped = True
+
+    def convert(self, docx_bytes, timeout):
+        if self.delay:
+            time.sleep(self.delay)
+        if self.fail_with:
+            raise self.fail_with
+        return b'%PDF-' + docx_bytes
+
+
+class DocxToPdfWorkerTests(SimpleTestCase):
+
+    def setUp(self):
+        FakeConverter.instances = []
+
+    def test_converter_is_reused_between_jobs(self):
+        worker = DocxToPdfWorker(FakeConverter, workers=1, job_timeout=5)
+        try:
+            self.assertEqual(worker.convert(b'one'), b'%PDF-one')
+            self.assertEqual(worker.convert(b'two'), b'%PDF-two')
+        finally:
+            worker.shutdown()
+
+        self.assertEqual(len(FakeConverter.instances), 1)
+        self.assertTrue(FakeConverter.instances[0].started)
+        self.assertTrue(FakeConverter.instances[0].stopped)
+
+    def test_timeout_restarts_converter(self):
+        worker = DocxToPdfWorker(lambda: FakeConverter(fail_with=ConversionTimeout('hung')), workers=1,
+                                 job_timeout=5)
+        try:
+            with self.assertRaises(ConversionTimeout):
+                worker.convert(b'one')
+            with self.assertRaises(ConversionTimeout):
+                worker.convert(b'two')
+        finally:
+            worker.shutdown()
+
+        self.assertEqual(len(FakeConverter.instances), 2)
+        self.assertTrue(all(converter.stopped for converter in FakeConverter.instances))
+
+    def test_repeated_failures_restart_converter(self):
+        worker = DocxToPdfWorker(lambda: FakeConverter(fail_with=ValueError('broken')), workers=1,
+                                 job_timeout=5, max_failures=2)
+        try:
+            for _ in range(3):
+                with self.assertRaises(ConversionError):
+                    worker.convert(b'doc')
+        finally:
+            worker.shutdown()
+
+        self.assertEqual(len(FakeConverter.instances), 2)
+        self.assertTrue(FakeConverter.instances[0].stopped)
+
+    def test_caller_gives_up_on_slow_job(self):
+        worker = DocxToPdfWorker(lambda: FakeConverter(delay=0.5), workers=1, job_timeout=0.1)
+        try:
+            with self.assertRaises(ConversionTimeout):
+                worker.convert(b'doc')
+        finally:
+            worker.shutdown()
+
+
+class MortgageTemplateCacheTests(SimpleTestCase):
+
+    def setUp(self):
+        MortgageChargeGenerator._template_cache.clear()
+
+    def test_template_is_read_once(self):
+        generator = MortgageChargeGenerator()
+        context = {key: '' for key in ['TODAYS_DATE', 'CHARGOR_NAME', 'LENDER_NAME']}
+
+        with patch('builtins.open', wraps=open) as patched_open:
+            self.assertIsNotNone(generator._generate_bytesio_response(context, 1))
+            self.assertIsNotNone(generator._generate_bytesio_response(context, 1))
+
+        template_reads = [call for call in patched_open.call_args_list
+                          if call.args and call.args[0] == generator.template_path]
+        self.assertEqual(len(template_reads), 1)
+
+    @patch('document_requirements.mortgage_generators.convert_docx_to_pdf')
+    @patch.object(MortgageChargeGenerator, '_get_mortgage_context', return_value={})
+    def test_pdf_response_uses_conversion_worker(self, patched_context, patched_convert):
+        patched_convert.return_value = b'%PDF-1.4'
+        requirement = type('Requirement', (), {'id': 1, 'application': type('Application', (), {'id': 1})})
+
+        result = MortgageChargeGenerator.generate_temp_pdf_response(requirement)
+
+        self.assertEqual(result.getvalue(), b'%PDF-1.4')
+        self.assertTrue(patched_convert.call_args.args[0].startswith(b'PK'))
+
+    @patch('document_requirements.mortgage_generators.convert_docx_to_pdf', side_effect=ConversionError('down'))
+    @patch.object(MortgageChargeGenerator, '_get_mortgage_context', return_value={})
+    def test_pdf_response_returns_none_when_conversion_fails(self, patched_context, patched_convert):
+        requirement = type('Requirement', (), {'id': 1, 'application': type('Application', (), {'id': 1})})
+
+        self.assertIsNone(MortgageChargeGenerator.generate_temp_pdf_response(requirement))
+
+
+class DocumentSkeletonTests(SimpleTestCase):
+
+    def setUp(self):
+        DocumentTemplateService._skeleton_cache.clear()
+
+    def make_requirement(self, deceased):
+        return SimpleNamespace(id=1, application=SimpleNamespace(id=1, deceased=deceased))
+
+    def test_skeleton_is_built_once(self):
+        requirement = self.make_requirement(SimpleNamespace(first_name='John', last_name='Doe'))
+
+        with patch.object(DocumentTemplateService, '_build_renunciation_skeleton',
+                          wraps=DocumentTemplateService._build_renunciation_skeleton) as patched_build:
+            DocumentTemplateService._generate_renunciation_word_document(requirement)
+            DocumentTemplateService._generate_renunciation_word_document(requirement)
+
+        self.assertEqual(patched_build.call_count, 1)
+
+    def test_renunciation_fills_deceased_name(self):
+        requirement = self.make_requirement(SimpleNamespace(first_name='John', last_name='Doe'))
+
+        doc = Document(DocumentTemplateService._generate_renunciation_word_document(requirement))
+        text = '\n'.join(paragraph.text for paragraph in doc.paragraphs)
+
+        self.assertIn('In the estate of John Doe (named the deceased)', text)
+        self.assertIn('Whereas John Doe, late of ', text)
+        self.assertNotIn('{{', text)
+
+        name_run = next(run for run in doc.paragraphs[1].runs if run.text == 'John Doe')
+        self.assertTrue(name_run.bold)
+        self.assertEqual(name_run.font.name, 'Times New Roman')
+
+    def test_renunciation_without_deceased_uses_blank_lines(self):
+        doc = Document(DocumentTemplateService._generate_renunciation_word_document(self.make_requirement(None)))
+
+        name_run = doc.paragraphs[1].runs[1]
+        self.assertEqual(name_run.text, '.' * 48)
+        self.assertTrue(name_run.underline)
+
+    def test_land_registry_form_51_replaces_property_tokens(self):
+        doc = Document(DocumentTemplateService._generate_land_registry_form_51(self.make_requirement(None)))
+        property_cell = doc.tables[0].rows[3].cells[1].text
+
+        self.assertIn('The property comprised in Folio  County', property_cell)
+        self.assertNotIn('{{', property_cell)
+
+
+async def read_chunks(response, first_chunk_read=None):
+    """Chunks of a streaming response read the way the ASGI handler does, through __aiter__"""
+    chunks = []
+    async for chunk in response:
+        chunks.append(chunk)
+        if first_chunk_read and len(chunks) == 1:
+            first_chunk_read()
+    return chunks
+
+
+def get_pack_url(application_id):
+    return reverse('document_requirements:download_requirements_pack', args=[application_id])
+
+
+class RequirementsPackAPITests(TestCase):
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='staff@example.com',
+            password='testpass123',
+            is_staff=True,
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(user=self.user)
+
+        deceased = Deceased.objects.create(first_name='John', last_name='Doe')
+        self.application = Application.objects.create(user=self.user, amount=1000, term=12, deceased=deceased)
+
+        self.requirements = {}
+        for name, has_template in [
+            ('Beneficiaries Irrevocable Instruction to Law Firm', True),
+            ('Solicitor Letter of Undertaking (Not to distribute estate)', True),
+            ('Renunciation of Probate', True),
+            ('Grant of Probate', False),
+        ]:
+            document_type = DocumentType.objects.create(name=name, has_template=has_template)
+            self.requirements[name] = ApplicationDocumentRequirement.objects.create(
+                application=self.application, document_type=document_type, created_by=self.user
+            )
+
+    def read_pack(self, response):
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'application/zip')
+        self.assertTrue(response.is_async)
+        return zipfile.ZipFile(BytesIO(b''.join(async_to_sync(read_chunks)(response))))
+
+    def test_pack_contains_every_template_document(self):
+        with patch.object(DocumentTemplateService, '_get_template_context',
+                          wraps=DocumentTemplateService._get_template_context) as patched_context:
+            response = self.client.post(get_pack_url(self.application.id), {}, format='json')
+            archive = self.read_pack(response)
+
+        self.assertEqual(sorted(archive.namelist()), sorted([
+            f'Beneficiaries_Irrevocable_Instruction_to_Law_Firm_{self.application.id}.pdf',
+            f'Solicitor_Letter_of_Undertaking_{self.application.id}.pdf',
+            f'Renunciation_of_Probate_{self.application.id}.docx',
+        ]))
+        self.assertEqual(patched_context.call_count, 1)
+
+    def test_pack_is_sent_while_documents_are_generated(self):
+        # Second in the archive (requirements are ordered by name), the first entry does not wait for it
+        blocked = self.requirements['Renunciation of Probate']
+        release_blocked = threading.Event()
+        generated = []
+
+        def generate(requirement, context=None):
+            if requirement.id == blocked.id:
+                release_blocked.wait(timeout=10)
+            generated.append(requirement.id)
+            return BytesIO(b'%PDF-1.4')
+
+        generated_before_first_chunk = []
+
+        def first_chunk_read():
+            generated_before_first_chunk.extend(generated)
+            release_blocked.set()
+
+        with patch.object(DocumentTemplateService, 'generate_document_response', side_effect=generate):
+            response = self.client.post(get_pack_url(self.application.id), {}, format='json')
+            chunks = async_to_sync(read_chunks)(response, first_chunk_read)
+
+        self.assertNotIn(blocked.id, generated_before_first_chunk)
+        self.assertGreater(len(chunks), 2)
+        archive = zipfile.ZipFile(BytesIO(b''.join(chunks)))
+        self.assertIn(f'Renunciation_of_Probate_{self.application.id}.docx', archive.namelist())
+
+    def test_pack_with_selected_requirements(self):
+        requirement = self.requirements['Renunciation of Probate']
+
+        response = self.client.post(
+            get_pack_url(self.application.id), {'requirement_ids': [requirement.id]}, format='json'
+        )
+        archive = self.read_pack(response)
+
+        self.assertEqual(archive.namelist(), [f'Renunciation_of_Probate_{self.application.id}.docx'])
+
+    def test_pack_lists_failed_documents(self):
+        with patch.object(DocumentTemplateService, '_generate_renunciation_word_document', return_value=None):
+            response = self.client.post(get_pack_url(self.application.id), {}, format='json')
+            archive = self.read_pack(response)
+
+        self.assertIn('errors.txt', archive.namelist())
+        self.assertIn(b'Renunciation of Probate', archive.read('errors.txt'))
+
+    def test_pack_without_template_requirements_fails(self):
+        requirement = self.requirements['Grant of Probate']
+
+        response = self.client.post(
+            get_pack_url(self.application.id), {'requirement_ids': [requirement.id]}, format='json'
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -42,6 +42,10 @@ urlpatterns = [
          views.download_template_pdf,
          name='download_template_pdf'),
 
+    path('api/applications/<int:application_id>/document-requirements/download-pack/',
+         views.download_requirements_pack,
+         name='download_requirements_pack'),
+
     path('api/applications/<int:application_id>/document-requirements/<int:requirement_id>/check-template/',
          views.check_template_availability,
          name='check_template_availability'),
@@ -7,7 +7,7 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from django.shortcuts import get_object_or_404
 from django.db import IntegrityError
 from django.db.models import Max
-from django.http import HttpResponse, Http404
+from django.http import HttpResponse, Http404, StreamingHttpResponse
 from drf_spectacular.utils import extend_schema, OpenApiParameter, OpenApiTypes, OpenApiExample
 from .models import DocumentType, ApplicationDocumentRequirement
 from .serializers import (
@@ -498,6 +498,79 @@ def download_template_pdf(request, application_id, requirement_id):
         )
 
 
+@extend_schema(
+    summary="Download requirements pack",
+    description="Generate the template documents of several requirements of an application in one request and "
+                "stream them back as a ZIP archive. When no requirement IDs are given, every requirement with a "
+                "generatable template is included.",
+    tags=["document-requirements"],
+    parameters=[
+        OpenApiParameter(
+            name="application_id",
+            type=OpenApiTypes.INT,
+            location=OpenApiParameter.PATH,
+            description="Application ID"
+        )
+    ],
+    request=OpenApiTypes.OBJECT,
+    examples=[
+        OpenApiExample(
+            name="Download Requirements Pack",
+            value={"requirement_ids": [1, 2, 3]},
+            request_only=True
+        )
+    ],
+    responses={
+        200: OpenApiTypes.BINARY,
+        400: OpenApiTypes.OBJECT,
+        404: OpenApiTypes.OBJECT
+    }
+)
+@api_view(['POST'])
+@authentication_classes([JWTAuthentication])
+@permission_classes([permissions.IsAuthenticated])
+def download_requirements_pack(request, application_id):
+    """Generate the templates of several requirements and stream them as one ZIP archive"""
+    # Everything the generators read is loaded up front, so the worker threads do not hit the database
+    application = get_object_or_404(
+        Application.objects.select_related('deceased', 'user__address', 'solicitor').prefetch_related('applicants'),
+        id=application_id
+    )
+
+    requirement_ids = request.data.get('requirement_ids', [])
+    if not isinstance(requirement_ids, list):
+        return Response(
+            {'error': 'requirement_ids must be a list'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    requirements = application.document_requirements.select_related('document_type')
+    if requirement_ids:
+        requirements = requirements.filter(id__in=requirement_ids)
+
+    requirements = [
+        requirement for requirement in requirements
+        if DocumentTemplateService.can_generate_template(requirement.document_type)
+    ]
+    if not requirements:
+        return Response(
+            {'error': 'No requirements with a generatable template found'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+
+    for requirement in requirements:
+        requirement.application = application
+
+    response = StreamingHttpResponse(
+        DocumentTemplateService.stream_requirements_pack(requirements),
+        content_type='application/zip'
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="{DocumentTemplateService.get_pack_filename(application)}"'
+    )
+    return response
+
+
 @extend_schema(
     summary="Check template availability",
     description="Check if a template can be generated for a specific requirement and get template info",
@@ -0,0 +1,72 @@
+"""
+Snapshot of every estate item of an application, fetched in one query
+"""
+import hashlib
+import json
+from collections import defaultdict
+
+from django.db.models import CharField, DecimalField, F, Value
+from django.db.models.functions import Cast, JSONObject
+from django.utils.http import quote_etag
+
+from core.estate_totals import ESTATE_RELATIONS, estate_models
+from estates import serializers
+
+ESTATE_SERIALIZERS = {
+    'real_and_leasehold': serializers.RealAndLeaseholdSerializer,
+    'household_contents': serializers.HouseholdContentsSerializer,
+    'cars_boats': serializers.CarsBoatsSerializer,
+    'business_farming': serializers.BusinessFarmingSerializer,
+    'business_other': serializers.BusinessOtherSerializer,
+    'unpaid_purchase_money': serializers.UnpaidPurchaseMoneySerializer,
+    'financial_assets': serializers.FinancialAssetSerializer,
+    'life_insurance': serializers.LifeInsuranceSerializer,
+    'debts_owing': serializers.DebtOwedSerializer,
+    'securities_quoted': serializers.SecuritiesQuotedSerializer,
+    'securities_unquoted': serializers.SecuritiesUnquotedSerializer,
+    'other_property': serializers.OtherPropertySerializer,
+    'irish_debts': serializers.IrishDebtSerializer,
+}
+
+
+def _item_columns(model):
+    """Every column of an estate item as a JSON object, decimals as text so they keep their scale"""
+    columns = {}
+    for field in model._meta.concrete_fields:
+        if isinstance(field, DecimalField):
+            columns[field.attname] = Cast(field.attname, CharField())
+        else:
+            columns[field.attname] = F(field.attname)
+    return JSONObject(**columns)
+
+
+def fetch_estate_rows(application_id):
+    """(relation, item id, columns) of every estate item of an application, in a single UNION ALL query"""
+    querysets = [
+        model.objects.filter(application_id=application_id).annotate(
+            category=Value(relation, output_field=CharField()),
+            columns=_item_columns(model),
+        ).values_list('category', 'id', 'columns')
+        for relation, model in estate_models().items()
+    ]
+    first, *rest = querysets
+    return list(first.union(*rest, all=True).order_by('category', 'id'))
+
+
+def estate_etag(rows):
+    """Quoted ETag of a snapshot, changes whenever any item is added, removed or edited"""
+    digest = hashlib.sha256(json.dumps(rows, sort_keys=True, default=str).encode()).hexdigest()
+    return quote_etag(digest)
+
+
+def serialize_estates(rows):
+    """Response body of a snapshot: the serialized items of each category, empty categories included"""
+    models_by_relation = estate_models()
+    items = defaultdict(list)
+    for relation, _, columns in rows:
+        items[relation].append(models_by_relation[relation](**columns))
+
+    return {
+        relation: ESTATE_SERIALIZERS[relation](items[relation], many=True).data
+        for relation in ESTATE_RELATIONS
+    }
@@ -1,13 +1,17 @@
-from rest_framework import viewsets, permissions
+from rest_framework import viewsets, permissions, status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django.shortcuts import get_object_or_404
 from django.db import transaction
+from django.utils.http import parse_etags
+from drf_spectacular.utils import extend_schema
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
+from core.estate_totals import rebuild_estate_totals
 from core.models import Application, Notification
 from core.models import *
 from .serializers import *
+from .services import estate_etag, fetch_estate_rows, serialize_estates
 
 
 class BaseEstateViewSet(viewsets.ModelViewSet):
@@ -107,6 +111,10 @@ class BaseEstateViewSet(viewsets.ModelViewSet):
         # Save the update
         serializer.save()
 
+        # An item moved to another application leaves the totals of the previous one behind
+        if original_instance.application_id != serializer.instance.application_id:
+            rebuild_estate_totals(original_instance.application_id)
+
         # Get updated data
         updated_data = serializer.instance.__dict__.copy()
 
@@ -231,38 +239,22 @@ class IrishDebtViewSet(BaseEstateViewSet):
 
 
 # 🔍 Unified read-only view by application
+@extend_schema(
+    summary='All estate items of an application',
+    description='Returns the estate items of every category. Send the returned ETag in If-None-Match to get '
+                'a 304 Not Modified while the estate has not changed.',
+    tags=['estates'],
+)
 @api_view(['GET'])
 @permission_classes([permissions.IsAuthenticated])
 def estates_by_application(request, application_id):
     application = get_object_or_404(Application, id=application_id)
 
-    data = {
-        "real_and_leasehold": RealAndLeaseholdSerializer(
-            RealAndLeaseholdProperty.objects.filter(application=application), many=True).data,
-        "household_contents": HouseholdContentsSerializer(
-            HouseholdContents.objects.filter(application=application), many=True).data,
-        "cars_boats": CarsBoatsSerializer(
-            CarsBoats.objects.filter(application=application), many=True).data,
-        "business_farming": BusinessFarmingSerializer(
-            BusinessFarming.objects.filter(application=application), many=True).data,
-        "business_other": BusinessOtherSerializer(
-            BusinessOther.objects.filter(application=application), many=True).data,
-        "unpaid_purchase_money": UnpaidPurchaseMoneySerializer(
-            UnpaidPurchaseMoney.objects.filter(application=application), many=True).data,
-        "financial_assets": FinancialAssetSerializer(
-            FinancialAsset.objects.filter(application=application), many=True).data,
-        "life_insurance": LifeInsuranceSerializer(
-            LifeInsurance.objects.filter(application=application), many=True).data,
-        "debts_owing": DebtOwedSerializer(
-            DebtOwed.objects.filter(application=application), many=True).data,
-        "securities_quoted": SecuritiesQuotedSerializer(
-            SecuritiesQuoted.objects.filter(application=application), many=True).data,
-        "securities_unquoted": SecuritiesUnquotedSerializer(
-            SecuritiesUnquoted.objects.filter(application=application), many=True).data,
-        "other_property": OtherPropertySerializer(
-            OtherProperty.objects.filter(application=application), many=True).data,
-        "irish_debts": IrishDebtSerializer(
-            IrishDebt.objects.filter(application=application), many=True).data,
-    }
-
-    return Response(data)
+    rows = fetch_estate_rows(application.id)
+    etag = estate_etag(rows)
+
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match and etag in parse_etags(if_none_match):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers={'ETag': etag})
+
+    return Response(serialize_estates(rows), headers={'ETag': etag})
@@ -3,6 +3,7 @@ from rest_framework import viewsets, mixins, permissions
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.permissions import IsAuthenticated
 
+from app.pagination import KeysetPaginationMixin
 from core.models import Event
 from event.permissions import IsStaff
 from event.serializers import EventSerializer
@@ -16,7 +17,7 @@ from event.serializers import EventSerializer
         tags=['events'],
     ),
 )
-class EventViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+class EventViewSet(KeysetPaginationMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
     """
     A viewset for listing all events
     """
@@ -34,7 +35,7 @@ class EventViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
         tags=['events'],
     ),
 )
-class EventByApplicationViewSet(mixins.ListModelMixin, viewsets.GenericViewSet):
+class EventByApplicationViewSet(KeysetPaginationMixin, mixins.ListModelMixin, viewsets.GenericViewSet):
     """
     A viewset for listing events by application
     """
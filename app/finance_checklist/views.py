@@ -12,6 +12,7 @@ from django.db import transaction
 from django.utils import timezone
 
 from agents_loan.permissions import IsStaff  # Adjust import path
+from core.loan_summaries import checklist_configuration, prefetch_loan_summaries
 from .models import (
     Loan, FinanceChecklistItem, LoanChecklistSubmission,
     LoanChecklistItemCheck, ChecklistConfiguration
@@ -270,19 +271,19 @@ class LoansRequiringChecklistView(APIView):
     def get(self, request):
         """Get loans that need checklist completion"""
         # Get loans that are approved but not paid out
-        loans = Loan.objects.filter(
+        # Submissions and their checked items of all the loans are loaded up front, the configuration is cached
+        loans = prefetch_loan_summaries(Loan.objects.filter(
             is_paid_out=False
-        ).select_related('application').prefetch_related('checklist_submissions')
+        ).select_related('application'))
 
-        config = ChecklistConfiguration.objects.filter(is_active=True).first()
-        required_approvers = config.required_approvers if config else 1
+        required_approvers = checklist_configuration()[0] or 1
 
         loans_data = []
         for loan in loans:
-            submissions_count = loan.checklist_submissions.count()
-            user_submitted = loan.checklist_submissions.filter(
-                submitted_by=request.user
-            ).exists()
+            submissions_count = len(loan.summary_checklist_submissions)
+            user_submitted = any(
+                submission.submitted_by_id == request.user.id for submission in loan.summary_checklist_submissions
+            )
 
             loans_data.append({
                 'id': loan.id,
@@ -8,6 +8,20 @@ urlpatterns = [
     # Create internal file for specific application
     path('application/<int:application_id>/', views.InternalFileCreateView.as_view(), name='internal-file-create'),
 
+    # Chunked upload of large internal files (init / append / complete)
+    path('application/<int:application_id>/chunked/',
+         views.InternalFileChunkedUploadViewSet.as_view({'post': 'create'}),
+         name='internal-file-chunked-upload'),
+    path('application/<int:application_id>/chunked/<uuid:upload_id>/',
+         views.InternalFileChunkedUploadViewSet.as_view({'get': 'retrieve', 'delete': 'destroy'}),
+         name='internal-file-chunked-upload-detail'),
+    path('application/<int:application_id>/chunked/<uuid:upload_id>/chunks/<int:index>/',
+         views.InternalFileChunkedUploadViewSet.as_view({'put': 'chunk'}),
+         name='internal-file-chunked-upload-chunk'),
+    path('application/<int:application_id>/chunked/<uuid:upload_id>/complete/',
+         views.InternalFileChunkedUploadViewSet.as_view({'post': 'complete'}),
+         name='internal-file-chunked-upload-complete'),
+
     # Individual file operations
     path('<int:pk>/', views.InternalFileDetailView.as_view(), name='internal-file-detail'),
     path('<int:pk>/download/', views.InternalFileDownloadView.as_view(), name='internal-file-download'),
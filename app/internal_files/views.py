@@ -1,3 +1,4 @@
+import logging
 from datetime import datetime
 
 from django.core.files.base import ContentFile
@@ -6,10 +7,12 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
-from django.http import Http404, HttpResponse
-from drf_spectacular.utils import extend_schema
+from django.http import Http404
+from drf_spectacular.utils import extend_schema, extend_schema_view
 
-from core.models import InternalFile
+from core.models import ChunkedUpload, InternalFile
+from core.downloads import serve_field_file
+from core.views import ChunkedUploadViewSet
 from .serializers import InternalFileSerializer
 from agents_loan.permissions import IsStaff  # Adjust import path
 from core.models import Application  # Adjust import path
@@ -19,6 +22,8 @@ import shutil
 import requests
 from django.conf import settings
 
+logger = logging.getLogger(__name__)
+
 
 class InternalFileListView(APIView):
     """
@@ -44,21 +49,17 @@ class InternalFileListView(APIView):
     )
     def get(self, request):
         application_id = request.query_params.get('application_id')
-        print(f"DEBUG: Received application_id: {application_id}")
+        logger.debug("Listing internal files, application_id=%s", application_id)
 
         if application_id:
             files = InternalFile.objects.filter(
                 application_id=application_id,
                 is_active=True
             )
-            print(f"DEBUG: Found {files.count()} files for application {application_id}")
-            print(f"DEBUG: Files: {list(files.values())}")
         else:
             files = InternalFile.objects.filter(is_active=True)
-            print(f"DEBUG: Found {files.count()} total active files")
 
         serializer = self.serializer_class(files, many=True)
-        print(f"DEBUG: Serialized data: {serializer.data}")
         return Response(serializer.data)
 
 
@@ -95,6 +96,59 @@ class InternalFileCreateView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+
+@extend_schema_view(
+    create=extend_schema(
+        summary="Start a chunked internal file upload for application",
+        description="Opens an upload session for a large internal file. Send `filename`, `total_size`, `title` "
+                    "and the other file fields, then upload each chunk and complete the upload. Staff only.",
+        tags=["internal_files"],
+    ),
+    retrieve=extend_schema(
+        summary="Status of a chunked internal file upload",
+        description="Returns the received and missing chunks, used to resume an interrupted upload. Staff only.",
+        tags=["internal_files"],
+    ),
+    chunk=extend_schema(
+        summary="Upload one chunk of an internal file",
+        description="Raw chunk bytes in the body, SHA-256 of the chunk in the `X-Chunk-Checksum` header. Staff only.",
+        tags=["internal_files"],
+    ),
+    complete=extend_schema(
+        summary="Complete a chunked internal file upload",
+        description="Commits the uploaded chunks and creates the internal file. Staff only.",
+        tags=["internal_files"],
+    ),
+    destroy=extend_schema(
+        summary="Abort a chunked internal file upload",
+        description="Aborts the upload and discards the received chunks. Staff only.",
+        tags=["internal_files"],
+    ),
+)
+class InternalFileChunkedUploadViewSet(ChunkedUploadViewSet):
+    permission_classes = [IsAuthenticated, IsStaff]
+    serializer_class = InternalFileSerializer
+    upload_target = ChunkedUpload.TARGET_INTERNAL_FILE
+
+    def get_application(self, application_id):
+        try:
+            return Application.objects.get(id=application_id)
+        except Application.DoesNotExist:
+            raise Http404
+
+    def get_storage_name(self, filename):
+        return InternalFile._meta.get_field('file').generate_filename(None, filename)
+
+    def save_record(self, serializer, application, upload, storage_name):
+        return serializer.save(
+            uploaded_by=self.request.user,
+            application=application,
+            application_id=application.id,
+            is_active=True,
+            file=storage_name
+        )
+
+
 class InternalFileDetailView(APIView):
     """
     Retrieve, update or delete an internal file.
@@ -168,10 +222,10 @@ class InternalFileDetailView(APIView):
                 # Move the file
                 shutil.move(current_file_path, destination_path)
 
-                print(f"DEBUG: File moved from {current_file_path} to {destination_path}")
+                logger.debug("File moved from %s to %s", current_file_path, destination_path)
 
             except Exception as e:
-                print(f"ERROR: Failed to move file: {str(e)}")
+                logger.error("Failed to move file %s: %s", current_file_path, e)
                 # You might want to decide whether to continue with deletion or return an error
                 # For now, we'll continue with the deletion
 
@@ -190,20 +244,15 @@ class InternalFileDownloadView(APIView):
 
     @extend_schema(
         summary="Download internal file",
-        description="Download an internal file. Staff only.",
+        description="Download an internal file. Staff only. Supports Range and If-None-Match requests.",
         tags=["internal_files"],
     )
     def get(self, request, pk):
         try:
             file_obj = InternalFile.objects.get(pk=pk, is_active=True)
-            response = HttpResponse(
-                file_obj.file.read(),
-                content_type='application/octet-stream'
-            )
-            response['Content-Disposition'] = f'attachment; filename="{file_obj.file.name}"'
-            return response
         except InternalFile.DoesNotExist:
             raise Http404
+        return serve_field_file(request, file_obj.file, content_type='application/octet-stream')
 
 
 class PEPCheckCreateView(APIView):
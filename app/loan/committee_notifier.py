@@ -0,0 +1,223 @@
+# loan/committee_notifier.py - Delivery of committee decisions off the request path
+import atexit
+import logging
+import queue
+import threading
+import uuid
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import close_old_connections
+from django.template.loader import render_to_string
+
+from core.loan_summaries import COMMITTEE_TEAM
+from core.models import Loan, Notification, User, UserEmailLog
+
+logger = logging.getLogger(__name__)
+
+DECISION_EMAILS = {
+    True: (
+        "Advancement Approval Notification",
+        "The advancement has been successfully approved by the required members of the committee. The status of the "
+        "advancement has now been updated to APPROVED.",
+    ),
+    False: (
+        "Advancement Rejection Notification",
+        "The advancement has been rejected by the committee. The status of the advancement has now been updated to "
+        "REJECTED.",
+    ),
+}
+
+
+def committee_members():
+    return list(User.objects.filter(teams__name=COMMITTEE_TEAM).distinct().order_by('pk'))
+
+
+def send_committee_emails(notices, members=None):
+    """
+    Email every committee member about each ``(loan, message, subject)`` of ``notices``.
+
+    All emails go out over one SMTP connection and are logged with one insert, then a notification listing the
+    recipients is written per loan. Returns False when the emails could not be sent or logged.
+    """
+    members = committee_members() if members is None else members
+    messages, email_logs = [], []
+    for loan, message, subject in notices:
+        for member in members:
+            email_log = UserEmailLog(
+                sender=settings.DEFAULT_FROM_EMAIL,
+                recipient=member.email,
+                subject='Committee Approval notification',
+                message=render_to_string("emails/committee_notification.html", {
+                    "member": member.name.strip() if member.name and member.name.strip() else member.email,
+                    "application": loan.application,
+                    "subject": subject,
+                    "message": message,
+                }),
+                application=loan.application,
+                solicitor_firm=loan.application.user,
+                seen=True,
+                message_id=str(uuid.uuid4()),
+                attachments=[],
+                original_filenames=[],
+                is_sent=True,
+                send_from=settings.DEFAULT_FROM_EMAIL,
+            )
+            email = EmailMessage(subject=email_log.subject, body=email_log.message, from_email=email_log.sender,
+                                 to=[email_log.recipient], headers={'Message-ID': email_log.message_id})
+            email.content_subtype = 'html'
+            messages.append(email)
+            email_logs.append(email_log)
+
+    try:
+        with get_connection() as connection:
+            connection.send_messages(messages)
+        UserEmailLog.objects.bulk_create(email_logs)
+        result = {"success": "Email sent and logged successfully"}
+    except Exception as e:
+        logger.exception("Sending %s committee emails failed", len(messages))
+        result = {"error": str(e)}
+
+    try:
+        Notification.objects.bulk_create([
+            Notification(
+                recipient=None,
+                text=''.join(f'Advancement committee approval {result}. Send to {member.email}\n'
+                             for member in members),
+                seen=False,
+                created_by=None,
+                application=loan.application,
+            )
+            for loan, _, _ in notices
+        ])
+    except Exception as e:
+        logger.error("Error creating notification: %s", e)
+        return False
+    return 'success' in result
+
+
+def push_notifications(notifications):
+    """Send the websocket events of ``notifications`` to the broadcast group in one event loop pass"""
+    channel_layer = get_channel_layer()
+
+    async def send_all():
+        for notification in notifications:
+            await channel_layer.group_send('broadcast', {
+                'type': 'notification',
+                'message': notification.text,
+                'recipient': notification.recipient.email if notification.recipient else None,
+                'notification_id': notification.id,
+                'application_id': notification.application.id,
+                'seen': notification.seen,
+                'country': notification.application.user.country,
+            })
+
+    async_to_sync(send_all)()
+
+
+def deliver_decisions(decisions):
+    """
+    Notify the assigned agent and the committee of a batch of decisions.
+
+    Each decision is a dict with the ``loan_id``, whether it was ``approved`` and the id of the member whose vote
+    ``decided_by_id`` it. Loans deleted in the meantime (referred back to the agent) are skipped.
+    """
+    loans = Loan.objects.select_related('application__assigned_to', 'application__user').in_bulk(
+        [decision['loan_id'] for decision in decisions])
+    decisions = [decision for decision in decisions if decision['loan_id'] in loans]
+    if not decisions:
+        return
+
+    verdict = {True: 'approved', False: 'rejected'}
+    notifications = Notification.objects.bulk_create([
+        Notification(
+            recipient=loans[decision['loan_id']].application.assigned_to,
+            text=f"Advancement: {decision['loan_id']} has been {verdict[decision['approved']]} by committee members",
+            seen=False,
+            created_by_id=decision['decided_by_id'],
+            application=loans[decision['loan_id']].application,
+        )
+        for decision in decisions
+    ])
+    push_notifications(notifications)
+
+    send_committee_emails([
+        (loans[decision['loan_id']], DECISION_EMAILS[decision['approved']][1],
+         DECISION_EMAILS[decision['approved']][0])
+        for decision in decisions
+    ])
+
+
+class CommitteeNotifier:
+    """
+    Background thread delivering committee decisions.
+
+    Decisions are queued once the vote that reached them is committed. The thread takes every decision waiting in
+    the queue, up to ``batch_size``, and delivers them together: one insert for the notifications, one pass for the
+    websocket pushes and one SMTP connection for the committee emails.
+    """
+
+    def __init__(self, batch_size=50):
+        self.batch_size = batch_size
+        self._decisions = queue.Queue()
+        self._thread = threading.Thread(target=self._run, name='committee-notifier', daemon=True)
+        self._thread.start()
+
+    def publish(self, decision):
+        self._decisions.put(decision)
+
+    def shutdown(self, timeout=30):
+        self._decisions.put(None)
+        self._thread.join(timeout=timeout)
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            decision = self._decisions.get()
+            if decision is None:
+                break
+
+            batch = [decision]
+            while len(batch) < self.batch_size:
+                try:
+                    decision = self._decisions.get_nowait()
+                except queue.Empty:
+                    break
+                if decision is None:
+                    stopping = True
+                    break
+                batch.append(decision)
+
+            try:
+                deliver_decisions(batch)
+            except Exception:
+                logger.exception("Delivering committee decisions failed for loans %s",
+                                 [decision['loan_id'] for decision in batch])
+            finally:
+                close_old_connections()
+
+
+_notifier = None
+_notifier_lock = threading.Lock()
+
+
+def get_committee_notifier():
+    """Return the process-wide notifier, starting it on first use"""
+    global _notifier
+
+    if _notifier is None:
+        with _notifier_lock:
+            if _notifier is None:
+                _notifier = CommitteeNotifier(batch_size=settings.COMMITTEE_NOTIFIER_BATCH_SIZE)
+                atexit.register(_notifier.shutdown)
+    return _notifier
+
+
+def publish_decision(decision):
+    """Hand a decision to the background notifier, or deliver it right away when COMMITTEE_NOTIFIER_ASYNC is off"""
+    if settings.COMMITTEE_NOTIFIER_ASYNC:
+        get_committee_notifier().publish(decision)
+    else:
+        deliver_decisions([decision])
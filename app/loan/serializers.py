@@ -1,9 +1,12 @@
 """
 Serializers for the Loan APIs
 """
+from django.db.models.manager import BaseManager
 from drf_spectacular.types import OpenApiTypes
 from drf_spectacular.utils import extend_schema_field
 from rest_framework import serializers
+from core.loan_ledger import prefetch_latest_entries
+from core.loan_summaries import prefetch_loan_summaries
 from core.models import (Loan, Transaction, LoanExtension, User)
 from loanbook.models import LoanBook
 from loanbook.serializers import LoanBookSerializer
@@ -62,6 +65,16 @@ class UserSerializer(serializers.ModelSerializer):
         fields = ['id', 'email']  #
 
 
+class LoanListSerializer(serializers.ListSerializer):
+    """Loads the committee and checklist summaries and the ledger balances of all the loans of a page in one pass
+    before serializing them"""
+
+    def to_representation(self, data):
+        loans = prefetch_loan_summaries(data.all() if isinstance(data, BaseManager) else data)
+        prefetch_latest_entries(loans)
+        return [self.child.to_representation(loan) for loan in loans]
+
+
 class LoanSerializer(serializers.ModelSerializer):
     amount_paid = serializers.SerializerMethodField()
     extension_fees_total = serializers.SerializerMethodField()
@@ -92,6 +105,7 @@ class LoanSerializer(serializers.ModelSerializer):
             'is_committee_approved', 'country', 'currency_sign'
         ]
         extra_kwargs = {"application": {'required': True}}
+        list_serializer_class = LoanListSerializer
 
     def get_loanbook_data(self, obj):
         try:
@@ -3,8 +3,10 @@ Test loan api
 """
 
 import json
+from unittest.mock import patch
 
 from django.contrib.auth import get_user_model
+from django.core import mail
 from django.test import override_settings
 from django.urls import reverse
 from django.utils import timezone
@@ -13,9 +15,13 @@ from rest_framework import status
 from rest_framework.test import APIClient, APITestCase
 
 from app import settings
+from core.loan_summaries import checklist_configuration, prefetch_loan_summaries
 from core.models import (Application, Deceased, Loan, Team, CommitteeApproval, Notification, )
+from finance_checklist.models import (ChecklistConfiguration, FinanceChecklistItem, LoanChecklistItemCheck,
+                                      LoanChecklistSubmission)
 
 from loan.serializers import (LoanSerializer, )
+from loan.utils import tally_committee_votes
 
 from decimal import Decimal
 
@@ -299,6 +305,54 @@ class PrivateLoanAPI(APITestCase):
         loan.refresh_from_db()
         self.assertFalse(loan.is_committee_approved)
 
+    def test_committee_decision_is_notified_once_after_commit(self):
+        """Test that the last vote decides the loan and the decision is delivered once, after the vote commits"""
+        data = {
+            'application': create_application(self.user, assigned_to=self.user).id,
+            'amount_agreed': settings.ADVANCEMENT_THRESHOLD_FOR_COMMITTEE_APPROVAL + 100_000,
+            'fee_agreed': 2000.00,
+            'term_agreed': 12,
+            'is_settled': False,
+        }
+        response = self.client.post(self.LOANS_URL, data)
+        loan = Loan.objects.get(id=response.data['id'])
+
+        committee_team = Team.objects.create(name="committee_members")
+        ie_team = Team.objects.get(name="ie_team")
+        members = []
+        for index in range(2):
+            member = get_user_model().objects.create_user(email=f'committee{index}@example.com', password='testpass',
+                                                          is_staff=True)
+            member.teams.set([committee_team, ie_team])
+            members.append(member)
+        approve_url = reverse('loans:loan-approve-loan', args=[loan.id])
+
+        self.client.force_authenticate(user=members[0])
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.client.post(approve_url, {'approved': True})
+        loan.refresh_from_db()
+        self.assertIsNone(loan.is_committee_approved)
+        self.assertEqual(callbacks, [])
+
+        self.client.force_authenticate(user=members[1])
+        with self.assertNumQueries(1):
+            self.assertEqual(tally_committee_votes(loan), {'members': 2, 'approvals': 1, 'rejections': 0})
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            response = self.client.post(approve_url, {'approved': True})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        loan.refresh_from_db()
+        self.assertTrue(loan.is_committee_approved)
+        self.assertEqual(len(callbacks), 1)
+        self.assertEqual(sorted(email.to[0] for email in mail.outbox), [member.email for member in members])
+        self.assertTrue(Notification.objects.filter(
+            recipient=self.user, text=f'Advancement: {loan.id} has been approved by committee members').exists())
+
+        # Voting the same way again does not decide, nor notify, a second time
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.client.post(approve_url, {'approved': True})
+        self.assertEqual(callbacks, [])
+        self.assertEqual(len(mail.outbox), 2)
+
     def test_committee_approvements_status_no_interactions(self):
         """Test that the status message is 'No interactions recorded' when no approvals or rejections exist."""
         # print("Test that the status message is 'No interactions recorded' when no approvals or rejections exist.")
@@ -405,6 +459,58 @@ class PrivateLoanAPI(APITestCase):
         self.assertIsNotNone(loan_instance.committee_approvements_status)
         self.assertNotEqual(loan_instance.committee_approvements_status, "")
 
+    def test_loan_summaries_are_loaded_for_a_page_at_once(self):
+        """Test that the committee and checklist summaries of many loans are read from one batch of queries"""
+        committee_team = Team.objects.create(name="committee_members")
+        members = []
+        for index in range(2):
+            member = get_user_model().objects.create_user(email=f'committee{index}@example.com', password='testpass',
+                                                          is_staff=True)
+            member.teams.set([committee_team])
+            members.append(member)
+        ChecklistConfiguration.objects.create(required_approvers=1)
+        items = [FinanceChecklistItem.objects.create(title=f'Item {index}') for index in range(2)]
+
+        for index in range(4):
+            loan = create_test_loan(self.user, create_application(self.user))
+            CommitteeApproval.objects.create(loan=loan, member=members[0], approved=index % 2 == 0,
+                                             rejection_reason=None if index % 2 == 0 else 'Not sufficient')
+            submission = LoanChecklistSubmission.objects.create(loan=loan, submitted_by=self.user)
+            for item in items[:1 + index % 2]:
+                LoanChecklistItemCheck.objects.create(submission=submission, checklist_item=item, is_checked=True)
+
+        expected = [(loan.committee_approvements_status, loan.finance_checklist_complete)
+                    for loan in Loan.objects.order_by('pk')]
+
+        loans = list(Loan.objects.order_by('pk'))
+        with self.assertNumQueries(3):
+            prefetch_loan_summaries(loans)
+        with self.assertNumQueries(0):
+            summaries = [(loan.committee_approvements_status, loan.finance_checklist_complete) for loan in loans]
+
+        self.assertEqual(summaries, expected)
+        self.assertEqual([complete for _, complete in summaries], [False, True, False, True])
+        self.assertIn(members[1].email, summaries[0][0])
+
+        # Leaving the committee drops the member from the cached committee
+        members[1].teams.clear()
+        self.assertNotIn(members[1].email, Loan.objects.order_by('pk').first().committee_approvements_status)
+
+    def test_loan_summaries_cache_expires_without_signal(self):
+        """Test that a change made in another process, which sends no signal here, is seen once the cached copy of
+        the checklist configuration is LOAN_SUMMARIES_CACHE_SECONDS old"""
+        ChecklistConfiguration.objects.create(required_approvers=1)
+        loaded_at = 1000.0
+        expired_at = loaded_at + settings.LOAN_SUMMARIES_CACHE_SECONDS
+        with patch('core.loan_summaries.time.monotonic', return_value=loaded_at):
+            self.assertEqual(checklist_configuration()[0], 1)
+
+        ChecklistConfiguration.objects.update(required_approvers=2)
+        with patch('core.loan_summaries.time.monotonic', return_value=loaded_at + 1):
+            self.assertEqual(checklist_configuration()[0], 1)
+        with patch('core.loan_summaries.time.monotonic', return_value=expired_at):
+            self.assertEqual(checklist_configuration()[0], 2)
+
     def test_notification_created_on_loan_approval(self):
         """Test that a notification is created when a loan is approved by the committee"""
         # print("Test that a notification is created when a loan is approved by the committee")
@@ -432,9 +538,10 @@ class PrivateLoanAPI(APITestCase):
         committee_member.teams.add(Team.objects.create(name="ie_team"))
         self.client.force_authenticate(user=committee_member)
 
-        # Approve the loan
+        # Approve the loan, the notification is delivered once the vote is committed
         approve_url = reverse('loans:loan-approve-loan', args=[loan.id])
-        response = self.client.post(approve_url, {'approved': True})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(approve_url, {'approved': True})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         # Check that a notification was created
@@ -473,9 +580,10 @@ class PrivateLoanAPI(APITestCase):
         committee_member.teams.add(Team.objects.create(name="ie_team"))
         self.client.force_authenticate(user=committee_member)
 
-        # Reject the loan with a reason
+        # Reject the loan with a reason, the notification is delivered once the vote is committed
         reject_url = reverse('loans:loan-approve-loan', args=[loan.id])
-        response = self.client.post(reject_url, {'approved': False, 'rejection_reason': 'Insufficient collateral'})
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(reject_url, {'approved': False, 'rejection_reason': 'Insufficient collateral'})
         self.assertEqual(response.status_code, status.HTTP_200_OK)
 
         # Check that a notification was created
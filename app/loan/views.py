@@ -13,10 +13,13 @@ from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.permissions import IsAuthenticated
 
 import agents_loan.serializers as AgentLoanSerializers
-from app.pagination import CustomPageNumberPagination
+from app.pagination import CustomPageNumberPagination, KeysetPaginationMixin
 from .permissions import IsStaff
 
 from core.models import Loan, Transaction, LoanExtension, CommitteeApproval, Comment
+from core.applicant_search import search_applications
+from core.maturity import maturity_date_expression
+from core.tab_counts import get_cached_counts
 from loan import serializers
 
 from dateutil.relativedelta import relativedelta
@@ -130,6 +133,18 @@ class LoanExtensionViewSet(viewsets.ModelViewSet):
         serializer.save(created_by=self.request.user)
 
 
+# Filters of the status tabs of the loan list, used by LoanViewSet.counts. Same conditions as get_queryset().
+LOAN_TAB_FILTERS = {
+    'active': Q(is_settled=False) & ~(
+        Q(is_committee_approved=False) | Q(is_paid_out=True, paid_out_date__isnull=False) | Q(is_settled=True)
+    ),
+    'paid_out': Q(is_paid_out=True) & ~Q(is_settled=True) & ~Q(paid_out_date__isnull=True),
+    'settled': Q(is_settled=True),
+    'not_committee_approved': Q(needs_committee_approval=True, is_committee_approved=False),
+    'awaiting_approval': Q(needs_committee_approval=True, is_committee_approved__isnull=True),
+}
+
+
 @extend_schema_view(
     list=extend_schema(
         summary='Retrieve all loans {-Works only for staff users-}',
@@ -207,9 +222,27 @@ class LoanExtensionViewSet(viewsets.ModelViewSet):
         summary='Delete a loan {-Works only for staff users-}',
         description='Deletes an existing loan and does not return any content.',
         tags=['loans']
+    ),
+    counts=extend_schema(
+        summary='Count loans per status tab {-Works only for staff users-}',
+        description='Returns the number of loans for every status filter of the list (active, paid_out, settled, '
+                    'not_committee_approved, awaiting_approval) and the total, for the countries of the user\'s '
+                    'teams. Counts are cached for a few seconds and refreshed whenever an application or loan '
+                    'changes.',
+        tags=['loans'],
+        parameters=[
+            OpenApiParameter(
+                name='assigned',
+                description='Count only loans assigned to the logged-in user (true) or unassigned loans (false) - '
+                            'optional',
+                required=False,
+                type=str
+            ),
+        ],
+        responses=OpenApiTypes.OBJECT,
     )
 )
-class LoanViewSet(viewsets.ModelViewSet):
+class LoanViewSet(KeysetPaginationMixin, viewsets.ModelViewSet):
     """View for managing Loan APIs"""
     authentication_classes = (JWTAuthentication,)
     permission_classes = [IsAuthenticated, IsStaff]
@@ -217,17 +250,8 @@ class LoanViewSet(viewsets.ModelViewSet):
     serializer_class = serializers.LoanSerializer
     pagination_class = CustomPageNumberPagination
 
-    def get_queryset(self):
-        queryset = self.queryset
-
-        stat = self.request.query_params.get('status', None)
-        assigned = self.request.query_params.get('assigned', None)
-        old_to_new = self.request.query_params.get('old_to_new', None)
-        not_paid_out_only = self.request.query_params.get('not_paid_out_only', None)
-        awaiting_approval_only = self.request.query_params.get('awaiting_approval_only', None)
-        search_term = self.request.query_params.get('search_term', None)
-        search_id = self.request.query_params.get('search_id', None)
-
+    def get_country_filters(self):
+        """Countries of the user's teams, staff without a country team cannot list loans"""
         user = self.request.user
 
         # Get the user's teams and filter based on the country
@@ -240,8 +264,20 @@ class LoanViewSet(viewsets.ModelViewSet):
         # Check if no country filters were added
         if not country_filters:
             raise PermissionDenied("You must be assigned to at least one team to access this resource.")
+        return country_filters
 
-        queryset = queryset.filter(application__user__country__in=country_filters)
+    def get_queryset(self):
+        queryset = self.queryset
+
+        stat = self.request.query_params.get('status', None)
+        assigned = self.request.query_params.get('assigned', None)
+        old_to_new = self.request.query_params.get('old_to_new', None)
+        not_paid_out_only = self.request.query_params.get('not_paid_out_only', None)
+        awaiting_approval_only = self.request.query_params.get('awaiting_approval_only', None)
+        search_term = self.request.query_params.get('search_term', None)
+        search_id = self.request.query_params.get('search_id', None)
+
+        queryset = queryset.filter(application__user__country__in=self.get_country_filters())
 
         if search_id:
             try:
@@ -253,11 +289,7 @@ class LoanViewSet(viewsets.ModelViewSet):
 
                 # Filter by applicant search term
         if search_term:
-            queryset = queryset.filter(
-                Q(application__applicants__first_name__icontains=search_term) |
-                Q(application__applicants__last_name__icontains=search_term) |
-                Q(application__applicants__pps_number__icontains=search_term)
-            ).distinct()
+            queryset = search_applications(queryset, search_term, field='application_id')
             return queryset
 
         if assigned is not None:
@@ -276,10 +308,8 @@ class LoanViewSet(viewsets.ModelViewSet):
                     paid_out_date__isnull=True  # EXCLUDE records where paid_out_date IS null
                 )
 
-                # Sort by maturity_date property using Python sorting
-                # Since we've filtered out records with no paid_out_date, maturity_date should always exist
-                queryset = sorted(queryset, key=lambda loan: loan.maturity_date)
-                return queryset
+                # Soonest maturity first, computed by the database so the list can still be paginated
+                return queryset.annotate(maturity=maturity_date_expression()).order_by('maturity', '-id')
 
             elif stat == 'settled':
                 queryset = queryset.filter(is_settled=True)
@@ -315,6 +345,22 @@ class LoanViewSet(viewsets.ModelViewSet):
 
         return queryset
 
+    @action(detail=False, methods=['get'])
+    def counts(self, request):
+        """Number of loans in every status tab, counted in a single query"""
+        country_filters = self.get_country_filters()
+        queryset = Loan.objects.filter(application__user__country__in=country_filters)
+
+        assigned = request.query_params.get('assigned', None)
+        if assigned is not None and assigned.lower() == "true":
+            queryset = queryset.filter(application__assigned_to=request.user)
+        elif assigned is not None and assigned.lower() == "false":
+            queryset = queryset.filter(application__assigned_to=None)
+
+        assigned_user = request.user.id if assigned is not None and assigned.lower() == "true" else ''
+        scope = f"loans:{','.join(country_filters)}:{assigned}:{assigned_user}"
+        return Response(get_cached_counts(scope, queryset, LOAN_TAB_FILTERS), status=status.HTTP_200_OK)
+
     def perform_create(self, serializer):
         serializer.save(
             approved_by=self.request.user,
@@ -372,14 +418,19 @@ class LoanViewSet(viewsets.ModelViewSet):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        # Register the approval or rejection
-        approval, created = CommitteeApproval.objects.update_or_create(
-            loan=loan, member=member,
-            defaults={'approved': approved, 'rejection_reason': rejection_reason}
-        )
+        with transaction.atomic():
+            # Votes on the same loan are recorded and tallied one at a time
+            Loan.objects.select_for_update().only('pk').get(pk=loan.pk)
+
+            # Register the approval or rejection
+            approval, created = CommitteeApproval.objects.update_or_create(
+                loan=loan, member=member,
+                defaults={'approved': approved, 'rejection_reason': rejection_reason}
+            )
 
-        # Check if the loan now meets the approval or rejection requirements
-        check_committee_approval(loan, request_user=request.user)
+            # Check if the loan now meets the approval or rejection requirements, the notifications are sent in the
+            # background once the vote is committed
+            check_committee_approval(loan, request_user=request.user)
         return Response({"detail": "Your decision has been recorded."}, status=status.HTTP_200_OK)
 
     @extend_schema(
@@ -184,14 +184,17 @@ class LoanBook(models.Model):
             }
         }
 
-    def calculate_total_due(self, on_date=None):
+    def calculate_total_due(self, on_date=None, transactions=None):
         """Updated to use the static calculation method when possible"""
-        statement = self.generate_statement(on_date)
+        statement = self.generate_statement(on_date, transactions=transactions)
         return statement["total_due"]
 
-    def generate_statement(self, on_date=None):
+    def generate_statement(self, on_date=None, transactions=None):
         """
         Generate statement using FIXED 365-day year calculations
+
+        ``transactions`` (ordered by transaction_date) are used instead of the loan's when given, e.g. by the CCR
+        valuation workers that have no database access.
         """
         on_date = on_date or timezone.now().date()
 
@@ -204,7 +207,11 @@ class LoanBook(models.Model):
 
         from_date = self.loan.paid_out_date or self.loan.approved_date
         principal = self.initial_amount
-        transactions = self.loan.transactions.order_by('transaction_date')
+        if transactions is None and 'transactions' in getattr(self.loan, '_prefetched_objects_cache', {}):
+            # Prefetched for many loans at once (e.g. the CCR submission builder)
+            transactions = sorted(self.loan.transactions.all(), key=lambda tx: tx.transaction_date)
+        elif transactions is None:
+            transactions = self.loan.transactions.order_by('transaction_date')
 
         statement = {
             "date": on_date,
@@ -39,3 +39,18 @@ class NotificationConsumer(AsyncWebsocketConsumer):
 
         # Send the response data back to the WebSocket
         await self.send(text_data=json.dumps(response_data))
+
+    async def new_application(self, event):
+        await self.send(text_data=json.dumps({
+            'type': event['type'],
+            'application_id': event['application_id'],
+            'country': event['country'],
+            'assigned_to': event['assigned_to'],
+        }))
+
+    async def new_applications_seen(self, event):
+        await self.send(text_data=json.dumps({
+            'type': event['type'],
+            'application_ids': event['application_ids'],
+            'seen_by': event['seen_by'],
+        }))
@@ -0,0 +1,36 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+
+def broadcast_new_application(application):
+    """
+    Pushes a `new_application` event to the notifications websocket when an application is submitted.
+
+    Agents add it to their new applications queue without polling, the REST list endpoint is only used to
+    catch up after a reconnect (`since` cursor).
+    """
+    channel_layer = get_channel_layer()
+    async_to_sync(channel_layer.group_send)(
+        'broadcast',
+        {
+            'type': 'new_application',
+            'application_id': application.id,
+            'country': application.country,
+            'assigned_to': application.assigned_to.email if application.assigned_to else None,
+        }
+    )
+
+
+def broadcast_applications_seen(application_ids, seen_by):
+    """
+    Pushes a `new_applications_seen` event so every agent removes the applications from their queue.
+    """
+    channel_layer = get_channel_layer()
+    async_to_sync(channel_layer.group_send)(
+        'broadcast',
+        {
+            'type': 'new_applications_seen',
+            'application_ids': list(application_ids),
+            'seen_by': seen_by.email,
+        }
+    )
@@ -5,7 +5,7 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework_simplejwt.authentication import JWTAuthentication
 
 from agents_loan.permissions import IsStaff
-from app.pagination import CustomPageNumberPagination
+from app.pagination import CustomPageNumberPagination, KeysetPaginationMixin
 from core.models import Notification
 from .serializers import NotificationSerializer
 from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiParameter
@@ -35,7 +35,8 @@ from drf_spectacular.utils import extend_schema_view, extend_schema, OpenApiPara
         ]
     ),
 )
-class NotificationViewSet(mixins.UpdateModelMixin,
+class NotificationViewSet(KeysetPaginationMixin,
+                          mixins.UpdateModelMixin,
                           mixins.ListModelMixin,
                           viewsets.GenericViewSet):
     """ViewSet for updating the 'seen' field of Notification objects."""
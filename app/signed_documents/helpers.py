@@ -1,5 +1,8 @@
+import logging
 import requests
 
+logger = logging.getLogger(__name__)
+
 
 def get_geolocation(ip_address):
     """
@@ -57,7 +60,7 @@ def get_geolocation(ip_address):
                     "as_number": data.get("as")  # Fixed field reference
                 }
     except requests.RequestException as e:
-        print(f"Error fetching geolocation: {e}")
+        logger.error("Error fetching geolocation: %s", e)
     return None
 
 
@@ -99,5 +102,5 @@ def get_proxy_info(ip_address):
                     "proxy_provider": data[ip_address].get("provider")
                 }
     except requests.RequestException as e:
-        print(f"Error fetching proxy info: {e}")
+        logger.error("Error fetching proxy info: %s", e)
     return None
@@ -1,3 +1,4 @@
+import logging
 import json
 from hashlib import sha256
 
@@ -35,6 +36,8 @@ from PIL import Image
 from reportlab.pdfgen import canvas
 from reportlab.lib.pagesizes import A4
 
+logger = logging.getLogger(__name__)
+
 
 def get_client_ip(request):
     """Retrieve the client's public IP address."""
@@ -243,7 +246,7 @@ class SignedDocumentUploadView(APIView):
                 )
                 # print(f"Found original unsigned document: {original_document.id}")
             except Document.DoesNotExist:
-                print(f"Original document with ID {document_id} not found")
+                logger.warning("Original document with ID %s not found", document_id)
         else:
             # If no document_id provided, try to find by document type and signature requirements
             try:
@@ -264,9 +267,9 @@ class SignedDocumentUploadView(APIView):
                     # print(f"Found original document by type matching: {original_document.id}")
                     pass
                 else:
-                    print("No matching original document found by type")
+                    logger.debug("No matching original document found by type")
             except Exception as e:
-                print(f"Error finding original document: {e}")
+                logger.error("Error finding original document: %s", e)
 
         # Save the modified PDF file in the Document model
         signed_document = Document.objects.create(
@@ -291,18 +294,18 @@ class SignedDocumentUploadView(APIView):
 
                 # Delete the database record
                 original_document.delete()
-                print(f"Deleted original unsigned document: {original_document_id}")
+                logger.debug("Deleted original unsigned document: %s", original_document_id)
 
                 # Optionally delete the physical file from storage
                 if original_file_path and os.path.exists(original_file_path):
                     try:
                         os.remove(original_file_path)
-                        print(f"Deleted original file: {original_file_path}")
+                        logger.debug("Deleted original file: %s", original_file_path)
                     except OSError as e:
-                        print(f"Error deleting original file {original_file_path}: {e}")
+                        logger.error("Error deleting original file %s: %s", original_file_path, e)
 
             except Exception as e:
-                print(f"Error deleting original document: {e}")
+                logger.error("Error deleting original document: %s", e)
                 # Don't fail the entire operation if deletion fails
                 pass
 
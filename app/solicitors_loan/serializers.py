@@ -8,6 +8,7 @@ from rest_framework import serializers
 
 from app import settings
 from core.models import (Application, Deceased, Dispute, Applicant, Document, ApplicationProcessingStatus, )
+from core.serializers import ApplicantListSerializer, ApplicantPPSMixin
 from expense.serializers import ExpenseSerializer
 from loan.serializers import LoanSerializer
 from rest_framework.reverse import reverse
@@ -88,7 +89,7 @@ class SolicitorDisputeSerializer(serializers.ModelSerializer):
         fields = ['details']
 
 
-class SolicitorApplicantSerializer(serializers.ModelSerializer):
+class SolicitorApplicantSerializer(ApplicantPPSMixin, serializers.ModelSerializer):
     # Override the pps_number field to accept plain text from the frontend
     pps_number = serializers.CharField(required=True, allow_blank=False)
 
@@ -140,16 +141,7 @@ class SolicitorApplicantSerializer(serializers.ModelSerializer):
             'updated_at'
         ]
         read_only_fields = ['id', 'full_name', 'full_address', 'created_at', 'updated_at']
-
-    def get_pps_number(self, obj):
-        """Return the decrypted PPS number for GET requests."""
-        return obj.decrypted_pps
-
-    def to_representation(self, instance):
-        """Decrypt PPS number when sending data to the frontend."""
-        ret = super().to_representation(instance)
-        ret['pps_number'] = instance.decrypted_pps
-        return ret
+        list_serializer_class = ApplicantListSerializer
 
     def validate(self, data):
         """Additional validation for required fields."""
@@ -183,6 +175,11 @@ class SolicitorApplicantSerializer(serializers.ModelSerializer):
         return instance
 
 
+class SolicitorMaskedApplicantSerializer(SolicitorApplicantSerializer):
+    """Applicant serializer for application lists, the PPS number is masked and never decrypted"""
+    mask_pps = True
+
+
 class ApplicationProcessingStatusSerializer(serializers.ModelSerializer):
     last_updated_by = serializers.StringRelatedField(read_only=True)
 
@@ -199,7 +196,7 @@ class ApplicationProcessingStatusSerializer(serializers.ModelSerializer):
 
 class SolicitorApplicationSerializer(serializers.ModelSerializer):
     """serializer for application list"""
-    applicants = SolicitorApplicantSerializer(
+    applicants = SolicitorMaskedApplicantSerializer(
         many=True, required=True)
     loan = LoanSerializer(read_only=True)
 
@@ -24,6 +24,21 @@ urlpatterns = [
     path('applications/solicitor_applications/document_file/<int:application_id>/',
          views.SolicitorDocumentUploadAndViewListForApplicationIdView.as_view(),
          name='solicitor_application-upload-document'),
+    # Chunked upload of large documents (init / append / complete)
+    path('applications/solicitor_applications/document_file/<int:application_id>/chunked/',
+         views.SolicitorChunkedDocumentUploadViewSet.as_view({'post': 'create'}),
+         name='solicitor_application-chunked-upload'),
+    path('applications/solicitor_applications/document_file/<int:application_id>/chunked/<uuid:upload_id>/',
+         views.SolicitorChunkedDocumentUploadViewSet.as_view({'get': 'retrieve', 'delete': 'destroy'}),
+         name='solicitor_application-chunked-upload-detail'),
+    path('applications/solicitor_applications/document_file/<int:application_id>/chunked/<uuid:upload_id>/'
+         'chunks/<int:index>/',
+         views.SolicitorChunkedDocumentUploadViewSet.as_view({'put': 'chunk'}),
+         name='solicitor_application-chunked-upload-chunk'),
+    path('applications/solicitor_applications/document_file/<int:application_id>/chunked/<uuid:upload_id>/'
+         'complete/',
+         views.SolicitorChunkedDocumentUploadViewSet.as_view({'post': 'complete'}),
+         name='solicitor_application-chunked-upload-complete'),
     path('applications/solicitor_applications/document_file/download/<str:filename>/', DownloadFileView.as_view(),
          name='download-file'),
 
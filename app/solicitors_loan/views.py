@@ -7,7 +7,7 @@ from asgiref.sync import async_to_sync
 from channels.layers import get_channel_layer
 from django.core.files.uploadedfile import InMemoryUploadedFile, TemporaryUploadedFile
 from django.db.models import Q
-from django.http import JsonResponse, Http404, HttpResponse, HttpResponseNotFound, HttpResponseForbidden
+from django.http import JsonResponse, Http404, HttpResponseNotFound, HttpResponseForbidden
 
 import os
 
@@ -17,11 +17,12 @@ from rest_framework import (viewsets, status)
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework.exceptions import MethodNotAllowed, PermissionDenied, NotFound, ValidationError
 from rest_framework.permissions import IsAuthenticated
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
 from app import settings
-from app.pagination import CustomPageNumberPagination
+from app.pagination import CustomPageNumberPagination, KeysetPaginationMixin
 from app.utils import log_event
 from core.Validators.validate_file_extension import is_valid_file_extension
 from core.Validators.validate_file_size import is_valid_file_size
@@ -29,6 +30,13 @@ from core.models import Document, Notification, Solicitor, Assignment
 from solicitors_loan import serializers
 from core import models
 from core.Validators.id_validators import ApplicantsValidator
+from core.applicant_search import search_applications
+from core.maturity import maturity_date_expression
+from core.detail_cache import cached_detail_response
+from core.tab_counts import get_cached_counts
+from core.downloads import serve_field_file
+from core.utils import get_application_document_file_path
+from core.views import ChunkedUploadViewSet
 from solicitors_loan.permissions import IsNonStaff
 
 from drf_spectacular.utils import extend_schema, extend_schema_view, OpenApiParameter
@@ -113,9 +121,17 @@ import re
         summary='Delete a solicitor_application {-Works only for non staff users-}',
         description='Deletes an existing solicitor_application and does not return any content.',
         tags=['solicitor_application']
+    ),
+    counts=extend_schema(
+        summary='Count solicitor_applications per status tab {-Works only for non staff users-}',
+        description='Returns the number of the user\'s applications for every status filter of the list (active, '
+                    'rejected, approved, paid_out, settled) and the total. Counts are cached for a few seconds and '
+                    'refreshed whenever an application or loan changes.',
+        tags=['solicitor_application'],
+        responses=OpenApiTypes.OBJECT,
     )
 )
-class SolicitorApplicationViewSet(viewsets.ModelViewSet):
+class SolicitorApplicationViewSet(KeysetPaginationMixin, viewsets.ModelViewSet):
     """Viewset for applications"""
     serializer_class = serializers.SolicitorApplicationDetailSerializer
     queryset = models.Application.objects.all()
@@ -140,99 +156,38 @@ class SolicitorApplicationViewSet(viewsets.ModelViewSet):
                 raise DRFValidationError({"search_id": "Invalid ID. Must be an integer."})
 
         if stat is not None:
-            if stat == 'active':
-                # Applications that are not rejected or approved, or need committee approval and are pending approval
-                # ALSO include loans that are marked paid_out but have no paid_out_date
-                queryset = queryset.filter(
-                    Q(is_rejected=False, approved=False) |
-                    Q(
-                        approved=True,
-                        loan__isnull=False,
-                        loan__needs_committee_approval=True,
-                        loan__is_committee_approved__isnull=True
-                    ) |
-                    Q(  # ✅ Add this: loans marked as paid out but no actual paid_out_date
-                        approved=True,
-                        loan__isnull=False,
-                        loan__is_paid_out=True,
-                        loan__paid_out_date__isnull=True
-                    )
-                ).distinct()
-
-            elif stat == 'rejected':
-                # Applications explicitly rejected or rejected in the loan approval process
-                queryset = queryset.filter(
-                    Q(is_rejected=True) |
-                    Q(
-                        is_rejected=False,
-                        approved=True,
-                        loan__isnull=False,
-                        loan__needs_committee_approval=True,
-                        loan__is_committee_approved=False
-                    )
-                ).distinct()
-
-
-            elif stat == 'approved':
-
-                # Define condition for "not truly paid out"
-                not_paid_out_condition = Q(loan__is_paid_out=False) | Q(loan__is_paid_out=True,
-                                                                        loan__paid_out_date__isnull=True)
-                # Approved applications with loans that are not paid out or settled
-                queryset = queryset.filter(
-                    approved=True,
-                    loan__isnull=False
-                ).filter(
-                    (Q(loan__needs_committee_approval=False) & not_paid_out_condition & Q(loan__is_settled=False)) |
-                    (Q(loan__needs_committee_approval=True) & Q(
-                        loan__is_committee_approved=True) & not_paid_out_condition & Q(loan__is_settled=False))
-                )
-
-            elif stat == 'paid_out':
-                # Applications with loans paid out but not settled
-                # Must have paid_out_date (same rule as before)
-                queryset = queryset.filter(
-                    approved=True,
-                    loan__isnull=False,
-                    loan__paid_out_date__isnull=False  # ✅ Add this check
-                ).filter(
-                    (Q(loan__needs_committee_approval=False) & Q(loan__is_paid_out=True) & Q(loan__is_settled=False)) |
-                    (Q(loan__needs_committee_approval=True) & Q(loan__is_committee_approved=True) & Q(
-                        loan__is_paid_out=True) & Q(loan__is_settled=False))
-                )
-                # Sort using date.max for consistency (fixes date comparison issue)
-                queryset = sorted(
-                    queryset,
-                    key=lambda app: app.loan.maturity_date if app.loan and app.loan.maturity_date else date.max
-                )
-
-                return queryset
+            # Single indexed lookup on the denormalized stage, "active" also lists loans marked as paid out
+            # that have no paid_out_date yet
+            stages = models.Application.SOLICITOR_STATUS_STAGES.get(stat)
+            if stages is not None:
+                queryset = queryset.filter(stage__in=stages)
 
-            elif stat == 'settled':
-                # Applications with loans that are fully paid out and settled
-                queryset = queryset.filter(
-                    approved=True,
-                    loan__isnull=False
-                ).filter(
-                    (Q(loan__needs_committee_approval=False) & Q(loan__is_paid_out=True) & Q(loan__is_settled=True)) |
-                    (Q(loan__needs_committee_approval=True) & Q(loan__is_committee_approved=True) & Q(
-                        loan__is_paid_out=True) & Q(loan__is_settled=True))
-                )
+            if stat == 'paid_out':
+                # Soonest maturity first, computed by the database so the list can still be paginated
+                return queryset.annotate(loan_maturity=maturity_date_expression('loan__')).order_by(
+                    'loan_maturity', '-id')
 
             # Filter by applicant search term
         if search_term:
-            queryset = queryset.filter(
-                Q(applicants__first_name__icontains=search_term) |
-                Q(applicants__last_name__icontains=search_term) |
-                Q(applicants__pps_number__icontains=search_term) |
-                Q(applicants__email__icontains=search_term) |
-                Q(applicants__phone_number__icontains=search_term) |
-                Q(applicants__city__icontains=search_term) |
-                Q(applicants__county__icontains=search_term)
-            ).distinct()
+            queryset = search_applications(queryset, search_term)
 
         return queryset
 
+    @action(detail=False, methods=['get'])
+    def counts(self, request):
+        """Number of the user's applications in every status tab, counted in a single query"""
+        queryset = models.Application.objects.filter(user=request.user)
+        tab_filters = {
+            stat: Q(stage__in=stages) for stat, stages in models.Application.SOLICITOR_STATUS_STAGES.items()
+        }
+        counts = get_cached_counts(f"solicitor_applications:{request.user.id}", queryset, tab_filters)
+        return Response(counts, status=status.HTTP_200_OK)
+
+    def retrieve(self, request, *args, **kwargs):
+        """Detail response cached per application version, with ETag / If-None-Match support"""
+        return cached_detail_response(request, self.get_object(), self.get_serializer_class(),
+                                      self.get_serializer_context())
+
     def get_serializer_class(self):
         """Return serializer class for the requested model."""
         if self.action == 'list':
@@ -565,6 +520,33 @@ class SolicitorApplicationViewSet(viewsets.ModelViewSet):
             raise e
 
 
+def notify_document_uploaded(request, application):
+    """Notify the assigned agent and broadcast that the solicitor uploaded a new document"""
+    assigned_to_user = application.assigned_to
+
+    notification = Notification.objects.create(
+        recipient=assigned_to_user,
+        text='New document uploaded',
+        seen=False,
+        created_by=request.user,
+        application=application,
+    )
+
+    channel_layer = get_channel_layer()
+    async_to_sync(channel_layer.group_send)(
+        'broadcast',
+        {
+            'type': 'notification',
+            'message': notification.text,
+            'recipient': notification.recipient.email if notification.recipient else None,
+            'notification_id': notification.id,
+            'application_id': application.id,
+            'seen': notification.seen,
+            'country': application.user.country,
+        }
+    )
+
+
 class SolicitorDocumentUploadAndViewListForApplicationIdView(APIView):
     serializer_class = serializers.SolicitorDocumentSerializer
     authentication_classes = (JWTAuthentication,)
@@ -637,36 +619,68 @@ class SolicitorDocumentUploadAndViewListForApplicationIdView(APIView):
 
             log_event(request=request, request_body=request_body, application=application)
 
-            # Broadcast the notification
-            assigned_to_user = application.assigned_to
-
-            notification = Notification.objects.create(
-                recipient=assigned_to_user,
-                text='New document uploaded',
-                seen=False,
-                created_by=request.user,
-                application=application,
-            )
-
-            channel_layer = get_channel_layer()
-            async_to_sync(channel_layer.group_send)(
-                'broadcast',
-                {
-                    'type': 'notification',
-                    'message': notification.text,
-                    'recipient': notification.recipient.email if notification.recipient else None,
-                    'notification_id': notification.id,
-                    'application_id': application.id,
-                    'seen': notification.seen,
-                    'country': application.user.country,
-                }
-            )
+            notify_document_uploaded(request, application)
 
             return Response(serializer.data, status=status.HTTP_201_CREATED)
 
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+
+@extend_schema_view(
+    create=extend_schema(
+        summary="Start a chunked document upload for a specific application {-Works only for non staff users-}",
+        description="Opens an upload session for a large document. Send `filename`, `total_size` and the "
+                    "document fields, then upload each chunk and complete the upload.",
+        tags=["document_solicitor"],
+    ),
+    retrieve=extend_schema(
+        summary="Status of a chunked document upload {-Works only for non staff users-}",
+        description="Returns the received and missing chunks, used to resume an interrupted upload.",
+        tags=["document_solicitor"],
+    ),
+    chunk=extend_schema(
+        summary="Upload one chunk of a document {-Works only for non staff users-}",
+        description="Raw chunk bytes in the body, SHA-256 of the chunk in the `X-Chunk-Checksum` header.",
+        tags=["document_solicitor"],
+    ),
+    complete=extend_schema(
+        summary="Complete a chunked document upload {-Works only for non staff users-}",
+        description="Commits the uploaded chunks and creates the document.",
+        tags=["document_solicitor"],
+    ),
+    destroy=extend_schema(
+        summary="Abort a chunked document upload {-Works only for non staff users-}",
+        description="Aborts the upload and discards the received chunks.",
+        tags=["document_solicitor"],
+    ),
+)
+class SolicitorChunkedDocumentUploadViewSet(ChunkedUploadViewSet):
+    serializer_class = serializers.SolicitorDocumentSerializer
+    permission_classes = [IsAuthenticated, IsNonStaff]
+    upload_target = models.ChunkedUpload.TARGET_DOCUMENT
+
+    def get_application(self, application_id):
+        return get_object_or_404(models.Application, id=application_id, user=self.request.user)
+
+    def get_storage_name(self, filename):
+        return get_application_document_file_path(None, filename)
+
+    def save_record(self, serializer, application, upload, storage_name):
+        return serializer.save(
+            application=application,
+            document=storage_name,
+            original_name=serializer.validated_data.get('original_name') or os.path.splitext(upload.filename)[0],
+        )
+
+    def upload_completed(self, request, application, upload, instance):
+        request_body = dict(upload.metadata)
+        request_body['document'] = 'A new file was uploaded.'
+        log_event(request=request, request_body=request_body, application=application)
+
+        notify_document_uploaded(request, application)
+
+
 class SolicitorDocumentDeleteView(APIView):
     authentication_classes = (JWTAuthentication,)
     permission_classes = [IsAuthenticated, IsNonStaff]
@@ -703,7 +717,8 @@ class DownloadFileView(APIView):
 
     @extend_schema(
         summary="Download a document with the given filename",
-        description="Allows authenticated users to download a file if they have access permissions.",
+        description="Allows authenticated users to download a file if they have access permissions. "
+                    "Supports Range and If-None-Match requests.",
         tags=["document_solicitor"],
         responses={
             200: {
@@ -716,22 +731,20 @@ class DownloadFileView(APIView):
     )
     def get(self, request, filename):
         try:
-            document = Document.objects.get(document__endswith=filename)
-            application = document.application
-
-            # Check if the user is not staff and does not own the application
-            if not request.user.is_staff and application.user != request.user:
-                return HttpResponseForbidden("You do not have permission to access this file.")
+            # Exact match on the indexed storage key, uploads are always stored as uploads/application/<uuid><ext>
+            document = Document.objects.select_related('application').get(
+                document=f'uploads/application/{filename}'
+            )
+        except Document.DoesNotExist:
+            return HttpResponseNotFound("File not found.")
 
-            file_path = os.path.join(settings.MEDIA_ROOT, 'uploads', 'application', filename)
+        application = document.application
 
-            if os.path.exists(file_path):
-                with open(file_path, 'rb') as file:
-                    response = HttpResponse(file.read(), content_type='application/pdf')
-                    response['Content-Disposition'] = f'attachment; filename="{filename}"'
-                    return response
-            else:
-                return HttpResponseNotFound("File not found.")
+        # Check if the user is not staff and does not own the application
+        if not request.user.is_staff and application.user != request.user:
+            return HttpResponseForbidden("You do not have permission to access this file.")
 
-        except Document.DoesNotExist:
+        try:
+            return serve_field_file(request, document.document, filename=filename)
+        except Http404:
             return HttpResponseNotFound("File not found.")
@@ -1,3 +1,4 @@
+import logging
 import base64
 import datetime
 import os
@@ -22,6 +23,8 @@ from app import settings
 from core.models import Application, Solicitor, User, Document  # Added Document model
 from loanbook.models import LoanBook
 
+logger = logging.getLogger(__name__)
+
 
 @extend_schema(
     summary="Generate an Undertaking PDF",
@@ -408,10 +411,10 @@ def generate_terms_of_business_pdf(request):
                     logo_base64 = base64.b64encode(logo_file.read()).decode('utf-8')
                 # print("Logo successfully encoded to base64")
             except Exception as e:
-                print(f"Error encoding logo: {e}")
+                logger.error("Error encoding logo: %s", e)
                 logo_base64 = None
         else:
-            print(f"Logo file not found at: {logo_path}")
+            logger.warning("Logo file not found at: %s", logo_path)
 
         solicitor = application.solicitor
         user = solicitor.user if solicitor else None
@@ -466,9 +469,9 @@ def generate_terms_of_business_pdf(request):
         # Render the HTML template with context data
         try:
             html_string = render_to_string('terms_of_business/terms_of_business_template.html', context)
-            print("HTML template rendered successfully")
+            logger.debug("HTML template rendered successfully")
         except Exception as e:
-            print(f"Error rendering template: {e}")
+            logger.error("Error rendering template: %s", e)
             return JsonResponse({'error': f'Error rendering template: {str(e)}'}, status=500)
 
         # Create a byte stream buffer
@@ -477,21 +480,21 @@ def generate_terms_of_business_pdf(request):
         # Generate PDF from the HTML string using xhtml2pdf
         try:
             pdf = pisa.CreatePDF(BytesIO(html_string.encode("UTF-8")), dest=result)
-            print(f"PDF generation completed. Errors: {pdf.err}")
+            logger.debug("PDF generation completed. Errors: %s", pdf.err)
         except Exception as e:
-            print(f"Error creating PDF: {e}")
+            logger.error("Error creating PDF: %s", e)
             return JsonResponse({'error': f'Error creating PDF: {str(e)}'}, status=500)
 
         # If there's an error generating the PDF, return an error response
         if pdf.err:
-            print(f"PDF generation errors: {pdf.err}")
+            logger.error("PDF generation errors: %s", pdf.err)
             return JsonResponse({'error': 'Error generating PDF - check server logs for details'}, status=500)
 
         # Get the PDF content
         pdf_content = result.getvalue()
 
         if not pdf_content:
-            print("PDF content is empty")
+            logger.error("PDF content is empty")
             return JsonResponse({'error': 'Generated PDF is empty'}, status=500)
 
         # Create a filename for the PDF
@@ -518,10 +521,10 @@ def generate_terms_of_business_pdf(request):
 
             # Save the document instance
             document.save()
-            print(f"Document saved successfully with ID: {document.id}")
+            logger.debug("Document saved successfully with ID: %s", document.id)
 
         except Exception as e:
-            print(f"Error saving document: {e}")
+            logger.error("Error saving document: %s", e)
             return JsonResponse({'error': f'Error saving document: {str(e)}'}, status=500)
 
         return JsonResponse({
@@ -534,13 +537,13 @@ def generate_terms_of_business_pdf(request):
         })
 
     except Application.DoesNotExist:
-        print("Application not found")
+        logger.warning("Application not found")
         return JsonResponse({'error': 'Application not found.'}, status=404)
     except json.JSONDecodeError as e:
-        print(f"JSON decode error: {e}")
+        logger.error("JSON decode error: %s", e)
         return JsonResponse({'error': 'Invalid JSON format'}, status=400)
     except Exception as e:
-        print(f"Unexpected error: {e}")
+        logger.exception("Unexpected error generating the terms of business")
         return JsonResponse({'error': str(e)}, status=500)
 
 
@@ -140,7 +140,7 @@ class CreateUserView(generics.CreateAPIView):
         try:
             self.send_activation_email(user, request)
         except Exception as email_error:
-            print(f"Failed to send activation email: {email_error}")
+            logger.error("Failed to send activation email: %s", email_error)
             return Response(
                 {"error": "User created, but activation email failed to send."},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
@@ -367,7 +367,6 @@ class ManageUserView(generics.RetrieveUpdateAPIView):
             # Validate eircode
             # Check if address is provided
             address = request.data['address']
-            print(address, country)
             if not address:
                 raise ValidationError({"address": "Address is required."})
 
@@ -646,7 +645,7 @@ class CheckCredentialsView(APIView):
                 )
         except ObjectDoesNotExist:
             # Optional: Provide a message if the email is not registered
-            print(f"User with email {email} does not exist.")
+            logger.warning("User with email %s does not exist.", email)
 
         # Authenticate the user
         user = custom_authenticate(request, email=email, password=password)